@@ -25,6 +25,9 @@ from config.socket_patcher import patch_socket
 patch_socket()
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+from django.conf import settings
+
 app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
@@ -38,6 +41,22 @@ app.conf.task_routes = {
     # Interactive tasks -> interactive queue
     'gallery.tasks.generate_stories_task': {'queue': 'interactive'},
     'gallery.tasks.compute_and_store_rep_vectors': {'queue': 'interactive'},
+    'gallery.tasks.purge_deleted_photos': {'queue': 'interactive'},
+    'gallery.tasks.cleanup_purged_photos': {'queue': 'interactive'},
+    'gallery.tasks.sweep_deleted_photos': {'queue': 'interactive'},
+    'gallery.tasks.drain_vector_outbox': {'queue': 'interactive'},
+}
+
+# Periodic tasks (run with: celery -A config beat --loglevel=info)
+app.conf.beat_schedule = {
+    'drain-vector-outbox': {
+        'task': 'gallery.tasks.drain_vector_outbox',
+        'schedule': settings.VECTOR_OUTBOX_SETTINGS.get('DRAIN_INTERVAL', 60),
+    },
+    'sweep-deleted-photos': {
+        'task': 'gallery.tasks.sweep_deleted_photos',
+        'schedule': settings.PHOTO_DELETE_SETTINGS.get('SWEEP_INTERVAL', 600),
+    },
 }
 
 # Default queue for any tasks not explicitly routed
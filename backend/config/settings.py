@@ -39,6 +39,37 @@ DEBUG = env.bool('DEBUG', default=True)
 QDRANT_CLUSTER_URL = env('QDRANT_CLUSTER_URL')
 QDRANT_API_KEY = env('QDRANT_API_KEY')
 
+QDRANT_CLIENT_SETTINGS = {
+    # --- Qdrant 클라이언트 (gallery/qdrant_utils.py) ---
+    "PREFER_GRPC": env.bool('QDRANT_PREFER_GRPC', default=False),  # gRPC 사용 (벡터를 JSON 대신 protobuf로 전송)
+    "GRPC_PORT": env.int('QDRANT_GRPC_PORT', default=6334),
+    "HTTP2": env.bool('QDRANT_HTTP2', default=False),  # REST를 HTTP/2로 (h2 패키지 필요)
+    "TIMEOUT": 10,  # 요청 타임아웃 (초)
+    "POOL_SIZE": 4,  # 프로세스당 클라이언트 수 (스레드들이 round-robin으로 나눠 씀)
+    "MAX_CONNECTIONS": 20,  # 클라이언트당 최대 REST 연결 수
+    "MAX_KEEPALIVE_CONNECTIONS": 10,  # 재사용할 REST 연결 수 (0이면 매 요청 새 연결)
+}
+
+QDRANT_COLLECTION_SETTINGS = {
+    # --- 이미지 / rep vector 컬렉션 구성 (initialize_qdrant, migrate_qdrant_schema) ---
+    # 양자화: "none", "scalar" (int8, 메모리 1/4), "binary" (1bit, 1024차원 이상에서 권장)
+    # 양자화 벡터로 후보를 찾고 원본 벡터로 rescoring (Qdrant 기본값)
+    "QUANTIZATION": env('QDRANT_QUANTIZATION', default='scalar'),
+    "QUANTIZATION_QUANTILE": 0.99,  # scalar 양자화 범위에서 제외할 극단값 비율
+    "QUANTIZATION_ALWAYS_RAM": True,  # 양자화 벡터는 항상 메모리에
+    "ON_DISK_VECTORS": True,  # 원본 float32 벡터는 디스크(mmap)에 두고 rescoring에만 사용
+
+    # 모든 검색이 user_id로 필터링되므로 전역 그래프 대신 사용자별 그래프만 생성
+    "HNSW_M": 0,  # 전역 HNSW 그래프 연결 수 (0이면 전역 그래프 없음)
+    "HNSW_PAYLOAD_M": 16,  # user_id 값별 그래프 연결 수
+    "HNSW_EF_CONSTRUCT": 100,  # 그래프 생성 시 탐색 폭
+
+    # 이미지 포인트 payload 필드 / 인덱스 (gallery/qdrant_utils.py IMAGE_PAYLOAD_PROFILES)
+    # "minimal": user_id, isTagged / "filters": + created_at, lat, lng, location (기간 / 위치 검색 필터)
+    # "full": + filename, photo_path_id
+    "PAYLOAD_PROFILE": env('QDRANT_PAYLOAD_PROFILE', default='filters'),
+}
+
 ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=[])
 CSRF_TRUSTED_ORIGINS = env.list('DJANGO_CSRF_TRUSTED_ORIGINS', default=[])
 
@@ -222,6 +253,11 @@ HYBRID_SEARCH_SETTINGS = {
     # --- (D) 다중 태그 곱셈 스케일링 설정 ---
     "TAG_PRODUCT_SCALE_BASE": 2,  # 태그 n개 곱셈 시 base^(n-1)을 곱함 (기본: 2)
     "TAG_MIN_SCORE": 0.1,  # 태그에 대한 최소 점수 (점수가 없거나 이보다 낮으면 0.1 사용)
+
+    # --- (E) 기간 / 위치 필터 (search/filters.py, date: / near: 검색어) ---
+    "NEAR_DEFAULT_RADIUS_KM": 10,  # near:에 반경이 없을 때 (km)
+    "NEAR_MAX_RADIUS_KM": 1000,  # 허용하는 최대 반경 (km)
+    "PLACE_CACHE_TTL": 60 * 60 * 24 * 7,  # 지명 → 좌표 (Kakao 검색 결과) Redis 캐시 시간 (초)
 }
 
 TAG_RECOMMENDATION_SETTINGS = {
@@ -232,6 +268,84 @@ TAG_RECOMMENDATION_SETTINGS = {
     # --- Tag Recommendation Limits ---
     "PRESET_TAG_LIMIT": 10,  # Preset 태그 검색 개수
     "USER_TAG_LIMIT": 10,    # 사용자 태그 검색 개수
+    "BATCH_MAX_PHOTOS": 100,  # 배치 태그 추천 요청 1회당 최대 사진 수
+
+    # --- Preset Tag Index (gallery/preset_index.py) ---
+    "PRESET_INDEX_CHECK_INTERVAL": 300,  # preset 컬렉션 변경 확인 주기 (초)
+    "PRESET_INDEX_MAX_AGE": 3600,  # 변경이 없어 보여도 이 시간이 지나면 다시 로드 (초)
+}
+
+REP_VECTOR_SETTINGS = {
+    # --- 클러스터링 백엔드 (gallery/clustering.py) ---
+    # "hdbscan": 512차원 원본 벡터에 HDBSCAN (기존 방식)
+    # "reduced_hdbscan": 정규화 + 차원 축소 후 HDBSCAN
+    # "minibatch_kmeans": 정규화 후 MiniBatchKMeans + 거리 기반 outlier 탐지
+    "CLUSTERING_BACKEND": env('REP_VECTOR_CLUSTERING_BACKEND', default='reduced_hdbscan'),
+    "MIN_SAMPLES_FOR_ML": 10,  # 클러스터링을 적용하기 위한 최소 샘플 수
+    "MIN_CLUSTER_SIZE": 5,  # 최소 클러스터 크기
+    "MIN_SAMPLES": 3,  # HDBSCAN 최소 샘플 수
+    "MAX_REP_VECTORS": 32,  # 태그당 최대 rep vec 수 (초과 시 outlier를 병합)
+
+    # --- reduced_hdbscan 설정 ---
+    "REDUCED_DIM": 64,  # 축소할 차원 수
+    "PROJECTION": "pca",  # "pca" 또는 "random" (Gaussian random projection)
+
+    # --- minibatch_kmeans 설정 ---
+    "KMEANS_MAX_CLUSTERS": 32,  # 최대 클러스터 수
+    "KMEANS_OUTLIER_Z": 2.5,  # 평균 거리 + z * 표준편차를 넘으면 outlier
+}
+
+STORY_POOL_SETTINGS = {
+    # --- 사용자별 스토리 풀 (gallery/story_pool.py) ---
+    "POOL_SIZE": 200,  # 리필 시 채울 목표 스토리 수
+    "LOW_WATER_MARK": 100,  # 풀이 이 개수 미만이면 백그라운드 리필 시작
+    "REFILL_LOCK_TIMEOUT": 300,  # 리필 락 만료 시간 (초, 작업 실패 대비)
+    "EXHAUSTED_TTL": 60,  # 생성할 사진이 없을 때 리필을 쉬는 시간 (초)
+    "POOL_TTL": 86400,  # 풀 만료 시간 (초)
+}
+
+CAPTION_GRAPH_SETTINGS = {
+    # --- 사진-캡션 이분 그래프 캐시 (gallery/caption_graph.py) ---
+    "CACHE_TTL": 3600,  # 캐시 만료 시간 (초, 삭제된 사진은 만료 시 반영)
+    "LOG_MAX_LENGTH": 10000,  # 증분 갱신용 신규 사진 로그 최대 길이
+}
+
+PHOTO_TAG_SETTINGS = {
+    # --- 여러 사진에 태그 일괄 추가 (BulkPostPhotoTagsView) ---
+    "BULK_MAX_PHOTOS": 500,  # 요청 1회당 최대 사진 수
+    "BULK_MAX_TAGS": 20,  # 요청 1회당 최대 태그 수
+
+    # --- 태그 목록 캐시 (gallery/tag_list_cache.py) ---
+    "TAG_LIST_CACHE_TTL": 3600,  # 캐시 만료 시간 (초, 변경 시 즉시 무효화)
+}
+
+PHOTO_DELETE_SETTINGS = {
+    # --- 사진 삭제 (tasks.purge_deleted_photos) ---
+    "CHUNK_SIZE": 500,  # 한 트랜잭션 / Qdrant 삭제 호출당 사진 수
+    "MAX_RETRIES": 5,  # purge 실패 시 재시도 횟수 (backoff)
+    "SWEEP_INTERVAL": 60 * 10,  # sweep_deleted_photos 실행 주기 (초)
+    "SWEEP_GRACE_PERIOD": 60 * 60,  # 삭제 표시 후 이 시간이 지나도 남아 있으면 다시 purge (초)
+    "SWEEP_BATCH_SIZE": 5000,  # sweep 한 번에 다시 purge할 최대 사진 수
+}
+
+VECTOR_OUTBOX_SETTINGS = {
+    # --- Qdrant 쓰기 outbox (gallery/outbox.py, 모든 Qdrant 쓰기가 거쳐감) ---
+    "DRAIN_INTERVAL": 60,  # drain_vector_outbox 실행 주기 (초)
+    "DRAIN_BATCH_SIZE": 100,  # 한 번에 재시도할 항목 수
+    "MAX_ATTEMPTS": 10,  # 이 횟수 이상 실패한 항목은 재시도하지 않음 (수동 확인)
+    "DRAIN_LOCK_TIMEOUT": 300,  # drain 락 만료 (초), 워커가 죽어도 락이 풀리도록
+    "FLUSH_DELAY": 1,  # 쓰기를 모아서 보내기 위해 drain을 미루는 시간 (초, 0이면 바로)
+    "FLUSH_SIZE": 200,  # 대기 중인 항목이 이만큼 쌓이면 기다리지 않고 바로 drain
+    "BARRIER_TIMEOUT": 30,  # barrier()가 drain 락을 기다리는 최대 시간 (초)
+}
+
+GRAPH_RECOMMENDATION_SETTINGS = {
+    # --- 태그 기반 사진 추천의 그래프 점수 (gallery/graph_recommend.py) ---
+    "FUSION_WEIGHT": 0.3,  # 벡터 점수 대비 그래프 점수 비중 (0이면 그래프 미사용)
+    "ALPHA": 0.6,  # Adamic/Adar 비중 (나머지는 Rooted PageRank)
+    "DAMPING": 0.85,  # PageRank damping factor
+    "MAX_ITER": 100,  # Power iteration 최대 반복 횟수
+    "TOL": 1e-6,  # 수렴 판정 허용 오차 (노드당)
 }
 
 CACHES = {
@@ -257,4 +371,14 @@ REDIS_HOST = env('REDIS_HOST', default='127.0.0.1')
 REDIS_PORT = 6379
 REDIS_PASSWORD = None
 
-KM_REST_API_KEY = env('KM_REST_API_KEY', default='')
\ No newline at end of file
+KM_REST_API_KEY = env('KM_REST_API_KEY', default='')
+
+REVERSE_GEOCODING_SETTINGS = {
+    # --- 사진 주소 (gallery/geocoding.py, PhotoDetailView) ---
+    # 지역 대표점 CSV (lat,lng,address_name, import_regions로 생성), 없으면 Kakao만 사용
+    "REGIONS_PATH": env('REGIONS_PATH', default=str(BASE_DIR / 'data' / 'regions.csv')),
+    "MAX_DISTANCE_KM": 3,  # 가장 가까운 대표점이 이보다 멀면 데이터 범위 밖으로 보고 Kakao로 조회
+    "GEOHASH_PRECISION": 6,  # Kakao 결과 캐시 칸 크기 (6: 약 1.2km x 0.6km, 7: 약 150m)
+    "CACHE_TTL": 60 * 60 * 24 * 30,  # Kakao 결과 Redis 캐시 시간 (초)
+    "KAKAO_TIMEOUT": 5,  # Kakao API 타임아웃 (초)
+}
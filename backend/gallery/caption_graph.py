@@ -0,0 +1,202 @@
+"""
+Per-user photo–caption bipartite graph as a sparse matrix.
+
+The graph is a (n_photos x n_captions) SciPy CSR matrix of Photo_Caption
+weights plus the ID maps for its rows and columns. It is built from a single
+``values_list`` query (no FK access per edge) and cached in the
+``combined_graph`` cache.
+
+Freshness is tracked in Redis. gpu_tasks calls record_new_captions after it
+stores captions for new photos, which bumps ``caption_graph:version:{user_id}``
+and appends the photo ids to ``caption_graph:log:{user_id}``. A cached graph
+whose version is behind only loads the captions of the logged photos and
+appends them as new rows; anything the log can't explain (trimmed log, a
+photo re-captioned, Redis unavailable) falls back to a full rebuild. Deleted
+photos stay in the cached graph until the cache entry expires, so callers
+must still resolve photo ids against the database.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from scipy import sparse
+
+from config.redis import get_redis
+
+from .models import Photo_Caption
+
+
+def _graph_settings():
+    return settings.CAPTION_GRAPH_SETTINGS
+
+
+def cache_key(user_id: int) -> str:
+    return f"caption_graph:{user_id}"
+
+
+def version_key(user_id: int) -> str:
+    return f"caption_graph:version:{user_id}"
+
+
+def log_key(user_id: int) -> str:
+    return f"caption_graph:log:{user_id}"
+
+
+@dataclass
+class CaptionGraph:
+    """Bipartite photo–caption graph (rows: photos, columns: captions)"""
+
+    photo_ids: list = field(default_factory=list)
+    caption_ids: list = field(default_factory=list)
+    matrix: sparse.csr_matrix = field(
+        default_factory=lambda: sparse.csr_matrix((0, 0), dtype=np.float32)
+    )
+    version: int = 0
+
+    def __post_init__(self):
+        self.photo_index = {photo_id: i for i, photo_id in enumerate(self.photo_ids)}
+        self.caption_index = {
+            caption_id: i for i, caption_id in enumerate(self.caption_ids)
+        }
+
+    @property
+    def n_photos(self):
+        return len(self.photo_ids)
+
+    @property
+    def n_captions(self):
+        return len(self.caption_ids)
+
+    def extend(self, rows, version):
+        """
+        Return a new graph with edges of new photos appended as rows.
+
+        Args:
+            rows: (photo_id, caption_id, weight) of photos not yet in the graph
+            version: Version of the resulting graph
+        """
+        photo_ids = list(self.photo_ids)
+        caption_ids = list(self.caption_ids)
+        photo_index = dict(self.photo_index)
+        caption_index = dict(self.caption_index)
+
+        row_indices, col_indices, weights = [], [], []
+        for photo_id, caption_id, weight in rows:
+            if photo_id not in photo_index:
+                photo_index[photo_id] = len(photo_ids)
+                photo_ids.append(photo_id)
+            if caption_id not in caption_index:
+                caption_index[caption_id] = len(caption_ids)
+                caption_ids.append(caption_id)
+            row_indices.append(photo_index[photo_id])
+            col_indices.append(caption_index[caption_id])
+            weights.append(weight)
+
+        existing = self.matrix.tocoo()
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate([existing.data, np.asarray(weights, dtype=np.float32)]),
+                (
+                    np.concatenate([existing.row, np.asarray(row_indices, dtype=np.int32)]),
+                    np.concatenate([existing.col, np.asarray(col_indices, dtype=np.int32)]),
+                ),
+            ),
+            shape=(len(photo_ids), len(caption_ids)),
+            dtype=np.float32,
+        )
+
+        return CaptionGraph(photo_ids, caption_ids, matrix, version)
+
+
+def _caption_rows(user_id: int, photo_ids=None):
+    queryset = Photo_Caption.objects.filter(user_id=user_id)
+    if photo_ids is not None:
+        queryset = queryset.filter(photo_id__in=photo_ids)
+    return queryset.values_list("photo_id", "caption_id", "weight")
+
+
+def build_caption_graph(user_id: int, version: int = 0) -> CaptionGraph:
+    """Build the full graph of a user with one query"""
+    return CaptionGraph().extend(_caption_rows(user_id), version)
+
+
+def record_new_captions(user_id: int, photo_ids: list):
+    """
+    Log photos whose captions were just stored (called from gpu_tasks).
+
+    The version counter and the log are updated in one MULTI so readers
+    always see a log that matches the version.
+    """
+    if not photo_ids:
+        return
+    try:
+        r = get_redis()
+        pipe = r.pipeline(transaction=True)
+        pipe.rpush(log_key(user_id), *[str(photo_id) for photo_id in photo_ids])
+        pipe.ltrim(log_key(user_id), -_graph_settings().get("LOG_MAX_LENGTH", 10000), -1)
+        pipe.incrby(version_key(user_id), len(photo_ids))
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"[WARN] Failed to record new captions for user {user_id}: {e}")
+
+
+def _read_version_and_log(user_id: int, cached_version: int | None):
+    """
+    Returns:
+        (current version, photo ids logged after cached_version, or None when
+        there is no cached graph or the log no longer covers the gap)
+    """
+    r = get_redis()
+    pipe = r.pipeline(transaction=True)
+    pipe.get(version_key(user_id))
+    pipe.llen(log_key(user_id))
+    version, log_length = pipe.execute()
+    version = int(version or 0)
+
+    if cached_version is None:
+        return version, None
+
+    delta = version - cached_version
+    if delta <= 0:
+        return version, []
+    if delta > log_length:
+        return version, None
+
+    new_ids = r.lrange(log_key(user_id), -delta, -1)
+    # The log moved again between the two reads; rebuild instead of guessing
+    if len(new_ids) != delta:
+        return version, None
+    return version, new_ids
+
+
+def get_caption_graph(user_id: int) -> CaptionGraph:
+    """Return the user's caption graph, updating the cached copy if needed"""
+    ttl = _graph_settings().get("CACHE_TTL", 3600)
+    graph = cache.get(cache_key(user_id))
+
+    try:
+        version, new_ids = _read_version_and_log(
+            user_id, graph.version if graph is not None else None
+        )
+    except redis.RedisError as e:
+        print(f"[WARN] Caption graph version check failed for user {user_id}: {e}")
+        return graph if graph is not None else build_caption_graph(user_id)
+
+    if graph is not None and version == graph.version:
+        return graph
+
+    if graph is not None and new_ids is not None:
+        rows = list(_caption_rows(user_id, new_ids))
+        new_photo_ids = {photo_id for photo_id, _, _ in rows}
+        # Re-captioned photos would duplicate edges; only append unseen photos
+        if not new_photo_ids & graph.photo_index.keys():
+            graph = graph.extend(rows, version)
+            cache.set(cache_key(user_id), graph, ttl)
+            return graph
+
+    graph = build_caption_graph(user_id, version)
+    cache.set(cache_key(user_id), graph, ttl)
+    return graph
@@ -0,0 +1,348 @@
+"""
+Clustering backends for representative vector computation.
+
+compute_and_store_rep_vectors groups the CLIP vectors of a tag into clusters
+and stores one representative vector per cluster (plus outliers). The backend
+used for that grouping is selected by REP_VECTOR_SETTINGS["CLUSTERING_BACKEND"]:
+
+- hdbscan: HDBSCAN directly on the raw 512-d vectors (legacy behaviour)
+- reduced_hdbscan: L2-normalize, project to a few dozen dimensions
+  (PCA or random projection), then HDBSCAN
+- minibatch_kmeans: MiniBatchKMeans on normalized vectors with
+  distance-based outlier detection
+
+Every backend only produces labels (-1 for outliers); cluster centers are
+always computed from the original vectors so representatives stay in the
+same space as the image collection.
+"""
+
+from abc import ABC, abstractmethod
+
+import hdbscan
+import numpy as np
+from django.conf import settings
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import PCA
+from sklearn.random_projection import GaussianRandomProjection
+
+OUTLIER_LABEL = -1
+# 이 cosine 거리 이하는 같은 벡터로 보고 새 대표 벡터로 고르지 않음
+DUPLICATE_DISTANCE = 1e-9
+
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so euclidean distance follows cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class ClusteringBackend(ABC):
+    """Abstract base class for rep vector clustering backends"""
+
+    name = ""
+
+    @abstractmethod
+    def fit_predict(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Cluster vectors.
+
+        Args:
+            vectors: (n, d) array of image vectors
+
+        Returns:
+            (n,) array of cluster labels, OUTLIER_LABEL for outliers
+        """
+
+
+class HDBSCANBackend(ClusteringBackend):
+    """HDBSCAN on the raw vectors"""
+
+    name = "hdbscan"
+
+    def __init__(self, min_cluster_size=5, min_samples=3):
+        self.min_cluster_size = min_cluster_size
+        self.min_samples = min_samples
+
+    def _cluster(self, vectors: np.ndarray) -> np.ndarray:
+        clusterer = hdbscan.HDBSCAN(
+            min_cluster_size=self.min_cluster_size,
+            min_samples=self.min_samples,
+            cluster_selection_epsilon=0.0,
+            metric="euclidean",
+        )
+        clusterer.fit(vectors)
+        return clusterer.labels_
+
+    def fit_predict(self, vectors: np.ndarray) -> np.ndarray:
+        return self._cluster(vectors)
+
+
+class ReducedHDBSCANBackend(HDBSCANBackend):
+    """HDBSCAN on normalized vectors projected to a low dimension"""
+
+    name = "reduced_hdbscan"
+
+    def __init__(
+        self,
+        min_cluster_size=5,
+        min_samples=3,
+        n_components=64,
+        projection="pca",
+        random_state=0,
+    ):
+        super().__init__(min_cluster_size=min_cluster_size, min_samples=min_samples)
+        if projection not in ("pca", "random"):
+            raise ValueError(f"Unknown projection: {projection}")
+        self.n_components = n_components
+        self.projection = projection
+        self.random_state = random_state
+
+    def reduce(self, vectors: np.ndarray) -> np.ndarray:
+        normalized = normalize_vectors(vectors)
+        n_samples, dim = normalized.shape
+        n_components = min(self.n_components, n_samples, dim)
+
+        # Nothing to gain when the data is already low-dimensional
+        if n_components >= dim:
+            return normalized
+
+        if self.projection == "pca":
+            reducer = PCA(
+                n_components=n_components,
+                svd_solver="randomized",
+                random_state=self.random_state,
+            )
+        else:
+            reducer = GaussianRandomProjection(
+                n_components=n_components, random_state=self.random_state
+            )
+        return reducer.fit_transform(normalized)
+
+    def fit_predict(self, vectors: np.ndarray) -> np.ndarray:
+        return self._cluster(self.reduce(vectors))
+
+
+class MiniBatchKMeansBackend(ClusteringBackend):
+    """
+    MiniBatchKMeans on normalized vectors with outlier detection.
+
+    The number of clusters is sqrt(n / 2) capped by max_clusters. A point is
+    an outlier when its distance to the assigned center is more than
+    outlier_z standard deviations above the mean distance, or when its
+    cluster has fewer than min_cluster_size members.
+    """
+
+    name = "minibatch_kmeans"
+
+    def __init__(
+        self,
+        min_cluster_size=5,
+        max_clusters=32,
+        outlier_z=2.5,
+        batch_size=1024,
+        random_state=0,
+    ):
+        self.min_cluster_size = min_cluster_size
+        self.max_clusters = max_clusters
+        self.outlier_z = outlier_z
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def fit_predict(self, vectors: np.ndarray) -> np.ndarray:
+        normalized = normalize_vectors(vectors)
+        n_samples = len(normalized)
+        n_clusters = int(np.clip(np.sqrt(n_samples / 2), 1, self.max_clusters))
+        n_clusters = min(n_clusters, n_samples)
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=self.batch_size,
+            n_init=3,
+            random_state=self.random_state,
+        )
+        labels = kmeans.fit_predict(normalized)
+
+        distances = np.linalg.norm(
+            normalized - kmeans.cluster_centers_[labels], axis=1
+        )
+        threshold = distances.mean() + self.outlier_z * distances.std()
+        labels = np.where(distances > threshold, OUTLIER_LABEL, labels)
+
+        # Clusters that are too small are not representative on their own
+        cluster_ids, counts = np.unique(labels[labels != OUTLIER_LABEL], return_counts=True)
+        small_clusters = cluster_ids[counts < self.min_cluster_size]
+        labels[np.isin(labels, small_clusters)] = OUTLIER_LABEL
+
+        return labels
+
+
+CLUSTERING_BACKENDS = {
+    backend.name: backend
+    for backend in (HDBSCANBackend, ReducedHDBSCANBackend, MiniBatchKMeansBackend)
+}
+
+
+def get_clustering_backend(name: str | None = None) -> ClusteringBackend:
+    """
+    Build the clustering backend configured in REP_VECTOR_SETTINGS.
+
+    Args:
+        name: Backend name overriding the CLUSTERING_BACKEND setting
+
+    Raises:
+        ValueError: Unknown backend name
+    """
+    rep_settings = settings.REP_VECTOR_SETTINGS
+    name = name or rep_settings.get("CLUSTERING_BACKEND", "reduced_hdbscan")
+
+    min_cluster_size = rep_settings.get("MIN_CLUSTER_SIZE", 5)
+
+    if name == HDBSCANBackend.name:
+        return HDBSCANBackend(
+            min_cluster_size=min_cluster_size,
+            min_samples=rep_settings.get("MIN_SAMPLES", 3),
+        )
+    if name == ReducedHDBSCANBackend.name:
+        return ReducedHDBSCANBackend(
+            min_cluster_size=min_cluster_size,
+            min_samples=rep_settings.get("MIN_SAMPLES", 3),
+            n_components=rep_settings.get("REDUCED_DIM", 64),
+            projection=rep_settings.get("PROJECTION", "pca"),
+        )
+    if name == MiniBatchKMeansBackend.name:
+        return MiniBatchKMeansBackend(
+            min_cluster_size=min_cluster_size,
+            max_clusters=rep_settings.get("KMEANS_MAX_CLUSTERS", 32),
+            outlier_z=rep_settings.get("KMEANS_OUTLIER_Z", 2.5),
+        )
+
+    raise ValueError(
+        f"Unknown clustering backend: {name} "
+        f"(expected one of {', '.join(CLUSTERING_BACKENDS)})"
+    )
+
+
+def compute_representatives(
+    vectors: np.ndarray, backend: ClusteringBackend
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster vectors and derive representative vectors.
+
+    Args:
+        vectors: (n, d) array of image vectors
+        backend: Clustering backend producing labels
+
+    Returns:
+        (cluster_centers, outlier_vectors), both in the original vector space
+    """
+    labels = backend.fit_predict(vectors)
+
+    cluster_labels = sorted(set(labels.tolist()) - {OUTLIER_LABEL})
+    dim = vectors.shape[1]
+
+    if cluster_labels:
+        centers = np.array(
+            [vectors[labels == label].mean(axis=0) for label in cluster_labels]
+        )
+    else:
+        centers = np.empty((0, dim))
+
+    outliers = vectors[labels == OUTLIER_LABEL]
+
+    return centers, outliers
+
+
+def _cosine_distances(points: np.ndarray, refs: np.ndarray) -> np.ndarray:
+    """(n, m) cosine distances between normalized points and refs"""
+    return 1.0 - points @ refs.T
+
+
+def _farthest_first(points: np.ndarray, k: int, anchors: np.ndarray) -> list[int]:
+    """
+    Greedy k-center selection.
+
+    Picks up to k indices of points, each time the point farthest from
+    everything chosen so far (anchors included). Points already well covered
+    by an anchor are therefore picked last. Stops early once the farthest
+    point is a duplicate of a chosen point or an anchor (distance 0).
+    """
+    if len(anchors) > 0:
+        min_dist = _cosine_distances(points, anchors).min(axis=1)
+    else:
+        min_dist = np.full(len(points), np.inf)
+
+    selected = []
+    for _ in range(min(k, len(points))):
+        index = int(np.argmax(min_dist))
+        if min_dist[index] <= DUPLICATE_DISTANCE:
+            break
+        selected.append(index)
+        min_dist = np.minimum(min_dist, _cosine_distances(points, points[index:index + 1])[:, 0])
+        min_dist[selected] = -np.inf
+
+    return selected
+
+
+def _merge_into_seeds(
+    vectors: np.ndarray, normalized: np.ndarray, seeds: list[int], anchors: np.ndarray
+) -> np.ndarray:
+    """
+    Assign every vector to its nearest seed or anchor and average each seed group.
+
+    Vectors closer to an anchor than to any seed are absorbed by that anchor
+    and do not contribute a representative of their own. Seeds left without
+    vectors (ties with an identical seed or anchor) are dropped.
+    """
+    refs = normalized[seeds]
+    if len(anchors) > 0:
+        refs = np.vstack([refs, anchors])
+
+    nearest = _cosine_distances(normalized, refs).argmin(axis=1)
+
+    groups = [nearest == seed_index for seed_index in range(len(seeds))]
+    return np.array(
+        [vectors[group].mean(axis=0) for group in groups if group.any()]
+    ).reshape(-1, vectors.shape[1])
+
+
+def cap_representatives(
+    centers: np.ndarray, outliers: np.ndarray, max_vectors: int
+) -> np.ndarray:
+    """
+    Bound the number of representative vectors of a tag.
+
+    Cluster centers are kept first. The remaining budget is spent on outliers
+    chosen by greedy k-center (farthest-first) coverage; every other outlier
+    is merged into the nearest chosen outlier (averaged) or absorbed by the
+    nearest cluster center. When there are more centers than the budget, the
+    centers themselves are merged the same way and outliers are absorbed.
+
+    Args:
+        centers: (c, d) cluster centers
+        outliers: (o, d) outlier vectors
+        max_vectors: Maximum number of representatives to return
+
+    Returns:
+        (<= max_vectors, d) array of representative vectors
+    """
+    if len(centers) + len(outliers) <= max_vectors:
+        return np.vstack([centers, outliers])
+
+    no_anchors = np.empty((0, centers.shape[1]))
+
+    if len(centers) >= max_vectors:
+        normalized_centers = normalize_vectors(centers)
+        seeds = _farthest_first(normalized_centers, max_vectors, no_anchors)
+        return _merge_into_seeds(centers, normalized_centers, seeds, no_anchors)
+
+    budget = max_vectors - len(centers)
+    normalized_centers = normalize_vectors(centers)
+    normalized_outliers = normalize_vectors(outliers)
+
+    seeds = _farthest_first(normalized_outliers, budget, normalized_centers)
+    merged_outliers = _merge_into_seeds(
+        outliers, normalized_outliers, seeds, normalized_centers
+    )
+
+    return np.vstack([centers, merged_outliers])
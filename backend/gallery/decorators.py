@@ -3,6 +3,7 @@ from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
 from gallery.models import Photo, Tag
+from gallery.pagination import decode_cursor
 import time
 import uuid
 
@@ -35,24 +36,31 @@ def log_request(view_func):
 
     return wrapper
 
-def validate_pagination(max_limit=100):
+def validate_pagination(max_limit=100, default_limit=20):
     """
     Decorator to validate and normalize pagination parameters.
 
+    Two modes:
+    - offset/limit: offset >= 0
+    - cursor/limit: opaque cursor from the X-Next-Cursor header of the
+      previous page (see gallery/pagination.py); can't be combined with offset
+
     Validates:
-    - offset >= 0
-    - 1 <= limit <= max_limit
+    - 1 <= limit <= max_limit (default_limit=None means no limit when absent)
 
     Adds validated values to request object:
     - request.validated_offset
     - request.validated_limit
+    - request.validated_cursor (None in offset mode)
     """
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(self, request, *args, **kwargs):
             try:
                 offset = int(request.GET.get("offset", 0))
-                limit = int(request.GET.get("limit", 20))
+                limit = request.GET.get("limit", default_limit)
+                limit = int(limit) if limit is not None else None
+                cursor = request.GET.get("cursor") or None
 
                 if offset < 0:
                     return Response(
@@ -60,15 +68,30 @@ def validate_pagination(max_limit=100):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-                if limit < 1 or limit > max_limit:
+                if limit is not None and (limit < 1 or limit > max_limit):
                     return Response(
                         {"error": f"limit must be between 1 and {max_limit}"},
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
+                if cursor is not None:
+                    if "offset" in request.GET:
+                        return Response(
+                            {"error": "offset and cursor cannot be used together"},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    try:
+                        decode_cursor(cursor)
+                    except ValueError:
+                        return Response(
+                            {"error": "Invalid cursor"},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+
                 # Add validated values to request
                 request.validated_offset = offset
                 request.validated_limit = limit
+                request.validated_cursor = cursor
 
                 return view_func(self, request, *args, **kwargs)
 
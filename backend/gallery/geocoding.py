@@ -0,0 +1,175 @@
+"""
+Reverse geocoding of photo coordinates (the address in PhotoDetailView).
+
+Addresses are resolved in process from a region dataset: one representative
+point per region (e.g. 행정동 centroids) with its address name, in a CSV with
+lat,lng,address_name columns at REVERSE_GEOCODING_SETTINGS["REGIONS_PATH"]
+(import_regions converts a downloaded dataset into it). The points are
+loaded once per process into a scikit-learn BallTree with the haversine
+metric, so a lookup is one nearest-neighbour query in memory. The dataset
+isn't shipped with the repo; without it every lookup falls back to Kakao.
+
+Coordinates farther than MAX_DISTANCE_KM from every region point (outside
+the dataset's coverage) fall back to the Kakao coord2regioncode API. Its
+answers are cached in Redis per geohash cell (GEOHASH_PRECISION), not per
+exact coordinate, so photos taken a few metres apart share one entry.
+"""
+
+import csv
+import threading
+from pathlib import Path
+
+import numpy as np
+import redis
+import requests
+from django.conf import settings
+from sklearn.neighbors import BallTree
+
+from config.redis import get_redis
+
+EARTH_RADIUS_KM = 6371.0
+KAKAO_REGION_URL = "https://dapi.kakao.com/v2/local/geo/coord2regioncode.json"
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lng: float, precision: int) -> str:
+    """Standard geohash of a coordinate (precision = number of characters)"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    n_bits = 0
+    even = True  # 경도 비트부터 번갈아 가며
+
+    while len(chars) < precision:
+        value, value_range = (lng, lng_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            value_range[0] = mid
+        else:
+            bits = bits * 2
+            value_range[1] = mid
+        even = not even
+
+        n_bits += 1
+        if n_bits == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            n_bits = 0
+
+    return "".join(chars)
+
+
+class RegionIndex:
+    """Region points searched by great-circle distance"""
+
+    def __init__(self, names, coordinates):
+        self.names = list(names)
+        self._tree = None
+        if self.names:
+            points = np.radians(np.asarray(coordinates, dtype=np.float64))
+            self._tree = BallTree(points, metric="haversine")
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_csv(cls, path):
+        names = []
+        coordinates = []
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                names.append(row["address_name"])
+                coordinates.append((float(row["lat"]), float(row["lng"])))
+        return cls(names, coordinates)
+
+    def nearest(self, lat: float, lng: float):
+        """
+        Returns:
+            (address name, distance in km) of the nearest region point, or
+            None if the index is empty
+        """
+        if self._tree is None:
+            return None
+        distances, indices = self._tree.query(np.radians([[lat, lng]]), k=1)
+        return self.names[indices[0][0]], float(distances[0][0]) * EARTH_RADIUS_KM
+
+
+_region_index = None
+_region_index_lock = threading.Lock()
+
+
+def get_region_index():
+    # 프로세스당 하나의 지역 인덱스 (Thread-safe), 데이터 파일이 없으면 빈 인덱스
+    global _region_index
+    if _region_index is None:
+        with _region_index_lock:
+            if _region_index is None:
+                path = Path(settings.REVERSE_GEOCODING_SETTINGS.get("REGIONS_PATH", ""))
+                try:
+                    index = RegionIndex.from_csv(path)
+                    print(f"[INFO] Loaded {len(index)} regions from '{path}'")
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"[WARN] Region dataset not loaded ({e}); using Kakao only")
+                    index = RegionIndex([], [])
+                _region_index = index
+    return _region_index
+
+
+def cache_key(lat: float, lng: float) -> str:
+    precision = settings.REVERSE_GEOCODING_SETTINGS.get("GEOHASH_PRECISION", 6)
+    return f"addr:{geohash(lat, lng, precision)}"
+
+
+def _kakao_region_name(lat: float, lng: float):
+    """Region name from Kakao, "" if it has none, None if the call failed"""
+    headers = {"Authorization": f"KakaoAK {settings.KM_REST_API_KEY}"}
+    try:
+        resp = requests.get(
+            KAKAO_REGION_URL,
+            params={"x": lng, "y": lat},
+            headers=headers,
+            timeout=settings.REVERSE_GEOCODING_SETTINGS.get("KAKAO_TIMEOUT", 5),
+        )
+    except requests.RequestException as e:
+        print(f"[WARN] Kakao reverse geocoding failed for ({lat}, {lng}): {e}")
+        return None
+    if resp.status_code != 200:
+        print(f"[WARN] Kakao reverse geocoding returned {resp.status_code} for ({lat}, {lng})")
+        return None
+
+    documents = resp.json().get("documents")
+    return documents[0]["address_name"] if documents else ""
+
+
+def reverse_geocode(lat, lng) -> str:
+    """Address name of a coordinate, "" if unknown"""
+    if lat is None or lng is None:
+        return ""
+
+    geocoding_settings = settings.REVERSE_GEOCODING_SETTINGS
+    nearest = get_region_index().nearest(lat, lng)
+    if nearest is not None and nearest[1] <= geocoding_settings.get("MAX_DISTANCE_KM", 3):
+        return nearest[0]
+
+    key = cache_key(lat, lng)
+    try:
+        cached = get_redis().get(key)
+    except redis.RedisError as e:
+        print(f"[WARN] Address cache read failed for {key}: {e}")
+        cached = None
+    if cached is not None:
+        return cached
+
+    address = _kakao_region_name(lat, lng)
+    if address is None:
+        # 실패는 캐시하지 않고 다음 요청에서 다시 시도
+        return ""
+
+    try:
+        get_redis().set(key, address, ex=geocoding_settings.get("CACHE_TTL", 60 * 60 * 24 * 30))
+    except redis.RedisError as e:
+        print(f"[WARN] Address cache write failed for {key}: {e}")
+    return address
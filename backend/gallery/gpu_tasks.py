@@ -16,7 +16,7 @@ import re
 import torch
 import threading
 from io import BytesIO
-from collections import Counter
+from collections import Counter, defaultdict
 from itertools import chain
 from celery import shared_task
 from qdrant_client import models
@@ -24,8 +24,10 @@ from sentence_transformers import SentenceTransformer
 from transformers import BlipProcessor, BlipForConditionalGeneration
 from PIL import Image
 
-from .qdrant_utils import get_qdrant_client, IMAGE_COLLECTION_NAME
+from .qdrant_utils import IMAGE_COLLECTION_NAME, build_image_payload
+from . import outbox
 from .models import User, Photo_Caption, Caption, Photo
+from .caption_graph import record_new_captions
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 
@@ -370,8 +372,6 @@ def process_and_embed_photo(
 
     image_data = None
     try:
-        client = get_qdrant_client()
-
         # Download from shared storage to memory (MinIO or local)
         image_data = download_photo(storage_key)
 
@@ -381,28 +381,30 @@ def process_and_embed_photo(
             print(f"[Celery Task Error] Failed to create embedding for {filename}")
             return
 
-        point_to_upsert = models.PointStruct(
-            id=str(storage_key),
-            vector=embedding,
-            payload={
-                "user_id": user_id,
-                "filename": filename,
-                "photo_path_id": photo_path_id,
-                "created_at": created_at,
-                "lat": lat,
-                "lng": lng,
-            },
-        )
-
         # asserts that user id has checked
         user = User.objects.get(id=user_id)
 
         photo = Photo.objects.get(photo_id=storage_key)
 
-        client.upsert(
-            collection_name=IMAGE_COLLECTION_NAME, points=[point_to_upsert], wait=True
+        point_to_upsert = models.PointStruct(
+            id=str(storage_key),
+            vector=embedding,
+            payload=build_image_payload(
+                user_id=user_id,
+                filename=filename,
+                photo_path_id=photo_path_id,
+                created_at=created_at,
+                lat=lat,
+                lng=lng,
+                # 임베딩 전에 태그된 사진도 반영 (이후 변경은 update_photo_tag_state가 outbox로 갱신)
+                isTagged=photo.is_tagged,
+            ),
         )
 
+        # Qdrant 반영은 outbox drain에 맡기고 기다리지 않음
+        outbox.enqueue_upsert(IMAGE_COLLECTION_NAME, [point_to_upsert])
+        outbox.schedule_drain()
+
         # Reset BytesIO position for captions (image_data was already read by embedding)
         image_data.seek(0)
         captions = get_image_captions(image_data)
@@ -420,6 +422,8 @@ def process_and_embed_photo(
                 weight=count,
             )
 
+        record_new_captions(user.id, [photo.photo_id])
+
         print(f"[Celery Task Success] Processed and upserted photo {filename}")
 
     except Exception as e:
@@ -464,8 +468,6 @@ def process_and_embed_photos_batch(photos_metadata: list[dict]):
     storage_keys = []
 
     try:
-        client = get_qdrant_client()
-
         # Step 1: Download all photos from storage
         for metadata in photos_metadata:
             storage_key = metadata["storage_key"]
@@ -494,6 +496,7 @@ def process_and_embed_photos_batch(photos_metadata: list[dict]):
 
         # Step 4: Store results for each photo
         points_to_upsert = []
+        captioned_photo_ids = defaultdict(list)  # user_id -> photo_ids (caption graph 갱신용)
         valid_idx = 0  # Track index in the filtered (non-None) lists
 
         for i, metadata in enumerate(photos_metadata):
@@ -518,25 +521,32 @@ def process_and_embed_photos_batch(photos_metadata: list[dict]):
                 print(f"[Celery Batch Task Error] Failed to create embedding for {filename}")
                 continue
 
+            photo = Photo.objects.filter(photo_id=storage_key).first()
+            if photo is None:
+                # 임베딩 전에 삭제된 사진
+                print(f"[Celery Batch Task] Skipping deleted photo {filename}")
+                continue
+
             # Prepare Qdrant point
             point_to_upsert = models.PointStruct(
                 id=str(storage_key),
                 vector=embedding,
-                payload={
-                    "user_id": user_id,
-                    "filename": filename,
-                    "photo_path_id": photo_path_id,
-                    "created_at": created_at,
-                    "lat": lat,
-                    "lng": lng,
-                },
+                payload=build_image_payload(
+                    user_id=user_id,
+                    filename=filename,
+                    photo_path_id=photo_path_id,
+                    created_at=created_at,
+                    lat=lat,
+                    lng=lng,
+                    # 임베딩 전에 태그된 사진도 반영 (이후 변경은 update_photo_tag_state가 outbox로 갱신)
+                    isTagged=photo.is_tagged,
+                ),
             )
             points_to_upsert.append(point_to_upsert)
 
             # Store captions in Django DB
             try:
                 user = User.objects.get(id=user_id)
-                photo = Photo.objects.get(photo_id=storage_key)
 
                 for word, count in captions.items():
                     caption, _ = Caption.objects.get_or_create(
@@ -551,19 +561,20 @@ def process_and_embed_photos_batch(photos_metadata: list[dict]):
                         weight=count,
                     )
 
+                captioned_photo_ids[user.id].append(photo.photo_id)
                 print(f"[Celery Batch Task] Successfully processed photo {filename}")
 
             except Exception as e:
                 print(f"[Celery Batch Task Exception] Error storing captions for {filename}: {str(e)}")
 
-        # Step 5: Batch upsert to Qdrant
+        # Step 5: Batch upsert to Qdrant (outbox drain이 반영, GPU 워커는 기다리지 않음)
         if points_to_upsert:
-            client.upsert(
-                collection_name=IMAGE_COLLECTION_NAME,
-                points=points_to_upsert,
-                wait=True,
-            )
-            print(f"[Celery Batch Task Success] Upserted {len(points_to_upsert)} photos to Qdrant")
+            outbox.enqueue_upsert(IMAGE_COLLECTION_NAME, points_to_upsert)
+            outbox.schedule_drain()
+            print(f"[Celery Batch Task Success] Queued {len(points_to_upsert)} photos for Qdrant upsert")
+
+        for user_id, photo_ids in captioned_photo_ids.items():
+            record_new_captions(user_id, photo_ids)
 
     except Exception as e:
         print(f"[Celery Batch Task Exception] Error in batch processing: {str(e)}")
@@ -0,0 +1,197 @@
+"""
+Django management command to benchmark Qdrant REST vs gRPC transport.
+
+Creates a throwaway collection on the configured Qdrant cluster, fills it
+with random 512-d points carrying our image payload shape, and runs the
+request shapes the app sends, from several threads like the tag
+recommendation fallback:
+
+- search: one query vector + user filter (search strategies)
+- recommend: recommend by photo id + user filter (recommend_photo_from_photo)
+- retrieve: a batch of ids with vectors (tag_recommendation_batch, rep vectors)
+- search_batch: one search per photo in a batch (tag_recommendation_batch)
+
+Clients are built with create_qdrant_client(), so the other
+QDRANT_CLIENT_SETTINGS (timeouts, HTTP/2, connection limits) apply to both
+transports. The collection is deleted afterwards.
+
+Usage:
+    python manage.py benchmark_qdrant_transport [--points N] [--iterations N]
+                                                [--threads N] [--transports rest,grpc]
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from qdrant_client import models
+
+from gallery.qdrant_utils import build_image_payload, create_qdrant_client
+
+VECTOR_DIM = 512
+USER_ID = 1
+UPSERT_BATCH_SIZE = 256
+TRANSPORTS = {"rest": False, "grpc": True}
+
+
+def make_points(n_points, seed):
+    """Random unit vectors with the image payload of the configured profile"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n_points, VECTOR_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return [
+        models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector.tolist(),
+            payload=build_image_payload(
+                user_id=USER_ID,
+                filename=f"{i}.jpg",
+                photo_path_id=i,
+                created_at="2025-01-01T00:00:00Z",
+                lat=37.5,
+                lng=127.0,
+                isTagged=bool(i % 2),
+            ),
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def make_workloads(collection, points, batch, seed):
+    """{name: fn(client, i)} for the request shapes the app sends"""
+    rng = np.random.default_rng(seed + 1)
+    ids = [point.id for point in points]
+    user_filter = models.Filter(
+        must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=USER_ID))]
+    )
+
+    def query_vector():
+        return points[int(rng.integers(len(points)))].vector
+
+    def id_batch():
+        return [ids[j] for j in rng.choice(len(ids), size=batch, replace=False)]
+
+    return {
+        "search": lambda client: client.search(
+            collection_name=collection,
+            query_vector=query_vector(),
+            query_filter=user_filter,
+            limit=20,
+        ),
+        "recommend": lambda client: client.recommend(
+            collection_name=collection,
+            positive=[ids[int(rng.integers(len(ids)))]],
+            query_filter=user_filter,
+            limit=20,
+        ),
+        "retrieve": lambda client: client.retrieve(
+            collection_name=collection, ids=id_batch(), with_vectors=True
+        ),
+        "search_batch": lambda client: client.search_batch(
+            collection_name=collection,
+            requests=[
+                models.SearchRequest(
+                    vector=query_vector(), filter=user_filter, limit=10, with_payload=True
+                )
+                for _ in range(batch)
+            ],
+        ),
+    }
+
+
+def run_workload(client, fn, iterations, threads):
+    """
+    Run fn iterations times from a thread pool.
+
+    Returns:
+        (latencies in seconds, wall time in seconds)
+    """
+
+    def timed(_):
+        start = time.perf_counter()
+        fn(client)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(timed, range(iterations)))
+    return np.array(latencies), time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Qdrant REST vs gRPC transport on the app request shapes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=5000, help='Points in the test collection')
+        parser.add_argument('--iterations', type=int, default=200, help='Requests per workload')
+        parser.add_argument('--threads', type=int, default=10, help='Concurrent callers')
+        parser.add_argument('--batch', type=int, default=12, help='Photos per retrieve / search_batch')
+        parser.add_argument(
+            '--transports',
+            type=str,
+            default=','.join(TRANSPORTS),
+            help='Comma-separated transports to compare (rest, grpc)',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        transports = [name.strip() for name in options['transports'].split(',') if name.strip()]
+        unknown = set(transports) - set(TRANSPORTS)
+        if unknown:
+            raise CommandError(f"Unknown transports: {', '.join(sorted(unknown))}")
+        if options['points'] < options['batch']:
+            raise CommandError('--points must be at least --batch')
+
+        collection = f"transport_benchmark_{uuid.uuid4().hex[:8]}"
+        setup_client = create_qdrant_client(prefer_grpc=False)
+        points = make_points(options['points'], options['seed'])
+
+        self.stdout.write(f"Creating {collection} with {len(points)} points...")
+        setup_client.create_collection(
+            collection_name=collection,
+            vectors_config=models.VectorParams(size=VECTOR_DIM, distance=models.Distance.COSINE),
+        )
+        try:
+            setup_client.create_payload_index(
+                collection_name=collection,
+                field_name="user_id",
+                field_schema=models.PayloadSchemaType.INTEGER,
+            )
+            for start in range(0, len(points), UPSERT_BATCH_SIZE):
+                setup_client.upsert(
+                    collection_name=collection,
+                    points=points[start : start + UPSERT_BATCH_SIZE],
+                    wait=True,
+                )
+
+            self._benchmark(collection, points, transports, options)
+        finally:
+            setup_client.delete_collection(collection_name=collection)
+            self.stdout.write(f"Deleted {collection}")
+
+    def _benchmark(self, collection, points, transports, options):
+        header = f"{'workload':<14}{'transport':<11}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for transport in transports:
+            client = create_qdrant_client(prefer_grpc=TRANSPORTS[transport])
+            workloads = make_workloads(collection, points, options['batch'], options['seed'])
+
+            for name, fn in workloads.items():
+                # Warm up connections before timing
+                run_workload(client, fn, options['threads'], options['threads'])
+                latencies, wall = run_workload(
+                    client, fn, options['iterations'], options['threads']
+                )
+                self.stdout.write(
+                    f"{name:<14}{transport:<11}"
+                    f"{np.percentile(latencies, 50) * 1000:>10.1f}"
+                    f"{np.percentile(latencies, 95) * 1000:>10.1f}"
+                    f"{len(latencies) / wall:>10.1f}"
+                )
+
+            client.close()
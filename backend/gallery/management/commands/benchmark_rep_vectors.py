@@ -0,0 +1,166 @@
+"""
+Django management command to benchmark rep vector clustering backends.
+
+Generates synthetic clustered CLIP-like vectors (several tags, each made of a
+few sub-clusters plus noise), computes representative vectors with every
+clustering backend and reports runtime and tag recommendation quality.
+
+Quality is measured the same way tag_recommendation ranks user tags: held-out
+photos are scored against every rep vector by cosine similarity and the tag
+of the best rep vector is compared with the true tag. Rep vectors are capped
+at REP_VECTOR_SETTINGS["MAX_REP_VECTORS"] per tag, as in production.
+
+Usage:
+    python manage.py benchmark_rep_vectors [--tags N] [--photos-per-tag N]
+                                           [--backends a,b,c] [--seed N]
+"""
+
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gallery.clustering import (
+    CLUSTERING_BACKENDS,
+    cap_representatives,
+    compute_representatives,
+    get_clustering_backend,
+    normalize_vectors,
+)
+
+VECTOR_DIM = 512
+
+
+def make_synthetic_tags(n_tags, photos_per_tag, sub_clusters, noise, seed):
+    """
+    Build synthetic tag data on the unit sphere.
+
+    Returns:
+        List of (train_vectors, test_vectors) per tag
+    """
+    rng = np.random.default_rng(seed)
+
+    # CLIP vectors share a common direction, so tags are not orthogonal
+    common = normalize_vectors(rng.normal(size=(1, VECTOR_DIM)))[0]
+
+    tags = []
+    for _ in range(n_tags):
+        tag_center = normalize_vectors(
+            (common + 0.8 * normalize_vectors(rng.normal(size=(1, VECTOR_DIM)))[0])[None, :]
+        )[0]
+        sub_centers = normalize_vectors(
+            tag_center + 0.35 * normalize_vectors(rng.normal(size=(sub_clusters, VECTOR_DIM)))
+        )
+
+        assignments = rng.integers(0, sub_clusters, size=photos_per_tag)
+        vectors = sub_centers[assignments] + noise * rng.normal(
+            size=(photos_per_tag, VECTOR_DIM)
+        ) / np.sqrt(VECTOR_DIM)
+        vectors = normalize_vectors(vectors)
+
+        # 5% of the photos are unrelated noise (mis-tagged / unusual shots)
+        n_noise = max(1, photos_per_tag // 20)
+        vectors[:n_noise] = normalize_vectors(
+            common + 0.8 * normalize_vectors(rng.normal(size=(n_noise, VECTOR_DIM)))
+        )
+        rng.shuffle(vectors)
+
+        n_test = max(1, photos_per_tag // 5)
+        tags.append((vectors[n_test:], vectors[:n_test]))
+
+    return tags
+
+
+def evaluate_rep_vectors(rep_vectors, rep_labels, tags, threshold):
+    """
+    Score held-out vectors against all rep vectors.
+
+    Returns:
+        (top-1 accuracy, fraction of held-out photos whose true tag scores
+        above the user tag threshold)
+    """
+    reps = normalize_vectors(rep_vectors)
+    correct = 0
+    above_threshold = 0
+    total = 0
+
+    for tag_index, (_, test_vectors) in enumerate(tags):
+        scores = normalize_vectors(test_vectors) @ reps.T
+        best = scores.argmax(axis=1)
+        correct += int((rep_labels[best] == tag_index).sum())
+
+        own_scores = scores[:, rep_labels == tag_index]
+        if own_scores.shape[1] > 0:
+            above_threshold += int((own_scores.max(axis=1) >= threshold).sum())
+
+        total += len(test_vectors)
+
+    return correct / total, above_threshold / total
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rep vector clustering backends on synthetic clustered data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tags', type=int, default=10, help='Number of synthetic tags')
+        parser.add_argument('--photos-per-tag', type=int, default=5000, help='Photos per tag')
+        parser.add_argument('--sub-clusters', type=int, default=4, help='Sub-clusters per tag')
+        parser.add_argument('--noise', type=float, default=0.6, help='Gaussian noise scale')
+        parser.add_argument(
+            '--backends',
+            type=str,
+            default=','.join(CLUSTERING_BACKENDS),
+            help='Comma-separated backend names to compare',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        backends = [name.strip() for name in options['backends'].split(',') if name.strip()]
+        threshold = settings.TAG_RECOMMENDATION_SETTINGS.get("USER_TAG_SCORE_THRESHOLD", 0.75)
+        max_rep_vectors = settings.REP_VECTOR_SETTINGS.get("MAX_REP_VECTORS", 32)
+
+        self.stdout.write(
+            f"Generating {options['tags']} tags x {options['photos_per_tag']} photos "
+            f"({options['sub_clusters']} sub-clusters, noise {options['noise']})..."
+        )
+        tags = make_synthetic_tags(
+            options['tags'],
+            options['photos_per_tag'],
+            options['sub_clusters'],
+            options['noise'],
+            options['seed'],
+        )
+
+        header = f"{'backend':<20}{'total s':>10}{'max tag s':>12}{'repvecs':>10}{'top1 acc':>10}{'>= thr':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for name in backends:
+            try:
+                backend = get_clustering_backend(name)
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(f'✗ {e}'))
+                continue
+
+            rep_vectors = []
+            rep_labels = []
+            timings = []
+
+            for tag_index, (train_vectors, _) in enumerate(tags):
+                start = time.perf_counter()
+                centers, outliers = compute_representatives(train_vectors, backend)
+                reps = cap_representatives(centers, outliers, max_rep_vectors)
+                timings.append(time.perf_counter() - start)
+
+                rep_vectors.append(reps)
+                rep_labels.extend([tag_index] * len(reps))
+
+            accuracy, recall = evaluate_rep_vectors(
+                np.vstack(rep_vectors), np.array(rep_labels), tags, threshold
+            )
+
+            self.stdout.write(
+                f"{name:<20}{sum(timings):>10.2f}{max(timings):>12.2f}"
+                f"{len(rep_labels):>10}{accuracy:>10.3f}{recall:>10.3f}"
+            )
@@ -0,0 +1,99 @@
+"""
+Django management command to build the region dataset of the local reverse
+geocoder (gallery/geocoding.py) from a downloaded CSV.
+
+Any table with one row per region and a representative coordinate works,
+e.g. the 행정동 centroid tables on 공공데이터포털. The address name is joined
+from one or more columns (시도, 시군구, 읍면동 ...). Rows without valid
+coordinates are skipped.
+
+The result is written as lat,lng,address_name to
+REVERSE_GEOCODING_SETTINGS["REGIONS_PATH"]; API processes load it on their
+first lookup, so restart them after an import.
+
+Usage:
+    python manage.py import_regions SOURCE --lat-column COL --lng-column COL
+                                    --name-columns COL[,COL...]
+                                    [--encoding ENC] [--output PATH]
+
+Example:
+    python manage.py import_regions 행정동_좌표.csv --encoding cp949 \\
+        --lat-column 위도 --lng-column 경도 --name-columns 시도명,시군구명,읍면동명
+"""
+
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gallery.geocoding import RegionIndex
+
+
+class Command(BaseCommand):
+    help = 'Build the reverse geocoding region dataset from a CSV of region coordinates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', type=str, help='CSV with one row per region')
+        parser.add_argument('--lat-column', type=str, required=True, help='Latitude column')
+        parser.add_argument('--lng-column', type=str, required=True, help='Longitude column')
+        parser.add_argument(
+            '--name-columns',
+            type=str,
+            required=True,
+            help='Comma-separated columns joined into the address name',
+        )
+        parser.add_argument('--encoding', type=str, default='utf-8-sig', help='Source encoding')
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Output path (default: REVERSE_GEOCODING_SETTINGS["REGIONS_PATH"])',
+        )
+
+    def handle(self, *args, **options):
+        name_columns = [name.strip() for name in options['name_columns'].split(',') if name.strip()]
+        output = Path(options['output'] or settings.REVERSE_GEOCODING_SETTINGS['REGIONS_PATH'])
+
+        try:
+            rows, skipped = self._read(options, name_columns)
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['source']}: {e}") from e
+        if not rows:
+            raise CommandError('No region with valid coordinates found')
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['lat', 'lng', 'address_name'])
+            writer.writerows(rows)
+
+        # 저장한 파일이 그대로 읽히는지 확인
+        index = RegionIndex.from_csv(output)
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Wrote {len(index)} regions to {output} ({skipped} rows skipped)')
+        )
+
+    def _read(self, options, name_columns):
+        rows = []
+        skipped = 0
+        with open(options['source'], newline='', encoding=options['encoding']) as f:
+            reader = csv.DictReader(f)
+            columns = [options['lat_column'], options['lng_column'], *name_columns]
+            missing = [column for column in columns if column not in (reader.fieldnames or [])]
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(missing)}")
+
+            for row in reader:
+                try:
+                    lat = float(row[options['lat_column']])
+                    lng = float(row[options['lng_column']])
+                except (TypeError, ValueError):
+                    skipped += 1
+                    continue
+                name = ' '.join(row[column].strip() for column in name_columns if row[column])
+                if not (-90 <= lat <= 90 and -180 <= lng <= 180) or not name:
+                    skipped += 1
+                    continue
+                rows.append((lat, lng, name))
+        return rows, skipped
@@ -0,0 +1,177 @@
+"""
+Django management command to migrate the Qdrant collections to the schema in
+settings (see gallery/qdrant_schema.py).
+
+For each collection the live configuration is diffed against the desired
+one (vector params, HNSW, quantization, payload indexes):
+
+- Missing collections are created (as an alias of a versioned collection)
+- On-disk vectors, HNSW, quantization and payload indexes are changed in
+  place; Qdrant rebuilds segments in the background
+- A different distance, or --rebuild, copies the points into a new
+  collection and swaps the alias (outbox drains are paused meanwhile)
+- A different vector size is refused: it needs re-embedding
+- Image points without the location payload get it from lat / lng
+- With --prune, indexes not in the schema are dropped and image payload
+  fields outside QDRANT_COLLECTION_SETTINGS["PAYLOAD_PROFILE"] are deleted
+  from the stored points
+
+Running it again once a collection is up to date changes nothing.
+
+Usage:
+    python manage.py migrate_qdrant_schema [--collection NAME] [--dry-run]
+                                           [--rebuild] [--batch-size N] [--keep-old]
+                                           [--convert-to-alias] [--prune]
+
+Options:
+    --collection NAME    Only migrate one collection (default: image and rep vector)
+    --dry-run            Only show the differences
+    --rebuild            Copy into a new collection even if in-place changes suffice
+    --batch-size N       Points per scroll / upsert when copying (default 256)
+    --keep-old           Keep the previous collection after an alias swap
+    --convert-to-alias   Allow copying a plain (un-aliased) collection: it is
+                         deleted before the alias is created, so searches fail
+                         until the swap ends (not compatible with --keep-old)
+    --prune              Drop indexes / payload fields the schema doesn't have
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gallery.qdrant_schema import (
+    SchemaMigrationError,
+    apply_in_place,
+    backfill_location,
+    check_swap_allowed,
+    create_aliased_collection,
+    desired_schema,
+    diff_collection,
+    migrate_collection,
+    prune,
+    resolve_collection,
+)
+from gallery.qdrant_utils import (
+    IMAGE_COLLECTION_NAME,
+    REPVEC_COLLECTION_NAME,
+    get_qdrant_client,
+)
+
+COLLECTIONS = (IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME)
+
+
+class Command(BaseCommand):
+    help = 'Migrate Qdrant collections to the configured schema (in place or via alias swap)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            type=str,
+            choices=COLLECTIONS,
+            help='Only migrate this collection',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show the differences',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Copy into a new collection and swap the alias even if not required',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=256,
+            help='Points per scroll / upsert when copying',
+        )
+        parser.add_argument(
+            '--keep-old',
+            action='store_true',
+            help='Keep the previous collection after an alias swap',
+        )
+        parser.add_argument(
+            '--convert-to-alias',
+            action='store_true',
+            help='Allow replacing a plain collection by an alias (searches fail during the swap)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Drop indexes not in the schema and payload fields outside the payload profile',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        client = get_qdrant_client()
+        collections = [options['collection']] if options['collection'] else COLLECTIONS
+
+        for name in collections:
+            try:
+                self._migrate(client, name, options)
+            except (SchemaMigrationError, ValueError) as e:
+                raise CommandError(f'{name}: {e}') from e
+
+    def _migrate(self, client, name, options):
+        schema = desired_schema(name)
+        physical, is_alias = resolve_collection(client, name)
+
+        if physical is None:
+            self.stdout.write(f'{name}: missing')
+            if not options['dry_run']:
+                created = create_aliased_collection(client, name, schema)
+                self.stdout.write(self.style.SUCCESS(f'  ✓ Created {created} (alias {name})'))
+            return
+
+        self.stdout.write(f'{name} -> {physical}' if is_alias else name)
+        diff = diff_collection(client, physical, schema)
+        for change in diff.changes:
+            self.stdout.write(f'  - {change}')
+        kept = 'dropped' if options['prune'] else 'kept'
+        for index_name in diff.extra_indexes:
+            self.stdout.write(f'  - index {index_name}: not in schema ({kept})')
+        if options['prune'] and schema.unused_payload:
+            self.stdout.write(f"  - payload: delete {', '.join(schema.unused_payload)}")
+
+        rebuild = diff.rebuild or options['rebuild']
+        if not diff.changes and not rebuild:
+            if options['prune'] and not options['dry_run']:
+                prune(client, physical, diff, schema)
+                self.stdout.write(self.style.SUCCESS('  ✓ Pruned'))
+            else:
+                self.stdout.write(self.style.SUCCESS('  ✓ Up to date'))
+            return
+
+        if options['dry_run']:
+            plan = 'copy into a new collection and swap the alias' if rebuild else 'in place'
+            if rebuild and not is_alias:
+                plan += ' (plain collection: needs --convert-to-alias)'
+            self.stdout.write(self.style.WARNING(f'  Plan: {plan}'))
+            return
+
+        if rebuild:
+            # 복사할 수 없으면 prune도 하지 않고 중단
+            check_swap_allowed(
+                name, is_alias, options['keep_old'], options['convert_to_alias']
+            )
+        if options['prune']:
+            prune(client, physical, diff, schema)
+
+        if rebuild:
+            target, copied = migrate_collection(
+                client,
+                name,
+                schema,
+                options['batch_size'],
+                keep_old=options['keep_old'],
+                convert_plain=options['convert_to_alias'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Copied {copied} points, {name} -> {target}'))
+            if diff.backfill:
+                backfill_location(client, target, options['batch_size'])
+        else:
+            apply_in_place(client, physical, diff, options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS('  ✓ Updated in place (segments are rebuilt in the background)')
+            )
@@ -0,0 +1,128 @@
+"""
+Django management command to reconcile MySQL photos/tags with Qdrant.
+
+Streams both sides per user in photo_id order (see gallery/reconcile.py), so
+memory stays bounded by the batch size however large the gallery is.
+
+- Orphan image points (no photo row) are deleted
+- Photos without an image point get their embedding re-enqueued
+  (process_and_embed_photos_batch; only works while the upload is still in
+  storage, otherwise the GPU task logs the failed download)
+- Image points whose isTagged payload is missing or stale get it set from
+  photo.is_tagged
+- Rep vectors of deleted tags are deleted
+- Points without a user_id payload are deleted
+
+Pending outbox writes are applied first (outbox.barrier), so points that are
+only queued are not reported as missing (a dry run only warns about them).
+
+Usage:
+    python manage.py reconcile_vectors [--user-id USER_ID] [--batch-size N] [--dry-run]
+
+Options:
+    --user-id USER_ID    Only reconcile a specific user
+    --batch-size N       Rows / points per page and per Qdrant delete (default 1000)
+    --dry-run            Only report, do not delete or enqueue anything
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gallery import outbox
+from gallery.qdrant_utils import (
+    IMAGE_COLLECTION_NAME,
+    REPVEC_COLLECTION_NAME,
+    get_qdrant_client,
+)
+from gallery.reconcile import (
+    ReconcileStats,
+    reconcile_unowned_points,
+    reconcile_user,
+    user_ids_to_reconcile,
+)
+
+
+class Command(BaseCommand):
+    help = 'Reconcile MySQL photos and tags with Qdrant points (streaming merge-join)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Only reconcile a specific user ID',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows / points fetched per page and deleted per Qdrant call',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report differences without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        user_id = options.get('user_id')
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        client = get_qdrant_client()
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry run: nothing will be changed'))
+
+        # Queued writes would otherwise show up as missing / orphan points
+        if dry_run:
+            if outbox.pending_entries():
+                self.stdout.write(
+                    self.style.WARNING('Outbox has pending writes; they may be reported below')
+                )
+        else:
+            for collection in (IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME):
+                if not outbox.barrier(client, collection):
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'{collection} has unapplied outbox writes; results may include them'
+                        )
+                    )
+
+        user_ids = [user_id] if user_id else user_ids_to_reconcile(client)
+        self.stdout.write(f'Reconciling {len(user_ids)} users (batch size {batch_size})...')
+
+        total = ReconcileStats()
+        for uid in user_ids:
+            stats = reconcile_user(client, uid, batch_size, dry_run)
+            total.add(stats)
+            if stats.changes:
+                self.stdout.write(
+                    f'  User {uid}: {stats.orphan_points} orphan points, '
+                    f'{stats.missing_points} missing points, '
+                    f'{stats.stale_tag_states} stale tag states, '
+                    f'{stats.orphan_rep_vectors} orphan rep vectors'
+                )
+
+        if not user_id:
+            unowned = reconcile_unowned_points(client, batch_size, dry_run)
+            total.add(unowned)
+            if unowned.changes:
+                self.stdout.write(
+                    f'  No user_id: {unowned.orphan_points} points, '
+                    f'{unowned.orphan_rep_vectors} rep vectors'
+                )
+
+        verb = 'Found' if dry_run else 'Fixed'
+        self.stdout.write(
+            f'\nChecked {total.photos} photos, {total.points} image points, '
+            f'{total.rep_vectors} rep vectors'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ {verb} {total.orphan_points} orphan points, '
+                f'{total.missing_points} missing points, '
+                f'{total.stale_tag_states} stale tag states, '
+                f'{total.orphan_rep_vectors} orphan rep vectors'
+            )
+        )
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+def backfill_is_tagged(apps, schema_editor):
+    Photo = apps.get_model('gallery', 'Photo')
+    Photo_Tag = apps.get_model('gallery', 'Photo_Tag')
+
+    has_tags = Photo_Tag.objects.filter(photo=models.OuterRef('pk'))
+    Photo.objects.update(is_tagged=models.Exists(has_tags))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_tag_created_at_tag_updated_at_alter_photo_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['user', 'is_tagged', 'photo_id'], name='photo_user_tagged_idx'),
+        ),
+        migrations.RunPython(backfill_is_tagged, migrations.RunPython.noop),
+    ]
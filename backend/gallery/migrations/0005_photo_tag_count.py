@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_tag_count(apps, schema_editor):
+    Photo = apps.get_model('gallery', 'Photo')
+    Photo_Tag = apps.get_model('gallery', 'Photo_Tag')
+
+    tag_count = (
+        Photo_Tag.objects.filter(photo=models.OuterRef('pk'))
+        .order_by()
+        .values('photo')
+        .annotate(count=models.Count('pk'))
+        .values('count')
+    )
+    Photo.objects.update(tag_count=Coalesce(models.Subquery(tag_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0004_photo_user_tagged_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='tag_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_tag_count, migrations.RunPython.noop),
+    ]
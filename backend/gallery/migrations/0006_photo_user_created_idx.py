@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_photo_tag_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['user', 'created_at', 'photo_id'], name='photo_user_created_idx'),
+        ),
+    ]
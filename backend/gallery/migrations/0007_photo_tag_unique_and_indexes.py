@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_photo_tags(apps, schema_editor):
+    Photo = apps.get_model('gallery', 'Photo')
+    Photo_Tag = apps.get_model('gallery', 'Photo_Tag')
+
+    duplicates = (
+        Photo_Tag.objects.values('user', 'photo', 'tag')
+        .annotate(count=models.Count('pk'), keep=models.Min('pt_id'))
+        .filter(count__gt=1)
+    )
+
+    affected_photo_ids = set()
+    for row in duplicates:
+        Photo_Tag.objects.filter(
+            user=row['user'], photo=row['photo'], tag=row['tag']
+        ).exclude(pt_id=row['keep']).delete()
+        affected_photo_ids.add(row['photo'])
+
+    if not affected_photo_ids:
+        return
+
+    tag_count = (
+        Photo_Tag.objects.filter(photo=models.OuterRef('pk'))
+        .order_by()
+        .values('photo')
+        .annotate(count=models.Count('pk'))
+        .values('count')
+    )
+    Photo.objects.filter(photo_id__in=affected_photo_ids).update(
+        tag_count=Coalesce(models.Subquery(tag_count), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_photo_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo_caption',
+            index=models.Index(fields=['user', 'photo'], name='photo_caption_user_photo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo_caption',
+            index=models.Index(fields=['user', 'caption'], name='photo_caption_user_cap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo_tag',
+            index=models.Index(fields=['user', 'tag'], name='photo_tag_user_tag_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'tag'], name='tag_user_name_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_photo_tags, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='photo_tag',
+            constraint=models.UniqueConstraint(fields=('user', 'photo', 'tag'), name='unique_user_photo_tag'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:06
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_tag_summary(apps, schema_editor):
+    Tag = apps.get_model('gallery', 'Tag')
+    Photo_Tag = apps.get_model('gallery', 'Photo_Tag')
+
+    photo_tags = Photo_Tag.objects.filter(tag=models.OuterRef('pk'))
+    photo_count = (
+        photo_tags.order_by()
+        .values('tag')
+        .annotate(count=models.Count('pk'))
+        .values('count')
+    )
+    thumbnail = photo_tags.order_by('-photo__created_at').values('photo__photo_path_id')[:1]
+    Tag.objects.update(
+        photo_count=Coalesce(models.Subquery(photo_count), 0),
+        thumbnail_path_id=models.Subquery(thumbnail),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0007_photo_tag_unique_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='thumbnail_path_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_tag_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0008_tag_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VectorOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=64)),
+                ('operation', models.CharField(choices=[('delete', 'delete')], max_length=16)),
+                ('point_ids', models.JSONField(default=list)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+    ]
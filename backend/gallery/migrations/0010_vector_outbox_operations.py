@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0009_photo_soft_delete_vector_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vectoroutbox',
+            name='data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vectoroutbox',
+            name='operation',
+            field=models.CharField(choices=[('upsert', 'upsert'), ('delete', 'delete'), ('set_payload', 'set_payload')], max_length=16),
+        ),
+    ]
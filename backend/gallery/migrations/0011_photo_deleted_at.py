@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0010_vector_outbox_operations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
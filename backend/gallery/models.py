@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
 
@@ -11,9 +12,44 @@ class Tag(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    # 태그 목록 화면용 요약 (Tag.refresh_summary로 갱신)
+    photo_count = models.PositiveIntegerField(default=0)
+    thumbnail_path_id = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 이름으로 사용자 태그 조회 (태그 생성, 태그 추천)
+            models.Index(fields=['user', 'tag'], name='tag_user_name_idx'),
+        ]
+
     def __str__(self):
         return self.tag
 
+    @staticmethod
+    def refresh_summary(tag_ids):
+        """Photo_Tag 기준으로 photo_count, 최신 사진 썸네일 재계산 (UPDATE 한 번)"""
+        photo_tags = Photo_Tag.objects.filter(tag=models.OuterRef("pk"))
+        photo_count = (
+            photo_tags.order_by()
+            .values("tag")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        thumbnail = photo_tags.order_by("-photo__created_at").values(
+            "photo__photo_path_id"
+        )[:1]
+        Tag.objects.filter(tag_id__in=tag_ids).update(
+            photo_count=Coalesce(models.Subquery(photo_count), 0),
+            thumbnail_path_id=models.Subquery(thumbnail),
+        )
+
+
+class PhotoManager(models.Manager):
+    """삭제 표시된 사진(is_deleted)을 제외하는 기본 매니저"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
 
 class Photo(models.Model):
     photo_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -24,6 +60,14 @@ class Photo(models.Model):
     lat = models.FloatField(null=True, blank=True)
     lng = models.FloatField(null=True, blank=True)
     is_tagged = models.BooleanField(default=False)
+    tag_count = models.PositiveIntegerField(default=0)
+    # 삭제 요청됨, purge_deleted_photos가 실제 삭제 (그 전까지 Photo.objects에서 제외)
+    is_deleted = models.BooleanField(default=False)
+    # 삭제 표시 시각, sweep_deleted_photos가 유예 시간이 지난 사진을 다시 purge
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PhotoManager()
+    all_objects = models.Manager()
     
     class Meta:
         constraints = [
@@ -32,10 +76,37 @@ class Photo(models.Model):
                 name='unique_user_photo_path_id'
             )
         ]
+        indexes = [
+            # 태그 없는 사진 랜덤 샘플링 (photo_id 기준 keyset)
+            models.Index(
+                fields=['user', 'is_tagged', 'photo_id'],
+                name='photo_user_tagged_idx',
+            ),
+            # 최신순 목록의 keyset 페이지네이션 (created_at, photo_id 커서)
+            models.Index(
+                fields=['user', 'created_at', 'photo_id'],
+                name='photo_user_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Photo {self.photo_id} by User {self.user.id}"
 
+    @staticmethod
+    def refresh_tag_state(photo_ids):
+        """Photo_Tag 기준으로 tag_count, is_tagged 재계산 (UPDATE 한 번)"""
+        photo_tags = Photo_Tag.objects.filter(photo=models.OuterRef("pk"))
+        tag_count = (
+            photo_tags.order_by()
+            .values("photo")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        Photo.objects.filter(photo_id__in=photo_ids).update(
+            tag_count=Coalesce(models.Subquery(tag_count), 0),
+            is_tagged=models.Exists(photo_tags),
+        )
+
 
 class Photo_Tag(models.Model):
     pt_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -43,6 +114,19 @@ class Photo_Tag(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     photo = models.ForeignKey(Photo, on_delete=models.CASCADE, default=None)
 
+    class Meta:
+        constraints = [
+            # 같은 사진에 같은 태그 중복 방지 (user, photo) 조회 인덱스 겸용
+            models.UniqueConstraint(
+                fields=['user', 'photo', 'tag'],
+                name='unique_user_photo_tag',
+            )
+        ]
+        indexes = [
+            # 태그 앨범 조회
+            models.Index(fields=['user', 'tag'], name='photo_tag_user_tag_idx'),
+        ]
+
     def __str__(self):
         return f"{self.photo.photo_id} tagged with {self.tag.tag_id}"
 
@@ -66,5 +150,44 @@ class Photo_Caption(models.Model):
     caption = models.ForeignKey(Caption, on_delete=models.CASCADE)
     weight = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # 사진별 캡션 조회 (캡션 그래프 증분 갱신, 하이브리드 검색)
+            models.Index(fields=['user', 'photo'], name='photo_caption_user_photo_idx'),
+            # 캡션별 사진 조회
+            models.Index(fields=['user', 'caption'], name='photo_caption_user_cap_idx'),
+        ]
+
     def __str__(self):
         return f"{self.photo.photo_id} captioned with {self.caption.caption}"
+
+
+class VectorOutbox(models.Model):
+    """
+    Qdrant에 반영해야 하는 쓰기 작업 (gallery/outbox.py)
+
+    DB 변경과 같은 트랜잭션에서 기록하고, Qdrant 반영에 성공하면 삭제.
+    실패한 항목은 drain_vector_outbox가 재시도한다.
+    """
+
+    OP_UPSERT = "upsert"
+    OP_DELETE = "delete"
+    OP_SET_PAYLOAD = "set_payload"
+    OPERATION_CHOICES = [
+        (OP_UPSERT, "upsert"),
+        (OP_DELETE, "delete"),
+        (OP_SET_PAYLOAD, "set_payload"),
+    ]
+
+    collection = models.CharField(max_length=64)
+    operation = models.CharField(max_length=16, choices=OPERATION_CHOICES)
+    point_ids = models.JSONField(default=list)
+    # upsert: {"points": [{"id", "vector", "payload"}]}, set_payload: {"payload": {...}},
+    # 필터 삭제: {"filter": Filter JSON} (point_ids는 빈 리스트)
+    data = models.JSONField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.operation} {len(self.point_ids)} points in {self.collection}"
@@ -0,0 +1,378 @@
+"""
+Write-ahead outbox of Qdrant writes.
+
+Writers never call Qdrant's write APIs directly. They record the operation
+(upsert, delete by ids or by filter, set_payload) as a VectorOutbox row -
+in the same transaction as the MySQL change it belongs to, if any - and call
+schedule_drain(). Once the transaction commits, a drain is queued FLUSH_DELAY
+seconds later (one per window, so writes of many tasks are coalesced), or
+right away when FLUSH_SIZE entries are pending. Request handlers and GPU
+workers therefore never wait on Qdrant.
+
+The drain applies pending entries in bulk: entries are grouped per
+collection and sent as one batch_update_points call per collection, in
+outbox order, so a rep vector "delete by filter" still lands before the
+upsert that replaces it. Consecutive upserts and id deletes are merged into
+one operation. The drain does not wait for indexing (wait=False): Qdrant
+acknowledges once the update is in its WAL, so the entry can be removed.
+Callers that must read their own writes call barrier() first, which applies
+the collection's pending entries and waits until Qdrant has applied every
+update acknowledged so far; barrier_points() does the same for a few points
+and only takes the drain lock when one of them still has a pending entry. Applied entries are removed. When a batch fails,
+the collection's entries are retried one by one and the collection stops at
+the first entry that still fails (later entries could depend on it); that
+entry keeps its attempt count and error, and the periodic drain retries it
+until MAX_ATTEMPTS.
+
+Every operation is idempotent (upserts carry their point ids), so replaying
+an entry that was applied but not yet removed is harmless. One drain runs at
+a time (Redis lock), which keeps replays from reordering writes.
+"""
+
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from qdrant_client.http import models
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from redis import RedisError
+
+from config.redis import get_redis
+
+from .models import VectorOutbox
+from .qdrant_utils import get_qdrant_client
+
+# Errors that mean "Qdrant did not take the write"; anything else is a bug
+QDRANT_ERRORS = (ResponseHandlingException, UnexpectedResponse, ConnectionError, TimeoutError)
+
+DRAIN_LOCK_KEY = "vector_outbox:drain_lock"
+DRAIN_SCHEDULED_KEY = "vector_outbox:drain_scheduled"
+
+# barrier() waits on a no-op delete of this id (photo and rep vector ids are uuid4)
+SYNC_POINT_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _outbox_settings():
+    return settings.VECTOR_OUTBOX_SETTINGS
+
+
+def enqueue_upsert(collection: str, points) -> VectorOutbox:
+    """Record a point upsert (points: PointStruct list)"""
+    return VectorOutbox.objects.create(
+        collection=collection,
+        operation=VectorOutbox.OP_UPSERT,
+        point_ids=[str(point.id) for point in points],
+        data={
+            "points": [
+                {"id": str(point.id), "vector": point.vector, "payload": point.payload}
+                for point in points
+            ]
+        },
+    )
+
+
+def enqueue_delete(collection: str, point_ids) -> VectorOutbox:
+    """Record a point deletion (call inside the transaction that deletes the rows)"""
+    return VectorOutbox.objects.create(
+        collection=collection,
+        operation=VectorOutbox.OP_DELETE,
+        point_ids=[str(point_id) for point_id in point_ids],
+    )
+
+
+def enqueue_delete_by_filter(collection: str, points_filter: models.Filter) -> VectorOutbox:
+    """Record a deletion of every point matching the filter"""
+    return VectorOutbox.objects.create(
+        collection=collection,
+        operation=VectorOutbox.OP_DELETE,
+        data={"filter": points_filter.model_dump(mode="json", exclude_none=True)},
+    )
+
+
+def enqueue_set_payload(collection: str, payload: dict, point_ids) -> VectorOutbox:
+    """Record a payload update (points that don't exist yet are skipped)"""
+    return VectorOutbox.objects.create(
+        collection=collection,
+        operation=VectorOutbox.OP_SET_PAYLOAD,
+        point_ids=[str(point_id) for point_id in point_ids],
+        data={"payload": payload},
+    )
+
+
+def schedule_drain():
+    """Queue a drain once the current transaction commits (right away outside one)"""
+    transaction.on_commit(_request_drain)
+
+
+def _request_drain():
+    from .tasks import drain_vector_outbox
+
+    outbox_settings = _outbox_settings()
+    delay = outbox_settings.get("FLUSH_DELAY", 1)
+    if delay <= 0 or VectorOutbox.objects.count() >= outbox_settings.get("FLUSH_SIZE", 200):
+        drain_vector_outbox.delay()
+        return
+
+    # A drain is already queued for this window: it will pick these entries up
+    try:
+        first = get_redis().set(DRAIN_SCHEDULED_KEY, 1, nx=True, ex=delay)
+    except RedisError as e:
+        print(f"[WARN] Outbox drain debounce unavailable: {e}")
+        first = True
+    if first:
+        drain_vector_outbox.apply_async(countdown=delay)
+
+
+def _operation(entry: VectorOutbox):
+    data = entry.data or {}
+
+    if entry.operation == VectorOutbox.OP_UPSERT:
+        return models.UpsertOperation(
+            upsert=models.PointsList(
+                points=[models.PointStruct(**point) for point in data["points"]]
+            )
+        )
+
+    if entry.operation == VectorOutbox.OP_DELETE:
+        if "filter" in data:
+            selector = models.FilterSelector(filter=models.Filter.model_validate(data["filter"]))
+        else:
+            selector = models.PointIdsList(points=entry.point_ids)
+        return models.DeleteOperation(delete=selector)
+
+    if entry.operation == VectorOutbox.OP_SET_PAYLOAD:
+        # Filter instead of ids: points that are not embedded yet are skipped silently
+        return models.SetPayloadOperation(
+            set_payload=models.SetPayload(
+                payload=data["payload"],
+                filter=models.Filter(must=[models.HasIdCondition(has_id=entry.point_ids)]),
+            )
+        )
+
+    raise ValueError(f"Unknown outbox operation: {entry.operation}")
+
+
+def _merge(previous, operation):
+    """Merge two consecutive operations into one, or None if they can't be"""
+    if isinstance(previous, models.UpsertOperation) and isinstance(
+        operation, models.UpsertOperation
+    ):
+        # A later upsert of the same id wins
+        points = {str(point.id): point for point in previous.upsert.points}
+        points.update({str(point.id): point for point in operation.upsert.points})
+        return models.UpsertOperation(upsert=models.PointsList(points=list(points.values())))
+
+    if (
+        isinstance(previous, models.DeleteOperation)
+        and isinstance(operation, models.DeleteOperation)
+        and isinstance(previous.delete, models.PointIdsList)
+        and isinstance(operation.delete, models.PointIdsList)
+    ):
+        point_ids = dict.fromkeys(previous.delete.points + operation.delete.points)
+        return models.DeleteOperation(delete=models.PointIdsList(points=list(point_ids)))
+
+    return None
+
+
+def _operations(entries) -> list:
+    """Entries as Qdrant operations, consecutive upserts / id deletes merged"""
+    operations = []
+    for entry in entries:
+        operation = _operation(entry)
+        merged = _merge(operations[-1], operation) if operations else None
+        if merged is None:
+            operations.append(operation)
+        else:
+            operations[-1] = merged
+    return operations
+
+
+def _apply(client, collection: str, entries, wait: bool):
+    client.batch_update_points(
+        collection_name=collection,
+        update_operations=_operations(entries),
+        wait=wait,
+    )
+
+
+def _record_failure(entry: VectorOutbox, error: Exception):
+    entry.attempts += 1
+    entry.last_error = str(error)[:1000]
+    entry.save(update_fields=["attempts", "last_error"])
+    print(
+        f"[WARN] Outbox entry {entry.pk} ({entry.operation} on "
+        f"{entry.collection}) failed, attempt {entry.attempts}: {error}"
+    )
+
+
+def _flush_collection(client, collection: str, entries, wait: bool) -> list:
+    """Apply one collection's entries in order; returns the applied entries"""
+    try:
+        _apply(client, collection, entries, wait)
+        return entries
+    except QDRANT_ERRORS as e:
+        if len(entries) == 1:
+            _record_failure(entries[0], e)
+            return []
+
+    # The batch failed: find the failing entry, keep everything after it pending
+    applied = []
+    for entry in entries:
+        try:
+            _apply(client, collection, [entry], wait)
+        except QDRANT_ERRORS as e:
+            _record_failure(entry, e)
+            break
+        applied.append(entry)
+    return applied
+
+
+def flush(entries, wait: bool = False, client=None) -> int:
+    """
+    Apply outbox entries to Qdrant, one bulk request per collection.
+
+    Args:
+        entries: VectorOutbox rows
+        wait: Wait until Qdrant has applied the updates (default: WAL only)
+        client: Qdrant client (default: get_qdrant_client())
+
+    Returns:
+        Number of entries applied (and removed from the outbox)
+    """
+    entries = sorted(entries, key=lambda entry: (entry.collection, entry.pk))
+    if not entries:
+        return 0
+
+    client = client or get_qdrant_client()
+    applied = []
+    for collection, group in groupby(entries, key=lambda entry: entry.collection):
+        applied.extend(_flush_collection(client, collection, list(group), wait))
+
+    if applied:
+        VectorOutbox.objects.filter(pk__in=[entry.pk for entry in applied]).delete()
+    return len(applied)
+
+
+def pending_entries(collection: str | None = None):
+    """Oldest retryable entries (of one collection), at most DRAIN_BATCH_SIZE"""
+    outbox_settings = _outbox_settings()
+    queryset = VectorOutbox.objects.filter(attempts__lt=outbox_settings.get("MAX_ATTEMPTS", 10))
+    if collection is not None:
+        queryset = queryset.filter(collection=collection)
+    return list(queryset.order_by("pk")[: outbox_settings.get("DRAIN_BATCH_SIZE", 100)])
+
+
+def acquire_drain_lock(timeout: int | None = None) -> bool:
+    """
+    Take the drain lock so only one drain applies entries at a time.
+
+    Without Redis the drain goes ahead unlocked (writes are idempotent; only
+    the ordering guarantee between concurrent drains is lost).
+
+    Args:
+        timeout: Lock expiry in seconds (default DRAIN_LOCK_TIMEOUT)
+    """
+    if timeout is None:
+        timeout = _outbox_settings().get("DRAIN_LOCK_TIMEOUT", 300)
+    try:
+        return bool(get_redis().set(DRAIN_LOCK_KEY, 1, nx=True, ex=timeout))
+    except RedisError as e:
+        print(f"[WARN] Outbox drain lock unavailable, draining without it: {e}")
+        return True
+
+
+def extend_drain_lock(timeout: int):
+    """Push the expiry of a held drain lock (long holders, e.g. schema migrations)"""
+    try:
+        get_redis().expire(DRAIN_LOCK_KEY, timeout)
+    except RedisError as e:
+        print(f"[WARN] Failed to extend outbox drain lock: {e}")
+
+
+def release_drain_lock():
+    try:
+        get_redis().delete(DRAIN_LOCK_KEY)
+    except RedisError as e:
+        print(f"[WARN] Failed to release outbox drain lock: {e}")
+
+
+def _wait_applied(client, collection: str):
+    """Wait until Qdrant has applied every update of the collection acknowledged so far"""
+    client.batch_update_points(
+        collection_name=collection,
+        update_operations=[
+            models.DeleteOperation(delete=models.PointIdsList(points=[SYNC_POINT_ID]))
+        ],
+        wait=True,
+    )
+
+
+def barrier(client, collection: str) -> bool:
+    """
+    Make every write queued so far visible to reads on the collection.
+
+    Takes the drain lock (waiting up to BARRIER_TIMEOUT), applies the
+    collection's pending entries, then waits on a no-op update: Qdrant applies
+    a collection's updates in order, so once it is applied so is every update
+    acknowledged before it by a wait=False drain.
+
+    Returns:
+        False if some writes may still be missing (lock timeout, failed entry,
+        Qdrant error); callers go on with possibly stale reads
+    """
+    outbox_settings = _outbox_settings()
+    deadline = time.monotonic() + outbox_settings.get("BARRIER_TIMEOUT", 30)
+    while not acquire_drain_lock():
+        if time.monotonic() >= deadline:
+            print(f"[WARN] Outbox barrier on {collection} timed out waiting for the drain lock")
+            return False
+        time.sleep(0.1)
+
+    batch_size = outbox_settings.get("DRAIN_BATCH_SIZE", 100)
+    try:
+        while True:
+            entries = pending_entries(collection)
+            if flush(entries, client=client) < len(entries):
+                return False
+            if len(entries) < batch_size:
+                break
+
+        _wait_applied(client, collection)
+        return True
+    except QDRANT_ERRORS as e:
+        print(f"[WARN] Outbox barrier on {collection} failed: {e}")
+        return False
+    finally:
+        release_drain_lock()
+
+
+def barrier_points(client, collection: str, point_ids) -> bool:
+    """
+    barrier() for reads of the given points only.
+
+    The drain lock is shared by every barrier and drain, so per-task barriers
+    of a bulk operation would serialize on it. Here it is only taken (through
+    barrier()) when a pending entry touches one of the points, or deletes by
+    filter and may match them. Otherwise every write of the points has been
+    removed from the outbox, i.e. acknowledged by Qdrant, and waiting on the
+    no-op update is enough.
+
+    Returns:
+        False if some writes may still be missing (see barrier())
+    """
+    point_ids = {str(point_id) for point_id in point_ids}
+    pending = VectorOutbox.objects.filter(
+        collection=collection, attempts__lt=_outbox_settings().get("MAX_ATTEMPTS", 10)
+    ).values_list("point_ids", flat=True)
+    for entry_point_ids in pending.iterator():
+        if not entry_point_ids or point_ids.intersection(entry_point_ids):
+            return barrier(client, collection)
+
+    try:
+        _wait_applied(client, collection)
+        return True
+    except QDRANT_ERRORS as e:
+        print(f"[WARN] Outbox barrier on {collection} failed: {e}")
+        return False
+
@@ -0,0 +1,89 @@
+"""
+Keyset (cursor) pagination for photo lists ordered newest first.
+
+Rows are ordered by (created_at DESC, photo_id DESC); photo_id breaks ties
+between photos taken at the same instant. The cursor is the key of the last
+row of a page, so the next page is a range scan that starts right after it
+instead of an OFFSET that re-reads every skipped row.
+
+Views send the cursor for the next page in the ``X-Next-Cursor`` response
+header and keep the body a plain list, so existing clients are unaffected.
+Cursor parameters are validated by ``decorators.validate_pagination``.
+
+The (user, created_at, photo_id) index on Photo serves both the filter and
+the order of these queries.
+"""
+
+import base64
+import json
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at, photo_id) -> str:
+    payload = json.dumps({"created_at": created_at.isoformat(), "photo_id": str(photo_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """
+    Returns:
+        (created_at, photo_id) of the last row of the previous page
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(payload["created_at"])
+        photo_id = uuid.UUID(payload["photo_id"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if created_at is None:
+        raise ValueError("Invalid cursor")
+    return created_at, photo_id
+
+
+def paginate_by_created_at(queryset, cursor=None, limit=None, offset=0):
+    """
+    Order a Photo queryset newest first and cut one page.
+
+    Pages are keyset pages when a cursor is given; offset is only kept for
+    clients that still page by offset (they get a cursor back as well, so
+    they can switch after the first page).
+
+    Args:
+        queryset: Photo queryset (or ``values()`` of it)
+        cursor: Cursor from the previous page's X-Next-Cursor header
+        limit: Page size, None for every remaining row
+        offset: Rows to skip (offset mode only)
+
+    Returns:
+        (rows, next cursor or None when this is the last page)
+    """
+    queryset = queryset.order_by("-created_at", "-photo_id")
+
+    if cursor:
+        created_at, photo_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, photo_id__lt=photo_id)
+        )
+
+    if limit is None:
+        return list(queryset[offset:]), None
+
+    # One extra row tells whether another page exists without a COUNT query
+    rows = list(queryset[offset : offset + limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor(last["created_at"], last["photo_id"])
+    return rows, encode_cursor(last.created_at, last.photo_id)
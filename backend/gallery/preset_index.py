@@ -0,0 +1,198 @@
+"""
+In-memory index of the preset tag collection.
+
+TAG_PRESET_COLLECTION_NAME is small, shared by every user and only changes
+when the preset list is re-uploaded, so searching it over the network for
+every photo is wasted latency. The preset vectors are loaded once per process
+into an L2-normalized NumPy matrix and searched with a single matmul (cosine
+similarity, same scores as the Qdrant COSINE collection).
+
+The index is reloaded when the collection's version changes. The preset
+collection is filled from outside this repo, so the version is read from
+the collection itself: the collection the name currently points to (a
+re-upload into a new collection followed by an alias swap) and its
+points_count. Those two calls run at most once every
+TAG_RECOMMENDATION_SETTINGS["PRESET_INDEX_CHECK_INTERVAL"] seconds. An
+in-place update that keeps both the same (a vector or payload update, one
+delete plus one insert) is picked up by the unconditional reload after
+PRESET_INDEX_MAX_AGE seconds.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .clustering import normalize_vectors
+from .qdrant_utils import TAG_PRESET_COLLECTION_NAME, get_qdrant_client
+
+SCROLL_BATCH_SIZE = 256
+
+
+class PresetTagIndex:
+    """Normalized preset tag vectors searched in memory"""
+
+    def __init__(
+        self, collection_name=TAG_PRESET_COLLECTION_NAME, check_interval=300, max_age=3600
+    ):
+        self.collection_name = collection_name
+        self.check_interval = check_interval
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        # (names, matrix) is swapped as one tuple so readers never see a mix
+        self._data = ([], np.empty((0, 0), dtype=np.float32))
+        self._version = None
+        self._checked_at = None
+        self._loaded_at = None
+
+    def __len__(self):
+        return len(self._data[0])
+
+    def _collection_version(self, client):
+        # (name이 가리키는 실제 컬렉션, points_count)
+        target = next(
+            (
+                alias.collection_name
+                for alias in client.get_aliases().aliases
+                if alias.alias_name == self.collection_name
+            ),
+            self.collection_name,
+        )
+        points_count = client.get_collection(collection_name=self.collection_name).points_count
+        return target, points_count
+
+    def _load(self, client):
+        names = []
+        vectors = []
+        offset = None
+
+        while True:
+            points, offset = client.scroll(
+                collection_name=self.collection_name,
+                limit=SCROLL_BATCH_SIZE,
+                offset=offset,
+                with_payload=["name"],
+                with_vectors=True,
+            )
+            for point in points:
+                if point.vector is None or "name" not in point.payload:
+                    continue
+                names.append(point.payload["name"])
+                vectors.append(point.vector)
+            if offset is None:
+                break
+
+        if vectors:
+            matrix = normalize_vectors(np.asarray(vectors, dtype=np.float32))
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        return names, matrix
+
+    def refresh(self, force=False):
+        """
+        Reload the preset vectors if the collection changed.
+
+        Args:
+            force: Reload without waiting for the check interval
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._checked_at is not None
+            and now - self._checked_at < self.check_interval
+        ):
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if (
+                not force
+                and self._checked_at is not None
+                and now - self._checked_at < self.check_interval
+            ):
+                return
+
+            client = get_qdrant_client()
+            version = self._collection_version(client)
+            expired = self._loaded_at is None or now - self._loaded_at >= self.max_age
+
+            if force or expired or version != self._version:
+                self._data = self._load(client)
+                self._version = version
+                self._loaded_at = time.monotonic()
+                print(
+                    f"[INFO] Loaded {len(self._data[0])} preset tags "
+                    f"from '{self.collection_name}'"
+                )
+
+            self._checked_at = time.monotonic()
+
+    def search_batch(self, vectors, limit, score_threshold=None):
+        """
+        Find the most similar preset tags for several query vectors at once.
+
+        Args:
+            vectors: (n, d) query vectors (need not be normalized)
+            limit: Maximum number of tags per query
+            score_threshold: Minimum cosine similarity, None for no threshold
+
+        Returns:
+            One list of (name, score) per query, ordered by score descending
+        """
+        self.refresh()
+        names, matrix = self._data
+
+        queries = np.asarray(vectors, dtype=np.float32)
+        if len(queries) == 0:
+            return []
+        if not names or limit <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = normalize_vectors(queries) @ matrix.T
+
+        k = min(limit, len(names))
+        # argpartition keeps this O(n_tags) per query before sorting the top k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for indices, row_scores in zip(top, top_scores):
+            results.append(
+                [
+                    (names[index], float(score))
+                    for index, score in zip(indices, row_scores)
+                    if score_threshold is None or score >= score_threshold
+                ]
+            )
+        return results
+
+    def search(self, vector, limit, score_threshold=None):
+        """Single-query version of search_batch"""
+        return self.search_batch([vector], limit, score_threshold)[0]
+
+
+_preset_index = None
+_preset_index_lock = threading.Lock()
+
+
+def get_preset_index():
+    # 프로세스당 하나의 preset 인덱스 (Thread-safe)
+    global _preset_index
+    if _preset_index is None:
+        with _preset_index_lock:
+            if _preset_index is None:
+                _preset_index = PresetTagIndex(
+                    check_interval=settings.TAG_RECOMMENDATION_SETTINGS.get(
+                        "PRESET_INDEX_CHECK_INTERVAL", 300
+                    ),
+                    max_age=settings.TAG_RECOMMENDATION_SETTINGS.get(
+                        "PRESET_INDEX_MAX_AGE", 3600
+                    ),
+                )
+    return _preset_index
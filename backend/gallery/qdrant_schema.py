@@ -0,0 +1,404 @@
+"""
+Schema migrations of the image and rep vector collections.
+
+desired_schema() describes a collection as it should be - vector params,
+HNSW, quantization (QDRANT_COLLECTION_SETTINGS) and payload indexes
+(qdrant_utils.payload_indexes, which follows the image payload profile) -
+and diff_collection() compares it with the live collection. Running the diff
+again after a migration yields no changes, so migrations are idempotent.
+
+Changes Qdrant can make on a live collection (on-disk vectors, HNSW,
+quantization, payload indexes) are applied in place. Image points stored
+before the location (geo) payload field get it from their lat / lng
+(backfill_location). Indexes and image payload fields the schema no longer
+has are only removed by prune(), since dropping them can't be undone without
+re-uploading.
+
+Anything else (a new distance, or an explicit rebuild) goes through a new
+collection: the app addresses collections by name, and that name becomes an
+alias of a `<name>__<timestamp>` collection. migrate_collection() creates
+the new collection, copies every point with scroll + upsert in batches,
+checks the point count and swaps the alias in one atomic call. A name that
+is still a plain collection can't become an alias while that collection
+exists, so its first copy deletes it before creating the alias and searches
+fail in between; that only runs with convert_plain (--convert-to-alias),
+and never with keep_old.
+
+Outbox drains are paused while points are copied (the migration holds the
+drain lock), so the source doesn't change under the copy; writes queued in
+the meantime are drained into the new collection after the swap.
+reconcile_vectors flushes its deletes directly and must not run during a
+migration.
+"""
+
+from dataclasses import dataclass, field
+
+from django.utils import timezone
+from qdrant_client.http import models
+
+from . import outbox
+from .qdrant_utils import (
+    IMAGE_COLLECTION_NAME,
+    IMAGE_PAYLOAD_PROFILES,
+    collection_hnsw_config,
+    collection_quantization_config,
+    collection_vectors_config,
+    image_location,
+    image_payload_fields,
+    payload_indexes,
+)
+
+# The drain lock is held for the whole copy and extended after every batch
+MIGRATION_LOCK_TIMEOUT = 600
+
+
+class SchemaMigrationError(Exception):
+    """The collection can't be migrated (automatically) to the desired schema"""
+
+
+@dataclass
+class CollectionSchema:
+    vectors: models.VectorParams
+    hnsw: models.HnswConfigDiff
+    quantization: models.ScalarQuantization | models.BinaryQuantization | None
+    payload_indexes: dict
+    unused_payload: tuple = ()  # payload fields outside the profile
+    location: bool = False  # points carry a location derived from lat / lng
+
+
+@dataclass
+class SchemaDiff:
+    changes: list = field(default_factory=list)  # human readable
+    update: dict = field(default_factory=dict)  # update_collection kwargs
+    drop_indexes: list = field(default_factory=list)  # indexes whose type changes
+    create_indexes: dict = field(default_factory=dict)
+    extra_indexes: list = field(default_factory=list)  # live only, left alone
+    backfill: int = 0  # points missing location
+    rebuild: bool = False  # needs a copy into a new collection
+
+
+def desired_schema(collection: str) -> CollectionSchema:
+    unused_payload = ()
+    location = False
+    if collection == IMAGE_COLLECTION_NAME:
+        fields = image_payload_fields()
+        unused_payload = tuple(
+            name for name in IMAGE_PAYLOAD_PROFILES["full"] if name not in fields
+        )
+        location = "location" in fields
+    return CollectionSchema(
+        vectors=collection_vectors_config(),
+        hnsw=collection_hnsw_config(),
+        quantization=collection_quantization_config(),
+        payload_indexes=payload_indexes(collection),
+        unused_payload=unused_payload,
+        location=location,
+    )
+
+
+def resolve_collection(client, name: str):
+    """
+    Returns:
+        (physical collection name or None if missing, whether name is an alias)
+    """
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name, True
+    if client.collection_exists(collection_name=name):
+        return name, False
+    return None, False
+
+
+def diff_schema(info, schema: CollectionSchema) -> SchemaDiff:
+    """Compare a live collection (get_collection result) with the desired schema"""
+    diff = SchemaDiff()
+    vectors = info.config.params.vectors
+    if isinstance(vectors, dict):
+        raise SchemaMigrationError("named vectors are not supported")
+    if vectors.size != schema.vectors.size:
+        raise SchemaMigrationError(
+            f"vector size {vectors.size} -> {schema.vectors.size} needs re-embedding"
+        )
+
+    if vectors.distance != schema.vectors.distance:
+        diff.changes.append(f"distance {vectors.distance.value} -> {schema.vectors.distance.value}")
+        diff.rebuild = True
+
+    if bool(vectors.on_disk) != bool(schema.vectors.on_disk):
+        diff.changes.append(f"on_disk {bool(vectors.on_disk)} -> {bool(schema.vectors.on_disk)}")
+        diff.update["vectors_config"] = {"": models.VectorParamsDiff(on_disk=schema.vectors.on_disk)}
+
+    hnsw = info.config.hnsw_config
+    live_hnsw = (hnsw.m, hnsw.payload_m, hnsw.ef_construct)
+    desired_hnsw = (schema.hnsw.m, schema.hnsw.payload_m, schema.hnsw.ef_construct)
+    if live_hnsw != desired_hnsw:
+        diff.changes.append(f"hnsw (m, payload_m, ef_construct) {live_hnsw} -> {desired_hnsw}")
+        diff.update["hnsw_config"] = schema.hnsw
+
+    if info.config.quantization_config != schema.quantization:
+        diff.changes.append(
+            f"quantization {describe_quantization(info.config.quantization_config)} "
+            f"-> {describe_quantization(schema.quantization)}"
+        )
+        diff.update["quantization_config"] = schema.quantization or models.Disabled.DISABLED
+
+    live_indexes = {
+        name: index.data_type for name, index in (info.payload_schema or {}).items()
+    }
+    for name, schema_type in schema.payload_indexes.items():
+        if name not in live_indexes:
+            diff.changes.append(f"index {name}: + {schema_type.value}")
+            diff.create_indexes[name] = schema_type
+        elif live_indexes[name] != schema_type:
+            diff.changes.append(f"index {name}: {live_indexes[name].value} -> {schema_type.value}")
+            diff.drop_indexes.append(name)
+            diff.create_indexes[name] = schema_type
+    diff.extra_indexes = sorted(set(live_indexes) - set(schema.payload_indexes))
+
+    return diff
+
+
+def missing_location_filter() -> models.Filter:
+    """Points with lat / lng but no location"""
+    return models.Filter(
+        must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="location"))],
+        must_not=[
+            models.IsEmptyCondition(is_empty=models.PayloadField(key="lat")),
+            models.IsEmptyCondition(is_empty=models.PayloadField(key="lng")),
+        ],
+    )
+
+
+def diff_collection(client, collection: str, schema: CollectionSchema) -> SchemaDiff:
+    """diff_schema plus the payload checks that need a query"""
+    diff = diff_schema(client.get_collection(collection_name=collection), schema)
+    if schema.location:
+        diff.backfill = client.count(
+            collection_name=collection, count_filter=missing_location_filter(), exact=True
+        ).count
+        if diff.backfill:
+            diff.changes.append(f"payload location: backfill {diff.backfill} points")
+    return diff
+
+
+def describe_quantization(quantization) -> str:
+    if quantization is None:
+        return "none"
+    if isinstance(quantization, models.ScalarQuantization):
+        return f"scalar {quantization.scalar.type.value}"
+    if isinstance(quantization, models.BinaryQuantization):
+        return "binary"
+    return type(quantization).__name__
+
+
+def apply_in_place(client, collection: str, diff: SchemaDiff, batch_size: int = 256):
+    """Apply the changes Qdrant can make on a live collection"""
+    if diff.update:
+        client.update_collection(collection_name=collection, **diff.update)
+    for name in diff.drop_indexes:
+        client.delete_payload_index(collection_name=collection, field_name=name, wait=True)
+    for name, schema_type in diff.create_indexes.items():
+        client.create_payload_index(
+            collection_name=collection, field_name=name, field_schema=schema_type, wait=True
+        )
+    if diff.backfill:
+        backfill_location(client, collection, batch_size)
+
+
+def backfill_location(client, collection: str, batch_size: int) -> int:
+    """Set location from lat / lng where it's missing; returns the count"""
+    filled = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=missing_location_filter(),
+            limit=batch_size,
+            offset=offset,
+            with_payload=["lat", "lng"],
+            with_vectors=False,
+        )
+        if points:
+            client.batch_update_points(
+                collection_name=collection,
+                update_operations=[
+                    models.SetPayloadOperation(
+                        set_payload=models.SetPayload(
+                            payload={
+                                "location": image_location(
+                                    point.payload["lat"], point.payload["lng"]
+                                )
+                            },
+                            points=[point.id],
+                        )
+                    )
+                    for point in points
+                ],
+                wait=True,
+            )
+            filled += len(points)
+        if offset is None:
+            return filled
+
+
+def prune(client, collection: str, diff: SchemaDiff, schema: CollectionSchema):
+    """Drop indexes not in the schema and strip payload fields outside the profile"""
+    for name in diff.extra_indexes:
+        client.delete_payload_index(collection_name=collection, field_name=name, wait=True)
+    if schema.unused_payload:
+        client.delete_payload(
+            collection_name=collection,
+            keys=list(schema.unused_payload),
+            points=models.Filter(must=[]),
+            wait=True,
+        )
+
+
+def create_versioned_collection(client, name: str, schema: CollectionSchema) -> str:
+    """Create `<name>__<timestamp>` with the schema; returns its name"""
+    physical = f"{name}__{timezone.now():%Y%m%d%H%M%S}"
+    client.create_collection(
+        collection_name=physical,
+        vectors_config=schema.vectors,
+        hnsw_config=schema.hnsw,
+        quantization_config=schema.quantization,
+    )
+    for index_name, schema_type in schema.payload_indexes.items():
+        client.create_payload_index(
+            collection_name=physical, field_name=index_name, field_schema=schema_type, wait=True
+        )
+    return physical
+
+
+def _create_alias(name: str, collection: str):
+    return models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=collection, alias_name=name)
+    )
+
+
+def create_aliased_collection(client, name: str, schema: CollectionSchema) -> str:
+    """Create a missing collection as an alias of a versioned collection"""
+    physical = create_versioned_collection(client, name, schema)
+    client.update_collection_aliases(change_aliases_operations=[_create_alias(name, physical)])
+    return physical
+
+
+def copy_points(client, source: str, target: str, batch_size: int) -> int:
+    """Copy every point (vector + payload) from source to target; returns the count"""
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    models.PointStruct(id=point.id, vector=point.vector, payload=point.payload)
+                    for point in points
+                ],
+                wait=True,
+            )
+            copied += len(points)
+            outbox.extend_drain_lock(MIGRATION_LOCK_TIMEOUT)
+        if offset is None:
+            return copied
+
+
+def _swap_alias(client, name: str, target: str, source: str, is_alias: bool):
+    if is_alias:
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=name)),
+                _create_alias(name, target),
+            ]
+        )
+        return
+
+    # 첫 전환: 이름을 alias로 쓰려면 기존 컬렉션을 먼저 지워야 함 (migrate_collection이 확인)
+    client.delete_collection(collection_name=source)
+    try:
+        client.update_collection_aliases(change_aliases_operations=[_create_alias(name, target)])
+    except Exception as e:
+        raise SchemaMigrationError(
+            f"{source} was deleted but alias {name} -> {target} could not be created "
+            f"({e}); create it manually"
+        ) from e
+
+
+def check_swap_allowed(name: str, is_alias: bool, keep_old: bool, convert_plain: bool):
+    """
+    Raises:
+        SchemaMigrationError: name is a plain collection and the swap would
+            delete it without convert_plain, or keep_old can't be honored
+    """
+    if is_alias:
+        return
+    if keep_old:
+        raise SchemaMigrationError(
+            f"{name} is a plain collection; it has to be deleted to free the name "
+            "for the alias, so --keep-old can't be honored"
+        )
+    if not convert_plain:
+        raise SchemaMigrationError(
+            f"{name} is a plain collection; converting it to an alias deletes it "
+            "before the alias exists, so searches fail until the swap ends. "
+            "Run with --convert-to-alias in a maintenance window"
+        )
+
+
+def migrate_collection(
+    client,
+    name: str,
+    schema: CollectionSchema,
+    batch_size: int,
+    keep_old: bool = False,
+    convert_plain: bool = False,
+):
+    """
+    Copy a collection into a new one with the desired schema and swap the alias.
+
+    Args:
+        keep_old: Keep the previous collection (aliased names only)
+        convert_plain: Allow turning a plain collection into an alias, which
+            deletes it before the alias exists (not online)
+
+    Returns:
+        (new collection name, number of copied points)
+    """
+    source, is_alias = resolve_collection(client, name)
+    if source is None:
+        raise SchemaMigrationError(f"{name} does not exist")
+    check_swap_allowed(name, is_alias, keep_old, convert_plain)
+
+    target = create_versioned_collection(client, name, schema)
+    if not outbox.acquire_drain_lock(timeout=MIGRATION_LOCK_TIMEOUT):
+        client.delete_collection(collection_name=target)
+        raise SchemaMigrationError("an outbox drain is running; retry in a moment")
+
+    try:
+        try:
+            copied = copy_points(client, source, target, batch_size)
+            expected = client.count(collection_name=source, exact=True).count
+            actual = client.count(collection_name=target, exact=True).count
+            if actual != expected:
+                raise SchemaMigrationError(f"copied {actual} of {expected} points")
+        except Exception:
+            client.delete_collection(collection_name=target)
+            raise
+
+        _swap_alias(client, name, target, source, is_alias)
+    finally:
+        outbox.release_drain_lock()
+
+    # Writes queued during the copy go to the new collection
+    outbox.schedule_drain()
+    if is_alias and not keep_old:
+        client.delete_collection(collection_name=source)
+
+    return target, copied
@@ -1,34 +1,172 @@
+import itertools
+import os
 import threading
 
+import httpx
 from django.conf import settings
 from qdrant_client import QdrantClient, models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
-# 싱글톤 인스턴스
-_qdrant_client = None
+# 프로세스별 클라이언트 풀
+_client_pool = None
+_client_pool_pid = None
+_client_counter = itertools.count()
 _qdrant_lock = threading.Lock()
 
 QDRANT_URL = settings.QDRANT_CLUSTER_URL
 QDRANT_API_KEY = settings.QDRANT_API_KEY
 
+
+def create_qdrant_client(prefer_grpc=None):
+    # QDRANT_CLIENT_SETTINGS에 따라 Qdrant Client 생성 (prefer_grpc로 전송 방식 지정 가능)
+    client_settings = settings.QDRANT_CLIENT_SETTINGS
+    if prefer_grpc is None:
+        prefer_grpc = client_settings.get("PREFER_GRPC", False)
+
+    return QdrantClient(
+        url=QDRANT_URL,
+        api_key=QDRANT_API_KEY,
+        prefer_grpc=prefer_grpc,
+        grpc_port=client_settings.get("GRPC_PORT", 6334),
+        timeout=client_settings.get("TIMEOUT", 10),
+        # REST 전송 설정 (gRPC 사용 시에도 REST 전용 API에 쓰임)
+        http2=client_settings.get("HTTP2", False),
+        limits=httpx.Limits(
+            max_connections=client_settings.get("MAX_CONNECTIONS", 20),
+            max_keepalive_connections=client_settings.get("MAX_KEEPALIVE_CONNECTIONS", 10),
+        ),
+    )
+
+
 def get_qdrant_client():
-    # 싱글톤 Qdrant Client 인스턴스 반환 (Thread-safe)
-    global _qdrant_client
-    if _qdrant_client is None:
+    # 프로세스별 풀에서 Qdrant Client 반환 (Thread-safe, round-robin)
+    global _client_pool, _client_pool_pid
+    pid = os.getpid()
+    if _client_pool is None or _client_pool_pid != pid:
         with _qdrant_lock:
             # Double-checked locking pattern
-            if _qdrant_client is None:
-                _qdrant_client = QdrantClient(
-                    url=QDRANT_URL,
-                    api_key=QDRANT_API_KEY,
-                )
-    return _qdrant_client
+            # fork된 Celery 워커는 부모 프로세스의 연결(gRPC 채널 등)을 쓰지 않고 새로 생성
+            if _client_pool is None or _client_pool_pid != pid:
+                pool_size = max(1, settings.QDRANT_CLIENT_SETTINGS.get("POOL_SIZE", 1))
+                pool = [create_qdrant_client() for _ in range(pool_size)]
+                _client_pool = pool
+                _client_pool_pid = pid
+    return _client_pool[next(_client_counter) % len(_client_pool)]
 
 
 IMAGE_COLLECTION_NAME = "my_image_collection"
 REPVEC_COLLECTION_NAME = "my_repvec_collection"
 TAG_PRESET_COLLECTION_NAME = "tag_recommendation_preset"
 
+VECTOR_SIZE = 512
+
+# 컬렉션별 payload 인덱스 (변경 시 migrate_qdrant_schema로 기존 컬렉션에 반영)
+# 이미지 컬렉션은 payload 프로필에 포함된 필드만 인덱싱 (payload_indexes 참고)
+# isTagged는 저장만 하고 인덱싱하지 않음 (추천은 태그별 HasIdCondition으로 제외하므로 필터에 안 씀)
+PAYLOAD_INDEXES = {
+    IMAGE_COLLECTION_NAME: {
+        "user_id": models.PayloadSchemaType.INTEGER,
+        "filename": models.PayloadSchemaType.KEYWORD,
+        "photo_path_id": models.PayloadSchemaType.INTEGER,
+        "created_at": models.PayloadSchemaType.DATETIME,
+        "lat": models.PayloadSchemaType.FLOAT,
+        "lng": models.PayloadSchemaType.FLOAT,
+        "location": models.PayloadSchemaType.GEO,
+    },
+    REPVEC_COLLECTION_NAME: {
+        "user_id": models.PayloadSchemaType.INTEGER,
+        "tag_id": models.PayloadSchemaType.KEYWORD,
+    },
+}
+
+
+# 이미지 포인트에 저장할 payload 필드 (QDRANT_COLLECTION_SETTINGS["PAYLOAD_PROFILE"])
+# - minimal: 사용자 필터와 태그 여부만
+# - filters: 기간 / 위치 필터(search/filters.py)에 쓰는 created_at, lat, lng, location 추가
+# - full: 검색에 쓰지 않는 filename, photo_path_id까지 (MySQL에 있는 값)
+IMAGE_PAYLOAD_PROFILES = {
+    "minimal": ("user_id", "isTagged"),
+    "filters": ("user_id", "isTagged", "created_at", "lat", "lng", "location"),
+    "full": (
+        "user_id", "isTagged", "created_at", "lat", "lng", "location", "filename", "photo_path_id",
+    ),
+}
+
+
+def image_payload_fields():
+    # 현재 payload 프로필의 이미지 payload 필드
+    profile = settings.QDRANT_COLLECTION_SETTINGS.get("PAYLOAD_PROFILE", "full")
+    try:
+        return IMAGE_PAYLOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown QDRANT_COLLECTION_SETTINGS PAYLOAD_PROFILE: {profile}")
+
+
+def image_location(lat, lng):
+    # 반경 검색(geo_radius)용 GEO payload 값, 좌표가 없으면 None
+    if lat is None or lng is None:
+        return None
+    return {"lat": lat, "lon": lng}
+
+
+def build_image_payload(**values):
+    # 이미지 포인트 payload (프로필에 없는 필드와 None 값은 저장하지 않음)
+    # location은 lat / lng로 채움
+    values.setdefault("location", image_location(values.get("lat"), values.get("lng")))
+    fields = image_payload_fields()
+    return {key: value for key, value in values.items() if key in fields and value is not None}
+
+
+def payload_indexes(collection_name):
+    # 컬렉션에 만들 payload 인덱스 {필드: 타입}
+    indexes = PAYLOAD_INDEXES[collection_name]
+    if collection_name != IMAGE_COLLECTION_NAME:
+        return dict(indexes)
+    fields = image_payload_fields()
+    return {name: schema for name, schema in indexes.items() if name in fields}
+
+
+def collection_vectors_config():
+    # 이미지 / rep vector 컬렉션 벡터 설정 (원본 벡터 on_disk 여부)
+    return models.VectorParams(
+        size=VECTOR_SIZE,
+        distance=models.Distance.COSINE,
+        on_disk=settings.QDRANT_COLLECTION_SETTINGS.get("ON_DISK_VECTORS", False),
+    )
+
+
+def collection_hnsw_config():
+    # HNSW 설정 (payload_m: user_id 값별 그래프)
+    collection_settings = settings.QDRANT_COLLECTION_SETTINGS
+    return models.HnswConfigDiff(
+        m=collection_settings.get("HNSW_M", 16),
+        payload_m=collection_settings.get("HNSW_PAYLOAD_M", 16),
+        ef_construct=collection_settings.get("HNSW_EF_CONSTRUCT", 100),
+    )
+
+
+def collection_quantization_config():
+    # 양자화 설정 ("none"이면 None)
+    collection_settings = settings.QDRANT_COLLECTION_SETTINGS
+    quantization = collection_settings.get("QUANTIZATION", "none")
+    always_ram = collection_settings.get("QUANTIZATION_ALWAYS_RAM", True)
+
+    if quantization == "none":
+        return None
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=collection_settings.get("QUANTIZATION_QUANTILE", 0.99),
+                always_ram=always_ram,
+            )
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+        )
+    raise ValueError(f"Unknown QDRANT_COLLECTION_SETTINGS QUANTIZATION: {quantization}")
+
 
 def initialize_qdrant():
     client = get_qdrant_client()
@@ -37,9 +175,9 @@ def initialize_qdrant():
     except (UnexpectedResponse, ValueError):
         client.create_collection(
             collection_name=IMAGE_COLLECTION_NAME,
-            vectors_config=models.VectorParams(
-                size=512, distance=models.Distance.COSINE
-            ),
+            vectors_config=collection_vectors_config(),
+            hnsw_config=collection_hnsw_config(),
+            quantization_config=collection_quantization_config(),
         )
         print(f"Collection '{IMAGE_COLLECTION_NAME}' created.")
 
@@ -48,46 +186,22 @@ def initialize_qdrant():
     except (UnexpectedResponse, ValueError):
         client.create_collection(
             collection_name=REPVEC_COLLECTION_NAME,
-            vectors_config=models.VectorParams(
-                size=512, distance=models.Distance.COSINE
-            ),
+            vectors_config=collection_vectors_config(),
+            hnsw_config=collection_hnsw_config(),
+            quantization_config=collection_quantization_config(),
         )
         print(f"Collection '{REPVEC_COLLECTION_NAME}' created.")
 
-    image_indexes = {
-        "user_id": models.PayloadSchemaType.INTEGER,
-        "filename": models.PayloadSchemaType.KEYWORD,
-        "photo_path_id": models.PayloadSchemaType.INTEGER,
-        "created_at": models.PayloadSchemaType.DATETIME,
-        "lat": models.PayloadSchemaType.FLOAT,
-        "lng": models.PayloadSchemaType.FLOAT,
-        "isTagged": models.PayloadSchemaType.BOOL,
-    }
-
-    for field, schema in image_indexes.items():
-        try:
-            client.create_payload_index(
-                collection_name=IMAGE_COLLECTION_NAME,
-                field_name=field,
-                field_schema=schema,
-            )
-        except UnexpectedResponse:
-            pass
-
-    repvec_indexes = {
-        "user_id": models.PayloadSchemaType.INTEGER,
-        "tag_id": models.PayloadSchemaType.KEYWORD,
-    }
-
-    for field, schema in repvec_indexes.items():
-        try:
-            client.create_payload_index(
-                collection_name=REPVEC_COLLECTION_NAME,
-                field_name=field,
-                field_schema=schema,
-            )
-        except UnexpectedResponse:
-            pass
+    for collection_name in PAYLOAD_INDEXES:
+        for field, schema in payload_indexes(collection_name).items():
+            try:
+                client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field,
+                    field_schema=schema,
+                )
+            except UnexpectedResponse:
+                pass
 
 
 if __name__ == "__main__":
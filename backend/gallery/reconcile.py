@@ -0,0 +1,298 @@
+"""
+Streaming reconciliation of MySQL with Qdrant.
+
+Replaces the old delete_db_duplicate.py script, which loaded every photo id
+and every Qdrant point id into memory before diffing. Here both sides are
+streamed per user, in photo_id order, and merge-joined:
+
+- MySQL: keyset pages of Photo rows ordered by photo_id. InnoDB secondary
+  indexes carry the primary key, so the user_id index already serves
+  ``user_id = ? AND photo_id > ? ORDER BY photo_id``.
+- Qdrant: scroll pages of the image collection filtered by user_id. Scroll
+  without order_by returns points in ascending id order, which for UUID ids
+  is the same order as the hex photo_id column.
+
+Memory is bounded by the batch size (plus one user's tag ids for the rep
+vector check), independent of the number of photos.
+
+Findings per user:
+
+- orphan points: point without a photo row -> deleted through the outbox
+- missing points: photo row without a point -> embedding re-enqueued
+- stale tag states: point whose isTagged payload is missing or differs from
+  photo.is_tagged (points embedded before isTagged was kept in sync) -> set
+  through the outbox
+- orphan rep vectors: rep vector whose tag no longer exists -> deleted
+
+Users are taken from MySQL and from a Qdrant facet on user_id, so points of
+users that were deleted from MySQL are found too; points without a user_id
+payload are swept at the end.
+"""
+
+import uuid
+from dataclasses import dataclass, fields
+
+from django.contrib.auth.models import User
+from qdrant_client.http import models
+
+from . import outbox
+from .gpu_tasks import process_and_embed_photos_batch
+from .models import Photo, Tag
+from .qdrant_utils import IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME
+
+# Same batch size as PhotoView uploads, so a re-embed batch fits one GPU task
+EMBED_BATCH_SIZE = 8
+# Upper bound on distinct user_id values read from the Qdrant facet
+USER_FACET_LIMIT = 1_000_000
+
+
+@dataclass
+class ReconcileStats:
+    photos: int = 0
+    points: int = 0
+    orphan_points: int = 0
+    missing_points: int = 0
+    stale_tag_states: int = 0
+    rep_vectors: int = 0
+    orphan_rep_vectors: int = 0
+
+    def add(self, other: "ReconcileStats"):
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    @property
+    def changes(self) -> int:
+        return (
+            self.orphan_points
+            + self.missing_points
+            + self.stale_tag_states
+            + self.orphan_rep_vectors
+        )
+
+
+def _point_key(point_id):
+    """Sort key matching Qdrant's id order (integer ids before UUIDs)"""
+    if isinstance(point_id, int):
+        return (0, point_id)
+    return (1, uuid.UUID(str(point_id)).int)
+
+
+def _user_filter(user_id) -> models.Filter:
+    return models.Filter(
+        must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
+    )
+
+
+def iter_photo_rows(user_id: int, batch_size: int):
+    """Yield the user's photo rows in photo_id order, one keyset page at a time"""
+    last_photo_id = None
+    while True:
+        queryset = Photo.objects.filter(user_id=user_id)
+        if last_photo_id is not None:
+            queryset = queryset.filter(photo_id__gt=last_photo_id)
+        rows = list(
+            queryset.order_by("photo_id").values(
+                "photo_id", "filename", "photo_path_id", "created_at", "lat", "lng", "is_tagged"
+            )[:batch_size]
+        )
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_photo_id = rows[-1]["photo_id"]
+
+
+def iter_points(client, collection: str, scroll_filter, batch_size: int, with_payload=False):
+    """Yield every point matching the filter, one scroll page at a time"""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=False,
+        )
+        yield from points
+        if offset is None:
+            return
+
+
+def merge_join(rows, points):
+    """
+    Merge two id-ordered streams.
+
+    Yields:
+        (row, point); row is None for an orphan point, point is None for a
+        row without a point
+
+    Raises:
+        RuntimeError: A stream is not in ascending id order (diffing it
+            would report false orphans)
+    """
+    rows, points = iter(rows), iter(points)
+    row, point = next(rows, None), next(points, None)
+    last_row_key = last_point_key = None
+
+    while row is not None or point is not None:
+        row_key = _point_key(row["photo_id"]) if row is not None else None
+        point_key = _point_key(point.id) if point is not None else None
+
+        for key, last, name in (
+            (row_key, last_row_key, "MySQL"),
+            (point_key, last_point_key, "Qdrant"),
+        ):
+            if key is not None and last is not None and key < last:
+                raise RuntimeError(f"{name} stream is not ordered by photo_id")
+
+        if point_key is None or (row_key is not None and row_key < point_key):
+            yield row, None
+            last_row_key, row = row_key, next(rows, None)
+        elif row_key is None or point_key < row_key:
+            yield None, point
+            last_point_key, point = point_key, next(points, None)
+        else:
+            yield row, point
+            last_row_key, row = row_key, next(rows, None)
+            last_point_key, point = point_key, next(points, None)
+
+
+def _delete_points(collection: str, point_ids, dry_run: bool):
+    if point_ids and not dry_run:
+        outbox.flush([outbox.enqueue_delete(collection, point_ids)])
+
+
+def _set_tag_states(ids_by_state: dict, dry_run: bool):
+    if dry_run:
+        return
+    entries = [
+        outbox.enqueue_set_payload(IMAGE_COLLECTION_NAME, {"isTagged": is_tagged}, point_ids)
+        for is_tagged, point_ids in ids_by_state.items()
+        if point_ids
+    ]
+    if entries:
+        outbox.flush(entries)
+
+
+def _embed_metadata(user_id: int, row) -> dict:
+    """Same metadata PhotoView.post sends to process_and_embed_photos_batch"""
+    return {
+        "storage_key": str(row["photo_id"]),
+        "user_id": user_id,
+        "filename": row["filename"],
+        "photo_path_id": row["photo_path_id"],
+        "created_at": row["created_at"].isoformat(),
+        "lat": row["lat"],
+        "lng": row["lng"],
+    }
+
+
+def _enqueue_embeddings(batch, dry_run: bool):
+    if batch and not dry_run:
+        process_and_embed_photos_batch.delay(batch)
+
+
+def reconcile_photos(client, user_id: int, batch_size: int, dry_run: bool) -> ReconcileStats:
+    """Merge-join the user's photo rows with the user's image points"""
+    stats = ReconcileStats()
+    orphans, missing = [], []
+    stale = {True: [], False: []}
+
+    points = iter_points(
+        client, IMAGE_COLLECTION_NAME, _user_filter(user_id), batch_size, with_payload=["isTagged"]
+    )
+    for row, point in merge_join(iter_photo_rows(user_id, batch_size), points):
+        stats.photos += row is not None
+        stats.points += point is not None
+
+        if row is None:
+            stats.orphan_points += 1
+            orphans.append(str(point.id))
+            if len(orphans) >= batch_size:
+                _delete_points(IMAGE_COLLECTION_NAME, orphans, dry_run)
+                orphans = []
+        elif point is None:
+            stats.missing_points += 1
+            missing.append(_embed_metadata(user_id, row))
+            if len(missing) >= EMBED_BATCH_SIZE:
+                _enqueue_embeddings(missing, dry_run)
+                missing = []
+        elif (point.payload or {}).get("isTagged") != row["is_tagged"]:
+            stats.stale_tag_states += 1
+            stale[row["is_tagged"]].append(str(point.id))
+            if len(stale[row["is_tagged"]]) >= batch_size:
+                _set_tag_states(stale, dry_run)
+                stale = {True: [], False: []}
+
+    _delete_points(IMAGE_COLLECTION_NAME, orphans, dry_run)
+    _enqueue_embeddings(missing, dry_run)
+    _set_tag_states(stale, dry_run)
+    return stats
+
+
+def reconcile_rep_vectors(client, user_id: int, batch_size: int, dry_run: bool) -> ReconcileStats:
+    """Delete rep vectors whose tag no longer exists"""
+    stats = ReconcileStats()
+    tag_ids = {
+        str(tag_id)
+        for tag_id in Tag.objects.filter(user_id=user_id).values_list("tag_id", flat=True)
+    }
+    orphans = []
+
+    for point in iter_points(
+        client, REPVEC_COLLECTION_NAME, _user_filter(user_id), batch_size, with_payload=["tag_id"]
+    ):
+        stats.rep_vectors += 1
+        if (point.payload or {}).get("tag_id") in tag_ids:
+            continue
+
+        stats.orphan_rep_vectors += 1
+        orphans.append(str(point.id))
+        if len(orphans) >= batch_size:
+            _delete_points(REPVEC_COLLECTION_NAME, orphans, dry_run)
+            orphans = []
+
+    _delete_points(REPVEC_COLLECTION_NAME, orphans, dry_run)
+    return stats
+
+
+def reconcile_unowned_points(client, batch_size: int, dry_run: bool) -> ReconcileStats:
+    """Delete points that have no user_id payload at all"""
+    stats = ReconcileStats()
+    no_user = models.Filter(
+        must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="user_id"))]
+    )
+
+    for collection in (IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME):
+        orphans = []
+        for point in iter_points(client, collection, no_user, batch_size):
+            if collection == IMAGE_COLLECTION_NAME:
+                stats.points += 1
+                stats.orphan_points += 1
+            else:
+                stats.rep_vectors += 1
+                stats.orphan_rep_vectors += 1
+            orphans.append(str(point.id))
+            if len(orphans) >= batch_size:
+                _delete_points(collection, orphans, dry_run)
+                orphans = []
+        _delete_points(collection, orphans, dry_run)
+
+    return stats
+
+
+def user_ids_to_reconcile(client) -> list[int]:
+    """Users with MySQL rows or with points in Qdrant"""
+    user_ids = set(User.objects.values_list("id", flat=True))
+    for collection in (IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME):
+        facet = client.facet(
+            collection_name=collection, key="user_id", limit=USER_FACET_LIMIT, exact=True
+        )
+        user_ids.update(hit.value for hit in facet.hits)
+    return sorted(user_ids)
+
+
+def reconcile_user(client, user_id: int, batch_size: int, dry_run: bool) -> ReconcileStats:
+    stats = reconcile_photos(client, user_id, batch_size, dry_run)
+    stats.add(reconcile_rep_vectors(client, user_id, batch_size, dry_run))
+    return stats
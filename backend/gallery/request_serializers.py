@@ -31,3 +31,16 @@ class ReqPhotoListSerializer(serializers.Serializer):
 
 class ReqPhotoBulkDeleteSerializer(serializers.Serializer):
     photos = ReqPhotoIdSerializer(many=True, help_text="삭제할 사진 ID 목록")
+
+
+class ReqBulkPhotoTagsSerializer(serializers.Serializer):
+    photos = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        help_text="태그를 추가할 사진들의 고유 ID 리스트",
+    )
+    tags = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        help_text="추가할 태그들의 고유 ID 리스트",
+    )
@@ -0,0 +1,101 @@
+"""
+Per-user pool of pre-generated story items.
+
+Each user has a Redis list ``story_pool:{user_id}`` of JSON story items
+({"photo_id", "photo_path_id", "tags"}). StoryView pops the items it needs
+from the head of the list with a single LPOP, and generate_stories_task
+appends freshly generated items to the tail. Whenever the pool drops below
+STORY_POOL_SETTINGS["LOW_WATER_MARK"], one refill task is scheduled to top it
+back up to POOL_SIZE; a short-lived lock key keeps concurrent requests from
+scheduling more than one refill per user.
+"""
+
+import json
+
+from django.conf import settings
+
+
+def _pool_settings():
+    return settings.STORY_POOL_SETTINGS
+
+
+def pool_key(user_id: int) -> str:
+    return f"story_pool:{user_id}"
+
+
+def refill_lock_key(user_id: int) -> str:
+    return f"story_pool_lock:{user_id}"
+
+
+def exhausted_key(user_id: int) -> str:
+    return f"story_pool_exhausted:{user_id}"
+
+
+def pop_stories(r, user_id: int, count: int) -> list[dict]:
+    """Pop up to count story items from the head of the pool"""
+    items = r.lpop(pool_key(user_id), count)
+    if not items:
+        return []
+    return [json.loads(item) for item in items]
+
+
+def push_stories(r, user_id: int, stories: list[dict]):
+    """Append story items to the tail of the pool"""
+    if not stories:
+        return
+    key = pool_key(user_id)
+    pipe = r.pipeline()
+    pipe.rpush(key, *[json.dumps(story) for story in stories])
+    pipe.expire(key, _pool_settings().get("POOL_TTL", 86400))
+    pipe.execute()
+
+
+def pooled_photo_ids(r, user_id: int) -> set[str]:
+    """photo_ids currently waiting in the pool (to avoid duplicates on refill)"""
+    return {json.loads(item)["photo_id"] for item in r.lrange(pool_key(user_id), 0, -1)}
+
+
+def acquire_refill(r, user_id: int) -> int:
+    """
+    Decide whether the pool needs a refill and take the refill lock.
+
+    Returns:
+        Number of stories the refill should generate, 0 when the pool is
+        above the low-water mark, a refill is already running, or the user
+        has no more photos to generate stories from.
+    """
+    pool_settings = _pool_settings()
+    pool_size = pool_settings.get("POOL_SIZE", 200)
+    low_water_mark = pool_settings.get("LOW_WATER_MARK", 100)
+
+    current = r.llen(pool_key(user_id))
+    if current >= low_water_mark or r.exists(exhausted_key(user_id)):
+        return 0
+
+    locked = r.set(
+        refill_lock_key(user_id),
+        1,
+        nx=True,
+        ex=pool_settings.get("REFILL_LOCK_TIMEOUT", 300),
+    )
+    if not locked:
+        return 0
+
+    return pool_size - current
+
+
+def release_refill(r, user_id: int, exhausted: bool = False):
+    """
+    Release the refill lock.
+
+    Args:
+        exhausted: The refill found no photos; skip refills for
+            EXHAUSTED_TTL seconds so empty libraries don't spawn a task per request
+    """
+    if exhausted:
+        r.set(exhausted_key(user_id), 1, ex=_pool_settings().get("EXHAUSTED_TTL", 60))
+    r.delete(refill_lock_key(user_id))
+
+
+def is_exhausted(r, user_id: int) -> bool:
+    return bool(r.exists(exhausted_key(user_id)))
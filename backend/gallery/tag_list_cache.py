@@ -0,0 +1,46 @@
+"""
+Per-user cache of the tag list shown on the home screen (TagView.get).
+
+The serialized response is stored in Redis under ``tag_list:{user_id}`` so
+every API worker sees the same entry and the same invalidation. Anything that
+changes a user's tags, their names, or which photos they hold calls
+invalidate_tag_list; the next TagView.get rebuilds the entry from the
+materialized Tag.photo_count / Tag.thumbnail_path_id columns. Redis errors
+only cost the cache: readers fall back to the database.
+"""
+
+import json
+
+import redis
+from django.conf import settings
+
+from config.redis import get_redis
+
+
+def cache_key(user_id: int) -> str:
+    return f"tag_list:{user_id}"
+
+
+def get_tag_list(user_id: int):
+    """Returns the cached response data, or None on a miss"""
+    try:
+        cached = get_redis().get(cache_key(user_id))
+    except redis.RedisError as e:
+        print(f"[WARN] Tag list cache read failed for user {user_id}: {e}")
+        return None
+    return json.loads(cached) if cached else None
+
+
+def set_tag_list(user_id: int, data):
+    ttl = settings.PHOTO_TAG_SETTINGS.get("TAG_LIST_CACHE_TTL", 3600)
+    try:
+        get_redis().set(cache_key(user_id), json.dumps(data), ex=ttl)
+    except redis.RedisError as e:
+        print(f"[WARN] Tag list cache write failed for user {user_id}: {e}")
+
+
+def invalidate_tag_list(user_id: int):
+    try:
+        get_redis().delete(cache_key(user_id))
+    except redis.RedisError as e:
+        print(f"[WARN] Tag list cache invalidation failed for user {user_id}: {e}")
@@ -7,30 +7,53 @@ and other CPU-bound tasks that don't require GPU acceleration.
 For GPU-dependent tasks (image processing, embeddings), see gpu_tasks.py
 """
 
+import heapq
+import random
+import threading
 import uuid
 import networkx as nx
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
+from datetime import timedelta
 from celery import shared_task
 from qdrant_client import models
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from .qdrant_utils import (
     get_qdrant_client,
     IMAGE_COLLECTION_NAME,
     REPVEC_COLLECTION_NAME,
-    TAG_PRESET_COLLECTION_NAME,
 )
 from .models import User, Photo_Caption, Photo_Tag, Tag, Photo
 from search.embedding_service import create_query_embedding
+from search.filters import SearchFilters, user_filter as search_user_filter
 
 
 import numpy as np
-import hdbscan
 
 from .gpu_tasks import phrase_to_words
+from . import story_pool
+from .caption_graph import get_caption_graph
+from .graph_recommend import graph_scores
+from .preset_index import get_preset_index
+from .tag_list_cache import invalidate_tag_list
+from .storage_service import delete_photo
+from . import outbox
+from .clustering import (
+    get_clustering_backend,
+    compute_representatives,
+    cap_representatives,
+)
 
 SEARCH_SETTINGS = settings.HYBRID_SEARCH_SETTINGS
 
+SEARCH_FALLBACK_WORKERS = 10
+_search_executor = None
+_search_executor_lock = threading.Lock()
+
 
 def recommend_photo_from_tag(user: User, tag_id: uuid.UUID):
     LIMIT = 40
@@ -58,18 +81,23 @@ def recommend_photo_from_tag(user: User, tag_id: uuid.UUID):
         ]
     )
 
+    # Photos already in the tag are excluded inside Qdrant (no over-fetch)
+    user_filter.must_not = [models.HasIdCondition(has_id=list(tagged_photo_ids))]
+
     # Use all photos in the tag as positive examples instead of rep vectors
     points = client.recommend(
         collection_name=IMAGE_COLLECTION_NAME,
         positive=list(tagged_photo_ids),
         query_filter=user_filter,
-        limit=2 * LIMIT,
+        limit=LIMIT,
         with_payload=False,
     )
 
+    ranked_ids = _fuse_graph_recommendations(user, tagged_photo_ids, points, LIMIT)
+
     # Fetch photo_path_id from Photo model instead of Qdrant
-    photo_uuids = list(map(uuid.UUID, (point.id for point in points)))
-    photos = Photo.objects.filter(photo_id__in=photo_uuids)
+    photo_uuids = list(map(uuid.UUID, ranked_ids))
+    photos = Photo.objects.filter(user=user, photo_id__in=photo_uuids)
     id_to_meta = {
         str(p.photo_id): {"photo_path_id": p.photo_path_id, "created_at": p.created_at}
         for p in photos
@@ -78,13 +106,59 @@ def recommend_photo_from_tag(user: User, tag_id: uuid.UUID):
     # Maintain order from sorted scores
     return [
         {
-            "photo_id": point.id,
-            "photo_path_id": id_to_meta[point.id]["photo_path_id"],
-            "created_at": id_to_meta[point.id]["created_at"],
+            "photo_id": photo_id,
+            "photo_path_id": id_to_meta[photo_id]["photo_path_id"],
+            "created_at": id_to_meta[photo_id]["created_at"],
         }
-        for point in points
-        if point.id in id_to_meta and point.id not in tagged_photo_ids
-    ][:LIMIT]
+        for photo_id in ranked_ids
+        if photo_id in id_to_meta and photo_id not in tagged_photo_ids
+    ]
+
+
+def _fuse_graph_recommendations(user, tagged_photo_ids, points, limit):
+    """
+    Blend Qdrant recommend results with photo–caption graph scores.
+
+    The graph score (RWR + Adamic/Adar in [0, 1], see graph_recommend.py)
+    gets GRAPH_RECOMMENDATION_SETTINGS["FUSION_WEIGHT"], the cosine score the
+    rest. The graph's own top candidates join the vector results, so photos
+    that share captions with the tag but sit just outside Qdrant's top-k can
+    still surface; their cosine score is bounded by the lowest returned one.
+
+    Returns:
+        Photo ids (str) in ranked order
+    """
+    vector_ids = [point.id for point in points]
+
+    graph_settings = settings.GRAPH_RECOMMENDATION_SETTINGS
+    weight = graph_settings.get("FUSION_WEIGHT", 0.0)
+    if weight <= 0:
+        return vector_ids
+
+    scores = graph_scores(
+        get_caption_graph(user.id),
+        [uuid.UUID(photo_id) for photo_id in tagged_photo_ids],
+        alpha=graph_settings.get("ALPHA", 0.6),
+        damping=graph_settings.get("DAMPING", 0.85),
+        max_iter=graph_settings.get("MAX_ITER", 100),
+        tol=graph_settings.get("TOL", 1e-6),
+    )
+    if not scores:
+        return vector_ids
+
+    scores = {str(photo_id): score for photo_id, score in scores.items()}
+    vector_scores = {point.id: point.score for point in points}
+    floor = min(vector_scores.values(), default=0.0)
+
+    for photo_id in heapq.nlargest(limit, scores, key=scores.get):
+        vector_scores.setdefault(photo_id, floor)
+
+    combined = {
+        photo_id: (1 - weight) * vector_score + weight * scores.get(photo_id, 0.0)
+        for photo_id, vector_score in vector_scores.items()
+    }
+
+    return sorted(combined, key=combined.get, reverse=True)[:limit]
 
 
 def recommend_photo_from_photo(user: User, photos: list[uuid.UUID]):
@@ -167,46 +241,86 @@ def tag_recommendation(user, photo_id):
 
     image_vector = retrieved_points[0].vector
 
-    # Search preset tags (no user filter - shared across all users)
-    preset_results = client.search(
-        collection_name=TAG_PRESET_COLLECTION_NAME,
+    # Search preset tags in memory (no user filter - shared across all users)
+    preset_names = [
+        name
+        for name, _ in get_preset_index().search(
+            image_vector, PRESET_LIMIT, PRESET_THRESHOLD
+        )
+    ]
+
+    # Search user's tags (with user filter)
+    user_filter = _user_filter(user.id)
+
+    user_results = client.search(
+        collection_name=REPVEC_COLLECTION_NAME,
         query_vector=image_vector,
-        limit=PRESET_LIMIT,
+        query_filter=user_filter,
+        limit=USER_LIMIT,
         with_payload=True,
-        score_threshold=PRESET_THRESHOLD,
+        score_threshold=USER_THRESHOLD,
     )
 
-    # Search user's tags (with user filter)
-    user_filter = models.Filter(
+    user_tag_names, user_tag_names_by_id = _lookup_user_tags(
+        user, preset_names, user_results
+    )
+
+    return _build_tag_recommendations(
+        preset_names, user_results, user_tag_names, user_tag_names_by_id
+    )
+
+
+def _user_filter(user_id: int) -> models.Filter:
+    return models.Filter(
         must=[
             models.FieldCondition(
                 key="user_id",
-                match=models.MatchValue(value=user.id),
+                match=models.MatchValue(value=user_id),
             )
         ]
     )
 
-    user_results = client.search(
-        collection_name=REPVEC_COLLECTION_NAME,
-        query_vector=image_vector,
-        query_filter=user_filter,
-        limit=USER_LIMIT,
-        with_payload=True,
-        score_threshold=USER_THRESHOLD,
+
+def _lookup_user_tags(user: User, preset_names, user_results):
+    """
+    Fetch the user's tags needed to assemble tag recommendations in one query.
+
+    Returns:
+        (names of the user's tags matching preset names,
+         {tag_id: name} of the user's tags found in the repvec results)
+    """
+    preset_names = set(preset_names)
+    repvec_tag_ids = {result.payload["tag_id"] for result in user_results}
+
+    if not preset_names and not repvec_tag_ids:
+        return set(), {}
+
+    rows = list(
+        Tag.objects.filter(user=user)
+        .filter(Q(tag__in=preset_names) | Q(tag_id__in=repvec_tag_ids))
+        .values_list("tag_id", "tag")
     )
 
+    user_tag_names = {name for _, name in rows if name in preset_names}
+    user_tag_names_by_id = {str(tag_id): name for tag_id, name in rows}
+
+    return user_tag_names, user_tag_names_by_id
+
+
+def _build_tag_recommendations(
+    preset_names, user_results, user_tag_names, user_tag_names_by_id
+):
     # Combine all results (preset and user tags)
     # Frontend will select top preset and top user tag separately using is_preset field
     recommendations = []
     existing_tag_names = set()
 
     # Add preset tags (ordered by similarity within preset collection)
-    for result in preset_results:
-        tag_name = result.payload['name']
+    for tag_name in preset_names:
         if tag_name in existing_tag_names:
             continue
-        # Check if user has this tag in database
-        if Tag.objects.filter(tag=tag_name, user=user).exists():
+        # Skip presets the user already has as a tag
+        if tag_name in user_tag_names:
             continue
         recommendations.append({
             'tag': tag_name,
@@ -217,25 +331,155 @@ def tag_recommendation(user, photo_id):
 
     # Add user tags (ordered by similarity within repvec collection)
     for result in user_results:
-        try:
-            tag = Tag.objects.get(tag_id=result.payload['tag_id'])
-            if tag.tag in existing_tag_names:
-                continue
-            recommendations.append({
-                'tag': tag.tag,
-                'tag_id': str(tag.tag_id),
-                'is_preset': False
-            })
-            existing_tag_names.add(tag.tag)
-        except Tag.DoesNotExist:
+        tag_id = result.payload['tag_id']
+        tag_name = user_tag_names_by_id.get(tag_id)
+        if tag_name is None or tag_name in existing_tag_names:
             continue
+        recommendations.append({
+            'tag': tag_name,
+            'tag_id': tag_id,
+            'is_preset': False
+        })
+        existing_tag_names.add(tag_name)
+
+    return recommendations
+
+
+def tag_recommendation_many(user: User, photo_ids: list[str]) -> dict[str, list]:
+    """
+    Recommend tags for several photos at once.
+
+    Returns the same per-photo list as tag_recommendation, keyed by photo id,
+    using one retrieve, one in-memory preset search, one repvec search_batch
+    and one Tag query regardless of the number of photos. Photos without a vector (not
+    embedded yet) get an empty list.
+    """
+    tag_settings = settings.TAG_RECOMMENDATION_SETTINGS
+    PRESET_LIMIT = tag_settings.get("PRESET_TAG_LIMIT", 10)
+    USER_LIMIT = tag_settings.get("USER_TAG_LIMIT", 10)
+    PRESET_THRESHOLD = tag_settings.get("PRESET_TAG_SCORE_THRESHOLD", 0.35)
+    USER_THRESHOLD = tag_settings.get("USER_TAG_SCORE_THRESHOLD", 0.75)
+
+    photo_ids = [str(photo_id) for photo_id in photo_ids]
+    if not photo_ids:
+        return {}
+
+    client = get_qdrant_client()
+
+    retrieved_points = client.retrieve(
+        collection_name=IMAGE_COLLECTION_NAME,
+        ids=photo_ids,
+        with_vectors=True,
+    )
+    photo_vectors = {
+        str(point.id): point.vector for point in retrieved_points if point.vector
+    }
+    embedded_ids = [photo_id for photo_id in photo_ids if photo_id in photo_vectors]
+
+    recommendations = {photo_id: [] for photo_id in photo_ids}
+    if not embedded_ids:
+        return recommendations
+
+    preset_batch = [
+        [name for name, _ in results]
+        for results in get_preset_index().search_batch(
+            [photo_vectors[photo_id] for photo_id in embedded_ids],
+            PRESET_LIMIT,
+            PRESET_THRESHOLD,
+        )
+    ]
+
+    user_filter = _user_filter(user.id)
+    user_batch = client.search_batch(
+        collection_name=REPVEC_COLLECTION_NAME,
+        requests=[
+            models.SearchRequest(
+                vector=photo_vectors[photo_id],
+                filter=user_filter,
+                limit=USER_LIMIT,
+                with_payload=True,
+                score_threshold=USER_THRESHOLD,
+            )
+            for photo_id in embedded_ids
+        ],
+    )
+
+    user_tag_names, user_tag_names_by_id = _lookup_user_tags(
+        user,
+        [name for names in preset_batch for name in names],
+        [result for results in user_batch for result in results],
+    )
+
+    for photo_id, preset_names, user_results in zip(
+        embedded_ids, preset_batch, user_batch
+    ):
+        recommendations[photo_id] = _build_tag_recommendations(
+            preset_names, user_results, user_tag_names, user_tag_names_by_id
+        )
 
     return recommendations
 
 
+def _get_search_executor() -> ThreadPoolExecutor:
+    # 프로세스당 하나의 검색용 스레드 풀 (search_batch 실패 시 fallback 전용)
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=SEARCH_FALLBACK_WORKERS,
+                    thread_name_prefix="tag-search",
+                )
+    return _search_executor
+
+
+def _search_user_tags_per_photo(
+    photo_vectors, user_filter, limit, score_threshold, tag_ids_of
+):
+    """
+    search_batch를 사용할 수 없을 때 사진별 검색을 공용 스레드 풀에서 병렬 실행
+
+    각 검색은 get_qdrant_client()의 클라이언트 풀에서 클라이언트를 받아
+    스레드들이 하나의 연결에 몰리지 않도록 한다.
+
+    Returns:
+        {photo_id: [tag_id, ...], ...}
+    """
+
+    def search_tags_for_photo(image_vector):
+        return get_qdrant_client().search(
+            collection_name=REPVEC_COLLECTION_NAME,
+            query_vector=image_vector,
+            query_filter=user_filter,
+            limit=limit,
+            with_payload=True,
+            score_threshold=score_threshold,
+        )
+
+    executor = _get_search_executor()
+    futures = {
+        executor.submit(search_tags_for_photo, vector): photo_id
+        for photo_id, vector in photo_vectors.items()
+    }
+
+    tag_results = {}
+    for future in as_completed(futures):
+        photo_id = futures[future]
+        try:
+            tag_results[photo_id] = tag_ids_of(future.result())
+        except Exception as e:
+            print(f"[ERROR] Search failed for photo {photo_id}: {e}")
+            tag_results[photo_id] = []
+
+    return tag_results
+
+
 def tag_recommendation_batch(user: User, photo_ids: list[str]) -> dict[str, list]:
     """
-    여러 사진의 태그 추천을 배치로 처리 (병렬 최적화)
+    여러 사진의 태그 추천을 배치로 처리
+
+    preset 태그는 메모리 인덱스에서, 사용자 태그는 Qdrant search_batch 한 번으로
+    검색하므로 사진 수와 관계없이 retrieve + search_batch 2회의 요청만 발생한다.
 
     Args:
         user: 사용자 객체
@@ -244,8 +488,6 @@ def tag_recommendation_batch(user: User, photo_ids: list[str]) -> dict[str, list
     Returns:
         {photo_id: [Tag, Tag, ...], ...}
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
     # Load settings from Django settings
     tag_settings = settings.TAG_RECOMMENDATION_SETTINGS
     PRESET_LIMIT = 2
@@ -276,67 +518,51 @@ def tag_recommendation_batch(user: User, photo_ids: list[str]) -> dict[str, list
     if not photo_vectors:
         return {}
 
-    user_filter = models.Filter(
-        must=[
-            models.FieldCondition(
-                key="user_id",
-                match=models.MatchValue(value=user.id),
-            )
-        ]
-    )
-
-    # 2. 병렬로 태그 검색 (ThreadPoolExecutor)
-    def search_tags_for_photo(photo_id, image_vector):
-        try:
-            preset_results = client.search(
-                collection_name=TAG_PRESET_COLLECTION_NAME,
-                query_vector=image_vector,
-                limit=PRESET_LIMIT,
-                with_payload=True,
-            )
-
-            preset_tags = [result.payload["name"] for result in preset_results]
+    user_filter = _user_filter(user.id)
 
-            search_results = client.search(
-                collection_name=REPVEC_COLLECTION_NAME,
-                query_vector=image_vector,
-                query_filter=user_filter,
-                limit=LIMIT,
-                with_payload=True,
-                score_threshold=USER_THRESHOLD,
-            )
-
-            tag_ids = list(
-                dict.fromkeys(result.payload["tag_id"] for result in search_results)
-            )
-
-            return photo_id, preset_tags, tag_ids
-        except Exception as e:
-            print(f"[ERROR] Search failed for photo {photo_id}: {e}")
-            return photo_id, [], []
+    # 2. preset 태그는 메모리 인덱스에서 한 번에 검색
+    batch_photo_ids = list(photo_vectors)
+    preset_batch = get_preset_index().search_batch(
+        [photo_vectors[photo_id] for photo_id in batch_photo_ids], PRESET_LIMIT
+    )
+    preset_tags_by_photo = {
+        photo_id: [name for name, _ in results]
+        for photo_id, results in zip(batch_photo_ids, preset_batch)
+    }
 
-    preset_results = {}
-    tag_results = {}
+    # 3. 사용자 태그 검색을 search_batch 한 번으로 처리
+    def tag_ids_of(search_results):
+        return list(dict.fromkeys(result.payload["tag_id"] for result in search_results))
 
-    # 최대 10개 스레드로 병렬 검색
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            executor.submit(search_tags_for_photo, photo_id, vector): photo_id
-            for photo_id, vector in photo_vectors.items()
+    try:
+        user_batch = client.search_batch(
+            collection_name=REPVEC_COLLECTION_NAME,
+            requests=[
+                models.SearchRequest(
+                    vector=photo_vectors[photo_id],
+                    filter=user_filter,
+                    limit=LIMIT,
+                    with_payload=True,
+                    score_threshold=USER_THRESHOLD,
+                )
+                for photo_id in batch_photo_ids
+            ],
+        )
+        tag_results = {
+            photo_id: tag_ids_of(search_results)
+            for photo_id, search_results in zip(batch_photo_ids, user_batch)
         }
+    except Exception as e:
+        print(f"[WARN] Batch search failed, falling back to per-photo search: {e}")
+        tag_results = _search_user_tags_per_photo(
+            photo_vectors, user_filter, LIMIT, USER_THRESHOLD, tag_ids_of
+        )
+
+    preset_results = {
+        photo_id: preset_tags_by_photo[photo_id] for photo_id in batch_photo_ids
+    }
 
-        for future in as_completed(futures):
-            try:
-                photo_id, preset_tags, tag_ids = future.result()
-                preset_results[photo_id] = preset_tags
-                tag_results[photo_id] = tag_ids
-            except Exception as e:
-                photo_id = futures[future]
-                print(f"[ERROR] Future failed for photo {photo_id}: {e}")
-                preset_results[photo_id] = []
-                tag_results[photo_id] = []
-
-    # 3. 모든 태그 ID를 한 번에 조회 (DB 최적화)
+    # 4. 모든 태그 ID를 한 번에 조회 (DB 최적화)
     all_tag_ids = set()
     for tag_ids in tag_results.values():
         all_tag_ids.update(tag_ids)
@@ -348,7 +574,7 @@ def tag_recommendation_batch(user: User, photo_ids: list[str]) -> dict[str, list
         str(tag.tag_id): tag.tag for tag in Tag.objects.filter(tag_id__in=all_tag_ids)
     }
 
-    # 4. 최종 결과 조합
+    # 5. 최종 결과 조합
     final_results = {}
     for photo_id, tag_ids in tag_results.items():
         tag_names = [
@@ -365,7 +591,8 @@ def tag_recommendation_batch(user: User, photo_ids: list[str]) -> dict[str, list
 
 def retrieve_all_rep_vectors_of_tag(user: User, tag_id: uuid.UUID):
     client = get_qdrant_client()
-    LIMIT = 32  # assert max num of rep vectors <= 32
+    # compute_and_store_rep_vectors caps rep vectors per tag at MAX_REP_VECTORS
+    LIMIT = settings.REP_VECTOR_SETTINGS.get("MAX_REP_VECTORS", 32)
 
     filters = models.Filter(
         must=[
@@ -391,23 +618,29 @@ def retrieve_all_rep_vectors_of_tag(user: User, tag_id: uuid.UUID):
 
 
 def retrieve_photo_caption_graph(user: User):
-    graph = nx.Graph()
+    """
+    사진-캡션 이분 그래프를 networkx 그래프로 반환
 
-    photo_set = set()
-    caption_set = set()
+    캐시된 희소 행렬 그래프(caption_graph.get_caption_graph)를 변환한다.
+    """
+    graph = nx.Graph()
+    caption_graph = get_caption_graph(user.id)
 
-    for photo_caption in Photo_Caption.objects.filter(user=user):
-        photo_id = photo_caption.photo.photo_id
-        if photo_id not in photo_set:
-            photo_set.add(photo_id)
-            graph.add_node(photo_id, bipartite=0)
+    photo_set = set(caption_graph.photo_ids)
+    caption_set = set(caption_graph.caption_ids)
 
-        caption_id = photo_caption.caption.caption_id
-        if caption_id not in caption_set:
-            caption_set.add(caption_id)
-            graph.add_node(caption_id, bipartite=1)
+    graph.add_nodes_from(caption_graph.photo_ids, bipartite=0)
+    graph.add_nodes_from(caption_graph.caption_ids, bipartite=1)
 
-        graph.add_edge(photo_id, caption_id, weight=photo_caption.weight)
+    coo = caption_graph.matrix.tocoo()
+    graph.add_weighted_edges_from(
+        (
+            caption_graph.photo_ids[row],
+            caption_graph.caption_ids[col],
+            int(weight),
+        )
+        for row, col, weight in zip(coo.row, coo.col, coo.data)
+    )
 
     return photo_set, caption_set, graph
 
@@ -422,20 +655,16 @@ def execute_hybrid_search(
     offset: int = SEARCH_SETTINGS.get("SEARCH_DEFAULT_OFFSET", 0),
     limit: int = SEARCH_SETTINGS.get("SEARCH_PAGE_SIZE", 30),
     score_threshold: float = SEARCH_SETTINGS.get("SEARCH_SCORE_THRESHOLD", 0.2),
+    filters: SearchFilters | None = None,
 ):
     client = get_qdrant_client()
     phase_1_scores = {}
     phase_2_scores = {}
+    filters = filters or SearchFilters()
 
     # Qdrant 검색 시 다른 유저의 데이터를 침범하지 않도록 필터를 생성합니다.
-    user_filter = models.Filter(
-        must=[
-            models.FieldCondition(
-                key="user_id",
-                match=models.MatchValue(value=user.id),
-            )
-        ]
-    )
+    # 기간 / 위치 필터도 함께 넣어 인덱스에서 후보를 거릅니다.
+    user_filter = search_user_filter(user.id, filters)
 
     if tag_ids:
         # 각 태그별 점수를 별도로 저장
@@ -444,9 +673,9 @@ def execute_hybrid_search(
         for tag_id in tag_ids:
             # 1.1: 이 태그에 직접 속한 사진 ID 조회
             tag_photo_uuids = set(
-                Photo_Tag.objects.filter(user=user, tag__tag_id=tag_id).values_list(
-                    "photo__photo_id", flat=True
-                )
+                filters.filter_photos(
+                    Photo_Tag.objects.filter(user=user, tag__tag_id=tag_id), prefix="photo__"
+                ).values_list("photo__photo_id", flat=True)
             )
 
             tag_photo_ids_str = {str(pid) for pid in tag_photo_uuids}
@@ -590,10 +819,315 @@ def is_valid_uuid(uuid_to_test):
     return True
 
 
+def update_photo_tag_state(photo_ids):
+    """
+    태그 추가/삭제 후 사진의 tag_count, is_tagged를 갱신하고 Qdrant payload에 반영
+
+    DB 갱신과 같은 트랜잭션에서 isTagged set_payload를 outbox에 기록하므로,
+    커밋된 태그 상태는 drain이 실패해도 재시도로 결국 Qdrant에 반영된다.
+
+    Args:
+        photo_ids: 태그 상태가 바뀐 사진 ID 리스트
+    """
+    photo_ids = [str(photo_id) for photo_id in photo_ids]
+    if not photo_ids:
+        return
+
+    with transaction.atomic():
+        Photo.refresh_tag_state(photo_ids)
+        enqueue_tag_state(photo_ids)
+    outbox.schedule_drain()
+
+
+def enqueue_tag_state(photo_ids):
+    """
+    DB의 is_tagged 값을 이미지 컬렉션의 isTagged payload로 복사하도록 outbox에 기록
+
+    아직 임베딩되지 않은 사진은 outbox 반영 시 조용히 건너뛰고, 임베딩될 때
+    현재 is_tagged 값으로 저장된다.
+
+    Returns:
+        기록한 사진 수
+    """
+    ids_by_state = defaultdict(list)
+    for photo_id, is_tagged in Photo.objects.filter(photo_id__in=photo_ids).values_list(
+        "photo_id", "is_tagged"
+    ):
+        ids_by_state[is_tagged].append(str(photo_id))
+
+    for is_tagged, ids in ids_by_state.items():
+        outbox.enqueue_set_payload(IMAGE_COLLECTION_NAME, {"isTagged": is_tagged}, ids)
+    return sum(len(ids) for ids in ids_by_state.values())
+
+
+def update_tag_summary(user_id: int, tag_ids):
+    """
+    태그의 사진이 바뀐 뒤 Tag.photo_count, thumbnail_path_id를 갱신하고
+    태그 목록 캐시를 무효화
+
+    Args:
+        tag_ids: 사진이 추가/삭제된 태그 ID 리스트 (이름 변경, 생성, 삭제만 있으면 빈 리스트)
+    """
+    tag_ids = [str(tag_id) for tag_id in tag_ids]
+    if tag_ids:
+        Tag.refresh_summary(tag_ids)
+    invalidate_tag_list(user_id)
+
+
+def soft_delete_photos(user_id: int, photo_ids) -> int:
+    """
+    사진을 삭제 표시하고 실제 삭제는 purge_deleted_photos에 맡김
+
+    삭제 표시된 사진은 Photo.objects에서 바로 제외되므로 요청은 즉시 반환할 수 있다.
+    purge가 실패하거나 메시지가 유실되면 sweep_deleted_photos가 다시 purge한다.
+
+    Returns:
+        삭제 표시된 사진 수
+    """
+    photo_ids = [str(photo_id) for photo_id in photo_ids]
+    marked = Photo.objects.filter(photo_id__in=photo_ids, user_id=user_id).update(
+        is_deleted=True, deleted_at=timezone.now()
+    )
+    if marked:
+        purge_deleted_photos.delay(user_id, photo_ids)
+    return marked
+
+
+def purge_reuploaded_photos(user_id: int, photo_path_ids) -> int:
+    """
+    다시 업로드되는 사진의 삭제 표시된 행만 바로 삭제
+
+    삭제 표시된 행도 (user, photo_path_id) unique 제약을 차지하므로, purge 전에
+    같은 사진을 다시 올리면 새 행을 만들 수 없다. 요청 안에서는 행 삭제와
+    Qdrant 삭제의 outbox 기록만 하고, 업로드 파일 / 태그 요약 / 대표 벡터 정리는
+    cleanup_purged_photos에 맡긴다.
+
+    Returns:
+        삭제한 사진 수
+    """
+    with transaction.atomic():
+        photo_ids = [
+            str(photo_id)
+            for photo_id in Photo.all_objects.filter(
+                user_id=user_id, photo_path_id__in=photo_path_ids, is_deleted=True
+            ).values_list("photo_id", flat=True)
+        ]
+        photo_ids, tag_ids = _delete_marked_photos(user_id, photo_ids)
+
+    if photo_ids:
+        outbox.schedule_drain()
+        cleanup_purged_photos.delay(user_id, photo_ids, [str(tag_id) for tag_id in tag_ids])
+    return len(photo_ids)
+
+
+def _delete_marked_photos(user_id: int, photo_ids) -> tuple[list[str], set]:
+    """
+    삭제 표시된 사진 행을 지우고 Qdrant 삭제를 outbox에 기록 (호출자의 트랜잭션 안에서)
+
+    Returns:
+        (지운 사진 ID 리스트, 지운 사진이 속해 있던 태그 ID 집합)
+    """
+    marked = {
+        str(photo_id)
+        for photo_id in Photo.all_objects.filter(
+            photo_id__in=photo_ids, user_id=user_id, is_deleted=True
+        ).values_list("photo_id", flat=True)
+    }
+    photo_ids = [photo_id for photo_id in photo_ids if photo_id in marked]
+    if not photo_ids:
+        return [], set()
+
+    tag_ids = set(
+        Photo_Tag.objects.filter(photo_id__in=photo_ids)
+        .values_list("tag_id", flat=True)
+        .distinct()
+    )
+    outbox.enqueue_delete(IMAGE_COLLECTION_NAME, photo_ids)
+    Photo.all_objects.filter(photo_id__in=photo_ids).delete()
+    return photo_ids, tag_ids
+
+
+def _delete_stored_files(photo_ids):
+    # 아직 임베딩되지 않은 사진의 업로드 파일 (GPU 태스크가 지웠으면 없음)
+    for photo_id in photo_ids:
+        try:
+            delete_photo(photo_id)
+        except Exception as e:
+            print(f"[WARN] Failed to delete stored file of photo {photo_id}: {e}")
+
+
+def _refresh_purged_tags(user_id: int, tag_ids):
+    # 사진이 빠진 태그의 요약 갱신, 대표 벡터 재계산은 태그마다 한 번만 예약
+    update_tag_summary(user_id, tag_ids)
+    for tag_id in tag_ids:
+        compute_and_store_rep_vectors.delay(user_id, str(tag_id))
+
+
+@shared_task(
+    queue='interactive',
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=settings.PHOTO_DELETE_SETTINGS.get("MAX_RETRIES", 5),
+)
+def purge_deleted_photos(user_id: int, photo_ids: list[str]):
+    """
+    삭제 표시된 사진을 청크 단위로 실제 삭제
+
+    Queue: interactive (CPU-only task)
+
+    청크마다 한 트랜잭션에서 MySQL 행(Photo_Tag, Photo_Caption cascade)을 지우고
+    Qdrant 삭제를 outbox에 기록한다. 모든 청크를 지운 뒤 drain_vector_outbox를
+    한 번 예약해 청크별 삭제를 한 번의 bulk 요청으로 반영한다.
+    대표 벡터 재계산은 영향받은 태그마다 마지막에 한 번만 예약한다.
+
+    삭제 표시된 사진만 지우므로 여러 번 실행해도 안전하다. 실패하면 backoff로
+    재시도하고, 재시도도 모두 실패하면 sweep_deleted_photos가 다시 실행한다.
+
+    Args:
+        user_id: User ID
+        photo_ids: 삭제 표시된 사진 ID 리스트
+    """
+    chunk_size = settings.PHOTO_DELETE_SETTINGS.get("CHUNK_SIZE", 500)
+    affected_tag_ids = set()
+
+    for start in range(0, len(photo_ids), chunk_size):
+        with transaction.atomic():
+            chunk, tag_ids = _delete_marked_photos(
+                user_id, photo_ids[start : start + chunk_size]
+            )
+        affected_tag_ids.update(tag_ids)
+        _delete_stored_files(chunk)
+
+    outbox.schedule_drain()
+    _refresh_purged_tags(user_id, affected_tag_ids)
+
+
+@shared_task(
+    queue='interactive',
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=settings.PHOTO_DELETE_SETTINGS.get("MAX_RETRIES", 5),
+)
+def cleanup_purged_photos(user_id: int, photo_ids: list[str], tag_ids: list[str]):
+    """
+    행이 이미 삭제된 사진의 나머지 정리 (purge_reuploaded_photos가 예약)
+
+    Queue: interactive (CPU-only task)
+
+    업로드 파일을 지우고 사진이 빠진 태그의 요약 갱신, 대표 벡터 재계산을 한다.
+    모두 여러 번 실행해도 안전하므로 실패하면 backoff로 재시도한다.
+
+    Args:
+        user_id: User ID
+        photo_ids: 삭제된 사진 ID 리스트
+        tag_ids: 삭제된 사진이 속해 있던 태그 ID 리스트
+    """
+    _delete_stored_files(photo_ids)
+    _refresh_purged_tags(user_id, tag_ids)
+
+
+@shared_task(queue='interactive')
+def sweep_deleted_photos():
+    """
+    유예 시간(SWEEP_GRACE_PERIOD)이 지나도 남아 있는 삭제 표시 사진을 다시 purge
+
+    Queue: interactive (CPU-only task)
+
+    purge_deleted_photos 메시지가 유실되거나 재시도가 모두 실패한 경우를 복구하기
+    위해 celery beat로 주기 실행된다. 사용자별로 purge_deleted_photos를 직접
+    실행하고, 실패한 사용자는 다음 주기에 다시 시도한다.
+
+    Returns:
+        purge를 시도한 사진 수
+    """
+    delete_settings = settings.PHOTO_DELETE_SETTINGS
+    cutoff = timezone.now() - timedelta(seconds=delete_settings.get("SWEEP_GRACE_PERIOD", 3600))
+    rows = (
+        Photo.all_objects.filter(is_deleted=True)
+        .filter(Q(deleted_at__lt=cutoff) | Q(deleted_at__isnull=True))
+        .values_list("user_id", "photo_id")[: delete_settings.get("SWEEP_BATCH_SIZE", 5000)]
+    )
+
+    photo_ids_by_user = defaultdict(list)
+    for user_id, photo_id in rows:
+        photo_ids_by_user[user_id].append(str(photo_id))
+
+    swept = 0
+    for user_id, photo_ids in photo_ids_by_user.items():
+        try:
+            purge_deleted_photos(user_id, photo_ids)
+            swept += len(photo_ids)
+        except Exception as e:
+            print(f"[WARN] Sweep failed to purge {len(photo_ids)} photos of user {user_id}: {e}")
+    return swept
+
+
+@shared_task(queue='interactive')
+def drain_vector_outbox():
+    """
+    outbox에 쌓인 Qdrant 쓰기를 컬렉션별 bulk 요청으로 반영
+
+    Queue: interactive (CPU-only task)
+
+    쓰기 직후 outbox.schedule_drain()으로 예약되고(FLUSH_DELAY 동안 모아서 한 번),
+    실패한 항목 재시도를 위해 celery beat로도 주기 실행된다. Qdrant 인덱싱은
+    기다리지 않는다(wait=False). 한 번에 하나의 drain만 실행되며(Redis 락),
+    실행 중에 쌓인 항목도 이어서 처리한다. 실패한 항목이 있으면 다음 주기로 넘긴다.
+
+    Returns:
+        반영된 항목 수
+    """
+    if not outbox.acquire_drain_lock():
+        return 0
+
+    batch_size = settings.VECTOR_OUTBOX_SETTINGS.get("DRAIN_BATCH_SIZE", 100)
+    total = 0
+    try:
+        while True:
+            entries = outbox.pending_entries()
+            if not entries:
+                break
+
+            applied = outbox.flush(entries)
+            total += applied
+            if applied < len(entries):
+                print(f"[Task Info] Outbox drain: {len(entries) - applied} entries left for retry")
+                break
+            if len(entries) < batch_size:
+                break
+    finally:
+        outbox.release_drain_lock()
+
+    return total
+
+
+def sample_untagged_photos(user: User, size: int, exclude_ids=()) -> list[Photo]:
+    """
+    태그 없는 사진을 무작위로 size개 샘플링
+
+    ORDER BY RAND() 대신 임의의 UUID를 기준점으로 잡고 (user, is_tagged, photo_id)
+    인덱스를 따라 photo_id 순으로 읽는다. photo_id가 uuid4라 연속 구간도 무작위
+    표본이 되며, 끝에 도달하면 처음부터 이어서 읽는다.
+    """
+    pivot = uuid.uuid4()
+    candidates = (
+        Photo.objects.filter(user=user, is_tagged=False)
+        .exclude(photo_id__in=exclude_ids)
+        .order_by("photo_id")
+    )
+
+    photos = list(candidates.filter(photo_id__gte=pivot)[:size])
+    if len(photos) < size:
+        photos += list(candidates.filter(photo_id__lt=pivot)[: size - len(photos)])
+
+    random.shuffle(photos)
+    return photos
+
+
 @shared_task(queue='interactive')
 def generate_stories_task(user_id: int, size: int):
     """
-    백그라운드에서 스토리 생성 및 Redis 저장 (Celery 비동기 처리)
+    백그라운드에서 스토리 생성 후 사용자 스토리 풀에 추가 (Celery 비동기 처리)
 
     Queue: interactive (fast response task)
 
@@ -601,26 +1135,25 @@ def generate_stories_task(user_id: int, size: int):
         user_id: 사용자 ID
         size: 생성할 스토리 개수
     """
-    from django.db.models import Exists, OuterRef
     from config.redis import get_redis
-    import json
 
     print(f"[Task Start] Story generation for User: {user_id}, Size: {size}")
 
+    r = get_redis()
+    exhausted = False
+
     try:
         user = User.objects.get(id=user_id)
 
+        # 이미 풀에 있는 사진은 제외
+        pooled_ids = story_pool.pooled_photo_ids(r, user_id)
+
         # 태그 없는 사진 랜덤 조회
-        has_tags = Photo_Tag.objects.filter(photo=OuterRef("pk"), user=user)
-        photos_queryset = (
-            Photo.objects.filter(user=user)
-            .exclude(Exists(has_tags))
-            .order_by("?")[:size]
-        )
+        photos = sample_untagged_photos(user, size, exclude_ids=pooled_ids)
 
-        # 배치 처리로 병렬 태그 추천
-        photo_ids = [str(photo.photo_id) for photo in photos_queryset]
-        photo_dict = {str(photo.photo_id): photo for photo in photos_queryset}
+        # 배치 처리로 태그 추천
+        photo_dict = {str(photo.photo_id): photo for photo in photos}
+        photo_ids = list(photo_dict)
 
         tag_rec_batch = tag_recommendation_batch(user, photo_ids)
 
@@ -635,9 +1168,9 @@ def generate_stories_task(user_id: int, size: int):
                 }
             )
 
-        # Redis에 저장
-        r = get_redis()
-        r.set(user_id, json.dumps(story_data))
+        # Redis 스토리 풀에 추가
+        story_pool.push_stories(r, user_id, story_data)
+        exhausted = not story_data
 
         print(
             f"[Task Success] Story generation completed for User: {user_id}, Generated: {len(story_data)} stories"
@@ -646,6 +1179,47 @@ def generate_stories_task(user_id: int, size: int):
     except Exception as e:
         print(f"[Task Exception] Story generation failed for User {user_id}: {str(e)}")
 
+    finally:
+        story_pool.release_refill(r, user_id, exhausted=exhausted)
+
+
+def _replace_rep_vectors(user_id: int, tag_id, representatives) -> int:
+    """
+    태그의 기존 rep vector 삭제와 새 rep vector upsert를 outbox에 함께 기록
+
+    두 작업은 같은 트랜잭션에 기록되고 drain에서 순서대로 반영되므로
+    삭제만 반영되고 새 벡터가 빠지는 경우가 없다.
+
+    Returns:
+        upsert할 rep vector 수
+    """
+    delete_filter = models.Filter(
+        must=[
+            models.FieldCondition(
+                key="user_id", match=models.MatchValue(value=user_id)
+            ),
+            models.FieldCondition(
+                key="tag_id", match=models.MatchValue(value=str(tag_id))
+            ),
+        ]
+    )
+    points_to_upsert = [
+        models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vec.tolist(),
+            payload={"user_id": user_id, "tag_id": str(tag_id)},
+        )
+        for vec in representatives
+    ]
+
+    with transaction.atomic():
+        outbox.enqueue_delete_by_filter(REPVEC_COLLECTION_NAME, delete_filter)
+        if points_to_upsert:
+            outbox.enqueue_upsert(REPVEC_COLLECTION_NAME, points_to_upsert)
+        outbox.schedule_drain()
+
+    return len(points_to_upsert)
+
 
 @shared_task(queue='interactive')
 def compute_and_store_rep_vectors(user_id: int, tag_id: uuid.UUID):
@@ -654,39 +1228,34 @@ def compute_and_store_rep_vectors(user_id: int, tag_id: uuid.UUID):
 
     Queue: interactive (CPU-only task)
 
+    The tag's rep vectors are replaced through the vector outbox
+    (_replace_rep_vectors), so the task doesn't wait on Qdrant writes. Image
+    vectors are read after outbox.barrier_points(), so photos embedded just
+    before the tag was attached are included; the drain lock is only taken
+    when one of the tag's photos still has a pending write, so the tasks of a
+    bulk tag don't queue on it.
+
     Args:
         user_id: User ID
         tag_id: Tag UUID
     """
     client = get_qdrant_client()
-    MIN_SAMPLES_FOR_ML = 10  # ML 모델을 돌리기 위한 최소 샘플 수
-    MIN_CLUSTER_SIZE = 5  # HDBSCAN 최소 클러스터 크기
-    MIN_SAMPLES = 3  # HDBSCAN 최소 샘플 수
+    rep_settings = settings.REP_VECTOR_SETTINGS
+    MIN_SAMPLES_FOR_ML = rep_settings.get("MIN_SAMPLES_FOR_ML", 10)  # ML 모델을 돌리기 위한 최소 샘플 수
+    MAX_REP_VECTORS = rep_settings.get("MAX_REP_VECTORS", 32)  # 태그당 최대 rep vec 수
 
     print(f"[Task Start] RepVec computation for User: {user_id}, Tag: {tag_id}")
 
     try:
-        photo_tags = Photo_Tag.objects.filter(user__id=user_id, tag__tag_id=tag_id)
-        photo_ids = [str(pt.photo.photo_id) for pt in photo_tags]
-
-        delete_filter = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="user_id", match=models.MatchValue(value=user_id)
-                ),
-                models.FieldCondition(
-                    key="tag_id", match=models.MatchValue(value=str(tag_id))
-                ),
-            ]
-        )
-        client.delete(
-            collection_name=REPVEC_COLLECTION_NAME,
-            points_selector=models.FilterSelector(filter=delete_filter),
-            wait=True,
-        )
-        print(f"[Task Info] Deleted old repvecs for Tag: {tag_id}.")
+        photo_ids = [
+            str(photo_id)
+            for photo_id in Photo_Tag.objects.filter(
+                user__id=user_id, tag__tag_id=tag_id
+            ).values_list("photo_id", flat=True)
+        ]
 
         if not photo_ids:
+            _replace_rep_vectors(user_id, tag_id, [])
             print(
                 f"[Task Info] No photos found for Tag: {
                     tag_id
@@ -694,6 +1263,7 @@ def compute_and_store_rep_vectors(user_id: int, tag_id: uuid.UUID):
             )
             return
 
+        outbox.barrier_points(client, IMAGE_COLLECTION_NAME, photo_ids)
         points = client.retrieve(
             collection_name=IMAGE_COLLECTION_NAME, ids=photo_ids, with_vectors=True
         )
@@ -701,50 +1271,34 @@ def compute_and_store_rep_vectors(user_id: int, tag_id: uuid.UUID):
         selected_vecs = np.array([point.vector for point in points if point.vector])
 
         if len(selected_vecs) == 0:
+            _replace_rep_vectors(user_id, tag_id, [])
             print(
                 f"[Task Info] No vectors found in Qdrant for Tag: {tag_id}. Skipping."
             )
             return
 
         if len(selected_vecs) < MIN_SAMPLES_FOR_ML:
-            # 사진이 적으면 모든 벡터를 rep vec로 사용
-            final_representatives = selected_vecs
+            # 사진이 적으면 모든 벡터를 rep vec로 사용 (MAX_REP_VECTORS 이내)
+            final_representatives = cap_representatives(
+                np.empty((0, selected_vecs.shape[1])), selected_vecs, MAX_REP_VECTORS
+            )
             print(f"[Task Info] Using all {len(selected_vecs)} vectors (< {MIN_SAMPLES_FOR_ML} samples).")
         else:
-            # HDBSCAN으로 자동 클러스터링 및 outlier 탐지
-            clusterer = hdbscan.HDBSCAN(
-                min_cluster_size=MIN_CLUSTER_SIZE,
-                min_samples=MIN_SAMPLES,
-                cluster_selection_epsilon=0.0,
-                metric='euclidean'
+            # 설정된 클러스터링 백엔드로 클러스터링 및 outlier 탐지
+            backend = get_clustering_backend()
+            cluster_centers, outlier_vecs = compute_representatives(
+                selected_vecs, backend
             )
-            clusterer.fit(selected_vecs)
-
-            labels = clusterer.labels_
-            n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-            n_noise = list(labels).count(-1)
-
-            print(f"[Task Info] HDBSCAN found {n_clusters} clusters and {n_noise} noise points.")
 
-            # 각 클러스터의 중심 계산
-            cluster_centers = []
-            for label in set(labels):
-                if label != -1:  # outlier 제외
-                    cluster_vecs = selected_vecs[labels == label]
-                    cluster_center = cluster_vecs.mean(axis=0)
-                    cluster_centers.append(cluster_center)
+            print(f"[Task Info] {backend.name} found {len(cluster_centers)} clusters and {len(outlier_vecs)} noise points.")
 
-            # Outlier 벡터 추출
-            outlier_vecs = selected_vecs[labels == -1]
-
-            # 최종 rep vec = 클러스터 중심 + outlier
-            final_representatives_list = []
-            if len(cluster_centers) > 0:
-                final_representatives_list.append(np.array(cluster_centers))
-            if len(outlier_vecs) > 0:
-                final_representatives_list.append(outlier_vecs)
+            # 최종 rep vec = 클러스터 중심 + outlier (MAX_REP_VECTORS 이내로 병합)
+            final_representatives = cap_representatives(
+                cluster_centers, outlier_vecs, MAX_REP_VECTORS
+            )
 
-            if not final_representatives_list:
+            if len(final_representatives) == 0:
+                _replace_rep_vectors(user_id, tag_id, [])
                 print(
                     f"[Task Info] No representative vectors generated for Tag: {
                         tag_id
@@ -752,30 +1306,14 @@ def compute_and_store_rep_vectors(user_id: int, tag_id: uuid.UUID):
                 )
                 return
 
-            final_representatives = np.vstack(final_representatives_list)
-            print(f"[Task Info] Generated {len(final_representatives)} representative vectors ({len(cluster_centers)} centers + {len(outlier_vecs)} outliers).")
+            print(f"[Task Info] Generated {len(final_representatives)} representative vectors from {len(cluster_centers)} centers + {len(outlier_vecs)} outliers (cap {MAX_REP_VECTORS}).")
 
-        points_to_upsert = []
-        for vec in final_representatives:
-            point_id = str(uuid.uuid4())
-            payload = {"user_id": user_id, "tag_id": str(tag_id)}
-            points_to_upsert.append(
-                models.PointStruct(id=point_id, vector=vec.tolist(), payload=payload)
-            )
-
-        if points_to_upsert:
-            client.upsert(
-                collection_name=REPVEC_COLLECTION_NAME,
-                points=points_to_upsert,
-                wait=True,
-            )
-            print(
-                f"[Task Success] Upserted {len(points_to_upsert)} new repvecs for Tag: {
-                    tag_id
-                }."
-            )
-        else:
-            print(f"[Task Info] No new repvecs to upsert for Tag: {tag_id}.")
+        queued = _replace_rep_vectors(user_id, tag_id, final_representatives)
+        print(
+            f"[Task Success] Queued {queued} new repvecs for Tag: {
+                tag_id
+            }."
+        )
 
     except Exception as e:
         print(f"[Task Exception] Error processing Tag {tag_id}: {str(e)}")
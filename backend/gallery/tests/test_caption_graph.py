@@ -0,0 +1,175 @@
+"""
+Tests for gallery/caption_graph.py
+
+Redis is mocked; the graph cache is the test LocMemCache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import redis
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from ..caption_graph import (
+    build_caption_graph,
+    get_caption_graph,
+    record_new_captions,
+)
+from ..models import Caption, Photo, Photo_Caption
+
+
+class CaptionGraphTestBase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.photo1 = self._create_photo(1)
+        self.photo2 = self._create_photo(2)
+        self.caption1 = Caption.objects.create(user=self.user, caption="바다")
+        self.caption2 = Caption.objects.create(user=self.user, caption="하늘")
+
+        Photo_Caption.objects.create(
+            user=self.user, photo=self.photo1, caption=self.caption1, weight=2
+        )
+        Photo_Caption.objects.create(
+            user=self.user, photo=self.photo2, caption=self.caption2, weight=1
+        )
+
+        patcher = patch("gallery.caption_graph.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.set_redis_state(version=0, log=[])
+
+    def _create_photo(self, photo_path_id):
+        return Photo.objects.create(
+            user=self.user, photo_path_id=photo_path_id, created_at=timezone.now()
+        )
+
+    def set_redis_state(self, version, log):
+        self.mock_redis.pipeline.return_value.execute.return_value = [
+            str(version),
+            len(log),
+        ]
+        self.mock_redis.lrange.side_effect = lambda key, start, end: log[start:]
+
+
+class BuildCaptionGraphTest(CaptionGraphTestBase):
+    """build_caption_graph 함수 테스트"""
+
+    def test_build_with_single_query(self):
+        """values_list 쿼리 한 번으로 그래프 생성"""
+        with self.assertNumQueries(1):
+            graph = build_caption_graph(self.user.id)
+
+        self.assertEqual(graph.matrix.shape, (2, 2))
+        row = graph.photo_index[self.photo1.photo_id]
+        col = graph.caption_index[self.caption1.caption_id]
+        self.assertEqual(graph.matrix[row, col], 2)
+
+    def test_empty_graph(self):
+        """캡션이 없는 사용자"""
+        other = User.objects.create_user(username="other", password="testpass123")
+
+        graph = build_caption_graph(other.id)
+
+        self.assertEqual(graph.n_photos, 0)
+        self.assertEqual(graph.matrix.shape, (0, 0))
+
+
+class GetCaptionGraphTest(CaptionGraphTestBase):
+    """get_caption_graph 함수 테스트"""
+
+    def test_cached_graph_is_reused(self):
+        """버전이 같으면 DB 조회 없이 캐시 사용"""
+        get_caption_graph(self.user.id)
+
+        with self.assertNumQueries(0):
+            graph = get_caption_graph(self.user.id)
+
+        self.assertEqual(graph.n_photos, 2)
+
+    def test_new_photos_are_appended_incrementally(self):
+        """새 사진의 캡션만 조회해 그래프에 추가"""
+        get_caption_graph(self.user.id)
+
+        photo3 = self._create_photo(3)
+        caption3 = Caption.objects.create(user=self.user, caption="산")
+        Photo_Caption.objects.create(
+            user=self.user, photo=photo3, caption=self.caption1, weight=1
+        )
+        Photo_Caption.objects.create(
+            user=self.user, photo=photo3, caption=caption3, weight=4
+        )
+        self.set_redis_state(version=1, log=[str(photo3.photo_id)])
+
+        with self.assertNumQueries(1):
+            graph = get_caption_graph(self.user.id)
+
+        self.assertEqual(graph.version, 1)
+        self.assertEqual(graph.matrix.shape, (3, 3))
+        row = graph.photo_index[photo3.photo_id]
+        self.assertEqual(graph.matrix[row, graph.caption_index[caption3.caption_id]], 4)
+        # 기존 간선 유지
+        row1 = graph.photo_index[self.photo1.photo_id]
+        self.assertEqual(graph.matrix[row1, graph.caption_index[self.caption1.caption_id]], 2)
+
+    def test_recaptioned_photo_triggers_rebuild(self):
+        """이미 그래프에 있는 사진이 다시 기록되면 전체 재생성"""
+        get_caption_graph(self.user.id)
+
+        Photo_Caption.objects.create(
+            user=self.user, photo=self.photo1, caption=self.caption2, weight=5
+        )
+        self.set_redis_state(version=1, log=[str(self.photo1.photo_id)])
+
+        with self.assertNumQueries(2):
+            graph = get_caption_graph(self.user.id)
+
+        self.assertEqual(graph.matrix.sum(), 8)
+
+    def test_trimmed_log_triggers_rebuild(self):
+        """로그가 버전 차이를 설명하지 못하면 전체 재생성"""
+        get_caption_graph(self.user.id)
+        self.set_redis_state(version=5, log=[])
+
+        graph = get_caption_graph(self.user.id)
+
+        self.assertEqual(graph.version, 5)
+        self.assertEqual(graph.n_photos, 2)
+
+    def test_redis_error_builds_without_cache(self):
+        """Redis 오류 시 DB에서 바로 생성"""
+        self.mock_redis.pipeline.return_value.execute.side_effect = redis.ConnectionError()
+
+        graph = get_caption_graph(self.user.id)
+
+        self.assertEqual(graph.n_photos, 2)
+        self.assertIsNone(cache.get(f"caption_graph:{self.user.id}"))
+
+
+class RecordNewCaptionsTest(TestCase):
+    """record_new_captions 함수 테스트"""
+
+    @patch("gallery.caption_graph.get_redis")
+    def test_appends_log_and_bumps_version(self, mock_get_redis):
+        pipe = MagicMock()
+        mock_get_redis.return_value.pipeline.return_value = pipe
+
+        record_new_captions(7, ["a", "b"])
+
+        pipe.rpush.assert_called_once_with("caption_graph:log:7", "a", "b")
+        pipe.incrby.assert_called_once_with("caption_graph:version:7", 2)
+        pipe.execute.assert_called_once()
+
+    @patch("gallery.caption_graph.get_redis")
+    def test_redis_error_is_ignored(self, mock_get_redis):
+        mock_get_redis.return_value.pipeline.return_value.execute.side_effect = (
+            redis.ConnectionError()
+        )
+
+        record_new_captions(7, ["a"])
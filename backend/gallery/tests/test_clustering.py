@@ -0,0 +1,256 @@
+"""
+Tests for gallery/clustering.py and the benchmark_rep_vectors command
+"""
+
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..clustering import (
+    OUTLIER_LABEL,
+    HDBSCANBackend,
+    MiniBatchKMeansBackend,
+    ReducedHDBSCANBackend,
+    cap_representatives,
+    compute_representatives,
+    get_clustering_backend,
+    normalize_vectors,
+)
+
+
+def make_clustered_vectors(n_clusters=3, per_cluster=40, dim=512, seed=0):
+    """잘 분리된 클러스터 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    centers = normalize_vectors(rng.normal(size=(n_clusters, dim)))
+    vectors = np.vstack(
+        [
+            center + 0.02 * rng.normal(size=(per_cluster, dim))
+            for center in centers
+        ]
+    )
+    return vectors, centers
+
+
+class NormalizeVectorsTest(TestCase):
+    """normalize_vectors 함수 테스트"""
+
+    def test_rows_have_unit_norm(self):
+        vectors = np.array([[3.0, 4.0], [1.0, 0.0]])
+        normalized = normalize_vectors(vectors)
+        np.testing.assert_allclose(np.linalg.norm(normalized, axis=1), [1.0, 1.0])
+
+    def test_zero_vector_is_kept(self):
+        normalized = normalize_vectors(np.zeros((1, 3)))
+        np.testing.assert_array_equal(normalized, np.zeros((1, 3)))
+
+
+class ClusteringBackendTest(TestCase):
+    """클러스터링 백엔드 테스트"""
+
+    def setUp(self):
+        self.vectors, self.centers = make_clustered_vectors()
+
+    def _assert_finds_clusters(self, backend):
+        labels = backend.fit_predict(self.vectors)
+        self.assertEqual(len(labels), len(self.vectors))
+        clusters = set(labels.tolist()) - {OUTLIER_LABEL}
+        self.assertEqual(len(clusters), 3)
+
+    def test_hdbscan_finds_clusters(self):
+        self._assert_finds_clusters(HDBSCANBackend())
+
+    def test_reduced_hdbscan_pca_finds_clusters(self):
+        self._assert_finds_clusters(ReducedHDBSCANBackend(n_components=16))
+
+    def test_reduced_hdbscan_random_projection_finds_clusters(self):
+        self._assert_finds_clusters(
+            ReducedHDBSCANBackend(n_components=32, projection="random")
+        )
+
+    def test_reduced_hdbscan_reduces_dimension(self):
+        backend = ReducedHDBSCANBackend(n_components=16)
+        self.assertEqual(backend.reduce(self.vectors).shape, (120, 16))
+
+    def test_reduced_hdbscan_caps_components_by_samples(self):
+        backend = ReducedHDBSCANBackend(n_components=64)
+        self.assertEqual(backend.reduce(self.vectors[:20]).shape, (20, 20))
+
+    def test_reduced_hdbscan_invalid_projection(self):
+        with self.assertRaises(ValueError):
+            ReducedHDBSCANBackend(projection="umap")
+
+    def test_minibatch_kmeans_finds_clusters(self):
+        self._assert_finds_clusters(MiniBatchKMeansBackend(max_clusters=3))
+
+    def test_minibatch_kmeans_marks_far_points_as_outliers(self):
+        rng = np.random.default_rng(1)
+        far_point = -self.centers[0] + 0.01 * rng.normal(size=512)
+        vectors = np.vstack([self.vectors, far_point])
+
+        labels = MiniBatchKMeansBackend(max_clusters=3).fit_predict(vectors)
+
+        self.assertEqual(labels[-1], OUTLIER_LABEL)
+
+
+class GetClusteringBackendTest(TestCase):
+    """get_clustering_backend 함수 테스트"""
+
+    @override_settings(REP_VECTOR_SETTINGS={"CLUSTERING_BACKEND": "hdbscan"})
+    def test_backend_from_settings(self):
+        self.assertIsInstance(get_clustering_backend(), HDBSCANBackend)
+        self.assertNotIsInstance(get_clustering_backend(), ReducedHDBSCANBackend)
+
+    @override_settings(
+        REP_VECTOR_SETTINGS={
+            "CLUSTERING_BACKEND": "reduced_hdbscan",
+            "REDUCED_DIM": 32,
+            "PROJECTION": "random",
+        }
+    )
+    def test_reduced_backend_options(self):
+        backend = get_clustering_backend()
+        self.assertIsInstance(backend, ReducedHDBSCANBackend)
+        self.assertEqual(backend.n_components, 32)
+        self.assertEqual(backend.projection, "random")
+
+    def test_name_overrides_settings(self):
+        self.assertIsInstance(
+            get_clustering_backend("minibatch_kmeans"), MiniBatchKMeansBackend
+        )
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_clustering_backend("spectral")
+
+
+class ComputeRepresentativesTest(TestCase):
+    """compute_representatives 함수 테스트"""
+
+    def test_centers_are_in_original_space(self):
+        vectors, centers = make_clustered_vectors()
+
+        rep_centers, outliers = compute_representatives(
+            vectors, ReducedHDBSCANBackend(n_components=16)
+        )
+
+        self.assertEqual(rep_centers.shape, (3, 512))
+        # 각 중심은 원래 클러스터 중심과 거의 같아야 함
+        similarities = normalize_vectors(rep_centers) @ centers.T
+        np.testing.assert_allclose(similarities.max(axis=1), 1.0, atol=0.01)
+        self.assertEqual(outliers.shape[1], 512)
+
+    def test_all_outliers(self):
+        vectors = np.random.default_rng(0).normal(size=(6, 8))
+
+        with patch.object(
+            HDBSCANBackend, "fit_predict", return_value=np.full(6, OUTLIER_LABEL)
+        ):
+            rep_centers, outliers = compute_representatives(vectors, HDBSCANBackend())
+
+        self.assertEqual(rep_centers.shape, (0, 8))
+        self.assertEqual(len(outliers), 6)
+
+
+class CapRepresentativesTest(TestCase):
+    """cap_representatives 함수 테스트"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.centers = normalize_vectors(self.rng.normal(size=(3, 64)))
+
+    def test_under_budget_is_unchanged(self):
+        outliers = normalize_vectors(self.rng.normal(size=(2, 64)))
+
+        reps = cap_representatives(self.centers, outliers, 32)
+
+        np.testing.assert_array_equal(reps, np.vstack([self.centers, outliers]))
+
+    def test_outliers_are_merged_to_budget(self):
+        outliers = normalize_vectors(self.rng.normal(size=(200, 64)))
+
+        reps = cap_representatives(self.centers, outliers, 10)
+
+        self.assertEqual(reps.shape, (10, 64))
+        # 클러스터 중심은 그대로 유지
+        np.testing.assert_array_equal(reps[:3], self.centers)
+
+    def test_outliers_near_centers_are_absorbed(self):
+        # 중심 근처 outlier 50개 + 멀리 떨어진 outlier 1개
+        near = self.centers[0] + 0.01 * self.rng.normal(size=(50, 64))
+        far = -self.centers[0][None, :]
+        outliers = np.vstack([near, far])
+
+        reps = cap_representatives(self.centers, outliers, 4)
+
+        self.assertEqual(len(reps), 4)
+        # 남은 한 자리는 가장 멀리 떨어진 outlier가 차지해야 함
+        similarity = normalize_vectors(reps[3:]) @ normalize_vectors(far).T
+        self.assertGreater(similarity[0, 0], 0.99)
+
+    def test_too_many_centers_are_merged(self):
+        centers = normalize_vectors(self.rng.normal(size=(40, 64)))
+        outliers = normalize_vectors(self.rng.normal(size=(5, 64)))
+
+        reps = cap_representatives(centers, outliers, 8)
+
+        self.assertEqual(reps.shape, (8, 64))
+
+    def test_only_outliers(self):
+        outliers = normalize_vectors(self.rng.normal(size=(12, 64)))
+
+        reps = cap_representatives(np.empty((0, 64)), outliers, 5)
+
+        self.assertEqual(reps.shape, (5, 64))
+
+    def test_duplicate_outliers(self):
+        """같은 벡터가 중복된 outlier도 NaN 없이 대표 벡터로 합침"""
+        base = normalize_vectors(self.rng.normal(size=(20, 8)))
+
+        reps = cap_representatives(np.empty((0, 8)), np.vstack([base, base]), 32)
+
+        self.assertFalse(np.isnan(reps).any())
+        np.testing.assert_allclose(np.sort(reps, axis=0), np.sort(base, axis=0))
+
+    def test_duplicate_outliers_of_centers(self):
+        """중심과 같은 outlier는 중심에 흡수되고 빈 대표 벡터를 만들지 않음"""
+        outliers = np.vstack([self.centers] * 3)
+
+        reps = cap_representatives(self.centers, outliers, 5)
+
+        self.assertFalse(np.isnan(reps).any())
+        np.testing.assert_array_equal(reps, self.centers)
+
+
+class BenchmarkRepVectorsCommandTest(TestCase):
+    """benchmark_rep_vectors 커맨드 테스트"""
+
+    def test_benchmark_reports_every_backend(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_rep_vectors",
+            "--tags", "2",
+            "--photos-per-tag", "60",
+            "--backends", "reduced_hdbscan,minibatch_kmeans",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("reduced_hdbscan", output)
+        self.assertIn("minibatch_kmeans", output)
+
+    def test_benchmark_unknown_backend(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_rep_vectors",
+            "--tags", "1",
+            "--photos-per-tag", "20",
+            "--backends", "spectral",
+            stdout=out,
+        )
+
+        self.assertIn("Unknown clustering backend", out.getvalue())
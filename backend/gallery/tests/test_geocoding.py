@@ -0,0 +1,203 @@
+"""
+Tests for gallery/geocoding.py and the import_regions command
+
+Redis and the Kakao API are mocked.
+"""
+
+import csv
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import redis
+import requests
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+import gallery.geocoding
+
+from ..geocoding import (
+    RegionIndex,
+    cache_key,
+    geohash,
+    get_region_index,
+    reverse_geocode,
+)
+
+# (address_name, lat, lng)
+REGIONS = [
+    ("서울특별시 중구 명동", 37.5605, 126.9860),
+    ("부산광역시 해운대구 우제2동", 35.1631, 129.1636),
+    ("제주특별자치도 제주시 일도1동", 33.5133, 126.5290),
+]
+
+
+def region_index():
+    return RegionIndex(
+        [name for name, _, _ in REGIONS], [(lat, lng) for _, lat, lng in REGIONS]
+    )
+
+
+class GeohashTest(TestCase):
+    """geohash 테스트"""
+
+    def test_known_values(self):
+        """표준 geohash 값과 일치"""
+        self.assertEqual(geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash(37.5665, 126.9780, 6), "wydm9q")
+
+    def test_nearby_coordinates_share_cache_key(self):
+        """몇 미터 떨어진 좌표는 같은 캐시 키"""
+        with self.settings(REVERSE_GEOCODING_SETTINGS={"GEOHASH_PRECISION": 6}):
+            self.assertEqual(cache_key(37.56650, 126.97800), cache_key(37.56652, 126.97803))
+            self.assertNotEqual(cache_key(37.5665, 126.9780), cache_key(35.1631, 129.1636))
+
+
+class RegionIndexTest(TestCase):
+    """RegionIndex 테스트"""
+
+    def test_nearest(self):
+        """가장 가까운 대표점과 거리(km)"""
+        name, distance = region_index().nearest(35.1587, 129.1604)
+
+        self.assertEqual(name, "부산광역시 해운대구 우제2동")
+        self.assertAlmostEqual(distance, 0.57, delta=0.05)
+
+    def test_empty(self):
+        """빈 인덱스는 None"""
+        self.assertIsNone(RegionIndex([], []).nearest(37.5, 127.0))
+
+    def test_missing_dataset(self):
+        """데이터 파일이 없으면 빈 인덱스로 Kakao만 사용"""
+        gallery.geocoding._region_index = None
+        self.addCleanup(setattr, gallery.geocoding, "_region_index", None)
+
+        with self.settings(REVERSE_GEOCODING_SETTINGS={"REGIONS_PATH": "/nonexistent/regions.csv"}):
+            self.assertEqual(len(get_region_index()), 0)
+
+
+class ReverseGeocodeTest(TestCase):
+    """reverse_geocode 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.geocoding.get_region_index", return_value=region_index())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.geocoding.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.mock_redis.get.return_value = None
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.geocoding.requests.get")
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _kakao(self, address_name):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"documents": [{"address_name": address_name}]}
+        self.mock_get.return_value = response
+
+    def test_local_region(self):
+        """데이터 범위 안은 Redis / Kakao 없이 조회"""
+        self.assertEqual(reverse_geocode(37.5610, 126.9850), "서울특별시 중구 명동")
+
+        self.mock_redis.get.assert_not_called()
+        self.mock_get.assert_not_called()
+
+    def test_kakao_fallback_cached_per_geohash(self):
+        """범위 밖은 Kakao로 조회하고 geohash 칸 단위로 캐시"""
+        self._kakao("강원특별자치도 강릉시 교1동")
+
+        self.assertEqual(reverse_geocode(37.7556, 128.8961), "강원특별자치도 강릉시 교1동")
+
+        key, address = self.mock_redis.set.call_args.args
+        self.assertEqual(key, cache_key(37.7556, 128.8961))
+        self.assertEqual(address, "강원특별자치도 강릉시 교1동")
+        self.assertEqual(self.mock_get.call_args.kwargs["params"], {"x": 128.8961, "y": 37.7556})
+
+    def test_cached_address(self):
+        """캐시된 칸은 Kakao를 호출하지 않음"""
+        self.mock_redis.get.return_value = "강원특별자치도 강릉시 교1동"
+
+        self.assertEqual(reverse_geocode(37.7556, 128.8961), "강원특별자치도 강릉시 교1동")
+        self.mock_get.assert_not_called()
+
+    def test_kakao_failure_not_cached(self):
+        """Kakao 실패는 빈 주소, 캐시하지 않음"""
+        self.mock_get.side_effect = requests.Timeout("timeout")
+
+        self.assertEqual(reverse_geocode(37.7556, 128.8961), "")
+        self.mock_redis.set.assert_not_called()
+
+    def test_redis_failure(self):
+        """Redis 오류는 캐시만 건너뜀"""
+        self.mock_redis.get.side_effect = redis.ConnectionError("down")
+        self.mock_redis.set.side_effect = redis.ConnectionError("down")
+        self._kakao("강원특별자치도 강릉시 교1동")
+
+        self.assertEqual(reverse_geocode(37.7556, 128.8961), "강원특별자치도 강릉시 교1동")
+
+    def test_no_coordinates(self):
+        """좌표가 없는 사진은 빈 주소"""
+        self.assertEqual(reverse_geocode(None, None), "")
+        self.mock_get.assert_not_called()
+
+
+class ImportRegionsCommandTest(TestCase):
+    """import_regions 커맨드 테스트"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def _source(self, rows):
+        path = self.dir / "source.csv"
+        with open(path, "w", newline="", encoding="cp949") as f:
+            writer = csv.writer(f)
+            writer.writerow(["시도명", "시군구명", "읍면동명", "위도", "경도"])
+            writer.writerows(rows)
+        return path
+
+    def _run(self, source, *args):
+        out = StringIO()
+        call_command(
+            "import_regions",
+            str(source),
+            "--lat-column", "위도",
+            "--lng-column", "경도",
+            "--name-columns", "시도명,시군구명,읍면동명",
+            "--output", str(self.dir / "regions.csv"),
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_import(self):
+        """이름 열을 합치고 좌표가 없는 행은 건너뜀"""
+        source = self._source(
+            [
+                ["서울특별시", "중구", "명동", "37.5605", "126.9860"],
+                ["세종특별자치시", "", "조치원읍", "36.6013", "127.2980"],
+                ["부산광역시", "해운대구", "우제2동", "", ""],
+            ]
+        )
+
+        output = self._run(source, "--encoding", "cp949")
+
+        self.assertIn("Wrote 2 regions", output)
+        self.assertIn("1 rows skipped", output)
+        index = RegionIndex.from_csv(self.dir / "regions.csv")
+        self.assertEqual(index.names, ["서울특별시 중구 명동", "세종특별자치시 조치원읍"])
+        self.assertEqual(index.nearest(36.6013, 127.2980)[0], "세종특별자치시 조치원읍")
+
+    def test_missing_column(self):
+        """없는 열 이름은 오류"""
+        source = self._source([["서울특별시", "중구", "명동", "37.5605", "126.9860"]])
+
+        with self.assertRaises(CommandError):
+            self._run(source, "--encoding", "cp949", "--lat-column", "lat")
@@ -12,7 +12,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 import numpy as np
 
-from ..models import Photo, Caption, Photo_Caption
+from ..models import Photo, Caption, Photo_Caption, VectorOutbox
 from ..gpu_tasks import (
     get_image_model,
     get_caption_processor,
@@ -426,10 +426,10 @@ class ProcessAndEmbedPhotoTest(TestCase):
     @patch("gallery.storage_service.download_photo")
     @patch("gallery.gpu_tasks.get_image_captions")
     @patch("gallery.gpu_tasks.get_image_embedding")
-    @patch("gallery.gpu_tasks.get_qdrant_client")
+    @patch("gallery.outbox.schedule_drain")
     def test_process_and_embed_photo_success(
         self,
-        mock_get_client,
+        mock_drain,
         mock_get_embedding,
         mock_get_captions,
         mock_download,
@@ -448,10 +448,6 @@ class ProcessAndEmbedPhotoTest(TestCase):
         fake_captions = {"dog": 3, "brown": 2, "running": 1}
         mock_get_captions.return_value = fake_captions
 
-        # Mock Qdrant client
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
         # Execute task
         process_and_embed_photo(
             storage_key=str(self.storage_key),
@@ -463,10 +459,10 @@ class ProcessAndEmbedPhotoTest(TestCase):
             lng=127.0,
         )
 
-        # Verify Qdrant upsert
-        mock_client.upsert.assert_called_once()
-        upsert_call = mock_client.upsert.call_args
-        self.assertEqual(len(upsert_call[1]["points"]), 1)
+        # Verify Qdrant upsert queued in the outbox
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(entry.point_ids, [str(self.storage_key)])
+        mock_drain.assert_called_once()
 
         # Verify captions saved to DB
         photo_captions = Photo_Caption.objects.filter(
@@ -481,12 +477,44 @@ class ProcessAndEmbedPhotoTest(TestCase):
         # Verify cleanup
         mock_delete.assert_called_once_with(str(self.storage_key))
 
+    @patch("gallery.storage_service.delete_photo")
+    @patch("gallery.storage_service.download_photo")
+    @patch("gallery.gpu_tasks.get_image_captions")
+    @patch("gallery.gpu_tasks.get_image_embedding")
+    @patch("gallery.outbox.schedule_drain")
+    def test_process_and_embed_photo_tagged_before_embedding(
+        self,
+        mock_drain,
+        mock_get_embedding,
+        mock_get_captions,
+        mock_download,
+        mock_delete,
+    ):
+        """임베딩 전에 태그된 사진은 isTagged=True로 저장"""
+        Photo.objects.filter(photo_id=self.storage_key).update(is_tagged=True, tag_count=1)
+        mock_download.return_value = BytesIO(b"fake_image_data")
+        mock_get_embedding.return_value = np.random.rand(512).tolist()
+        mock_get_captions.return_value = {}
+
+        process_and_embed_photo(
+            storage_key=str(self.storage_key),
+            user_id=self.user.id,
+            filename="test.jpg",
+            photo_path_id=12345,
+            created_at=str(timezone.now()),
+            lat=37.5,
+            lng=127.0,
+        )
+
+        entry = VectorOutbox.objects.get()
+        self.assertTrue(entry.data["points"][0]["payload"]["isTagged"])
+
     @patch("gallery.storage_service.delete_photo")
     @patch("gallery.storage_service.download_photo")
     @patch("gallery.gpu_tasks.get_image_embedding")
-    @patch("gallery.gpu_tasks.get_qdrant_client")
+    @patch("gallery.outbox.schedule_drain")
     def test_process_and_embed_photo_embedding_failure(
-        self, mock_get_client, mock_get_embedding, mock_download, mock_delete
+        self, mock_drain, mock_get_embedding, mock_download, mock_delete
     ):
         """임베딩 생성 실패 시 처리"""
         fake_image_data = BytesIO(b"fake_image_data")
@@ -495,9 +523,6 @@ class ProcessAndEmbedPhotoTest(TestCase):
         # 임베딩 실패
         mock_get_embedding.return_value = None
 
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
         process_and_embed_photo(
             storage_key=str(self.storage_key),
             user_id=self.user.id,
@@ -509,7 +534,8 @@ class ProcessAndEmbedPhotoTest(TestCase):
         )
 
         # Qdrant에 업로드되지 않음
-        mock_client.upsert.assert_not_called()
+        self.assertFalse(VectorOutbox.objects.exists())
+        mock_drain.assert_not_called()
 
         # 여전히 cleanup은 실행됨
         mock_delete.assert_called_once()
@@ -563,10 +589,10 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
     @patch("gallery.storage_service.download_photo")
     @patch("gallery.gpu_tasks.get_image_captions_batch")
     @patch("gallery.gpu_tasks.get_image_embeddings_batch")
-    @patch("gallery.gpu_tasks.get_qdrant_client")
+    @patch("gallery.outbox.schedule_drain")
     def test_process_and_embed_photos_batch_success(
         self,
-        mock_get_client,
+        mock_drain,
         mock_get_embeddings,
         mock_get_captions,
         mock_download,
@@ -592,10 +618,6 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
         ]
         mock_get_captions.return_value = fake_captions
 
-        # Mock Qdrant client
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
         photos_metadata = [
             {
                 "storage_key": str(self.storage_key1),
@@ -619,10 +641,10 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
 
         process_and_embed_photos_batch(photos_metadata)
 
-        # Verify Qdrant batch upsert
-        mock_client.upsert.assert_called_once()
-        upsert_call = mock_client.upsert.call_args
-        self.assertEqual(len(upsert_call[1]["points"]), 2)
+        # Verify Qdrant batch upsert queued as one outbox entry
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(len(entry.data["points"]), 2)
+        mock_drain.assert_called_once()
 
         # Verify captions saved to DB
         photo1_captions = Photo_Caption.objects.filter(
@@ -638,6 +660,49 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
         # Verify cleanup called for both
         self.assertEqual(mock_delete.call_count, 2)
 
+    @patch("gallery.storage_service.delete_photo")
+    @patch("gallery.storage_service.download_photo")
+    @patch("gallery.gpu_tasks.get_image_captions_batch")
+    @patch("gallery.gpu_tasks.get_image_embeddings_batch")
+    @patch("gallery.outbox.schedule_drain")
+    def test_process_and_embed_photos_batch_tagged_and_deleted_photos(
+        self,
+        mock_drain,
+        mock_get_embeddings,
+        mock_get_captions,
+        mock_download,
+        mock_delete,
+    ):
+        """임베딩 전에 태그된 사진은 isTagged=True, 삭제된 사진은 업로드하지 않음"""
+        Photo.objects.filter(photo_id=self.storage_key1).update(is_tagged=True, tag_count=1)
+        Photo.objects.filter(photo_id=self.storage_key2).update(is_deleted=True)
+        mock_download.side_effect = [BytesIO(b"fake_image_1"), BytesIO(b"fake_image_2")]
+        mock_get_embeddings.return_value = [
+            np.random.rand(512).tolist(),
+            np.random.rand(512).tolist(),
+        ]
+        mock_get_captions.return_value = [{"cat": 1}, {"dog": 1}]
+
+        process_and_embed_photos_batch(
+            [
+                {
+                    "storage_key": str(storage_key),
+                    "user_id": self.user.id,
+                    "filename": f"photo{i}.jpg",
+                    "photo_path_id": 100 + i,
+                    "created_at": str(timezone.now()),
+                    "lat": 37.5,
+                    "lng": 127.0,
+                }
+                for i, storage_key in enumerate([self.storage_key1, self.storage_key2], start=1)
+            ]
+        )
+
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(entry.point_ids, [str(self.storage_key1)])
+        self.assertTrue(entry.data["points"][0]["payload"]["isTagged"])
+        self.assertFalse(Photo_Caption.objects.filter(photo_id=self.storage_key2).exists())
+
     def test_process_and_embed_photos_batch_empty_input(self):
         """빈 입력 처리"""
         process_and_embed_photos_batch([])
@@ -647,10 +712,10 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
     @patch("gallery.storage_service.download_photo")
     @patch("gallery.gpu_tasks.get_image_captions_batch")
     @patch("gallery.gpu_tasks.get_image_embeddings_batch")
-    @patch("gallery.gpu_tasks.get_qdrant_client")
+    @patch("gallery.outbox.schedule_drain")
     def test_process_and_embed_photos_batch_partial_failure(
         self,
-        mock_get_client,
+        mock_drain,
         mock_get_embeddings,
         mock_get_captions,
         mock_download,
@@ -671,9 +736,6 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
         fake_captions = [{"cat": 2}]
         mock_get_captions.return_value = fake_captions
 
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
         photos_metadata = [
             {
                 "storage_key": str(self.storage_key1),
@@ -698,9 +760,8 @@ class ProcessAndEmbedPhotosBatchTest(TestCase):
         process_and_embed_photos_batch(photos_metadata)
 
         # 첫 번째 사진만 Qdrant에 업로드
-        mock_client.upsert.assert_called_once()
-        upsert_call = mock_client.upsert.call_args
-        self.assertEqual(len(upsert_call[1]["points"]), 1)
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(entry.point_ids, [str(self.storage_key1)])
 
         # 첫 번째 사진만 캡션 저장
         photo1_captions = Photo_Caption.objects.filter(
@@ -0,0 +1,90 @@
+"""
+Tests for gallery/graph_recommend.py
+
+Scores are checked against the networkx implementation used by the
+tag-search prototype (nx.pagerank / nx.adamic_adar_index).
+"""
+
+import networkx as nx
+import numpy as np
+from django.test import TestCase
+from scipy import sparse
+
+from ..caption_graph import CaptionGraph
+from ..graph_recommend import adamic_adar_to_group, graph_scores, rooted_pagerank
+
+
+def make_graph(n_photos, n_captions, density, seed):
+    matrix = sparse.random(
+        n_photos, n_captions, density=density, random_state=seed, format="csr"
+    )
+    matrix.data = np.ceil(matrix.data * 5)
+    return CaptionGraph(
+        list(range(n_photos)),
+        [f"c{i}" for i in range(n_captions)],
+        matrix.astype(np.float32),
+    )
+
+
+def to_networkx(graph):
+    B = nx.Graph()
+    B.add_nodes_from(graph.photo_ids, bipartite=0)
+    B.add_nodes_from(graph.caption_ids, bipartite=1)
+    coo = graph.matrix.tocoo()
+    for row, col, weight in zip(coo.row, coo.col, coo.data):
+        B.add_edge(graph.photo_ids[row], graph.caption_ids[col], weight=float(weight))
+    return B
+
+
+class GraphRecommendTest(TestCase):
+    """graph_recommend 모듈 테스트"""
+
+    def setUp(self):
+        self.graph = make_graph(60, 25, density=0.15, seed=1)
+        self.seeds = [0, 1, 2]
+        self.B = to_networkx(self.graph)
+
+    def test_rooted_pagerank_matches_networkx(self):
+        """networkx personalized PageRank와 동일한 값"""
+        expected = nx.pagerank(
+            self.B,
+            personalization={seed: 1 for seed in self.seeds},
+            weight="weight",
+            tol=1e-10,
+            max_iter=1000,
+        )
+
+        scores = rooted_pagerank(
+            self.graph, np.array(self.seeds), tol=1e-12, max_iter=1000
+        )
+
+        for photo_id in self.graph.photo_ids:
+            self.assertAlmostEqual(scores[photo_id], expected[photo_id], places=6)
+
+    def test_adamic_adar_matches_networkx(self):
+        """그룹 평균 Adamic/Adar가 networkx와 동일"""
+        candidates = [p for p in self.graph.photo_ids if p not in self.seeds]
+        expected = {}
+        for u, _, score in nx.adamic_adar_index(
+            self.B, [(c, s) for c in candidates for s in self.seeds]
+        ):
+            expected[u] = expected.get(u, 0.0) + score / len(self.seeds)
+
+        scores = adamic_adar_to_group(self.graph, np.array(self.seeds))
+
+        for photo_id in candidates:
+            self.assertAlmostEqual(scores[photo_id], expected.get(photo_id, 0.0), places=5)
+
+    def test_graph_scores_exclude_seeds_and_normalize(self):
+        """시드 사진 제외, 점수는 [0, 1]"""
+        scores = graph_scores(self.graph, self.seeds)
+
+        self.assertEqual(len(scores), 57)
+        self.assertFalse(set(self.seeds) & scores.keys())
+        self.assertTrue(all(0.0 <= s <= 1.0 for s in scores.values()))
+        self.assertGreater(max(scores.values()), 0.0)
+
+    def test_unknown_seeds_return_empty(self):
+        """그래프에 없는 시드만 주어지면 빈 결과"""
+        self.assertEqual(graph_scores(self.graph, [1000]), {})
+        self.assertEqual(graph_scores(CaptionGraph(), [0]), {})
@@ -218,6 +218,13 @@ class PhotoTagModelTest(TestCase):
         self.user.delete()
         self.assertFalse(Photo_Tag.objects.filter(pt_id=pt_id).exists())
 
+    def test_photo_tag_unique_constraint(self):
+        """Test unique constraint on user, photo and tag"""
+        Photo_Tag.objects.create(tag=self.tag, user=self.user, photo=self.photo)
+
+        with self.assertRaises(IntegrityError):
+            Photo_Tag.objects.create(tag=self.tag, user=self.user, photo=self.photo)
+
 
 class CaptionModelTest(TestCase):
     """Tests for Caption model"""
@@ -0,0 +1,306 @@
+"""
+Tests for gallery/outbox.py and drain_vector_outbox
+
+Qdrant and Redis are mocked.
+"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from qdrant_client.http import models
+from qdrant_client.http.exceptions import ResponseHandlingException
+
+from .. import outbox
+from ..models import VectorOutbox
+from ..qdrant_utils import IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME
+from ..tasks import drain_vector_outbox
+
+
+class OutboxFlushTest(TestCase):
+    """outbox.flush 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.outbox.get_qdrant_client")
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def _calls(self):
+        return {
+            call.kwargs["collection_name"]: call.kwargs["update_operations"]
+            for call in self.mock_client.batch_update_points.call_args_list
+        }
+
+    def test_groups_operations_per_collection_in_order(self):
+        """컬렉션마다 bulk 요청 한 번, outbox 순서 유지"""
+        repvec_filter = models.Filter(
+            must=[models.FieldCondition(key="tag_id", match=models.MatchValue(value="t"))]
+        )
+        entries = [
+            outbox.enqueue_delete_by_filter(REPVEC_COLLECTION_NAME, repvec_filter),
+            outbox.enqueue_upsert(
+                IMAGE_COLLECTION_NAME,
+                [models.PointStruct(id=str(uuid.uuid4()), vector=[0.1, 0.2], payload={"user_id": 1})],
+            ),
+            outbox.enqueue_upsert(
+                REPVEC_COLLECTION_NAME,
+                [models.PointStruct(id=str(uuid.uuid4()), vector=[0.3, 0.4], payload={"tag_id": "t"})],
+            ),
+            outbox.enqueue_set_payload(IMAGE_COLLECTION_NAME, {"isTagged": True}, ["a"]),
+        ]
+
+        self.assertEqual(outbox.flush(entries), 4)
+
+        calls = self._calls()
+        self.assertEqual(self.mock_client.batch_update_points.call_count, 2)
+        repvec_ops = calls[REPVEC_COLLECTION_NAME]
+        self.assertEqual(repvec_ops[0].delete.filter, repvec_filter)
+        self.assertEqual(repvec_ops[1].upsert.points[0].vector, [0.3, 0.4])
+        image_ops = calls[IMAGE_COLLECTION_NAME]
+        self.assertEqual(image_ops[0].upsert.points[0].payload, {"user_id": 1})
+        self.assertEqual(image_ops[1].set_payload.payload, {"isTagged": True})
+        self.assertEqual(image_ops[1].set_payload.filter.must[0].has_id, ["a"])
+        self.assertFalse(VectorOutbox.objects.exists())
+
+    def test_failed_entry_blocks_later_entries_of_its_collection(self):
+        """실패한 항목 뒤의 같은 컬렉션 항목은 보류, 다른 컬렉션은 반영"""
+        first = outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["ok"])
+        bad = outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["bad"])
+        later = outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["later"])
+        other = outbox.enqueue_delete(REPVEC_COLLECTION_NAME, ["rep"])
+
+        def batch_update_points(collection_name, update_operations, wait):
+            if any("bad" in op.delete.points for op in update_operations):
+                raise ResponseHandlingException(Exception("bad point"))
+
+        self.mock_client.batch_update_points.side_effect = batch_update_points
+
+        self.assertEqual(outbox.flush([first, bad, later, other]), 2)
+
+        remaining = {entry.pk: entry for entry in VectorOutbox.objects.all()}
+        self.assertEqual(set(remaining), {bad.pk, later.pk})
+        self.assertEqual(remaining[bad.pk].attempts, 1)
+        self.assertIn("bad point", remaining[bad.pk].last_error)
+        self.assertEqual(remaining[later.pk].attempts, 0)
+
+    def test_merges_consecutive_upserts_and_deletes(self):
+        """연속된 upsert/삭제는 하나의 operation으로 병합, wait=False"""
+        point_id = str(uuid.uuid4())
+        entries = [
+            outbox.enqueue_upsert(
+                IMAGE_COLLECTION_NAME, [models.PointStruct(id=point_id, vector=[0.1], payload={})]
+            ),
+            outbox.enqueue_upsert(
+                IMAGE_COLLECTION_NAME, [models.PointStruct(id=point_id, vector=[0.2], payload={})]
+            ),
+            outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a", "b"]),
+            outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["b", "c"]),
+        ]
+
+        outbox.flush(entries)
+
+        call = self.mock_client.batch_update_points.call_args
+        self.assertFalse(call.kwargs["wait"])
+        upsert, delete = call.kwargs["update_operations"]
+        # 같은 id는 나중 upsert가 남음
+        self.assertEqual([point.vector for point in upsert.upsert.points], [[0.2]])
+        self.assertEqual(delete.delete.points, ["a", "b", "c"])
+
+
+class ScheduleDrainTest(TestCase):
+    """schedule_drain 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.outbox.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.tasks.drain_vector_outbox")
+        self.mock_drain = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_delays_drain_after_commit(self):
+        """커밋 후 FLUSH_DELAY 뒤로 drain 예약"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            outbox.schedule_drain()
+        self.mock_drain.apply_async.assert_not_called()
+
+        callbacks[0]()
+
+        self.mock_drain.apply_async.assert_called_once_with(countdown=1)
+        self.mock_drain.delay.assert_not_called()
+
+    def test_coalesces_drains_within_window(self):
+        """이미 예약된 drain이 있으면 다시 예약하지 않음"""
+        self.mock_redis.set.return_value = None
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox.schedule_drain()
+
+        self.mock_drain.apply_async.assert_not_called()
+        self.mock_drain.delay.assert_not_called()
+
+    def test_drains_right_away_when_full(self):
+        """FLUSH_SIZE만큼 쌓이면 바로 drain"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["b"])
+
+        with (
+            self.settings(VECTOR_OUTBOX_SETTINGS={"FLUSH_DELAY": 1, "FLUSH_SIZE": 2}),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            outbox.schedule_drain()
+
+        self.mock_drain.delay.assert_called_once()
+        self.mock_drain.apply_async.assert_not_called()
+
+
+class BarrierTest(TestCase):
+    """outbox.barrier 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.outbox.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.mock_client = MagicMock()
+
+    def test_applies_pending_writes_of_collection(self):
+        """해당 컬렉션의 대기 항목을 반영하고 인덱싱 완료까지 기다림"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+        other = outbox.enqueue_delete(REPVEC_COLLECTION_NAME, ["rep"])
+
+        self.assertTrue(outbox.barrier(self.mock_client, IMAGE_COLLECTION_NAME))
+
+        first, sync = self.mock_client.batch_update_points.call_args_list
+        self.assertEqual(first.kwargs["update_operations"][0].delete.points, ["a"])
+        self.assertEqual(
+            sync.kwargs["update_operations"][0].delete.points, [outbox.SYNC_POINT_ID]
+        )
+        self.assertTrue(sync.kwargs["wait"])
+        self.assertEqual(list(VectorOutbox.objects.all()), [other])
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+
+    def test_failed_entry_reports_stale(self):
+        """반영 실패 시 False"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+        self.mock_client.batch_update_points.side_effect = ResponseHandlingException(
+            Exception("down")
+        )
+
+        self.assertFalse(outbox.barrier(self.mock_client, IMAGE_COLLECTION_NAME))
+        self.assertEqual(VectorOutbox.objects.get().attempts, 1)
+
+    def test_lock_timeout(self):
+        """drain 락을 못 잡으면 제한 시간 후 False"""
+        self.mock_redis.set.return_value = None
+
+        with self.settings(VECTOR_OUTBOX_SETTINGS={"BARRIER_TIMEOUT": 0}):
+            self.assertFalse(outbox.barrier(self.mock_client, IMAGE_COLLECTION_NAME))
+
+        self.mock_client.batch_update_points.assert_not_called()
+        self.mock_redis.delete.assert_not_called()
+
+
+class BarrierPointsTest(TestCase):
+    """outbox.barrier_points 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.outbox.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.mock_client = MagicMock()
+
+    def _synced_only(self):
+        (sync,) = self.mock_client.batch_update_points.call_args_list
+        self.assertEqual(
+            sync.kwargs["update_operations"][0].delete.points, [outbox.SYNC_POINT_ID]
+        )
+        self.assertTrue(sync.kwargs["wait"])
+
+    def test_other_points_skip_drain_lock(self):
+        """다른 포인트의 대기 항목만 있으면 락 없이 인덱싱 완료만 기다림"""
+        other = outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["b"])
+
+        self.assertTrue(outbox.barrier_points(self.mock_client, IMAGE_COLLECTION_NAME, ["a"]))
+
+        self._synced_only()
+        self.mock_redis.set.assert_not_called()
+        self.assertEqual(list(VectorOutbox.objects.all()), [other])
+
+    def test_pending_write_of_point_takes_barrier(self):
+        """읽을 포인트의 대기 항목이 있으면 barrier로 반영"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+
+        self.assertTrue(outbox.barrier_points(self.mock_client, IMAGE_COLLECTION_NAME, ["a"]))
+
+        first, sync = self.mock_client.batch_update_points.call_args_list
+        self.assertEqual(first.kwargs["update_operations"][0].delete.points, ["a"])
+        self.assertTrue(sync.kwargs["wait"])
+        self.assertFalse(VectorOutbox.objects.exists())
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+
+    def test_pending_filter_delete_takes_barrier(self):
+        """필터 삭제는 포인트를 알 수 없으므로 barrier로 반영"""
+        outbox.enqueue_delete_by_filter(IMAGE_COLLECTION_NAME, models.Filter(must=[]))
+
+        self.assertTrue(outbox.barrier_points(self.mock_client, IMAGE_COLLECTION_NAME, ["a"]))
+
+        self.assertFalse(VectorOutbox.objects.exists())
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+
+    def test_qdrant_error_reports_stale(self):
+        """인덱싱 대기 실패 시 False"""
+        self.mock_client.batch_update_points.side_effect = ResponseHandlingException(
+            Exception("down")
+        )
+
+        self.assertFalse(outbox.barrier_points(self.mock_client, IMAGE_COLLECTION_NAME, ["a"]))
+
+
+class DrainVectorOutboxTest(TestCase):
+    """drain_vector_outbox 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.outbox.get_qdrant_client")
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.outbox.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_drains_until_empty(self):
+        """DRAIN_BATCH_SIZE씩 반복해서 모두 반영 후 락 해제"""
+        for i in range(5):
+            outbox.enqueue_delete(IMAGE_COLLECTION_NAME, [str(i)])
+
+        with self.settings(VECTOR_OUTBOX_SETTINGS={"DRAIN_BATCH_SIZE": 2, "MAX_ATTEMPTS": 10}):
+            self.assertEqual(drain_vector_outbox(), 5)
+
+        self.assertEqual(self.mock_client.batch_update_points.call_count, 3)
+        self.assertFalse(VectorOutbox.objects.exists())
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+
+    def test_stops_after_failure(self):
+        """실패가 있으면 같은 항목을 반복 재시도하지 않고 다음 주기로 넘김"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+        self.mock_client.batch_update_points.side_effect = ResponseHandlingException(
+            Exception("down")
+        )
+
+        self.assertEqual(drain_vector_outbox(), 0)
+
+        self.assertEqual(VectorOutbox.objects.get().attempts, 1)
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+
+    def test_skips_when_another_drain_runs(self):
+        """락을 못 잡으면 Qdrant를 호출하지 않음"""
+        outbox.enqueue_delete(IMAGE_COLLECTION_NAME, ["a"])
+        self.mock_redis.set.return_value = None
+
+        self.assertEqual(drain_vector_outbox(), 0)
+
+        self.mock_client.batch_update_points.assert_not_called()
+        self.assertTrue(VectorOutbox.objects.exists())
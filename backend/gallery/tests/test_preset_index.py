@@ -0,0 +1,129 @@
+"""
+Tests for gallery/preset_index.py
+
+Qdrant is mocked.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from django.test import TestCase
+
+from ..preset_index import PresetTagIndex
+
+
+def make_point(name, vector):
+    point = MagicMock()
+    point.payload = {"name": name}
+    point.vector = vector
+    return point
+
+
+class PresetTagIndexTest(TestCase):
+    """PresetTagIndex 테스트"""
+
+    def setUp(self):
+        patcher = patch("gallery.preset_index.get_qdrant_client")
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.mock_client.get_aliases.return_value.aliases = []
+        self.mock_client.get_collection.return_value.points_count = 3
+        self.mock_client.scroll.side_effect = [
+            ([make_point("바다", [1.0, 0.0, 0.0]), make_point("산", [0.0, 2.0, 0.0])], "next"),
+            ([make_point("음식", [0.0, 0.0, 1.0])], None),
+        ]
+
+        self.index = PresetTagIndex(check_interval=300)
+
+    def test_loads_all_pages(self):
+        """scroll 페이지를 모두 읽어 인덱스 구성"""
+        self.index.refresh()
+
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.mock_client.scroll.call_count, 2)
+
+    def test_search_orders_by_cosine_similarity(self):
+        """코사인 유사도 순으로 정렬 (벡터 크기 무관)"""
+        results = self.index.search([0.1, 0.9, 0.0], limit=2)
+
+        self.assertEqual([name for name, _ in results], ["산", "바다"])
+        self.assertAlmostEqual(results[0][1], 0.9 / np.linalg.norm([0.1, 0.9]), places=5)
+
+    def test_search_applies_threshold(self):
+        """score_threshold 미만 결과 제외"""
+        results = self.index.search([0.1, 0.9, 0.0], limit=3, score_threshold=0.5)
+
+        self.assertEqual([name for name, _ in results], ["산"])
+
+    def test_search_batch(self):
+        """여러 벡터를 한 번에 검색"""
+        results = self.index.search_batch(
+            [[0.0, 0.0, 1.0], [1.0, 0.1, 0.0]], limit=1
+        )
+
+        self.assertEqual([[name for name, _ in r] for r in results], [["음식"], ["바다"]])
+
+    def test_refresh_is_rate_limited(self):
+        """확인 주기 내에는 컬렉션을 다시 확인하지 않음"""
+        self.index.search([1.0, 0.0, 0.0], limit=1)
+        self.index.search([1.0, 0.0, 0.0], limit=1)
+
+        self.mock_client.get_collection.assert_called_once()
+
+    def test_reload_when_version_changes(self):
+        """points_count가 바뀌면 다시 로드"""
+        index = PresetTagIndex(check_interval=0)
+        index.refresh()
+
+        self.mock_client.get_collection.return_value.points_count = 1
+        self.mock_client.scroll.side_effect = [([make_point("하늘", [0.0, 1.0, 0.0])], None)]
+        results = index.search([0.0, 1.0, 0.0], limit=5)
+
+        self.assertEqual([name for name, _ in results], ["하늘"])
+
+    def test_no_reload_when_version_unchanged(self):
+        """points_count가 같으면 다시 로드하지 않음"""
+        index = PresetTagIndex(check_interval=0)
+        index.refresh()
+        index.refresh()
+
+        self.assertEqual(self.mock_client.get_collection.call_count, 2)
+        self.assertEqual(self.mock_client.scroll.call_count, 2)
+
+    def test_reload_when_alias_moves(self):
+        """같은 개수로 새 컬렉션에 올리고 alias를 바꾸면 다시 로드"""
+        index = PresetTagIndex(check_interval=0)
+        index.refresh()
+
+        alias = MagicMock(alias_name=index.collection_name, collection_name="preset__2")
+        self.mock_client.get_aliases.return_value.aliases = [alias]
+        self.mock_client.scroll.side_effect = [
+            (
+                [
+                    make_point("바다", [1.0, 0.0, 0.0]),
+                    make_point("산", [0.0, 2.0, 0.0]),
+                    make_point("하늘", [0.0, 1.0, 1.0]),
+                ],
+                None,
+            )
+        ]
+        results = index.search([0.0, 1.0, 1.0], limit=1)
+
+        self.assertEqual([name for name, _ in results], ["하늘"])
+
+    def test_reload_after_max_age(self):
+        """버전이 같아도 max_age가 지나면 다시 로드 (제자리 수정)"""
+        index = PresetTagIndex(check_interval=0, max_age=0)
+        index.refresh()
+        self.mock_client.scroll.side_effect = [([make_point("하늘", [0.0, 1.0, 0.0])], None)]
+        index.refresh()
+
+        self.assertEqual(len(index), 1)
+
+    def test_empty_collection(self):
+        """preset이 없으면 빈 결과"""
+        self.mock_client.get_collection.return_value.points_count = 0
+        self.mock_client.scroll.side_effect = [([], None)]
+
+        self.assertEqual(self.index.search_batch([[1.0, 0.0, 0.0]], limit=3), [[]])
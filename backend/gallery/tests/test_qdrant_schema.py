@@ -0,0 +1,375 @@
+"""
+Tests for gallery/qdrant_schema.py and the migrate_qdrant_schema command
+
+Qdrant is replaced by an in-memory fake with collections and aliases; the
+outbox drain lock (Redis) is mocked.
+"""
+
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from qdrant_client.http import models
+
+from .. import outbox
+from ..qdrant_utils import IMAGE_COLLECTION_NAME, PAYLOAD_INDEXES
+
+COLLECTION_SETTINGS = {
+    "QUANTIZATION": "scalar",
+    "ON_DISK_VECTORS": True,
+    "HNSW_M": 0,
+    "HNSW_PAYLOAD_M": 16,
+    "HNSW_EF_CONSTRUCT": 100,
+}
+
+
+class FakeQdrant:
+    """컬렉션/alias/포인트를 메모리에 두는 Qdrant"""
+
+    def __init__(self):
+        self.collections = {}
+        self.aliases = {}
+        self.update_collection = MagicMock()
+        self.delete_payload_index = MagicMock()
+        self.delete_payload = MagicMock()
+        self.create_payload_index = MagicMock(side_effect=self._create_payload_index)
+        self.upsert = MagicMock(side_effect=self._upsert)
+        self.batch_update_points = MagicMock(side_effect=self._batch_update_points)
+
+    def add(
+        self,
+        name,
+        n_points=0,
+        distance=models.Distance.COSINE,
+        size=512,
+        indexes=None,
+    ):
+        """기본 설정(float32, 전역 HNSW, 양자화 없음)으로 만든 기존 컬렉션"""
+        self.collections[name] = {
+            "vectors": models.VectorParams(size=size, distance=distance),
+            "hnsw": models.HnswConfig(m=16, ef_construct=100, full_scan_threshold=10000),
+            "quantization": None,
+            "indexes": dict(indexes or {}),
+            "points": {i: ([0.1] * 4, {"user_id": 1, "n": i}) for i in range(n_points)},
+        }
+
+    def _resolve(self, name):
+        return self.aliases.get(name, name)
+
+    def get_aliases(self):
+        return SimpleNamespace(
+            aliases=[
+                SimpleNamespace(alias_name=alias, collection_name=collection)
+                for alias, collection in self.aliases.items()
+            ]
+        )
+
+    def collection_exists(self, collection_name):
+        return collection_name in self.collections
+
+    def get_collection(self, collection_name):
+        collection = self.collections[self._resolve(collection_name)]
+        return SimpleNamespace(
+            config=SimpleNamespace(
+                params=SimpleNamespace(vectors=collection["vectors"]),
+                hnsw_config=collection["hnsw"],
+                quantization_config=collection["quantization"],
+            ),
+            payload_schema={
+                name: SimpleNamespace(data_type=schema_type)
+                for name, schema_type in collection["indexes"].items()
+            },
+        )
+
+    def create_collection(self, collection_name, vectors_config, hnsw_config, quantization_config):
+        self.collections[collection_name] = {
+            "vectors": vectors_config,
+            "hnsw": models.HnswConfig(
+                m=hnsw_config.m,
+                payload_m=hnsw_config.payload_m,
+                ef_construct=hnsw_config.ef_construct,
+                full_scan_threshold=10000,
+            ),
+            "quantization": quantization_config,
+            "indexes": {},
+            "points": {},
+        }
+
+    def _create_payload_index(self, collection_name, field_name, field_schema, wait):
+        self.collections[self._resolve(collection_name)]["indexes"][field_name] = field_schema
+
+    def delete_collection(self, collection_name):
+        del self.collections[collection_name]
+
+    def update_collection_aliases(self, change_aliases_operations):
+        for operation in change_aliases_operations:
+            if isinstance(operation, models.DeleteAliasOperation):
+                del self.aliases[operation.delete_alias.alias_name]
+            else:
+                alias = operation.create_alias
+                assert alias.alias_name not in self.collections, "alias clashes with a collection"
+                self.aliases[alias.alias_name] = alias.collection_name
+
+    @staticmethod
+    def _matches(payload, point_filter):
+        # IsEmptyCondition만 지원
+        if point_filter is None:
+            return True
+        return all(
+            payload.get(c.is_empty.key) is None for c in point_filter.must or []
+        ) and all(payload.get(c.is_empty.key) is not None for c in point_filter.must_not or [])
+
+    def scroll(
+        self, collection_name, limit, offset, with_payload, with_vectors, scroll_filter=None
+    ):
+        points = self.collections[collection_name]["points"]
+        ids = [
+            i
+            for i in sorted(points)
+            if (offset is None or i >= offset) and self._matches(points[i][1], scroll_filter)
+        ]
+        page = [
+            SimpleNamespace(id=i, vector=points[i][0], payload=points[i][1])
+            for i in ids[:limit]
+        ]
+        return page, ids[limit] if len(ids) > limit else None
+
+    def _upsert(self, collection_name, points, wait):
+        for point in points:
+            self.collections[collection_name]["points"][point.id] = (point.vector, point.payload)
+
+    def _batch_update_points(self, collection_name, update_operations, wait):
+        points = self.collections[self._resolve(collection_name)]["points"]
+        for operation in update_operations:
+            for point_id in operation.set_payload.points:
+                points[point_id][1].update(operation.set_payload.payload)
+
+    def count(self, collection_name, exact, count_filter=None):
+        points = self.collections[collection_name]["points"]
+        return SimpleNamespace(
+            count=sum(self._matches(payload, count_filter) for _, payload in points.values())
+        )
+
+
+@override_settings(QDRANT_COLLECTION_SETTINGS=COLLECTION_SETTINGS)
+class MigrateQdrantSchemaCommandTest(TestCase):
+    """migrate_qdrant_schema 커맨드 테스트"""
+
+    def setUp(self):
+        self.qdrant = FakeQdrant()
+        patcher = patch(
+            "gallery.management.commands.migrate_qdrant_schema.get_qdrant_client",
+            return_value=self.qdrant,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.outbox.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("gallery.outbox.schedule_drain")
+        self.mock_drain = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command(
+            "migrate_qdrant_schema", "--collection", IMAGE_COLLECTION_NAME, *args, stdout=out
+        )
+        return out.getvalue()
+
+    def _image_collection(self):
+        return self.qdrant.collections[self.qdrant._resolve(IMAGE_COLLECTION_NAME)]
+
+    def test_creates_missing_collection_and_is_idempotent(self):
+        """없는 컬렉션은 alias로 생성, 다시 실행하면 변경 없음"""
+        self._run()
+
+        physical = self.qdrant.aliases[IMAGE_COLLECTION_NAME]
+        self.assertTrue(physical.startswith(f"{IMAGE_COLLECTION_NAME}__"))
+        self.assertEqual(self._image_collection()["indexes"], PAYLOAD_INDEXES[IMAGE_COLLECTION_NAME])
+
+        self.qdrant.create_payload_index.reset_mock()
+        output = self._run()
+
+        self.assertIn("Up to date", output)
+        self.qdrant.update_collection.assert_not_called()
+        self.qdrant.create_payload_index.assert_not_called()
+
+    def test_in_place_changes(self):
+        """HNSW/양자화/on_disk/인덱스 변경은 복사 없이 그 자리에서 반영"""
+        self.qdrant.add(
+            IMAGE_COLLECTION_NAME,
+            n_points=3,
+            indexes={
+                "user_id": models.PayloadSchemaType.INTEGER,
+                "filename": models.PayloadSchemaType.TEXT,
+                "legacy": models.PayloadSchemaType.KEYWORD,
+            },
+        )
+
+        output = self._run()
+
+        update = self.qdrant.update_collection.call_args.kwargs
+        self.assertEqual(update["vectors_config"], {"": models.VectorParamsDiff(on_disk=True)})
+        self.assertEqual(update["hnsw_config"].m, 0)
+        self.assertIsInstance(update["quantization_config"], models.ScalarQuantization)
+        self.qdrant.delete_payload_index.assert_called_once_with(
+            collection_name=IMAGE_COLLECTION_NAME, field_name="filename", wait=True
+        )
+        indexes = self._image_collection()["indexes"]
+        self.assertEqual(indexes["filename"], models.PayloadSchemaType.KEYWORD)
+        self.assertIn("created_at", indexes)
+        # 스키마에 없는 인덱스는 보고만 함
+        self.assertIn("legacy", indexes)
+        self.assertIn("index legacy: not in schema (kept)", output)
+        self.qdrant.upsert.assert_not_called()
+        self.assertNotIn(IMAGE_COLLECTION_NAME, self.qdrant.aliases)
+
+    def test_distance_change_copies_and_swaps_alias(self):
+        """distance 변경은 새 컬렉션으로 배치 복사 후 alias 전환"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=5, distance=models.Distance.DOT)
+
+        output = self._run("--batch-size", "2", "--convert-to-alias")
+
+        physical = self.qdrant.aliases[IMAGE_COLLECTION_NAME]
+        self.assertEqual(set(self.qdrant.collections), {physical})
+        new = self.qdrant.collections[physical]
+        self.assertEqual(new["vectors"].distance, models.Distance.COSINE)
+        self.assertEqual(len(new["points"]), 5)
+        self.assertEqual(new["points"][3][1], {"user_id": 1, "n": 3})
+        self.assertEqual(
+            [len(call.kwargs["points"]) for call in self.qdrant.upsert.call_args_list], [2, 2, 1]
+        )
+        # 복사 중 drain 정지, 끝난 뒤 재개
+        self.assertEqual(self.mock_redis.set.call_args.kwargs["ex"], 600)
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+        self.mock_drain.assert_called_once()
+        self.assertIn("Copied 5 points", output)
+
+    def test_rebuild_swaps_existing_alias(self):
+        """alias로 운영 중인 컬렉션은 원자적으로 전환하고 이전 컬렉션 삭제"""
+        self.qdrant.add("old_physical", n_points=2)
+        self.qdrant.aliases[IMAGE_COLLECTION_NAME] = "old_physical"
+
+        self._run("--rebuild")
+
+        self.assertNotEqual(self.qdrant.aliases[IMAGE_COLLECTION_NAME], "old_physical")
+        self.assertNotIn("old_physical", self.qdrant.collections)
+        self.assertEqual(len(self._image_collection()["points"]), 2)
+
+    def test_keep_old(self):
+        """--keep-old는 이전 컬렉션을 남김"""
+        self.qdrant.add("old_physical", n_points=2)
+        self.qdrant.aliases[IMAGE_COLLECTION_NAME] = "old_physical"
+
+        self._run("--rebuild", "--keep-old")
+
+        self.assertIn("old_physical", self.qdrant.collections)
+
+    def test_plain_collection_needs_convert_flag(self):
+        """alias가 아닌 컬렉션은 --convert-to-alias 없이 지우지 않음"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=3, distance=models.Distance.DOT)
+
+        with self.assertRaisesMessage(CommandError, "--convert-to-alias"):
+            self._run()
+
+        self.assertEqual(set(self.qdrant.collections), {IMAGE_COLLECTION_NAME})
+        self.assertEqual(self.qdrant.aliases, {})
+        self.qdrant.upsert.assert_not_called()
+
+    def test_plain_collection_rejects_keep_old(self):
+        """alias가 아닌 컬렉션은 이름을 비워야 하므로 --keep-old 거부"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=3)
+
+        with self.assertRaisesMessage(CommandError, "--keep-old"):
+            self._run("--rebuild", "--keep-old", "--convert-to-alias")
+
+        self.assertEqual(set(self.qdrant.collections), {IMAGE_COLLECTION_NAME})
+        self.qdrant.upsert.assert_not_called()
+
+    def test_incomplete_copy_keeps_source(self):
+        """복사된 포인트 수가 다르면 새 컬렉션을 지우고 기존 컬렉션 유지"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=3)
+        self.qdrant.upsert.side_effect = None
+
+        with self.assertRaises(CommandError):
+            self._run("--rebuild", "--convert-to-alias")
+
+        self.assertEqual(set(self.qdrant.collections), {IMAGE_COLLECTION_NAME})
+        self.assertEqual(self.qdrant.aliases, {})
+        self.mock_redis.delete.assert_called_once_with(outbox.DRAIN_LOCK_KEY)
+        self.mock_drain.assert_not_called()
+
+    def test_running_drain_blocks_copy(self):
+        """drain이 실행 중이면 복사하지 않음"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=3)
+        self.mock_redis.set.return_value = None
+
+        with self.assertRaises(CommandError):
+            self._run("--rebuild", "--convert-to-alias")
+
+        self.assertEqual(set(self.qdrant.collections), {IMAGE_COLLECTION_NAME})
+        self.qdrant.upsert.assert_not_called()
+
+    def test_vector_size_change_refused(self):
+        """벡터 차원 변경은 재임베딩이 필요하므로 거부"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, size=768)
+
+        with self.assertRaises(CommandError):
+            self._run()
+
+    def test_prune(self):
+        """--prune는 스키마에 없는 인덱스와 프로필 밖의 payload 필드를 삭제"""
+        self.qdrant.add(
+            IMAGE_COLLECTION_NAME,
+            indexes={
+                **PAYLOAD_INDEXES[IMAGE_COLLECTION_NAME],
+                "legacy": models.PayloadSchemaType.KEYWORD,
+            },
+        )
+
+        with self.settings(
+            QDRANT_COLLECTION_SETTINGS={**COLLECTION_SETTINGS, "PAYLOAD_PROFILE": "filters"}
+        ):
+            output = self._run("--prune")
+
+        dropped = {
+            call.kwargs["field_name"] for call in self.qdrant.delete_payload_index.call_args_list
+        }
+        self.assertEqual(dropped, {"filename", "photo_path_id", "legacy"})
+        delete = self.qdrant.delete_payload.call_args.kwargs
+        self.assertEqual(delete["keys"], ["filename", "photo_path_id"])
+        self.assertEqual(delete["points"], models.Filter(must=[]))
+        self.assertIn("index legacy: not in schema (dropped)", output)
+
+    def test_backfills_location(self):
+        """lat / lng가 있고 location이 없는 포인트에 location을 채움"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, n_points=5)
+        points = self._image_collection()["points"]
+        for i in (0, 2, 3):
+            points[i][1].update({"lat": 35.0 + i, "lng": 129.0})
+
+        output = self._run("--batch-size", "2")
+
+        self.assertIn("payload location: backfill 3 points", output)
+        self.assertEqual(points[2][1]["location"], {"lat": 37.0, "lon": 129.0})
+        self.assertNotIn("location", points[1][1])
+        self.assertEqual(self.qdrant.batch_update_points.call_count, 2)
+
+        self.assertNotIn("backfill", self._run())
+
+    def test_dry_run(self):
+        """--dry-run은 차이만 출력"""
+        self.qdrant.add(IMAGE_COLLECTION_NAME, distance=models.Distance.DOT)
+
+        output = self._run("--dry-run")
+
+        self.assertIn("distance Dot -> Cosine", output)
+        self.assertIn("Plan: copy into a new collection", output)
+        self.qdrant.update_collection.assert_not_called()
+        self.assertEqual(set(self.qdrant.collections), {IMAGE_COLLECTION_NAME})
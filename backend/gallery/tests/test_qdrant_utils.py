@@ -1,10 +1,13 @@
 import gallery.qdrant_utils
-from django.test import TestCase
+import httpx
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock, call
 from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client import models
 
 from gallery.qdrant_utils import (
+    build_image_payload,
+    collection_quantization_config,
     get_qdrant_client,
     initialize_qdrant,
     IMAGE_COLLECTION_NAME,
@@ -19,8 +22,9 @@ class GetQdrantClientTest(TestCase):
     """Tests for get_qdrant_client function"""
 
     def setUp(self):
-        """Reset the singleton client before each test."""
-        gallery.qdrant_utils._qdrant_client = None
+        """Reset the client pool before each test."""
+        gallery.qdrant_utils._client_pool = None
+        self.addCleanup(setattr, gallery.qdrant_utils, '_client_pool', None)
 
     @patch('gallery.qdrant_utils.QdrantClient')
     def test_get_qdrant_client_returns_client(self, mock_qdrant_client_class):
@@ -28,23 +32,75 @@ class GetQdrantClientTest(TestCase):
         mock_client = MagicMock()
         mock_qdrant_client_class.return_value = mock_client
 
-        result = get_qdrant_client()
+        with self.settings(QDRANT_CLIENT_SETTINGS={"POOL_SIZE": 1}):
+            result = get_qdrant_client()
 
         # Verify QdrantClient was called with correct parameters
         mock_qdrant_client_class.assert_called_once_with(
             url=QDRANT_URL,
             api_key=QDRANT_API_KEY,
+            prefer_grpc=False,
+            grpc_port=6334,
+            timeout=10,
+            http2=False,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
         )
         self.assertEqual(result, mock_client)
 
     @patch('gallery.qdrant_utils.QdrantClient')
     def test_get_qdrant_client_uses_settings(self, mock_qdrant_client_class):
         """Test that get_qdrant_client uses Django settings"""
-        get_qdrant_client()
+        client_settings = {
+            "PREFER_GRPC": True,
+            "GRPC_PORT": 7334,
+            "HTTP2": True,
+            "TIMEOUT": 3,
+            "POOL_SIZE": 1,
+            "MAX_CONNECTIONS": 5,
+            "MAX_KEEPALIVE_CONNECTIONS": 2,
+        }
+        with self.settings(QDRANT_CLIENT_SETTINGS=client_settings):
+            get_qdrant_client()
 
         call_kwargs = mock_qdrant_client_class.call_args[1]
         self.assertIn('url', call_kwargs)
         self.assertIn('api_key', call_kwargs)
+        self.assertTrue(call_kwargs['prefer_grpc'])
+        self.assertEqual(call_kwargs['grpc_port'], 7334)
+        self.assertEqual(call_kwargs['timeout'], 3)
+        self.assertTrue(call_kwargs['http2'])
+        self.assertEqual(
+            call_kwargs['limits'], httpx.Limits(max_connections=5, max_keepalive_connections=2)
+        )
+
+    @patch('gallery.qdrant_utils.QdrantClient')
+    def test_get_qdrant_client_round_robin_pool(self, mock_qdrant_client_class):
+        """Test that clients are handed out round-robin from a per-process pool"""
+        mock_qdrant_client_class.side_effect = lambda **kwargs: MagicMock()
+
+        with self.settings(QDRANT_CLIENT_SETTINGS={"POOL_SIZE": 3}):
+            clients = [get_qdrant_client() for _ in range(6)]
+
+        self.assertEqual(mock_qdrant_client_class.call_count, 3)
+        self.assertEqual(len({id(client) for client in clients}), 3)
+        self.assertEqual(clients[:3], clients[3:])
+
+    @patch('gallery.qdrant_utils.os.getpid')
+    @patch('gallery.qdrant_utils.QdrantClient')
+    def test_get_qdrant_client_recreated_after_fork(self, mock_qdrant_client_class, mock_getpid):
+        """Test that a forked worker does not reuse the parent's clients"""
+        mock_qdrant_client_class.side_effect = lambda **kwargs: MagicMock()
+
+        with self.settings(QDRANT_CLIENT_SETTINGS={"POOL_SIZE": 1}):
+            mock_getpid.return_value = 100
+            parent_client = get_qdrant_client()
+            self.assertIs(get_qdrant_client(), parent_client)
+
+            mock_getpid.return_value = 200
+            child_client = get_qdrant_client()
+
+        self.assertIsNot(child_client, parent_client)
+        self.assertEqual(mock_qdrant_client_class.call_count, 2)
 
 
 class InitializeQdrantTest(TestCase):
@@ -101,6 +157,34 @@ class InitializeQdrantTest(TestCase):
         # Verify print statement
         mock_print.assert_called_with(f"Collection '{IMAGE_COLLECTION_NAME}' created.")
 
+    @override_settings(
+        QDRANT_COLLECTION_SETTINGS={
+            "QUANTIZATION": "scalar",
+            "ON_DISK_VECTORS": True,
+            "HNSW_M": 0,
+            "HNSW_PAYLOAD_M": 16,
+            "HNSW_EF_CONSTRUCT": 128,
+        }
+    )
+    @patch('gallery.qdrant_utils.get_qdrant_client')
+    def test_initialize_applies_collection_settings(self, mock_get_client):
+        """Test that new collections get quantization, HNSW and on-disk settings"""
+        mock_get_client.return_value = self.mock_client
+        self.mock_client.get_collection.side_effect = UnexpectedResponse(404, "Not Found", b"", {})
+
+        initialize_qdrant()
+
+        for create_call in self.mock_client.create_collection.call_args_list:
+            call_kwargs = create_call[1]
+            self.assertTrue(call_kwargs['vectors_config'].on_disk)
+            self.assertEqual(
+                call_kwargs['hnsw_config'],
+                models.HnswConfigDiff(m=0, payload_m=16, ef_construct=128),
+            )
+            self.assertEqual(
+                call_kwargs['quantization_config'].scalar.type, models.ScalarType.INT8
+            )
+
     @patch('gallery.qdrant_utils.get_qdrant_client')
     @patch('builtins.print')
     def test_initialize_creates_missing_repvec_collection(self, mock_print, mock_get_client):
@@ -145,6 +229,7 @@ class InitializeQdrantTest(TestCase):
         self.assertIn(IMAGE_COLLECTION_NAME, collection_names)
         self.assertIn(REPVEC_COLLECTION_NAME, collection_names)
 
+    @override_settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "full"})
     @patch('gallery.qdrant_utils.get_qdrant_client')
     def test_initialize_creates_image_collection_indexes(self, mock_get_client):
         """Test that image collection indexes are created"""
@@ -156,7 +241,7 @@ class InitializeQdrantTest(TestCase):
         initialize_qdrant()
 
         # Verify payload indexes were created for image collection
-        expected_fields = ["user_id", "filename", "photo_path_id", "created_at", "lat", "lng", "isTagged"]
+        expected_fields = ["user_id", "filename", "photo_path_id", "created_at", "lat", "lng"]
         
         create_index_calls = self.mock_client.create_payload_index.call_args_list
         created_fields = []
@@ -169,6 +254,26 @@ class InitializeQdrantTest(TestCase):
         for field in expected_fields:
             self.assertIn(field, created_fields)
 
+    @override_settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "minimal"})
+    @patch('gallery.qdrant_utils.get_qdrant_client')
+    def test_initialize_indexes_follow_payload_profile(self, mock_get_client):
+        """Test that only fields of the payload profile are indexed"""
+        mock_get_client.return_value = self.mock_client
+        self.mock_client.get_collection.side_effect = UnexpectedResponse(404, "Not Found", b"", {})
+
+        initialize_qdrant()
+
+        created_fields = {
+            collection: [
+                call_item[1]['field_name']
+                for call_item in self.mock_client.create_payload_index.call_args_list
+                if call_item[1]['collection_name'] == collection
+            ]
+            for collection in (IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME)
+        }
+        self.assertEqual(created_fields[IMAGE_COLLECTION_NAME], ["user_id"])
+        self.assertEqual(created_fields[REPVEC_COLLECTION_NAME], ["user_id", "tag_id"])
+
     @patch('gallery.qdrant_utils.get_qdrant_client')
     def test_initialize_creates_repvec_collection_indexes(self, mock_get_client):
         """Test that repvec collection indexes are created"""
@@ -230,7 +335,6 @@ class InitializeQdrantTest(TestCase):
             "created_at": models.PayloadSchemaType.DATETIME,
             "lat": models.PayloadSchemaType.FLOAT,
             "lng": models.PayloadSchemaType.FLOAT,
-            "isTagged": models.PayloadSchemaType.BOOL,
         }
 
         create_index_calls = self.mock_client.create_payload_index.call_args_list
@@ -286,3 +390,70 @@ class QdrantConstantsTest(TestCase):
         """Test that all collection names are unique"""
         names = [IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME, TAG_PRESET_COLLECTION_NAME]
         self.assertEqual(len(names), len(set(names)))
+
+
+class BuildImagePayloadTest(TestCase):
+    """Tests for build_image_payload"""
+
+    def _payload(self):
+        return build_image_payload(
+            user_id=1,
+            filename="a.jpg",
+            photo_path_id=7,
+            created_at="2025-01-01T00:00:00+00:00",
+            lat=None,
+            lng=None,
+            isTagged=False,
+        )
+
+    def test_filters_profile(self):
+        """Test that the filters profile drops filename / photo_path_id and None values"""
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            self.assertEqual(
+                self._payload(),
+                {"user_id": 1, "created_at": "2025-01-01T00:00:00+00:00", "isTagged": False},
+            )
+
+    def test_location_from_coordinates(self):
+        """Test that location is derived from lat / lng"""
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            payload = build_image_payload(user_id=1, lat=35.1, lng=129.0, isTagged=False)
+
+        self.assertEqual(payload["location"], {"lat": 35.1, "lon": 129.0})
+
+    def test_full_profile(self):
+        """Test that the full profile keeps every field"""
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "full"}):
+            self.assertEqual(self._payload()["photo_path_id"], 7)
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile raises ValueError"""
+        with (
+            self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "everything"}),
+            self.assertRaises(ValueError),
+        ):
+            self._payload()
+
+
+class CollectionQuantizationConfigTest(TestCase):
+    """Tests for collection_quantization_config"""
+
+    def test_quantization_modes(self):
+        """Test scalar, binary and disabled quantization"""
+        for mode, expected in [
+            ("scalar", models.ScalarQuantization),
+            ("binary", models.BinaryQuantization),
+        ]:
+            with self.settings(QDRANT_COLLECTION_SETTINGS={"QUANTIZATION": mode}):
+                self.assertIsInstance(collection_quantization_config(), expected)
+
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"QUANTIZATION": "none"}):
+            self.assertIsNone(collection_quantization_config())
+
+    def test_unknown_quantization(self):
+        """Test that an unknown mode raises ValueError"""
+        with (
+            self.settings(QDRANT_COLLECTION_SETTINGS={"QUANTIZATION": "product"}),
+            self.assertRaises(ValueError),
+        ):
+            collection_quantization_config()
@@ -0,0 +1,248 @@
+"""
+Query plan regression tests for hot gallery queries
+
+Each test runs a real view or task with the queries captured, then EXPLAINs
+every captured statement on gallery tables and fails if the plan contains a
+full table scan. Qdrant, Redis and Celery are mocked.
+"""
+
+import re
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..caption_graph import _caption_rows, build_caption_graph
+from ..models import Caption, Photo, Photo_Caption, Photo_Tag, Tag
+from ..tasks import (
+    recommend_photo_from_tag,
+    sample_untagged_photos,
+    tag_recommendation,
+    update_photo_tag_state,
+)
+
+GALLERY_TABLE = re.compile(r"\bgallery_\w+")
+# SQLite: "SCAN gallery_photo" (optionally "USING INDEX ..." = full index scan)
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (gallery_\w+)")
+
+
+def full_scans(sql):
+    """
+    EXPLAIN a captured statement.
+
+    Returns:
+        Names of gallery tables the plan reads in full
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            details = [row[-1] for row in cursor.fetchall()]
+            return [
+                match.group(1)
+                for detail in details
+                for match in [SQLITE_FULL_SCAN.search(detail)]
+                if match
+            ]
+
+        # MySQL: access type "ALL" is a full table scan
+        cursor.execute(f"EXPLAIN {sql}")
+        columns = [col[0] for col in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return [
+            row["table"]
+            for row in rows
+            if row["type"] == "ALL" and str(row["table"]).startswith("gallery_")
+        ]
+
+
+class QueryPlanTestBase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(username="other", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.tags = [Tag.objects.create(tag=f"태그{i}", user=self.user) for i in range(3)]
+        self.captions = [
+            Caption.objects.create(user=self.user, caption=f"캡션{i}") for i in range(3)
+        ]
+        self.photos = []
+        for i in range(6):
+            photo = Photo.objects.create(
+                user=self.user, photo_path_id=i, created_at=timezone.now()
+            )
+            self.photos.append(photo)
+            Photo_Caption.objects.create(
+                user=self.user, photo=photo, caption=self.captions[i % 3], weight=1
+            )
+            if i < 3:
+                Photo_Tag.objects.create(user=self.user, photo=photo, tag=self.tags[i])
+
+        # 다른 사용자 데이터 (user 조건이 실제로 걸러내야 하도록)
+        other_tag = Tag.objects.create(tag="태그0", user=self.other)
+        other_photo = Photo.objects.create(
+            user=self.other, photo_path_id=0, created_at=timezone.now()
+        )
+        Photo_Tag.objects.create(user=self.other, photo=other_photo, tag=other_tag)
+
+    def assert_no_full_scan(self, func):
+        """func 실행 중 gallery 테이블을 읽는 모든 쿼리에 full scan이 없어야 함"""
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+
+        checked = 0
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not GALLERY_TABLE.search(sql) or not sql.lstrip().upper().startswith(
+                ("SELECT", "UPDATE", "DELETE")
+            ):
+                continue
+            checked += 1
+            scans = full_scans(sql)
+            self.assertEqual(scans, [], f"Full scan on {scans}:\n{sql}")
+
+        self.assertGreater(checked, 0, "No gallery query was captured")
+        return result
+
+
+class ViewQueryPlanTest(QueryPlanTestBase):
+    """views.py 쿼리 플랜"""
+
+    def test_photo_list(self):
+        """사진 목록 (offset, cursor)"""
+        url = reverse("gallery:photos")
+        response = self.assert_no_full_scan(lambda: self.client.get(url, {"limit": 2}))
+        cursor = response.headers["X-Next-Cursor"]
+
+        self.assert_no_full_scan(lambda: self.client.get(url, {"limit": 2, "cursor": cursor}))
+
+    def test_photos_by_tag(self):
+        """태그 앨범"""
+        url = reverse("gallery:photos_by_tag", kwargs={"tag_id": self.tags[0].tag_id})
+
+        self.assert_no_full_scan(lambda: self.client.get(url))
+
+    @patch("gallery.views.reverse_geocode", return_value="서울")
+    def test_photo_detail(self, mock_reverse_geocode):
+        """사진 상세"""
+        url = reverse("gallery:photo_detail", kwargs={"photo_id": self.photos[0].photo_id})
+
+        self.assert_no_full_scan(lambda: self.client.get(url))
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_photo_delete(self, mock_get_client, mock_compute):
+        """사진 삭제 (cascade 포함)"""
+        url = reverse("gallery:photo_detail", kwargs={"photo_id": self.photos[0].photo_id})
+
+        self.assert_no_full_scan(lambda: self.client.delete(url))
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_bulk_delete(self, mock_get_client, mock_compute):
+        """여러 사진 삭제"""
+        url = reverse("gallery:photos_bulk_delete")
+        data = {"photos": [{"photo_id": str(p.photo_id)} for p in self.photos[:2]]}
+
+        self.assert_no_full_scan(lambda: self.client.post(url, data, format="json"))
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_post_photo_tags(self, mock_compute):
+        """사진에 태그 추가"""
+        url = reverse("gallery:photo_tags", kwargs={"photo_id": self.photos[4].photo_id})
+        data = [{"tag_id": str(self.tags[0].tag_id)}]
+
+        self.assert_no_full_scan(lambda: self.client.post(url, data, format="json"))
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_delete_photo_tag(self, mock_compute):
+        """사진에서 태그 삭제"""
+        url = reverse(
+            "gallery:delete_photo_tag",
+            kwargs={"photo_id": self.photos[0].photo_id, "tag_id": self.tags[0].tag_id},
+        )
+
+        self.assert_no_full_scan(lambda: self.client.delete(url))
+
+    def test_tag_list_and_create(self):
+        """태그 목록, 태그 생성"""
+        url = reverse("gallery:tags")
+
+        self.assert_no_full_scan(lambda: self.client.get(url))
+        self.assert_no_full_scan(lambda: self.client.post(url, {"tag": "새태그"}, format="json"))
+
+
+class TaskQueryPlanTest(QueryPlanTestBase):
+    """tasks.py, caption_graph.py 쿼리 플랜"""
+
+    @patch("gallery.tasks.get_caption_graph")
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_recommend_photo_from_tag(self, mock_get_client, mock_get_graph):
+        point = MagicMock()
+        point.id = str(self.photos[4].photo_id)
+        point.score = 0.9
+        mock_get_client.return_value.recommend.return_value = [point]
+        mock_get_graph.return_value = build_caption_graph(self.user.id)
+
+        self.assert_no_full_scan(lambda: recommend_photo_from_tag(self.user, self.tags[0].tag_id))
+
+    @patch("gallery.tasks.get_preset_index")
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_tag_recommendation(self, mock_get_client, mock_get_index):
+        mock_client = mock_get_client.return_value
+        point = MagicMock()
+        point.vector = [0.1, 0.2]
+        mock_client.retrieve.return_value = [point]
+        repvec = MagicMock()
+        repvec.payload = {"tag_id": str(self.tags[1].tag_id)}
+        repvec.score = 0.9
+        mock_client.search.return_value = [repvec]
+        mock_get_index.return_value.search.return_value = [("태그0", 0.8)]
+
+        self.assert_no_full_scan(lambda: tag_recommendation(self.user, self.photos[4].photo_id))
+
+    def test_sample_untagged_photos(self):
+        self.assert_no_full_scan(lambda: sample_untagged_photos(self.user, 2))
+
+    def test_update_photo_tag_state(self):
+        self.assert_no_full_scan(
+            lambda: update_photo_tag_state([p.photo_id for p in self.photos[:2]])
+        )
+
+    def test_caption_graph_rows(self):
+        """캡션 그래프 전체 생성, 증분 갱신 조회"""
+        new_ids = [self.photos[5].photo_id]
+
+        self.assert_no_full_scan(lambda: list(_caption_rows(self.user.id)))
+        self.assert_no_full_scan(lambda: list(_caption_rows(self.user.id, new_ids)))
+
+    def test_hybrid_search_caption_bonus(self):
+        """하이브리드 검색의 캡션 보너스 조회"""
+        queryset = Photo_Caption.objects.filter(
+            user=self.user,
+            photo_id__in=[p.photo_id for p in self.photos],
+            caption__caption__in=["캡션0"],
+        ).values("photo_id")
+
+        self.assert_no_full_scan(lambda: list(queryset))
+
+    def test_unknown_user_rows_are_not_scanned(self):
+        """다른 사용자의 행만 있는 조건도 인덱스로 처리"""
+        self.assert_no_full_scan(
+            lambda: list(Photo_Tag.objects.filter(user=self.other, tag_id=uuid.uuid4()))
+        )
+
+    def test_harness_detects_full_scan(self):
+        """인덱스 없는 조건은 full scan으로 검출 (하네스 자체 검증)"""
+        with CaptureQueriesContext(connection) as ctx:
+            list(Photo.objects.filter(filename="a.jpg"))
+
+        self.assertEqual(full_scans(ctx.captured_queries[0]["sql"]), ["gallery_photo"])
@@ -0,0 +1,257 @@
+"""
+Tests for gallery/reconcile.py and the reconcile_vectors command
+
+Qdrant is replaced by an in-memory fake that pages scroll results in id
+order; Celery is mocked.
+"""
+
+import uuid
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from qdrant_client.http import models
+
+from ..models import Photo, Tag, VectorOutbox
+from ..qdrant_utils import IMAGE_COLLECTION_NAME, REPVEC_COLLECTION_NAME
+from ..reconcile import merge_join, reconcile_photos
+
+
+class FakeQdrant:
+    """scroll/facet/batch_update_points(삭제, set_payload)만 흉내내는 Qdrant (id 순서로 페이지 반환)"""
+
+    def __init__(self):
+        self.collections = {IMAGE_COLLECTION_NAME: {}, REPVEC_COLLECTION_NAME: {}}
+        self.scroll_limits = []
+        self.batch_update_points = MagicMock(side_effect=self._batch_update_points)
+
+    def add(self, collection, point_id, payload):
+        self.collections[collection][str(point_id)] = payload
+
+    def _matches(self, payload, scroll_filter):
+        condition = scroll_filter.must[0]
+        if isinstance(condition, models.IsEmptyCondition):
+            return "user_id" not in payload
+        return payload.get("user_id") == condition.match.value
+
+    def scroll(self, collection_name, scroll_filter, limit, offset, with_payload, with_vectors):
+        self.scroll_limits.append(limit)
+        points = sorted(
+            (
+                SimpleNamespace(id=point_id, payload=payload)
+                for point_id, payload in self.collections[collection_name].items()
+                if self._matches(payload, scroll_filter)
+            ),
+            key=lambda point: uuid.UUID(point.id).int,
+        )
+        start = offset or 0
+        next_offset = start + limit if start + limit < len(points) else None
+        return points[start : start + limit], next_offset
+
+    def facet(self, collection_name, key, limit, exact):
+        values = {p[key] for p in self.collections[collection_name].values() if key in p}
+        return SimpleNamespace(hits=[SimpleNamespace(value=v, count=1) for v in values])
+
+    def _batch_update_points(self, collection_name, update_operations, wait):
+        for operation in update_operations:
+            if isinstance(operation, models.SetPayloadOperation):
+                for point_id in operation.set_payload.filter.must[0].has_id:
+                    self.collections[collection_name][point_id].update(
+                        operation.set_payload.payload
+                    )
+                continue
+            for point_id in operation.delete.points:
+                self.collections[collection_name].pop(point_id, None)
+
+    def _operations(self, operation_type):
+        return [
+            operation
+            for call in self.batch_update_points.call_args_list
+            for operation in call.kwargs["update_operations"]
+            if isinstance(operation, operation_type)
+        ]
+
+    def deleted_batches(self):
+        return [operation.delete.points for operation in self._operations(models.DeleteOperation)]
+
+    def set_payload_batches(self):
+        return [
+            operation.set_payload.filter.must[0].has_id
+            for operation in self._operations(models.SetPayloadOperation)
+        ]
+
+
+class MergeJoinTest(TestCase):
+    """merge_join 함수 테스트"""
+
+    def test_classifies_rows_and_points(self):
+        ids = sorted((uuid.uuid4() for _ in range(4)), key=lambda u: u.int)
+        rows = [{"photo_id": ids[0]}, {"photo_id": ids[1]}, {"photo_id": ids[3]}]
+        points = [SimpleNamespace(id=str(ids[1])), SimpleNamespace(id=str(ids[2]))]
+
+        result = [
+            (row["photo_id"] if row else None, point.id if point else None)
+            for row, point in merge_join(rows, points)
+        ]
+
+        self.assertEqual(
+            result,
+            [(ids[0], None), (ids[1], str(ids[1])), (None, str(ids[2])), (ids[3], None)],
+        )
+
+    def test_unsorted_stream_raises(self):
+        """정렬되지 않은 입력은 잘못된 삭제 대신 예외"""
+        ids = sorted((uuid.uuid4() for _ in range(2)), key=lambda u: u.int)
+        points = [SimpleNamespace(id=str(ids[1])), SimpleNamespace(id=str(ids[0]))]
+
+        with self.assertRaises(RuntimeError):
+            list(merge_join([], points))
+
+
+@patch("gallery.reconcile.process_and_embed_photos_batch.delay")
+class ReconcileVectorsCommandTest(TestCase):
+    """reconcile_vectors 커맨드 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.qdrant = FakeQdrant()
+        for name in (
+            "gallery.outbox.get_qdrant_client",
+            "gallery.management.commands.reconcile_vectors.get_qdrant_client",
+        ):
+            patcher = patch(name, return_value=self.qdrant)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.photos = [
+            Photo.objects.create(
+                user=self.user, photo_path_id=i, filename=f"{i}.jpg", created_at=timezone.now()
+            )
+            for i in range(5)
+        ]
+        # 0~2번 사진만 Qdrant에 있음
+        for photo in self.photos[:3]:
+            self.qdrant.add(
+                IMAGE_COLLECTION_NAME,
+                photo.photo_id,
+                {"user_id": self.user.id, "isTagged": False},
+            )
+
+        self.orphan = uuid.uuid4()
+        self.qdrant.add(IMAGE_COLLECTION_NAME, self.orphan, {"user_id": self.user.id})
+        self.deleted_user_point = uuid.uuid4()
+        self.qdrant.add(IMAGE_COLLECTION_NAME, self.deleted_user_point, {"user_id": 999})
+        self.unowned_point = uuid.uuid4()
+        self.qdrant.add(IMAGE_COLLECTION_NAME, self.unowned_point, {})
+
+        self.tag = Tag.objects.create(tag="태그", user=self.user)
+        self.rep = uuid.uuid4()
+        self.qdrant.add(
+            REPVEC_COLLECTION_NAME,
+            self.rep,
+            {"user_id": self.user.id, "tag_id": str(self.tag.tag_id)},
+        )
+        self.orphan_rep = uuid.uuid4()
+        self.qdrant.add(
+            REPVEC_COLLECTION_NAME,
+            self.orphan_rep,
+            {"user_id": self.user.id, "tag_id": str(uuid.uuid4())},
+        )
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("reconcile_vectors", "--batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_fixes_all_differences(self, mock_embed):
+        output = self._run()
+
+        self.assertEqual(
+            set(self.qdrant.collections[IMAGE_COLLECTION_NAME]),
+            {str(photo.photo_id) for photo in self.photos[:3]},
+        )
+        self.assertEqual(set(self.qdrant.collections[REPVEC_COLLECTION_NAME]), {str(self.rep)})
+        self.assertFalse(VectorOutbox.objects.exists())
+
+        embedded = [
+            meta["storage_key"] for call in mock_embed.call_args_list for meta in call.args[0]
+        ]
+        self.assertEqual(
+            sorted(embedded), sorted(str(photo.photo_id) for photo in self.photos[3:])
+        )
+        self.assertEqual(mock_embed.call_args.args[0][0]["user_id"], self.user.id)
+
+        self.assertIn(
+            "Fixed 3 orphan points, 2 missing points, 0 stale tag states, 1 orphan rep vectors",
+            output,
+        )
+
+    def test_dry_run_changes_nothing(self, mock_embed):
+        output = self._run("--dry-run")
+
+        self.assertEqual(len(self.qdrant.collections[IMAGE_COLLECTION_NAME]), 6)
+        self.assertEqual(len(self.qdrant.collections[REPVEC_COLLECTION_NAME]), 2)
+        self.qdrant.batch_update_points.assert_not_called()
+        mock_embed.assert_not_called()
+        self.assertIn(
+            "Found 3 orphan points, 2 missing points, 0 stale tag states, 1 orphan rep vectors",
+            output,
+        )
+
+    def test_pages_are_bounded_by_batch_size(self, mock_embed):
+        """모든 조회와 삭제가 batch size 이하"""
+        with CaptureQueriesContext(connection) as ctx:
+            self._run()
+
+        photo_pages = [q["sql"] for q in ctx.captured_queries if 'FROM "gallery_photo"' in q["sql"]]
+        # 사용자 1: 2 + 2 + 1행, 사용자 999: 빈 페이지
+        self.assertEqual(len(photo_pages), 4)
+        for sql in photo_pages:
+            self.assertIn("LIMIT 2", sql)
+        self.assertEqual(set(self.qdrant.scroll_limits), {2})
+        for points in self.qdrant.deleted_batches():
+            self.assertLessEqual(len(points), 2)
+
+    def test_single_user(self, mock_embed):
+        """--user-id는 해당 사용자만 처리"""
+        self._run("--user-id", str(self.user.id))
+
+        remaining = set(self.qdrant.collections[IMAGE_COLLECTION_NAME])
+        self.assertIn(str(self.deleted_user_point), remaining)
+        self.assertIn(str(self.unowned_point), remaining)
+        self.assertNotIn(str(self.orphan), remaining)
+
+    def test_soft_deleted_photo_point_is_orphan(self, mock_embed):
+        """삭제 표시된 사진의 포인트는 고아로 처리"""
+        Photo.objects.filter(photo_id=self.photos[0].photo_id).update(is_deleted=True)
+
+        stats = reconcile_photos(self.qdrant, self.user.id, batch_size=2, dry_run=True)
+
+        self.assertEqual((stats.orphan_points, stats.missing_points), (2, 2))
+
+    def test_backfills_is_tagged(self, mock_embed):
+        """isTagged가 없거나 DB와 다른 포인트는 photo.is_tagged로 채움"""
+        Photo.objects.filter(photo_id=self.photos[0].photo_id).update(is_tagged=True)
+        del self.qdrant.collections[IMAGE_COLLECTION_NAME][str(self.photos[1].photo_id)]["isTagged"]
+
+        output = self._run("--user-id", str(self.user.id))
+
+        points = self.qdrant.collections[IMAGE_COLLECTION_NAME]
+        self.assertEqual(
+            [points[str(photo.photo_id)]["isTagged"] for photo in self.photos[:3]],
+            [True, False, False],
+        )
+        self.assertEqual(
+            sorted(map(sorted, self.qdrant.set_payload_batches())),
+            sorted([[str(self.photos[0].photo_id)], [str(self.photos[1].photo_id)]]),
+        )
+        self.assertFalse(VectorOutbox.objects.exists())
+        self.assertIn("2 stale tag states", output)
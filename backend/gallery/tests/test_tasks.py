@@ -6,24 +6,41 @@ All external dependencies (Qdrant, Redis, Celery) are mocked.
 
 import uuid
 import json
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.utils import timezone
 import numpy as np
 
-from ..models import Tag, Photo, Photo_Tag, Photo_Caption, Caption
+from qdrant_client.http.exceptions import ResponseHandlingException
+from search.filters import SearchFilters
+
+from ..models import Tag, Photo, Photo_Tag, Photo_Caption, Caption, VectorOutbox
+from ..qdrant_utils import IMAGE_COLLECTION_NAME
 from ..tasks import (
     recommend_photo_from_tag,
     recommend_photo_from_photo,
     tag_recommendation,
     tag_recommendation_batch,
+    tag_recommendation_many,
     retrieve_all_rep_vectors_of_tag,
     retrieve_photo_caption_graph,
     execute_hybrid_search,
     is_valid_uuid,
     generate_stories_task,
+    sample_untagged_photos,
+    update_photo_tag_state,
     compute_and_store_rep_vectors,
+    soft_delete_photos,
+    purge_deleted_photos,
+    purge_reuploaded_photos,
+    cleanup_purged_photos,
+    sweep_deleted_photos,
+    drain_vector_outbox,
 )
 
 
@@ -48,6 +65,30 @@ class RecommendPhotoFromTagTest(TestCase):
             created_at=timezone.now(),
         )
 
+        # 그래프 캐시 버전 확인용 Redis
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = patch("gallery.caption_graph.get_redis")
+        mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        mock_redis.pipeline.return_value.execute.return_value = ["0", 0]
+
+    def _create_photo(self, photo_path_id):
+        return Photo.objects.create(
+            user=self.user, photo_path_id=photo_path_id, created_at=timezone.now()
+        )
+
+    def _caption(self, photo, caption, weight=1):
+        Photo_Caption.objects.create(
+            user=self.user, photo=photo, caption=caption, weight=weight
+        )
+
+    def _point(self, photo, score):
+        point = MagicMock()
+        point.id = str(photo.photo_id)
+        point.score = score
+        return point
+
     @patch("gallery.tasks.get_qdrant_client")
     def test_recommend_photo_from_tag_with_results(self, mock_get_client):
         """태그 기반 사진 추천 - 정상 결과"""
@@ -102,6 +143,87 @@ class RecommendPhotoFromTagTest(TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["photo_id"], str(self.photo2.photo_id))
 
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_recommend_photo_from_tag_pushes_exclusion_to_qdrant(self, mock_get_client):
+        """태그된 사진 제외를 Qdrant 필터로 처리 (over-fetch 없음)"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag)
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.recommend.return_value = []
+
+        recommend_photo_from_tag(self.user, self.tag.tag_id)
+
+        call_kwargs = mock_client.recommend.call_args.kwargs
+        self.assertEqual(call_kwargs["limit"], 40)
+        must_not = call_kwargs["query_filter"].must_not
+        self.assertEqual(must_not[0].has_id, [str(self.photo1.photo_id)])
+
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_graph_scores_rerank_vector_results(self, mock_get_client):
+        """태그 사진과 캡션을 공유하는 사진이 그래프 점수로 앞섬"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag)
+        photo3 = self._create_photo(103)
+        sea = Caption.objects.create(user=self.user, caption="바다")
+        sky = Caption.objects.create(user=self.user, caption="하늘")
+        self._caption(self.photo1, sea, weight=3)
+        self._caption(photo3, sea, weight=3)
+        self._caption(self.photo2, sky)
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        # 벡터 점수 차이는 작고 photo2가 앞섬
+        mock_client.recommend.return_value = [
+            self._point(self.photo2, 0.81),
+            self._point(photo3, 0.80),
+        ]
+
+        results = recommend_photo_from_tag(self.user, self.tag.tag_id)
+
+        self.assertEqual(
+            [r["photo_id"] for r in results],
+            [str(photo3.photo_id), str(self.photo2.photo_id)],
+        )
+
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_graph_candidates_outside_vector_results(self, mock_get_client):
+        """벡터 검색 결과에 없는 사진도 그래프 후보로 추가"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag)
+        sea = Caption.objects.create(user=self.user, caption="바다")
+        self._caption(self.photo1, sea)
+        self._caption(self.photo2, sea)
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.recommend.return_value = []
+
+        results = recommend_photo_from_tag(self.user, self.tag.tag_id)
+
+        self.assertEqual([r["photo_id"] for r in results], [str(self.photo2.photo_id)])
+
+    @override_settings(GRAPH_RECOMMENDATION_SETTINGS={"FUSION_WEIGHT": 0.0})
+    @patch("gallery.tasks.get_caption_graph")
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_graph_disabled_by_zero_weight(self, mock_get_client, mock_get_graph):
+        """FUSION_WEIGHT가 0이면 그래프를 읽지 않고 벡터 순서 유지"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag)
+        photo3 = self._create_photo(103)
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.recommend.return_value = [
+            self._point(self.photo2, 0.9),
+            self._point(photo3, 0.8),
+        ]
+
+        results = recommend_photo_from_tag(self.user, self.tag.tag_id)
+
+        mock_get_graph.assert_not_called()
+        self.assertEqual(
+            [r["photo_id"] for r in results],
+            [str(self.photo2.photo_id), str(photo3.photo_id)],
+        )
+
 
 class RecommendPhotoFromPhotoTest(TestCase):
     """recommend_photo_from_photo 함수 테스트"""
@@ -161,6 +283,11 @@ class TagRecommendationTest(TestCase):
         self.tag1 = Tag.objects.create(tag="태그1", user=self.user)
         self.tag2 = Tag.objects.create(tag="태그2", user=self.user)
 
+        preset_index_patcher = patch("gallery.tasks.get_preset_index")
+        self.mock_preset_index = preset_index_patcher.start().return_value
+        self.addCleanup(preset_index_patcher.stop)
+        self.mock_preset_index.search.return_value = []
+
     @patch("gallery.tasks.get_qdrant_client")
     def test_tag_recommendation_success(self, mock_get_client):
         """태그 추천 성공"""
@@ -172,13 +299,7 @@ class TagRecommendationTest(TestCase):
         mock_retrieved_point.vector = [0.1, 0.2, 0.3]
         mock_client.retrieve.return_value = [mock_retrieved_point]
 
-        # Mock search - two calls: preset search, then user search
-        # First call: preset search (returns empty)
-        mock_preset_result = MagicMock()
-        mock_preset_result.payload = {"name": "preset_tag"}
-        mock_preset_result.score = 0.8
-
-        # Second call: user tag search
+        # Mock user tag search (preset index returns empty)
         mock_search_result1 = MagicMock()
         mock_search_result1.payload = {"tag_id": str(self.tag1.tag_id)}
         mock_search_result1.score = 0.9
@@ -186,10 +307,9 @@ class TagRecommendationTest(TestCase):
         mock_search_result2.payload = {"tag_id": str(self.tag2.tag_id)}
         mock_search_result2.score = 0.7
 
-        mock_client.search.side_effect = [
-            [],  # preset search returns empty
-            [mock_search_result1, mock_search_result2]  # user tag search
-        ]
+        mock_client.search.return_value = [
+            mock_search_result1, mock_search_result2
+        ]  # user tag search (preset search returns empty)
 
         results = tag_recommendation(self.user, self.photo.photo_id)
 
@@ -230,10 +350,8 @@ class TagRecommendationTest(TestCase):
         mock_search_result.payload = {"tag_id": str(uuid.uuid4())}
         mock_search_result.score = 0.8
 
-        mock_client.search.side_effect = [
-            [],  # preset search returns empty
-            [mock_search_result]  # user tag search with nonexistent tag
-        ]
+        # user tag search with nonexistent tag (preset search returns empty)
+        mock_client.search.return_value = [mock_search_result]
 
         results = tag_recommendation(self.user, self.photo.photo_id)
 
@@ -250,20 +368,15 @@ class TagRecommendationTest(TestCase):
         mock_retrieved_point.vector = [0.1, 0.2, 0.3]
         mock_client.retrieve.return_value = [mock_retrieved_point]
 
-        # Mock preset search result
-        mock_preset_result = MagicMock()
-        mock_preset_result.payload = {"name": "여행"}
-        mock_preset_result.score = 0.95
+        # Mock preset search result (in-memory preset index)
+        self.mock_preset_index.search.return_value = [("여행", 0.95)]
 
         # Mock user tag search result
         mock_user_result = MagicMock()
         mock_user_result.payload = {"tag_id": str(self.tag1.tag_id)}
         mock_user_result.score = 0.85
 
-        mock_client.search.side_effect = [
-            [mock_preset_result],  # preset search
-            [mock_user_result]  # user tag search
-        ]
+        mock_client.search.return_value = [mock_user_result]  # user tag search
 
         results = tag_recommendation(self.user, self.photo.photo_id)
 
@@ -289,19 +402,14 @@ class TagRecommendationTest(TestCase):
         mock_client.retrieve.return_value = [mock_retrieved_point]
 
         # Mock preset search - returns a tag user doesn't have yet
-        mock_preset_result = MagicMock()
-        mock_preset_result.payload = {"name": "추천태그"}
-        mock_preset_result.score = 0.95
+        self.mock_preset_index.search.return_value = [("추천태그", 0.95)]
 
         # Mock user tag search
         mock_user_result = MagicMock()
         mock_user_result.payload = {"tag_id": str(self.tag1.tag_id)}
         mock_user_result.score = 0.85
 
-        mock_client.search.side_effect = [
-            [mock_preset_result],  # preset search
-            [mock_user_result]  # user tag search
-        ]
+        mock_client.search.return_value = [mock_user_result]  # user tag search
 
         results = tag_recommendation(self.user, self.photo.photo_id)
 
@@ -317,6 +425,112 @@ class TagRecommendationTest(TestCase):
         self.assertEqual(results[1]['is_preset'], False)
 
 
+class TagRecommendationManyTest(TestCase):
+    """tag_recommendation_many 함수 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.photo1 = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=501,
+            created_at=timezone.now(),
+        )
+        self.photo2 = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=502,
+            created_at=timezone.now(),
+        )
+        self.photo3 = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=503,
+            created_at=timezone.now(),
+        )
+        self.tag1 = Tag.objects.create(tag="태그1", user=self.user)
+        self.owned_preset = Tag.objects.create(tag="바다", user=self.user)
+
+        preset_index_patcher = patch("gallery.tasks.get_preset_index")
+        self.mock_preset_index = preset_index_patcher.start().return_value
+        self.addCleanup(preset_index_patcher.stop)
+
+    def _point(self, photo, vector):
+        point = MagicMock()
+        point.id = str(photo.photo_id)
+        point.vector = vector
+        return point
+
+    def _result(self, payload):
+        result = MagicMock()
+        result.payload = payload
+        return result
+
+    def test_tag_recommendation_many_empty_input(self):
+        """빈 입력 처리"""
+        self.assertEqual(tag_recommendation_many(self.user, []), {})
+
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_tag_recommendation_many_batches_searches(self, mock_get_client):
+        """retrieve 1회, preset 메모리 검색 1회, search_batch 1회, Tag 조회 1회로 처리"""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        # photo3은 아직 임베딩되지 않음
+        mock_client.retrieve.return_value = [
+            self._point(self.photo1, [0.1, 0.2]),
+            self._point(self.photo2, [0.3, 0.4]),
+        ]
+        # preset 검색 (메모리 인덱스)
+        self.mock_preset_index.search_batch.return_value = [
+            [("여행", 0.9), ("바다", 0.8)],
+            [("음식", 0.7)],
+        ]
+        # 사용자 태그 검색
+        mock_client.search_batch.return_value = [
+            [self._result({"tag_id": str(self.tag1.tag_id)})],
+            [self._result({"tag_id": str(uuid.uuid4())})],
+        ]
+
+        photo_ids = [self.photo1.photo_id, self.photo2.photo_id, self.photo3.photo_id]
+        with self.assertNumQueries(1):
+            results = tag_recommendation_many(self.user, photo_ids)
+
+        mock_client.retrieve.assert_called_once()
+        self.mock_preset_index.search_batch.assert_called_once()
+        mock_client.search_batch.assert_called_once()
+        self.assertEqual(len(mock_client.search_batch.call_args.kwargs["requests"]), 2)
+
+        self.assertEqual(
+            results[str(self.photo1.photo_id)],
+            [
+                {"tag": "여행", "tag_id": "", "is_preset": True},
+                {"tag": "태그1", "tag_id": str(self.tag1.tag_id), "is_preset": False},
+            ],
+        )
+        # 존재하지 않는 태그는 무시됨
+        self.assertEqual(
+            results[str(self.photo2.photo_id)],
+            [{"tag": "음식", "tag_id": "", "is_preset": True}],
+        )
+        self.assertEqual(results[str(self.photo3.photo_id)], [])
+
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_tag_recommendation_many_no_vectors(self, mock_get_client):
+        """임베딩된 사진이 없는 경우 검색하지 않음"""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.retrieve.return_value = []
+
+        results = tag_recommendation_many(self.user, [self.photo1.photo_id])
+
+        self.assertEqual(results, {str(self.photo1.photo_id): []})
+        self.mock_preset_index.search_batch.assert_not_called()
+        mock_client.search_batch.assert_not_called()
+
+
 class TagRecommendationBatchTest(TestCase):
     """tag_recommendation_batch 함수 테스트 (통합)"""
 
@@ -342,8 +556,11 @@ class TagRecommendationBatchTest(TestCase):
         results = tag_recommendation_batch(self.user, [])
         self.assertEqual(results, {})
 
+    @patch("gallery.tasks.get_preset_index")
     @patch("gallery.tasks.get_qdrant_client")
-    def test_tag_recommendation_batch_with_results(self, mock_get_client):
+    def test_tag_recommendation_batch_with_results(
+        self, mock_get_client, mock_get_preset_index
+    ):
         """배치 태그 추천 성공 (preset + user tags)"""
         # Create tags
         user_tag1 = Tag.objects.create(tag="사용자태그1", user=self.user)
@@ -363,13 +580,11 @@ class TagRecommendationBatchTest(TestCase):
         
         mock_client.retrieve.return_value = [mock_point1, mock_point2]
 
-        # Mock search results (preset + user tags)
-        # photo1에 대한 preset 검색 결과
-        mock_preset1 = MagicMock()
-        mock_preset1.payload = {"name": "프리셋태그1"}
-        
-        mock_preset2 = MagicMock()
-        mock_preset2.payload = {"name": "프리셋태그2"}
+        # preset 검색 결과 (메모리 인덱스, photo1, photo2 순서)
+        mock_get_preset_index.return_value.search_batch.return_value = [
+            [("프리셋태그1", 0.9), ("프리셋태그2", 0.8)],
+            [("프리셋태그3", 0.7)],
+        ]
 
         # photo1에 대한 user tag 검색 결과
         mock_user_tag1 = MagicMock()
@@ -379,17 +594,12 @@ class TagRecommendationBatchTest(TestCase):
         mock_user_tag2.payload = {"tag_id": str(user_tag2.tag_id)}
 
         # photo2에 대한 검색 결과
-        mock_preset3 = MagicMock()
-        mock_preset3.payload = {"name": "프리셋태그3"}
-        
         mock_user_tag3 = MagicMock()
         mock_user_tag3.payload = {"tag_id": str(user_tag1.tag_id)}
 
-        # search 호출 순서: photo1 preset, photo1 user, photo2 preset, photo2 user
-        mock_client.search.side_effect = [
-            [mock_preset1, mock_preset2],  # photo1 preset
+        # 사용자 태그 검색은 search_batch 한 번 (photo1, photo2 순서)
+        mock_client.search_batch.return_value = [
             [mock_user_tag1, mock_user_tag2],  # photo1 user tags
-            [mock_preset3],  # photo2 preset
             [mock_user_tag3],  # photo2 user tags
         ]
 
@@ -416,7 +626,38 @@ class TagRecommendationBatchTest(TestCase):
 
         # Mock 호출 검증
         mock_client.retrieve.assert_called_once()
-        self.assertEqual(mock_client.search.call_count, 4)  # 2 photos * 2 searches each
+        mock_client.search_batch.assert_called_once()
+        self.assertEqual(len(mock_client.search_batch.call_args.kwargs["requests"]), 2)
+        mock_client.search.assert_not_called()
+        mock_get_preset_index.return_value.search_batch.assert_called_once()
+
+    @patch("gallery.tasks.get_preset_index")
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_tag_recommendation_batch_falls_back_to_per_photo_search(
+        self, mock_get_client, mock_get_preset_index
+    ):
+        """search_batch 실패 시 사진별 검색으로 대체"""
+        user_tag = Tag.objects.create(tag="사용자태그", user=self.user)
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        mock_point = MagicMock()
+        mock_point.id = str(self.photo1.photo_id)
+        mock_point.vector = [0.1, 0.2, 0.3]
+        mock_client.retrieve.return_value = [mock_point]
+
+        mock_get_preset_index.return_value.search_batch.return_value = [[]]
+
+        mock_user_tag = MagicMock()
+        mock_user_tag.payload = {"tag_id": str(user_tag.tag_id)}
+        mock_client.search_batch.side_effect = Exception("batch not supported")
+        mock_client.search.return_value = [mock_user_tag]
+
+        results = tag_recommendation_batch(self.user, [str(self.photo1.photo_id)])
+
+        self.assertEqual(results, {str(self.photo1.photo_id): ["사용자태그"]})
+        mock_client.search.assert_called_once()
 
 
 class RetrieveAllRepVectorsOfTagTest(TestCase):
@@ -481,6 +722,14 @@ class RetrievePhotoCaptionGraphTest(TestCase):
         self.caption1 = Caption.objects.create(user=self.user, caption="캡션1")
         self.caption2 = Caption.objects.create(user=self.user, caption="캡션2")
 
+        # 그래프 캐시 버전 확인용 Redis
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = patch("gallery.caption_graph.get_redis")
+        mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        mock_redis.pipeline.return_value.execute.return_value = ["0", 0]
+
     def test_retrieve_photo_caption_graph_empty(self):
         """사진-캡션 관계가 없는 경우"""
         photo_set, caption_set, graph = retrieve_photo_caption_graph(self.user)
@@ -615,6 +864,26 @@ class ExecuteHybridSearchTest(TestCase):
 
         self.assertEqual(results, [])
 
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_execute_hybrid_search_date_filter(self, mock_get_client):
+        """기간 필터는 recommend 필터와 직접 태그된 사진 조회에 모두 적용"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag)
+        mock_client = mock_get_client.return_value
+        mock_client.recommend.return_value = []
+        future = timezone.now() + timedelta(days=1)
+
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            results = execute_hybrid_search(
+                user=self.user,
+                tag_ids=[self.tag.tag_id],
+                query_string="",
+                filters=SearchFilters(date_from=future),
+            )
+
+        # photo1은 기간 밖이므로 recommend의 positive로도 쓰이지 않음
+        self.assertEqual(results, [])
+        mock_client.recommend.assert_not_called()
+
 
 class IsValidUuidTest(TestCase):
     """is_valid_uuid 함수 테스트"""
@@ -632,6 +901,122 @@ class IsValidUuidTest(TestCase):
         self.assertFalse(is_valid_uuid(""))
 
 
+class UpdatePhotoTagStateTest(TestCase):
+    """update_photo_tag_state / enqueue_tag_state 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.photo1 = Photo.objects.create(
+            user=self.user, photo_path_id=901, created_at=timezone.now()
+        )
+        self.photo2 = Photo.objects.create(
+            user=self.user, photo_path_id=902, created_at=timezone.now()
+        )
+        self.tag1 = Tag.objects.create(tag="태그1", user=self.user)
+        self.tag2 = Tag.objects.create(tag="태그2", user=self.user)
+
+    @patch("gallery.outbox.schedule_drain")
+    def test_updates_tag_count_and_is_tagged(self, mock_drain):
+        """tag_count, is_tagged 갱신과 isTagged set_payload outbox 기록"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag1)
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag2)
+
+        photo_ids = [self.photo1.photo_id, self.photo2.photo_id]
+        update_photo_tag_state(photo_ids)
+
+        self.photo1.refresh_from_db()
+        self.photo2.refresh_from_db()
+        self.assertEqual((self.photo1.tag_count, self.photo1.is_tagged), (2, True))
+        self.assertEqual((self.photo2.tag_count, self.photo2.is_tagged), (0, False))
+
+        payloads = {
+            entry.data["payload"]["isTagged"]: entry.point_ids
+            for entry in VectorOutbox.objects.filter(operation=VectorOutbox.OP_SET_PAYLOAD)
+        }
+        self.assertEqual(
+            payloads,
+            {True: [str(self.photo1.photo_id)], False: [str(self.photo2.photo_id)]},
+        )
+        mock_drain.assert_called_once()
+
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_qdrant_error_keeps_outbox_entry(self, mock_get_client):
+        """Qdrant 오류 시 DB 갱신은 유지되고 set_payload는 outbox에 남아 재시도"""
+        mock_get_client.return_value.batch_update_points.side_effect = (
+            ResponseHandlingException(Exception("Qdrant down"))
+        )
+        Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=self.tag1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_photo_tag_state([self.photo1.photo_id])
+
+        self.photo1.refresh_from_db()
+        self.assertTrue(self.photo1.is_tagged)
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(entry.data["payload"], {"isTagged": True})
+        self.assertEqual(entry.attempts, 1)
+
+    @patch("gallery.outbox.schedule_drain")
+    def test_empty_photo_ids(self, mock_drain):
+        """빈 목록이면 아무것도 기록하지 않음"""
+        update_photo_tag_state([])
+
+        self.assertFalse(VectorOutbox.objects.exists())
+        mock_drain.assert_not_called()
+
+
+class SampleUntaggedPhotosTest(TestCase):
+    """sample_untagged_photos 함수 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.photos = [
+            Photo.objects.create(
+                user=self.user, photo_path_id=800 + i, created_at=timezone.now()
+            )
+            for i in range(10)
+        ]
+        tag = Tag.objects.create(tag="태그", user=self.user)
+        self.tagged = self.photos[:3]
+        for photo in self.tagged:
+            Photo_Tag.objects.create(user=self.user, photo=photo, tag=tag)
+        Photo.refresh_tag_state([photo.photo_id for photo in self.tagged])
+
+    def test_returns_requested_size_without_duplicates(self):
+        """요청한 개수만큼 중복 없이 반환"""
+        for _ in range(5):
+            photos = sample_untagged_photos(self.user, 4)
+            self.assertEqual(len(photos), 4)
+            self.assertEqual(len({photo.photo_id for photo in photos}), 4)
+
+    def test_wraps_around_to_return_all_untagged(self):
+        """기준점 이후가 부족하면 처음부터 이어서 읽음"""
+        photos = sample_untagged_photos(self.user, 100)
+
+        self.assertEqual(
+            {photo.photo_id for photo in photos},
+            {photo.photo_id for photo in self.photos[3:]},
+        )
+
+    def test_excludes_given_ids(self):
+        """exclude_ids에 있는 사진 제외"""
+        excluded = {str(photo.photo_id) for photo in self.photos[3:6]}
+
+        photos = sample_untagged_photos(self.user, 100, exclude_ids=excluded)
+
+        self.assertEqual(len(photos), 4)
+        self.assertFalse({str(photo.photo_id) for photo in photos} & excluded)
+
+    def test_single_query_per_range(self):
+        """ORDER BY RAND() 없이 인덱스 구간 조회 최대 2회"""
+        with self.assertNumQueries(2):
+            sample_untagged_photos(self.user, 100)
+
+
 class GenerateStoriesTaskTest(TestCase):
     """generate_stories_task Celery 작업 테스트"""
 
@@ -653,30 +1038,54 @@ class GenerateStoriesTaskTest(TestCase):
             created_at=timezone.now(),
         )
 
+    def _pushed_stories(self, mock_redis):
+        call_args = mock_redis.pipeline.return_value.rpush.call_args
+        self.assertEqual(call_args[0][0], f"story_pool:{self.user.id}")
+        return [json.loads(item) for item in call_args[0][1:]]
+
     @patch("config.redis.get_redis")
     @patch("gallery.tasks.tag_recommendation_batch")
     def test_generate_stories_task_success(self, mock_tag_batch, mock_get_redis):
-        """스토리 생성 작업 성공"""
+        """스토리 생성 후 스토리 풀에 추가"""
         mock_tag_batch.return_value = {
             str(self.photo1.photo_id): ["태그1", "태그2"],
             str(self.photo2.photo_id): ["태그3"],
         }
 
         mock_redis = MagicMock()
+        mock_redis.lrange.return_value = []
         mock_get_redis.return_value = mock_redis
 
         generate_stories_task(self.user.id, 10)
 
-        # Redis에 저장 확인
-        mock_redis.set.assert_called_once()
-        call_args = mock_redis.set.call_args
-        saved_data = json.loads(call_args[0][1])
-
+        # 스토리 풀에 추가 확인
+        saved_data = self._pushed_stories(mock_redis)
         self.assertEqual(len(saved_data), 2)
         self.assertIn("photo_id", saved_data[0])
         self.assertIn("photo_path_id", saved_data[0])
         self.assertIn("tags", saved_data[0])
 
+        # 리필 락 해제 확인
+        mock_redis.delete.assert_called_once_with(f"story_pool_lock:{self.user.id}")
+
+    @patch("config.redis.get_redis")
+    @patch("gallery.tasks.tag_recommendation_batch")
+    def test_generate_stories_task_skips_pooled_photos(
+        self, mock_tag_batch, mock_get_redis
+    ):
+        """이미 풀에 있는 사진은 다시 생성하지 않음"""
+        mock_tag_batch.return_value = {str(self.photo2.photo_id): []}
+
+        mock_redis = MagicMock()
+        mock_redis.lrange.return_value = [
+            json.dumps({"photo_id": str(self.photo1.photo_id), "photo_path_id": 701, "tags": []})
+        ]
+        mock_get_redis.return_value = mock_redis
+
+        generate_stories_task(self.user.id, 10)
+
+        mock_tag_batch.assert_called_once_with(self.user, [str(self.photo2.photo_id)])
+
     @patch("config.redis.get_redis")
     @patch("gallery.tasks.tag_recommendation_batch")
     def test_generate_stories_task_no_photos(self, mock_tag_batch, mock_get_redis):
@@ -685,17 +1094,20 @@ class GenerateStoriesTaskTest(TestCase):
         tag = Tag.objects.create(tag="태그", user=self.user)
         Photo_Tag.objects.create(user=self.user, photo=self.photo1, tag=tag)
         Photo_Tag.objects.create(user=self.user, photo=self.photo2, tag=tag)
+        Photo.refresh_tag_state([self.photo1.photo_id, self.photo2.photo_id])
 
         mock_tag_batch.return_value = {}
         mock_redis = MagicMock()
+        mock_redis.lrange.return_value = []
         mock_get_redis.return_value = mock_redis
 
         generate_stories_task(self.user.id, 10)
 
-        # 빈 리스트가 저장되어야 함
-        call_args = mock_redis.set.call_args
-        saved_data = json.loads(call_args[0][1])
-        self.assertEqual(len(saved_data), 0)
+        # 풀에 추가하지 않고 잠시 리필을 중단
+        mock_redis.pipeline.assert_not_called()
+        mock_redis.set.assert_called_once_with(
+            f"story_pool_exhausted:{self.user.id}", 1, ex=60
+        )
 
     @patch("config.redis.get_redis")
     @patch("gallery.tasks.tag_recommendation_batch")
@@ -705,13 +1117,16 @@ class GenerateStoriesTaskTest(TestCase):
         """예외 처리 테스트"""
         mock_tag_batch.side_effect = Exception("Batch processing failed")
         mock_redis = MagicMock()
+        mock_redis.lrange.return_value = []
         mock_get_redis.return_value = mock_redis
 
         # 예외가 발생해도 함수가 종료되어야 함 (로그만 출력)
         generate_stories_task(self.user.id, 10)
 
-        # Redis에 저장되지 않아야 함
+        # Redis에 저장되지 않아야 하고 락은 해제되어야 함
+        mock_redis.pipeline.assert_not_called()
         mock_redis.set.assert_not_called()
+        mock_redis.delete.assert_called_once_with(f"story_pool_lock:{self.user.id}")
 
 
 class ComputeAndStoreRepVectorsTest(TestCase):
@@ -735,6 +1150,11 @@ class ComputeAndStoreRepVectorsTest(TestCase):
             self.photos.append(photo)
             Photo_Tag.objects.create(user=self.user, photo=photo, tag=self.tag)
 
+        # outbox.barrier의 drain 락 (Redis)
+        patcher = patch("gallery.outbox.get_redis")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("gallery.tasks.get_qdrant_client")
     def test_compute_and_store_rep_vectors_success(self, mock_get_client):
         """rep vector 계산 및 저장 성공"""
@@ -752,17 +1172,68 @@ class ComputeAndStoreRepVectorsTest(TestCase):
 
         compute_and_store_rep_vectors(self.user.id, self.tag.tag_id)
 
-        # delete 호출 확인 (기존 rep vector 삭제)
-        mock_client.delete.assert_called_once()
+        # 기존 rep vector 삭제(필터)와 새 rep vector upsert가 순서대로 outbox에 기록
+        delete_entry, upsert_entry = VectorOutbox.objects.order_by("pk")
+        self.assertEqual(delete_entry.operation, VectorOutbox.OP_DELETE)
+        self.assertIn("filter", delete_entry.data)
+        self.assertEqual(upsert_entry.operation, VectorOutbox.OP_UPSERT)
+        points_to_upsert = upsert_entry.data["points"]
 
-        # upsert 호출 확인 (새 rep vector 저장)
-        mock_client.upsert.assert_called_once()
-        upsert_call_args = mock_client.upsert.call_args
-        points_to_upsert = upsert_call_args[1]["points"]
+        # 사진 벡터를 읽기 전에 대기 중인 쓰기가 반영됨 (barrier_points)
+        sync = mock_client.batch_update_points.call_args
+        self.assertEqual(sync.kwargs["collection_name"], IMAGE_COLLECTION_NAME)
+        self.assertTrue(sync.kwargs["wait"])
 
         # ML 모델이 적용되어 대표 벡터가 생성되어야 함
         self.assertGreater(len(points_to_upsert), 0)
 
+    @override_settings(
+        REP_VECTOR_SETTINGS={
+            "CLUSTERING_BACKEND": "hdbscan",
+            "MIN_SAMPLES_FOR_ML": 10,
+            "MAX_REP_VECTORS": 4,
+        }
+    )
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_compute_and_store_rep_vectors_caps_noisy_tag(self, mock_get_client):
+        """outlier가 많은 태그도 MAX_REP_VECTORS 이하로 저장"""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        # 서로 무관한 벡터들 -> 대부분 outlier
+        rng = np.random.default_rng(0)
+        mock_points = []
+        for _ in self.photos:
+            mock_point = MagicMock()
+            mock_point.vector = rng.normal(size=512).tolist()
+            mock_points.append(mock_point)
+
+        mock_client.retrieve.return_value = mock_points
+
+        compute_and_store_rep_vectors(self.user.id, self.tag.tag_id)
+
+        upsert_entry = VectorOutbox.objects.get(operation=VectorOutbox.OP_UPSERT)
+        points_to_upsert = upsert_entry.data["points"]
+        self.assertLessEqual(len(points_to_upsert), 4)
+        self.assertGreater(len(points_to_upsert), 0)
+
+    @patch("gallery.tasks.get_qdrant_client")
+    def test_compute_and_store_rep_vectors_reads_photo_ids_once(self, mock_get_client):
+        """태그 사진 id는 Photo 행을 사진마다 조회하지 않고 한 번에 읽음"""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.retrieve.return_value = []
+
+        with CaptureQueriesContext(connection) as ctx:
+            compute_and_store_rep_vectors(self.user.id, self.tag.tag_id)
+
+        photo_queries = [
+            q["sql"] for q in ctx.captured_queries if 'FROM "gallery_photo"' in q["sql"]
+        ]
+        self.assertEqual(photo_queries, [])
+        retrieved_ids = mock_client.retrieve.call_args.kwargs["ids"]
+        self.assertEqual(sorted(retrieved_ids), sorted(str(p.photo_id) for p in self.photos))
+
     @patch("gallery.tasks.get_qdrant_client")
     def test_compute_and_store_rep_vectors_no_photos(self, mock_get_client):
         """사진이 없는 태그"""
@@ -774,11 +1245,9 @@ class ComputeAndStoreRepVectorsTest(TestCase):
 
         compute_and_store_rep_vectors(self.user.id, empty_tag.tag_id)
 
-        # delete 호출 확인
-        mock_client.delete.assert_called_once()
-
-        # upsert는 호출되지 않아야 함
-        mock_client.upsert.assert_not_called()
+        # 기존 rep vector 삭제만 기록, upsert는 없음
+        entry = VectorOutbox.objects.get()
+        self.assertEqual(entry.operation, VectorOutbox.OP_DELETE)
 
     @patch("gallery.tasks.get_qdrant_client")
     def test_compute_and_store_rep_vectors_few_samples(self, mock_get_client):
@@ -809,10 +1278,8 @@ class ComputeAndStoreRepVectorsTest(TestCase):
 
         compute_and_store_rep_vectors(self.user.id, few_tag.tag_id)
 
-        # upsert 호출 확인
-        mock_client.upsert.assert_called_once()
-        upsert_call_args = mock_client.upsert.call_args
-        points_to_upsert = upsert_call_args[1]["points"]
+        upsert_entry = VectorOutbox.objects.get(operation=VectorOutbox.OP_UPSERT)
+        points_to_upsert = upsert_entry.data["points"]
 
         # 샘플이 적으면 모든 벡터가 rep vector가 됨
         self.assertEqual(len(points_to_upsert), 3)
@@ -827,5 +1294,195 @@ class ComputeAndStoreRepVectorsTest(TestCase):
         # 예외가 발생해도 함수가 종료되어야 함
         compute_and_store_rep_vectors(self.user.id, self.tag.tag_id)
 
-        # upsert는 호출되지 않아야 함
-        mock_client.upsert.assert_not_called()
+        # 기존 rep vector도 지우지 않음 (아무것도 기록되지 않음)
+        self.assertFalse(VectorOutbox.objects.exists())
+
+
+@override_settings(PHOTO_DELETE_SETTINGS={"CHUNK_SIZE": 2})
+class PurgeDeletedPhotosTest(TestCase):
+    """soft_delete_photos / purge_deleted_photos / drain_vector_outbox 테스트"""
+
+    def setUp(self):
+        # drain 락 (Redis)
+        patcher = patch("gallery.outbox.get_redis")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.photos = [
+            Photo.objects.create(user=self.user, photo_path_id=950 + i, created_at=timezone.now())
+            for i in range(5)
+        ]
+        self.tag1 = Tag.objects.create(tag="태그1", user=self.user)
+        self.tag2 = Tag.objects.create(tag="태그2", user=self.user)
+        for photo in self.photos:
+            Photo_Tag.objects.create(user=self.user, photo=photo, tag=self.tag1)
+        Photo_Tag.objects.create(user=self.user, photo=self.photos[0], tag=self.tag2)
+
+    def _ids(self, photos):
+        return [str(photo.photo_id) for photo in photos]
+
+    @patch("gallery.tasks.purge_deleted_photos.delay")
+    def test_soft_delete_hides_photos(self, mock_purge):
+        """삭제 표시된 사진은 기본 매니저에서 제외, 행은 purge 전까지 유지"""
+        marked = soft_delete_photos(self.user.id, self._ids(self.photos[:2]))
+
+        self.assertEqual(marked, 2)
+        self.assertEqual(Photo.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Photo.all_objects.filter(user=self.user).count(), 5)
+        mock_purge.assert_called_once_with(self.user.id, self._ids(self.photos[:2]))
+
+    @patch("gallery.tasks.purge_deleted_photos.delay")
+    def test_soft_delete_ignores_other_users_photos(self, mock_purge):
+        """다른 사용자의 사진은 표시하지 않고 purge도 예약하지 않음"""
+        other = User.objects.create_user(username="other", password="testpass123")
+
+        marked = soft_delete_photos(other.id, self._ids(self.photos))
+
+        self.assertEqual(marked, 0)
+        self.assertEqual(Photo.objects.filter(user=self.user).count(), 5)
+        mock_purge.assert_not_called()
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_purge_deletes_in_chunks(self, mock_get_client, mock_compute):
+        """청크별 outbox 항목을 delete 하나로 합쳐 반영, 태그별 재계산은 한 번만"""
+        photo_ids = self._ids(self.photos)
+        Photo.objects.filter(photo_id__in=photo_ids).update(is_deleted=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purge_deleted_photos(self.user.id, photo_ids)
+
+        self.assertFalse(Photo.all_objects.filter(user=self.user).exists())
+        self.assertFalse(Photo_Tag.objects.filter(user=self.user).exists())
+        mock_client = mock_get_client.return_value
+        mock_client.batch_update_points.assert_called_once()
+        operations = mock_client.batch_update_points.call_args.kwargs["update_operations"]
+        self.assertEqual(
+            [operation.delete.points for operation in operations], [photo_ids]
+        )
+        self.assertFalse(VectorOutbox.objects.exists())
+        self.assertEqual(
+            sorted(call.args[1] for call in mock_compute.call_args_list),
+            sorted([str(self.tag1.tag_id), str(self.tag2.tag_id)]),
+        )
+        self.tag1.refresh_from_db()
+        self.assertEqual((self.tag1.photo_count, self.tag1.thumbnail_path_id), (0, None))
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_purge_skips_unmarked_photos(self, mock_get_client, mock_compute):
+        """삭제 표시가 없는 사진은 지우지 않음"""
+        with self.captureOnCommitCallbacks(execute=True):
+            purge_deleted_photos(self.user.id, self._ids(self.photos[:2]))
+
+        self.assertEqual(Photo.objects.filter(user=self.user).count(), 5)
+        mock_get_client.return_value.batch_update_points.assert_not_called()
+        mock_compute.assert_not_called()
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_qdrant_failure_keeps_outbox_entry(self, mock_get_client, mock_compute):
+        """Qdrant 삭제 실패 시 MySQL 삭제는 유지하고 outbox에 남겨 재시도"""
+        mock_client = mock_get_client.return_value
+        mock_client.batch_update_points.side_effect = ResponseHandlingException(
+            Exception("down")
+        )
+        photo_ids = self._ids(self.photos[:2])
+        Photo.objects.filter(photo_id__in=photo_ids).update(is_deleted=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purge_deleted_photos(self.user.id, photo_ids)
+
+        self.assertFalse(Photo.all_objects.filter(photo_id__in=photo_ids).exists())
+        entry = VectorOutbox.objects.get()
+        self.assertEqual((entry.point_ids, entry.attempts), (photo_ids, 1))
+
+        mock_client.batch_update_points.side_effect = None
+        self.assertEqual(drain_vector_outbox(), 1)
+
+        self.assertFalse(VectorOutbox.objects.exists())
+        kwargs = mock_client.batch_update_points.call_args.kwargs
+        self.assertEqual(kwargs["collection_name"], entry.collection)
+        self.assertEqual(kwargs["update_operations"][0].delete.points, photo_ids)
+
+    @patch("gallery.tasks.delete_photo")
+    @patch("gallery.tasks.cleanup_purged_photos.delay")
+    @patch("gallery.outbox.schedule_drain")
+    def test_reupload_deletes_rows_and_defers_cleanup(
+        self, mock_drain, mock_cleanup, mock_delete_photo
+    ):
+        """다시 업로드되는 사진은 행 삭제와 outbox 기록만 하고 나머지 정리는 예약"""
+        Photo.objects.filter(photo_id=self.photos[0].photo_id).update(is_deleted=True)
+        path_ids = [self.photos[0].photo_path_id, self.photos[1].photo_path_id]
+
+        self.assertEqual(purge_reuploaded_photos(self.user.id, path_ids), 1)
+
+        self.assertFalse(Photo.all_objects.filter(photo_id=self.photos[0].photo_id).exists())
+        self.assertTrue(Photo.objects.filter(photo_id=self.photos[1].photo_id).exists())
+        self.assertEqual(VectorOutbox.objects.get().point_ids, self._ids(self.photos[:1]))
+        mock_delete_photo.assert_not_called()
+        user_id, photo_ids, tag_ids = mock_cleanup.call_args.args
+        self.assertEqual((user_id, photo_ids), (self.user.id, self._ids(self.photos[:1])))
+        self.assertEqual(sorted(tag_ids), sorted([str(self.tag1.tag_id), str(self.tag2.tag_id)]))
+
+    @patch("gallery.tasks.delete_photo")
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    def test_cleanup_purged_photos(self, mock_compute, mock_delete_photo):
+        """업로드 파일 삭제, 태그 요약 갱신, 대표 벡터 재계산 예약"""
+        photo_id = str(self.photos[0].photo_id)
+        Tag.refresh_summary([self.tag2.tag_id])
+        self.assertEqual(Tag.objects.get(tag_id=self.tag2.tag_id).photo_count, 1)
+        Photo.all_objects.filter(photo_id=photo_id).delete()
+
+        cleanup_purged_photos(self.user.id, [photo_id], [str(self.tag2.tag_id)])
+
+        mock_delete_photo.assert_called_once_with(photo_id)
+        mock_compute.assert_called_once_with(self.user.id, str(self.tag2.tag_id))
+        self.assertEqual(Tag.objects.get(tag_id=self.tag2.tag_id).photo_count, 0)
+
+    @override_settings(PHOTO_DELETE_SETTINGS={"CHUNK_SIZE": 2, "SWEEP_GRACE_PERIOD": 600})
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_sweep_purges_after_failed_purge(self, mock_get_client, mock_compute):
+        """purge가 실패해 남은 삭제 표시 사진은 유예 시간이 지나면 sweep이 지움"""
+        photo_ids = self._ids(self.photos[:2])
+        with patch("gallery.tasks.purge_deleted_photos.delay") as mock_purge:
+            soft_delete_photos(self.user.id, photo_ids)
+        with patch("gallery.tasks.outbox.enqueue_delete", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                purge_deleted_photos(*mock_purge.call_args.args)
+        self.assertEqual(Photo.all_objects.filter(is_deleted=True).count(), 2)
+
+        # 유예 시간 전에는 건드리지 않음
+        self.assertEqual(sweep_deleted_photos(), 0)
+
+        Photo.all_objects.filter(photo_id=photo_ids[0]).update(
+            deleted_at=timezone.now() - timedelta(seconds=601)
+        )
+        Photo.all_objects.filter(photo_id=photo_ids[1]).update(deleted_at=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sweep_deleted_photos(), 2)
+
+        self.assertFalse(Photo.all_objects.filter(photo_id__in=photo_ids).exists())
+        self.assertEqual(Photo.objects.filter(user=self.user).count(), 3)
+        operations = mock_get_client.return_value.batch_update_points.call_args.kwargs[
+            "update_operations"
+        ]
+        self.assertEqual(sorted(operations[0].delete.points), sorted(photo_ids))
+
+    @override_settings(VECTOR_OUTBOX_SETTINGS={"MAX_ATTEMPTS": 3, "DRAIN_BATCH_SIZE": 10})
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_drain_skips_exhausted_entries(self, mock_get_client):
+        """MAX_ATTEMPTS 이상 실패한 항목은 재시도하지 않음"""
+        VectorOutbox.objects.create(
+            collection="my_image_collection",
+            operation=VectorOutbox.OP_DELETE,
+            point_ids=["a"],
+            attempts=3,
+        )
+
+        self.assertEqual(drain_vector_outbox(), 0)
+        mock_get_client.return_value.batch_update_points.assert_not_called()
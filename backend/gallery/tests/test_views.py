@@ -8,7 +8,9 @@ import uuid
 import json
 from io import BytesIO
 from unittest.mock import MagicMock, patch
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
@@ -16,6 +18,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from PIL import Image
 
+from ..geocoding import RegionIndex
 from ..models import Photo, Tag, Photo_Tag
 
 
@@ -91,6 +94,49 @@ class PhotoViewTest(TestCase):
         # Verify batch processing called
         mock_process.assert_called_once()
 
+    @patch("gallery.tasks.cleanup_purged_photos.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    @patch("gallery.tasks.purge_deleted_photos.delay")
+    @patch("gallery.views.get_redis")
+    @patch("gallery.views.process_and_embed_photos_batch.delay")
+    @patch("gallery.views.upload_photo")
+    def test_post_photo_after_delete_before_purge(
+        self, mock_upload, mock_process, mock_get_redis, mock_purge, mock_get_client, mock_cleanup
+    ):
+        """삭제 후 purge 전에 같은 사진을 다시 올리면 새 사진으로 저장, 나머지 정리는 비동기"""
+        mock_upload.side_effect = lambda data: uuid.uuid4()
+        deleted = Photo.objects.create(
+            user=self.user, photo_path_id=101, filename="test1.jpg", created_at=timezone.now()
+        )
+        self.client.delete(reverse("gallery:photo_detail", kwargs={"photo_id": deleted.photo_id}))
+        metadata = [
+            {
+                "filename": "test1.jpg",
+                "photo_path_id": 101,
+                "created_at": "2024-01-01T00:00:00Z",
+                "lat": 37.5,
+                "lng": 127.0,
+            }
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {"photo": [self.make_test_image()], "metadata": json.dumps(metadata)},
+                format="multipart",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        photo = Photo.objects.get(user=self.user, photo_path_id=101)
+        self.assertNotEqual(photo.photo_id, deleted.photo_id)
+        self.assertFalse(Photo.all_objects.filter(photo_id=deleted.photo_id).exists())
+        mock_process.assert_called_once()
+        operation = mock_get_client.return_value.batch_update_points.call_args.kwargs[
+            "update_operations"
+        ][0]
+        self.assertEqual(operation.delete.points, [str(deleted.photo_id)])
+        mock_cleanup.assert_called_once_with(self.user.id, [str(deleted.photo_id)], [])
+
     def test_post_photo_missing_metadata(self):
         """metadata 누락 시 400 에러"""
         photo = BytesIO(b"fake_image")
@@ -178,6 +224,44 @@ class PhotoViewTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_get_photos_cursor_pagination(self):
+        """X-Next-Cursor로 끝까지 조회 (같은 created_at은 photo_id로 구분)"""
+        created_at = timezone.now()
+        for i in range(25):
+            Photo.objects.create(
+                user=self.user,
+                photo_path_id=100 + i,
+                created_at=created_at if i < 10 else created_at - timezone.timedelta(hours=i),
+            )
+
+        response = self.client.get(self.url, {"limit": 10})
+        seen = [p["photo_id"] for p in response.data]
+        cursor = response.headers.get("X-Next-Cursor")
+        while cursor:
+            response = self.client.get(self.url, {"limit": 10, "cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(p["photo_id"] for p in response.data)
+            cursor = response.headers.get("X-Next-Cursor")
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_get_photos_offset_and_cursor_conflict(self):
+        """offset과 cursor 동시 사용 불가"""
+        Photo.objects.create(user=self.user, photo_path_id=100, created_at=timezone.now())
+        Photo.objects.create(user=self.user, photo_path_id=101, created_at=timezone.now())
+        cursor = self.client.get(self.url, {"limit": 1}).headers["X-Next-Cursor"]
+
+        response = self.client.get(self.url, {"offset": 0, "limit": 1, "cursor": cursor})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_photos_invalid_cursor(self):
+        """잘못된 cursor 파라미터"""
+        response = self.client.get(self.url, {"limit": 10, "cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_photo_unauthenticated(self):
         """인증되지 않은 사용자"""
         self.client.force_authenticate(user=None)
@@ -225,10 +309,13 @@ class PhotoDetailViewTest(TestCase):
 
         self.url = reverse('gallery:photo_detail', kwargs={'photo_id': self.photo.photo_id})
 
-    @patch("gallery.views.get_redis")
-    @patch("gallery.views.requests.get")
-    def test_get_photo_detail_success(self, mock_requests_get, mock_get_redis):
-        """사진 상세 정보 조회 성공"""
+    @patch("gallery.geocoding.get_region_index")
+    @patch("gallery.geocoding.get_redis")
+    @patch("gallery.geocoding.requests.get")
+    def test_get_photo_detail_success(self, mock_requests_get, mock_get_redis, mock_get_index):
+        """사진 상세 정보 조회 성공 (지역 데이터 범위 밖 → Kakao)"""
+        mock_get_index.return_value = RegionIndex([], [])
+
         # Mock Redis
         mock_redis = MagicMock()
         mock_redis.get.return_value = None  # Cache miss
@@ -238,7 +325,7 @@ class PhotoDetailViewTest(TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
-            "results": [{"formatted_address": "서울특별시 강남구"}]
+            "documents": [{"address_name": "서울특별시 강남구 역삼동"}]
         }
         mock_requests_get.return_value = mock_response
 
@@ -246,8 +333,23 @@ class PhotoDetailViewTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["photo_path_id"], 12345)
+        self.assertEqual(response.data["address"], "서울특별시 강남구 역삼동")
         self.assertEqual(len(response.data["tags"]), 2)
 
+    @patch("gallery.geocoding.get_region_index")
+    @patch("gallery.geocoding.requests.get")
+    def test_get_photo_detail_local_address(self, mock_requests_get, mock_get_index):
+        """지역 데이터 범위 안의 좌표는 Kakao 호출 없이 주소 조회"""
+        mock_get_index.return_value = RegionIndex(
+            ["서울특별시 서초구 서초2동"], [(37.49, 127.01)]
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["address"], "서울특별시 서초구 서초2동")
+        mock_requests_get.assert_not_called()
+
     def test_get_photo_detail_not_found(self):
         """존재하지 않는 사진"""
         fake_id = uuid.uuid4()
@@ -256,26 +358,40 @@ class PhotoDetailViewTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch("gallery.views.compute_and_store_rep_vectors.delay")
-    @patch("gallery.views.get_qdrant_client")
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
     def test_delete_photo_success(self, mock_get_client, mock_compute):
         """사진 삭제 성공"""
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        response = self.client.delete(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         
         # Verify photo deleted from DB
         self.assertFalse(Photo.objects.filter(photo_id=self.photo.photo_id).exists())
         
-        # Verify Qdrant delete called
-        mock_client.delete.assert_called_once()
+        # Verify Qdrant delete applied through the outbox
+        mock_client.batch_update_points.assert_called_once()
+        operation = mock_client.batch_update_points.call_args.kwargs["update_operations"][0]
+        self.assertEqual(operation.delete.points, [str(self.photo.photo_id)])
         
         # Verify rep vectors recomputation triggered
         self.assertEqual(mock_compute.call_count, 2)  # 2 tags
 
+    @patch("gallery.tasks.purge_deleted_photos.delay")
+    def test_deleted_photo_hidden_before_purge(self, mock_purge):
+        """purge 전에도 삭제한 사진은 조회되지 않음"""
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        mock_purge.assert_called_once_with(self.user.id, [str(self.photo.photo_id)])
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        photos = self.client.get(reverse("gallery:photos")).json()
+        self.assertNotIn(str(self.photo.photo_id), [p["photo_id"] for p in photos])
+
 
 class BulkDeletePhotoViewTest(TestCase):
     """BulkDeletePhotoView 테스트"""
@@ -302,8 +418,8 @@ class BulkDeletePhotoViewTest(TestCase):
 
         self.url = reverse('gallery:photos_bulk_delete')
 
-    @patch("gallery.views.compute_and_store_rep_vectors.delay")
-    @patch("gallery.views.get_qdrant_client")
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
     def test_bulk_delete_photos_success(self, mock_get_client, mock_compute):
         """여러 사진 삭제 성공"""
         mock_client = MagicMock()
@@ -376,6 +492,148 @@ class GetPhotosByTagViewTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_photos_by_tag_cursor_pagination(self):
+        """limit 지정 시 X-Next-Cursor 헤더로 다음 페이지 조회"""
+        base = timezone.now()
+        for i in range(3):
+            photo = Photo.objects.create(
+                user=self.user,
+                photo_path_id=200 + i,
+                created_at=base - timezone.timedelta(days=i + 1),
+            )
+            Photo_Tag.objects.create(user=self.user, photo=photo, tag=self.tag)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(p["photo_path_id"] for p in response.data)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+        self.assertEqual(seen[-3:], [200, 201, 202])
+
+    def test_get_photos_by_tag_without_limit_returns_all(self):
+        """limit이 없으면 전체 목록, 커서 헤더 없음"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 2)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_get_photos_by_tag_invalid_cursor(self):
+        """잘못된 커서"""
+        response = self.client.get(self.url, {"limit": 2, "cursor": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_photos_by_tag_invalid_limit(self):
+        """범위를 벗어난 limit"""
+        response = self.client.get(self.url, {"limit": 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryCountRegressionTest(TestCase):
+    """결과 크기와 무관하게 쿼리 수가 일정한지 검사 (N+1 회귀 방지)"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _create_tagged_photos(self, count, tags):
+        start = Photo.objects.filter(user=self.user).count()
+        photos = []
+        for i in range(start, start + count):
+            photo = Photo.objects.create(
+                user=self.user, photo_path_id=i, created_at=timezone.now()
+            )
+            for tag in tags:
+                Photo_Tag.objects.create(user=self.user, photo=photo, tag=tag)
+            photos.append(photo)
+        return photos
+
+    def _count_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return len(ctx.captured_queries)
+
+    def test_photos_by_tag_query_count(self):
+        """태그 앨범 조회"""
+        small = Tag.objects.create(tag="small", user=self.user)
+        large = Tag.objects.create(tag="large", user=self.user)
+        self._create_tagged_photos(2, [small])
+        self._create_tagged_photos(30, [large])
+
+        def fetch(tag):
+            url = reverse("gallery:photos_by_tag", kwargs={"tag_id": tag.tag_id})
+            return lambda: self.client.get(url)
+
+        self.assertEqual(self._count_queries(fetch(small)), self._count_queries(fetch(large)))
+        self.assertEqual(self._count_queries(fetch(large)), 2)
+
+    @patch("gallery.views.get_redis")
+    def test_photo_detail_query_count(self, mock_get_redis):
+        """사진 상세 조회 (태그 목록)"""
+        mock_get_redis.return_value.get.return_value = "서울"
+        few_tags = [Tag.objects.create(tag=f"a{i}", user=self.user) for i in range(1)]
+        many_tags = [Tag.objects.create(tag=f"b{i}", user=self.user) for i in range(20)]
+        (photo_few,) = self._create_tagged_photos(1, few_tags)
+        (photo_many,) = self._create_tagged_photos(1, many_tags)
+
+        def fetch(photo):
+            url = reverse("gallery:photo_detail", kwargs={"photo_id": photo.photo_id})
+            return lambda: self.client.get(url)
+
+        self.assertEqual(
+            self._count_queries(fetch(photo_few)), self._count_queries(fetch(photo_many))
+        )
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_photo_delete_tag_lookup_query_count(self, mock_get_client, mock_compute):
+        """사진 삭제 시 재계산할 태그 조회"""
+        few_tags = [Tag.objects.create(tag=f"a{i}", user=self.user) for i in range(1)]
+        many_tags = [Tag.objects.create(tag=f"b{i}", user=self.user) for i in range(20)]
+        (photo_few,) = self._create_tagged_photos(1, few_tags)
+        (photo_many,) = self._create_tagged_photos(1, many_tags)
+
+        def delete(photo):
+            url = reverse("gallery:photo_detail", kwargs={"photo_id": photo.photo_id})
+            return lambda: self.client.delete(url)
+
+        # 삭제 자체(cascade)는 행 수와 무관하게 테이블당 한 번
+        self.assertEqual(
+            self._count_queries(delete(photo_few)), self._count_queries(delete(photo_many))
+        )
+        self.assertEqual(mock_compute.call_count, 21)
+
+    @patch("gallery.tasks.compute_and_store_rep_vectors.delay")
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_bulk_delete_tag_lookup_query_count(self, mock_get_client, mock_compute):
+        """여러 사진 삭제 시 재계산할 태그 조회"""
+        tags = [Tag.objects.create(tag=f"t{i}", user=self.user) for i in range(3)]
+        few = self._create_tagged_photos(2, tags)
+        many = self._create_tagged_photos(30, tags)
+
+        def delete(photos):
+            data = {"photos": [{"photo_id": str(p.photo_id)} for p in photos]}
+            url = reverse("gallery:photos_bulk_delete")
+            return lambda: self.client.post(url, data, format="json")
+
+        self.assertEqual(self._count_queries(delete(few)), self._count_queries(delete(many)))
+        # 태그 3개가 두 번의 요청에서 각각 한 번씩만 재계산
+        self.assertEqual(mock_compute.call_count, 6)
+
 
 class PostPhotoTagsViewTest(TestCase):
     """PostPhotoTagsView 테스트"""
@@ -424,6 +682,9 @@ class PostPhotoTagsViewTest(TestCase):
                 user=self.user, photo=self.photo, tag=self.tag2
             ).exists()
         )
+        # is_tagged 동기화 확인
+        self.photo.refresh_from_db()
+        self.assertTrue(self.photo.is_tagged)
 
     def test_post_photo_tags_photo_not_found(self):
         """존재하지 않는 사진"""
@@ -449,6 +710,130 @@ class PostPhotoTagsViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class BulkPostPhotoTagsViewTest(TestCase):
+    """BulkPostPhotoTagsView 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.photos = [
+            Photo.objects.create(
+                user=self.user, photo_path_id=100 + i, created_at=timezone.now()
+            )
+            for i in range(3)
+        ]
+        self.tag1 = Tag.objects.create(tag="태그1", user=self.user)
+        self.tag2 = Tag.objects.create(tag="태그2", user=self.user)
+
+        self.url = reverse("gallery:photos_bulk_tag")
+
+    def _data(self, photos, tags):
+        return {
+            "photos": [str(p.photo_id) for p in photos],
+            "tags": [str(t.tag_id) for t in tags],
+        }
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_bulk_tag_success(self, mock_compute):
+        """여러 사진에 여러 태그 추가, 태그당 대표 벡터 재계산 한 번"""
+        response = self.client.post(
+            self.url, self._data(self.photos, [self.tag1, self.tag2]), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 6)
+        self.assertEqual(Photo_Tag.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(mock_compute.call_count, 2)
+        self.assertEqual(
+            Photo.objects.filter(user=self.user, is_tagged=True, tag_count=2).count(), 3
+        )
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_bulk_tag_skips_existing_pairs(self, mock_compute):
+        """이미 있는 사진-태그 쌍은 건너뜀"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photos[0], tag=self.tag1)
+
+        response = self.client.post(
+            self.url, self._data(self.photos, [self.tag1]), format="json"
+        )
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Photo_Tag.objects.filter(tag=self.tag1).count(), 3)
+        mock_compute.assert_called_once_with(self.user.id, str(self.tag1.tag_id))
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_bulk_tag_nothing_new(self, mock_compute):
+        """새로 추가된 쌍이 없으면 재계산 없음"""
+        Photo_Tag.objects.create(user=self.user, photo=self.photos[0], tag=self.tag1)
+
+        response = self.client.post(
+            self.url, self._data(self.photos[:1], [self.tag1]), format="json"
+        )
+
+        self.assertEqual(response.data["created"], 0)
+        mock_compute.assert_not_called()
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_bulk_tag_query_count_is_constant(self, mock_compute):
+        """사진 수와 무관한 쿼리 수"""
+        more_photos = [
+            Photo.objects.create(
+                user=self.user, photo_path_id=200 + i, created_at=timezone.now()
+            )
+            for i in range(20)
+        ]
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, self._data(self.photos, [self.tag1]), format="json")
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, self._data(more_photos, [self.tag1]), format="json")
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+    def test_bulk_tag_photo_not_owned(self):
+        """다른 사용자의 사진 포함 시 404, 아무것도 추가하지 않음"""
+        other = User.objects.create_user(username="other", password="testpass123")
+        other_photo = Photo.objects.create(
+            user=other, photo_path_id=100, created_at=timezone.now()
+        )
+
+        response = self.client.post(
+            self.url, self._data([self.photos[0], other_photo], [self.tag1]), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Photo_Tag.objects.exists())
+
+    def test_bulk_tag_tag_not_found(self):
+        """존재하지 않는 태그 포함 시 404"""
+        data = self._data(self.photos, [self.tag1])
+        data["tags"].append(str(uuid.uuid4()))
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Photo_Tag.objects.exists())
+
+    @override_settings(PHOTO_TAG_SETTINGS={"BULK_MAX_PHOTOS": 2, "BULK_MAX_TAGS": 20})
+    def test_bulk_tag_too_many_photos(self):
+        """최대 사진 수 초과"""
+        response = self.client.post(
+            self.url, self._data(self.photos, [self.tag1]), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_tag_invalid_data(self):
+        """빈 목록"""
+        response = self.client.post(self.url, {"photos": [], "tags": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class DeletePhotoTagsViewTest(TestCase):
     """DeletePhotoTagsView 테스트"""
 
@@ -469,6 +854,7 @@ class DeletePhotoTagsViewTest(TestCase):
         self.tag = Tag.objects.create(tag="태그1", user=self.user)
 
         Photo_Tag.objects.create(user=self.user, photo=self.photo, tag=self.tag)
+        Photo.refresh_tag_state([self.photo.photo_id])
 
         self.url = reverse('gallery:delete_photo_tag', kwargs={
             'photo_id': self.photo.photo_id,
@@ -488,6 +874,9 @@ class DeletePhotoTagsViewTest(TestCase):
                 user=self.user, photo=self.photo, tag=self.tag
             ).exists()
         )
+        # 마지막 태그가 삭제되면 is_tagged 해제
+        self.photo.refresh_from_db()
+        self.assertFalse(self.photo.is_tagged)
         
         # Verify rep vectors recomputation triggered
         mock_compute.assert_called_once()
@@ -551,6 +940,91 @@ class GetRecommendTagViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class BatchRecommendTagViewTest(TestCase):
+    """BatchRecommendTagView 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.photo1 = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=12345,
+            created_at=timezone.now(),
+        )
+        self.photo2 = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=12346,
+            created_at=timezone.now(),
+        )
+        self.other_photo = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.other_user,
+            photo_path_id=12347,
+            created_at=timezone.now(),
+        )
+
+        self.url = reverse('gallery:batch_tag_recommendation')
+
+    @patch("gallery.views.tag_recommendation_many")
+    def test_batch_recommend_tag_success(self, mock_tag_rec_many):
+        """여러 사진의 태그 추천 성공"""
+        mock_tag_rec_many.return_value = {
+            str(self.photo1.photo_id): [{'tag': '여행', 'tag_id': '', 'is_preset': True}],
+            str(self.photo2.photo_id): [],
+        }
+
+        response = self.client.post(
+            self.url,
+            {"photos": [str(self.photo1.photo_id), str(self.photo2.photo_id)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[str(self.photo1.photo_id)][0]['tag'], '여행')
+        self.assertEqual(response.data[str(self.photo2.photo_id)], [])
+        mock_tag_rec_many.assert_called_once_with(
+            self.user, [self.photo1.photo_id, self.photo2.photo_id]
+        )
+
+    @patch("gallery.views.tag_recommendation_many")
+    def test_batch_recommend_tag_not_owned(self, mock_tag_rec_many):
+        """다른 사용자의 사진이 포함된 경우"""
+        response = self.client.post(
+            self.url,
+            {"photos": [str(self.photo1.photo_id), str(self.other_photo.photo_id)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        mock_tag_rec_many.assert_not_called()
+
+    @override_settings(TAG_RECOMMENDATION_SETTINGS={"BATCH_MAX_PHOTOS": 1})
+    def test_batch_recommend_tag_too_many_photos(self):
+        """요청 사진 수 초과"""
+        response = self.client.post(
+            self.url,
+            {"photos": [str(self.photo1.photo_id), str(self.photo2.photo_id)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_recommend_tag_invalid_request(self):
+        """잘못된 요청 형식"""
+        response = self.client.post(self.url, {"photos": ["not-a-uuid"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class PhotoRecommendationViewTest(TestCase):
     """PhotoRecommendationView 테스트"""
 
@@ -680,6 +1154,132 @@ class TagViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TagListCacheTest(TestCase):
+    """태그 목록 요약 컬럼 / 캐시 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(tag="태그", user=self.user)
+
+        # Redis를 dict로 대체
+        self.store = {}
+        patcher = patch("gallery.tag_list_cache.get_redis")
+        mock_redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        mock_redis.get.side_effect = self.store.get
+        mock_redis.set.side_effect = lambda key, value, ex=None: self.store.__setitem__(key, value)
+        mock_redis.delete.side_effect = lambda key: self.store.pop(key, None)
+
+        patcher = patch("gallery.views.compute_and_store_rep_vectors.delay")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_photo(self, photo_path_id, days_ago=0):
+        return Photo.objects.create(
+            user=self.user,
+            photo_path_id=photo_path_id,
+            created_at=timezone.now() - timezone.timedelta(days=days_ago),
+        )
+
+    def _get_tag_list(self):
+        response = self.client.get(reverse("gallery:tags"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["tag_id"]: item for item in response.data}
+
+    def test_cached_response_skips_database(self):
+        """두 번째 조회는 DB 조회 없이 캐시 사용"""
+        self._get_tag_list()
+
+        with self.assertNumQueries(0):
+            tags = self._get_tag_list()
+
+        self.assertIn(str(self.tag.tag_id), tags)
+
+    def test_tagging_updates_summary_and_invalidates(self):
+        """태그 추가 시 photo_count, 최신 사진 썸네일 반영"""
+        old = self._create_photo(101, days_ago=3)
+        new = self._create_photo(102, days_ago=1)
+        self._get_tag_list()
+
+        self.client.post(
+            reverse("gallery:photos_bulk_tag"),
+            {"photos": [str(old.photo_id), str(new.photo_id)], "tags": [str(self.tag.tag_id)]},
+            format="json",
+        )
+
+        item = self._get_tag_list()[str(self.tag.tag_id)]
+        self.assertEqual(item["photo_count"], 2)
+        self.assertEqual(item["thumbnail_path_id"], 102)
+
+    def test_untagging_updates_summary(self):
+        """태그 삭제 시 다음 최신 사진으로 썸네일 변경"""
+        old = self._create_photo(101, days_ago=3)
+        new = self._create_photo(102, days_ago=1)
+        self.client.post(
+            reverse("gallery:photos_bulk_tag"),
+            {"photos": [str(old.photo_id), str(new.photo_id)], "tags": [str(self.tag.tag_id)]},
+            format="json",
+        )
+        self._get_tag_list()
+
+        self.client.delete(
+            reverse(
+                "gallery:delete_photo_tag",
+                kwargs={"photo_id": new.photo_id, "tag_id": self.tag.tag_id},
+            )
+        )
+
+        item = self._get_tag_list()[str(self.tag.tag_id)]
+        self.assertEqual(item["photo_count"], 1)
+        self.assertEqual(item["thumbnail_path_id"], 101)
+
+    @patch("gallery.outbox.get_qdrant_client")
+    def test_photo_delete_updates_summary(self, mock_get_client):
+        """사진 삭제 시 요약 갱신"""
+        photo = self._create_photo(101)
+        self.client.post(
+            reverse("gallery:photo_tags", kwargs={"photo_id": photo.photo_id}),
+            [{"tag_id": str(self.tag.tag_id)}],
+            format="json",
+        )
+        keep = self._create_photo(102, days_ago=5)
+        Photo_Tag.objects.create(user=self.user, photo=keep, tag=self.tag)
+        self._get_tag_list()
+
+        self.client.delete(reverse("gallery:photo_detail", kwargs={"photo_id": photo.photo_id}))
+
+        item = self._get_tag_list()[str(self.tag.tag_id)]
+        self.assertEqual(item["photo_count"], 1)
+        self.assertEqual(item["thumbnail_path_id"], 102)
+
+    def test_create_and_rename_invalidate(self):
+        """태그 생성, 이름 변경 시 캐시 무효화"""
+        self._get_tag_list()
+
+        self.client.post(reverse("gallery:tags"), {"tag": "새태그"}, format="json")
+        self.assertEqual(len(self._get_tag_list()), 2)
+
+        self.client.put(
+            reverse("gallery:tag_detail", kwargs={"tag_id": self.tag.tag_id}),
+            {"tag": "바뀐이름"},
+            format="json",
+        )
+        self.assertEqual(self._get_tag_list()[str(self.tag.tag_id)]["tag"], "바뀐이름")
+
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_tag_delete_invalidates(self, mock_compute):
+        """태그 삭제 시 캐시 무효화"""
+        self._get_tag_list()
+
+        self.client.delete(reverse("gallery:tag_detail", kwargs={"tag_id": self.tag.tag_id}))
+
+        self.assertEqual(self._get_tag_list(), {})
+
+
 class TagDetailViewTest(TestCase):
     """TagDetailView 테스트 (GET, PUT, DELETE)"""
 
@@ -694,7 +1294,7 @@ class TagDetailViewTest(TestCase):
 
         self.url = reverse('gallery:tag_detail', kwargs={'tag_id': self.tag.tag_id})
 
-    @patch("gallery.views.get_qdrant_client")
+    @patch("gallery.tasks.get_qdrant_client")
     def test_delete_tag_success(self, mock_get_client):
         """태그 삭제 성공"""
         mock_client = MagicMock()
@@ -707,6 +1307,24 @@ class TagDetailViewTest(TestCase):
         # Verify tag deleted
         self.assertFalse(Tag.objects.filter(tag_id=self.tag.tag_id).exists())
 
+    @patch("gallery.views.compute_and_store_rep_vectors.delay")
+    def test_delete_tag_clears_is_tagged(self, mock_compute):
+        """태그 삭제 시 해당 태그만 있던 사진의 is_tagged 해제"""
+        photo = Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=1,
+            created_at=timezone.now(),
+        )
+        Photo_Tag.objects.create(user=self.user, photo=photo, tag=self.tag)
+        Photo.refresh_tag_state([photo.photo_id])
+
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        photo.refresh_from_db()
+        self.assertFalse(photo.is_tagged)
+
     def test_delete_tag_not_found(self):
         """존재하지 않는 태그"""
         fake_id = uuid.uuid4()
@@ -765,101 +1383,140 @@ class StoryViewTest(TestCase):
         self.client.force_authenticate(user=self.user)
         self.url = reverse('gallery:stories')
 
+    def _mock_redis(self, pooled=None, pool_length=0, lock_acquired=True, exhausted=False):
+        mock_redis = MagicMock()
+        mock_redis.lpop.return_value = (
+            [json.dumps(story) for story in pooled] if pooled else None
+        )
+        mock_redis.llen.return_value = pool_length
+        mock_redis.set.return_value = lock_acquired
+        mock_redis.exists.return_value = exhausted
+        return mock_redis
+
+    def _story(self, photo):
+        return {
+            "photo_id": str(photo.photo_id),
+            "photo_path_id": photo.photo_path_id,
+            "tags": ["sunset", "beach"],
+        }
+
+    def _create_photo(self, photo_path_id):
+        return Photo.objects.create(
+            photo_id=uuid.uuid4(),
+            user=self.user,
+            photo_path_id=photo_path_id,
+            created_at=timezone.now(),
+        )
+
     @patch("gallery.views.get_redis")
     @patch("gallery.views.generate_stories_task")
     def test_get_stories_no_existing_stories(self, mock_generate_task, mock_get_redis):
-        """스토리가 없을 때 생성 시작"""
-        mock_redis = MagicMock()
+        """스토리 풀이 비어 있을 때 리필 시작"""
+        mock_redis = self._mock_redis()
         mock_get_redis.return_value = mock_redis
-        
-        # Redis에 스토리 없음
-        mock_redis.exists.return_value = False
-        mock_redis.get.return_value = None
-        
-        # Task ID 모킹
-        mock_task = MagicMock()
-        mock_task.id = "test-task-id"
-        mock_generate_task.delay.return_value = mock_task
 
         response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "PROCESSING")
         self.assertEqual(response.data["stories"], [])
-        
-        # Task 생성 확인
-        mock_generate_task.delay.assert_called_once_with(self.user.id, 20)
-        mock_redis.set.assert_called_once()
+
+        # 풀 크기만큼 리필 시작 확인
+        mock_generate_task.delay.assert_called_once_with(self.user.id, 200)
 
     @patch("gallery.views.get_redis")
     @patch("gallery.views.generate_stories_task")
     def test_get_stories_ready(self, mock_generate_task, mock_get_redis):
-        """준비된 스토리 조회 성공"""
-        mock_redis = MagicMock()
+        """스토리 풀에서 스토리 조회 성공"""
+        photo = self._create_photo(123)
+        mock_redis = self._mock_redis(pooled=[self._story(photo)], pool_length=150)
         mock_get_redis.return_value = mock_redis
-        
-        # Redis에 스토리 있음
-        story_data = [
-            {
-                "photo_id": str(uuid.uuid4()),
-                "photo_path_id": 123,
-                "tags": ["sunset", "beach"]
-            }
-        ]
-        mock_redis.exists.return_value = True
-        mock_redis.get.return_value = json.dumps(story_data)
-        
-        # Task ID 모킹
-        mock_task = MagicMock()
-        mock_task.id = "new-task-id"
-        mock_generate_task.delay.return_value = mock_task
 
         response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "SUCCESS")
         self.assertEqual(len(response.data["stories"]), 1)
-        
-        # 스토리 삭제 확인
-        mock_redis.delete.assert_called_once()
-        # 새로운 생성 시작 확인
-        mock_generate_task.delay.assert_called_once_with(self.user.id, 20)
+
+        mock_redis.lpop.assert_called_once_with(f"story_pool:{self.user.id}", 20)
+        # low-water mark 이상이므로 리필하지 않음
+        mock_generate_task.delay.assert_not_called()
 
     @patch("gallery.views.get_redis")
-    @patch("celery.result.AsyncResult")
-    def test_get_stories_processing(self, mock_async_result, mock_get_redis):
-        """스토리 생성 중"""
-        mock_redis = MagicMock()
+    @patch("gallery.views.generate_stories_task")
+    def test_get_stories_refills_below_low_water_mark(
+        self, mock_generate_task, mock_get_redis
+    ):
+        """풀이 low-water mark 미만이면 부족한 만큼 리필"""
+        photo = self._create_photo(123)
+        mock_redis = self._mock_redis(pooled=[self._story(photo)], pool_length=30)
+        mock_get_redis.return_value = mock_redis
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["status"], "SUCCESS")
+        mock_generate_task.delay.assert_called_once_with(self.user.id, 170)
+
+    @patch("gallery.views.get_redis")
+    @patch("gallery.views.generate_stories_task")
+    def test_get_stories_refill_already_running(self, mock_generate_task, mock_get_redis):
+        """리필이 이미 진행 중이면 새 작업을 만들지 않음"""
+        mock_redis = self._mock_redis(lock_acquired=None)
         mock_get_redis.return_value = mock_redis
-        
-        # Redis에 스토리 없음
-        mock_redis.exists.return_value = False
-        # Task 실행 중
-        mock_redis.get.return_value = "existing-task-id"
-        
-        # Task 상태 모킹
-        mock_task_result = MagicMock()
-        mock_task_result.state = "STARTED"
-        mock_async_result.return_value = mock_task_result
 
         response = self.client.get(self.url)
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "PROCESSING")
+        mock_generate_task.delay.assert_not_called()
+
+    @patch("gallery.views.get_redis")
+    @patch("gallery.views.generate_stories_task")
+    def test_get_stories_drops_stale_photos(self, mock_generate_task, mock_get_redis):
+        """생성 이후 삭제되거나 태그된 사진은 제외"""
+        untagged = self._create_photo(1)
+        tagged = self._create_photo(2)
+        tag = Tag.objects.create(tag="태그", user=self.user)
+        Photo_Tag.objects.create(user=self.user, photo=tagged, tag=tag)
+        Photo.refresh_tag_state([tagged.photo_id])
+        deleted = {"photo_id": str(uuid.uuid4()), "photo_path_id": 3, "tags": []}
+
+        mock_redis = self._mock_redis(
+            pooled=[self._story(untagged), self._story(tagged), deleted],
+            pool_length=150,
+        )
+        mock_get_redis.return_value = mock_redis
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [story["photo_id"] for story in response.data["stories"]],
+            [str(untagged.photo_id)],
+        )
+
+    @patch("gallery.views.get_redis")
+    @patch("gallery.views.generate_stories_task")
+    def test_get_stories_exhausted(self, mock_generate_task, mock_get_redis):
+        """생성할 사진이 없으면 빈 SUCCESS 반환"""
+        mock_redis = self._mock_redis(exhausted=True)
+        mock_get_redis.return_value = mock_redis
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["status"], "SUCCESS")
         self.assertEqual(response.data["stories"], [])
+        mock_generate_task.delay.assert_not_called()
 
     @patch("gallery.views.get_redis")
-    def test_get_stories_custom_size(self, mock_get_redis):
+    @patch("gallery.views.generate_stories_task")
+    def test_get_stories_custom_size(self, mock_generate_task, mock_get_redis):
         """커스텀 크기로 스토리 요청"""
-        mock_redis = MagicMock()
+        mock_redis = self._mock_redis(pool_length=150)
         mock_get_redis.return_value = mock_redis
-        
-        mock_redis.exists.return_value = False
-        mock_redis.get.return_value = None
 
         response = self.client.get(f"{self.url}?size=50")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_redis.lpop.assert_called_once_with(f"story_pool:{self.user.id}", 50)
 
     @patch("gallery.views.get_redis")
     def test_get_stories_invalid_size(self, mock_get_redis):
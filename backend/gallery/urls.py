@@ -22,6 +22,11 @@ urlpatterns = [
         views.PostPhotoTagsView.as_view(),
         name="photo_tags",
     ),  # post
+    path(
+        "photos/tags/",
+        views.BulkPostPhotoTagsView.as_view(),
+        name="photos_bulk_tag",
+    ),  # post
     path(
         "photos/<uuid:photo_id>/tags/<uuid:tag_id>/",
         views.DeletePhotoTagsView.as_view(),
@@ -32,6 +37,11 @@ urlpatterns = [
         views.GetRecommendTagView.as_view(),
         name="tag_recommendation",
     ),  # get
+    path(
+        "photos/tags/recommendation/",
+        views.BatchRecommendTagView.as_view(),
+        name="batch_tag_recommendation",
+    ),  # post
     path("tags/", views.TagView.as_view(), name="tags"),  # get, post
     path(
         "tags/<uuid:tag_id>/",
@@ -1,5 +1,3 @@
-import requests
-from django.db.models import OuterRef, Count, Subquery, Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -22,28 +20,36 @@ from .request_serializers import (
     ReqTagIdSerializer,
     ReqPhotoListSerializer,
     ReqPhotoBulkDeleteSerializer,
+    ReqBulkPhotoTagsSerializer,
 )
 
 from .serializers import TagSerializer
 from .models import Photo_Tag, Tag, Photo
-from .qdrant_utils import get_qdrant_client, IMAGE_COLLECTION_NAME
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from .tasks import (
     tag_recommendation,
+    tag_recommendation_many,
     recommend_photo_from_tag,
     recommend_photo_from_photo,
     compute_and_store_rep_vectors,
     generate_stories_task,
+    update_photo_tag_state,
+    update_tag_summary,
+    soft_delete_photos,
+    purge_reuploaded_photos,
 )
 from .gpu_tasks import (
     process_and_embed_photos_batch,  # GPU-dependent task (batch)
 )
 from .storage_service import upload_photo, delete_photo
+from .geocoding import reverse_geocode
 import logging
 from config.redis import get_redis
-import json
+from . import story_pool
+from . import tag_list_cache
+from .pagination import NEXT_CURSOR_HEADER, paginate_by_created_at
 from django.conf import settings
 from .decorators import (
     log_request,
@@ -56,6 +62,58 @@ from .decorators import (
 logger = logging.getLogger(__name__)
 
 
+def _assign_tags(user, photo_ids, tag_ids):
+    """
+    Tag every photo with every tag.
+
+    Tags are validated with one query and the new Photo_Tag rows are inserted
+    with one bulk_create; pairs that already exist (or are inserted by a
+    concurrent request) are skipped by the unique_user_photo_tag constraint.
+    Each tag that gained photos gets one rep-vector recompute.
+
+    Raises:
+        Tag.DoesNotExist: Some tags don't exist or aren't owned by the user
+
+    Returns:
+        Number of new Photo_Tag rows
+    """
+    photo_ids = list(dict.fromkeys(photo_ids))
+    tag_ids = list(dict.fromkeys(tag_ids))
+
+    if Tag.objects.filter(tag_id__in=tag_ids, user=user).count() != len(tag_ids):
+        raise Tag.DoesNotExist
+
+    existing = set(
+        Photo_Tag.objects.filter(
+            user=user, photo_id__in=photo_ids, tag_id__in=tag_ids
+        ).values_list("photo_id", "tag_id")
+    )
+    new_pairs = [
+        (photo_id, tag_id)
+        for photo_id in photo_ids
+        for tag_id in tag_ids
+        if (photo_id, tag_id) not in existing
+    ]
+    if not new_pairs:
+        return 0
+
+    Photo_Tag.objects.bulk_create(
+        [
+            Photo_Tag(user=user, photo_id=photo_id, tag_id=tag_id)
+            for photo_id, tag_id in new_pairs
+        ],
+        ignore_conflicts=True,
+    )
+
+    affected_tag_ids = {tag_id for _, tag_id in new_pairs}
+    update_photo_tag_state(list({photo_id for photo_id, _ in new_pairs}))
+    update_tag_summary(user.id, affected_tag_ids)
+    for tag_id in affected_tag_ids:
+        compute_and_store_rep_vectors.delay(user.id, str(tag_id))
+
+    return len(new_pairs)
+
+
 class PhotoView(APIView):
     parser_classes = (MultiPartParser, FormParser)
     authentication_classes = [JWTAuthentication]
@@ -151,6 +209,12 @@ class PhotoView(APIView):
 
         photos_data = serializer.validated_data
 
+        # 삭제 후 purge 전에 다시 올린 사진이 중복으로 건너뛰어지지 않도록
+        # 삭제 표시된 행만 먼저 지움 (파일, 대표 벡터 정리는 비동기)
+        purge_reuploaded_photos(
+            request.user.id, [data["photo_path_id"] for data in photos_data]
+        )
+
         all_metadata = []
         skipped_count = 0
 
@@ -231,14 +295,17 @@ class PhotoView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Photo All View",
-        operation_description="Get all the photos the user has uploaded",
+        operation_description=(
+            "Get all the photos the user has uploaded, newest first. "
+            "The cursor for the next page is sent in the X-Next-Cursor header"
+        ),
         request_body=None,
         responses={
             200: openapi.Response(
                 description="Success", schema=ResPhotoSerializer(many=True)
             ),
             400: openapi.Response(
-                description="Bad Request - Invalid offset or limit parameter"
+                description="Bad Request - Invalid offset, limit or cursor parameter"
             ),
             401: openapi.Response(
                 description="Unauthorized - The refresh token is expired"
@@ -263,20 +330,33 @@ class PhotoView(APIView):
                 description="maximum number of photos to return",
                 type=openapi.TYPE_INTEGER,
             ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="X-Next-Cursor value of the previous page (instead of offset)",
+                type=openapi.TYPE_STRING,
+            ),
         ],
     )
     @log_request
     @handle_exceptions
     @validate_pagination(max_limit=100)
     def get(self, request):
-        offset = request.validated_offset
-        limit = request.validated_limit
-
-        photos = Photo.objects.filter(user=request.user).order_by("-created_at")
-        photos = photos[offset : offset + limit]
+        photos = Photo.objects.filter(user=request.user).values(
+            "photo_id", "photo_path_id", "created_at"
+        )
+        photos, next_cursor = paginate_by_created_at(
+            photos,
+            cursor=request.validated_cursor,
+            limit=request.validated_limit,
+            offset=request.validated_offset,
+        )
 
         serializer = ResPhotoSerializer(photos, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        if next_cursor:
+            response[NEXT_CURSOR_HEADER] = next_cursor
+        return response
 
 
 class PhotoDetailView(APIView):
@@ -312,43 +392,20 @@ class PhotoDetailView(APIView):
     @validate_uuid("photo_id")
     @require_ownership(Photo, "photo_id", "photo_id")
     def get(self, request, photo_id):
-        photo = Photo.objects.get(photo_id=photo_id)
-        photo_tags = Photo_Tag.objects.filter(photo=photo, user=request.user)
-        tags = [photo_tag.tag for photo_tag in photo_tags]
-
+        photo = Photo.objects.only("photo_path_id", "lat", "lng").get(photo_id=photo_id)
         tag_list = [
             {
-                "tag_id": str(tag.tag_id),
-                "tag": tag.tag,
+                "tag_id": str(tag_id),
+                "tag": tag,
             }
-            for tag in tags
+            for tag_id, tag in Photo_Tag.objects.filter(
+                photo_id=photo_id, user=request.user
+            ).values_list("tag_id", "tag__tag")
         ]
 
-        lat = str(photo.lat)
-        lng = str(photo.lng)
-
-        r = get_redis()
-        address = ""
-        key = f"cord:({lat},{lng})"
-
-        if r.get(key):
-            address = r.get(key)
-        else:
-            URL = f"https://dapi.kakao.com/v2/local/geo/coord2regioncode.json?x={lng}&y={lat}"
-            KM_REST_API_KEY = settings.KM_REST_API_KEY
-            headers = {"Authorization": f"KakaoAK {KM_REST_API_KEY}"}
-            resp = requests.get(URL, headers=headers, timeout=5)
-
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("documents"):
-                    address = data["documents"][0]["address_name"]
-
-            r.set(key, address, ex=60 * 60 * 24)
-
         photo_data = {
             "photo_path_id": photo.photo_path_id,
-            "address": address,
+            "address": reverse_geocode(photo.lat, photo.lng),
             "tags": tag_list,
         }
 
@@ -379,23 +436,8 @@ class PhotoDetailView(APIView):
     @validate_uuid("photo_id")
     @require_ownership(Photo, "photo_id", "photo_id")
     def delete(self, request, photo_id):
-        client = get_qdrant_client()
-
-        associated_photo_tags = Photo_Tag.objects.filter(
-            photo__photo_id=photo_id, user=request.user
-        )
-        tag_ids_to_recompute = [str(pt.tag.tag_id) for pt in associated_photo_tags]
-
-        Photo.objects.filter(photo_id=photo_id, user=request.user).delete()
-
-        client.delete(
-            collection_name=IMAGE_COLLECTION_NAME,
-            points_selector=[str(photo_id)],
-            wait=True,
-        )
-
-        for tag_id in tag_ids_to_recompute:
-            compute_and_store_rep_vectors.delay(request.user.id, tag_id)
+        # 삭제 표시 후 즉시 반환, 실제 삭제는 purge_deleted_photos 태스크가 처리
+        soft_delete_photos(request.user.id, [photo_id])
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -427,7 +469,6 @@ class BulkDeletePhotoView(APIView):
     @log_request
     @handle_exceptions
     def post(self, request):
-        client = get_qdrant_client()
         serializer = ReqPhotoBulkDeleteSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -436,22 +477,8 @@ class BulkDeletePhotoView(APIView):
         photos_raw_data = serializer.validated_data["photos"]
         photo_ids_to_delete = [data["photo_id"] for data in photos_raw_data]
 
-        associated_photo_tags = Photo_Tag.objects.filter(
-            photo__photo_id__in=photo_ids_to_delete, user=request.user
-        )
-        tag_ids_to_recompute = {str(pt.tag.tag_id) for pt in associated_photo_tags}
-
-        Photo.objects.filter(
-            photo_id__in=photo_ids_to_delete, user=request.user
-        ).delete()
-        client.delete(
-            collection_name=IMAGE_COLLECTION_NAME,
-            points_selector=[str(pid) for pid in photo_ids_to_delete],
-            wait=True,
-        )
-
-        for tag_id in tag_ids_to_recompute:
-            compute_and_store_rep_vectors.delay(request.user.id, tag_id)
+        # 삭제 표시 후 즉시 반환, 실제 삭제는 purge_deleted_photos 태스크가 처리
+        soft_delete_photos(request.user.id, photo_ids_to_delete)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -462,12 +489,19 @@ class GetPhotosByTagView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Get Photos List for a Tag Album",
-        operation_description="Get a list of photo_path_ids in a tag album",
+        operation_description=(
+            "Get a list of photo_path_ids in a tag album, newest first. "
+            "Without limit the whole album is returned; with limit, the cursor "
+            "for the next page is sent in the X-Next-Cursor header"
+        ),
         request_body=None,
         responses={
             200: openapi.Response(
                 description="Success", schema=ResPhotoSerializer(many=True)
             ),
+            400: openapi.Response(
+                description="Bad Request - Invalid limit or cursor parameter"
+            ),
             401: openapi.Response(
                 description="Unauthorized - The refresh token is expired"
             ),
@@ -479,20 +513,43 @@ class GetPhotosByTagView(APIView):
                 openapi.IN_HEADER,
                 description="access token",
                 type=openapi.TYPE_STRING,
-            )
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="maximum number of photos to return",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="X-Next-Cursor value of the previous page",
+                type=openapi.TYPE_STRING,
+            ),
         ],
     )
     @log_request
     @handle_exceptions
     @validate_uuid("tag_id")
     @require_ownership(Tag, "tag_id", "tag_id")
+    @validate_pagination(max_limit=100, default_limit=None)
     def get(self, request, tag_id):
-        tag = Tag.objects.get(tag_id=tag_id)
-        photo_tags = Photo_Tag.objects.filter(tag=tag, user=request.user)
-        photos = [photo_tag.photo for photo_tag in photo_tags]
+        # Single joined query; no Photo fetch per Photo_Tag row
+        photos = Photo.objects.filter(
+            photo_tag__tag_id=tag_id, photo_tag__user=request.user
+        ).values("photo_id", "photo_path_id", "created_at")
+        photos, next_cursor = paginate_by_created_at(
+            photos,
+            cursor=request.validated_cursor,
+            limit=request.validated_limit,
+            offset=request.validated_offset,
+        )
 
         serializer = ResPhotoSerializer(photos, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        if next_cursor:
+            response[NEXT_CURSOR_HEADER] = next_cursor
+        return response
 
 
 class PostPhotoTagsView(APIView):
@@ -530,21 +587,76 @@ class PostPhotoTagsView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         tag_ids = [data["tag_id"] for data in serializer.validated_data]
-        photo = Photo.objects.get(photo_id=photo_id)
+        if tag_ids:
+            _assign_tags(request.user, [photo_id], tag_ids)
 
-        tags_to_recompute = set()
-        for tag_id in tag_ids:
-            tag = Tag.objects.get(tag_id=tag_id, user=request.user)
-            if not Photo_Tag.objects.filter(
-                photo=photo, tag=tag, user=request.user
-            ).exists():
-                Photo_Tag.objects.create(photo=photo, tag=tag, user=request.user)
-                tags_to_recompute.add(str(tag_id))
+        return Response(status=status.HTTP_200_OK)
 
-        for tag_id in tags_to_recompute:
-            compute_and_store_rep_vectors.delay(request.user.id, tag_id)
 
-        return Response(status=status.HTTP_200_OK)
+class BulkPostPhotoTagsView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Add Tags to Multiple Photos",
+        operation_description=(
+            "Add every tag in tags to every photo in photos. "
+            "Pairs that already exist are skipped; returns the number of new pairs"
+        ),
+        request_body=ReqBulkPhotoTagsSerializer,
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(
+                description="Bad Request - Request form mismatch or too many photos/tags"
+            ),
+            401: openapi.Response(
+                description="Unauthorized - The refresh token is expired"
+            ),
+            404: openapi.Response(
+                description="Not Found - Some photos or tags do not exist or are not owned by the user"
+            ),
+        },
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="access token",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+    )
+    @log_request
+    @handle_exceptions
+    def post(self, request):
+        serializer = ReqBulkPhotoTagsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        photo_ids = list(dict.fromkeys(serializer.validated_data["photos"]))
+        tag_ids = list(dict.fromkeys(serializer.validated_data["tags"]))
+
+        max_photos = settings.PHOTO_TAG_SETTINGS.get("BULK_MAX_PHOTOS", 500)
+        max_tags = settings.PHOTO_TAG_SETTINGS.get("BULK_MAX_TAGS", 20)
+        if len(photo_ids) > max_photos or len(tag_ids) > max_tags:
+            return Response(
+                {
+                    "error": f"At most {max_photos} photos and {max_tags} tags "
+                    "can be requested at once"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owned_count = Photo.objects.filter(
+            photo_id__in=photo_ids, user=request.user
+        ).count()
+        if owned_count != len(photo_ids):
+            return Response(
+                {"error": "Some photos not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        created = _assign_tags(request.user, photo_ids, tag_ids)
+        return Response({"created": created}, status=status.HTTP_200_OK)
 
 
 class DeletePhotoTagsView(APIView):
@@ -583,6 +695,7 @@ class DeletePhotoTagsView(APIView):
         )
         tag = photo_tag.tag
         photo_tag.delete()
+        update_photo_tag_state([photo_id])
 
         # Check if tag still has any photos associated
         has_remaining_photos = Photo_Tag.objects.filter(tag=tag, user=request.user).exists()
@@ -590,11 +703,13 @@ class DeletePhotoTagsView(APIView):
         if not has_remaining_photos:
             # No photos left for this tag - delete the tag itself
             tag.delete()
+            update_tag_summary(request.user.id, [])
             # No need to compute repvec - tag is gone
             # compute_and_store_rep_vectors will handle cleanup in Qdrant
             compute_and_store_rep_vectors.delay(request.user.id, str(tag_id))
         else:
             # Tag still has photos - recompute representative vectors
+            update_tag_summary(request.user.id, [tag_id])
             compute_and_store_rep_vectors.delay(request.user.id, str(tag_id))
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -639,6 +754,68 @@ class GetRecommendTagView(APIView):
         return Response(tag_recommendations, status=status.HTTP_200_OK)
 
 
+class BatchRecommendTagView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get Recommended Tags of Multiple Photos",
+        operation_description=(
+            "Get recommended tags for a list of photos in one request. "
+            "Returns {photo_id: [recommendation, ...]} with the same item shape "
+            "as the single-photo endpoint. Photos that are not embedded yet get an empty list."
+        ),
+        request_body=ReqPhotoListSerializer,
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(
+                description="Bad Request - Request form mismatch or too many photos"
+            ),
+            401: openapi.Response(
+                description="Unauthorized - The refresh token is expired"
+            ),
+            404: openapi.Response(
+                description="Not Found - Some photos do not exist or are not owned by the user"
+            ),
+        },
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="access token",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+    )
+    @log_request
+    @handle_exceptions
+    def post(self, request):
+        serializer = ReqPhotoListSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        photo_ids = list(dict.fromkeys(serializer.validated_data["photos"]))
+
+        max_photos = settings.TAG_RECOMMENDATION_SETTINGS.get("BATCH_MAX_PHOTOS", 100)
+        if len(photo_ids) > max_photos:
+            return Response(
+                {"error": f"At most {max_photos} photos can be requested at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owned_count = Photo.objects.filter(
+            photo_id__in=photo_ids, user=request.user
+        ).count()
+        if owned_count != len(photo_ids):
+            return Response(
+                {"error": "Some photos not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        tag_recommendations = tag_recommendation_many(request.user, photo_ids)
+        return Response(tag_recommendations, status=status.HTTP_200_OK)
+
+
 class PhotoRecommendationView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -751,20 +928,22 @@ class TagView(APIView):
     @log_request
     @handle_exceptions
     def get(self, request):
-        latest_photo_subquery = (
-            Photo_Tag.objects.filter(tag=OuterRef("pk"), user=request.user)
-            .select_related("photo")
-            .order_by("-photo__created_at")
-        )
-
-        tags = Tag.objects.filter(user=request.user).annotate(
-            photo_count=Count("photo_tag", filter=Q(photo_tag__user=request.user)),
-            thumbnail_path_id=Subquery(
-                latest_photo_subquery.values("photo__photo_path_id")[:1]
-            ),
+        cached = tag_list_cache.get_tag_list(request.user.id)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        # photo_count / thumbnail_path_id are materialized (Tag.refresh_summary)
+        tags = Tag.objects.filter(user=request.user).values(
+            "tag_id",
+            "tag",
+            "thumbnail_path_id",
+            "created_at",
+            "updated_at",
+            "photo_count",
         )
 
         response_serializer = ResTagThumbnailSerializer(tags, many=True)
+        tag_list_cache.set_tag_list(request.user.id, response_serializer.data)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -804,6 +983,8 @@ class TagView(APIView):
             )
 
         tag, created = Tag.objects.get_or_create(tag=data["tag"], user=request.user)
+        if created:
+            tag_list_cache.invalidate_tag_list(request.user.id)
 
         status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
 
@@ -846,8 +1027,13 @@ class TagDetailView(APIView):
     @require_ownership(Tag, "tag_id", "tag_id")
     def delete(self, request, tag_id):
         tag = Tag.objects.get(tag_id=tag_id)
+        tagged_photo_ids = list(
+            Photo_Tag.objects.filter(tag=tag).values_list("photo_id", flat=True)
+        )
         compute_and_store_rep_vectors.delay(request.user.id, str(tag_id))
         tag.delete()
+        update_photo_tag_state(tagged_photo_ids)
+        tag_list_cache.invalidate_tag_list(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @swagger_auto_schema(
@@ -886,6 +1072,7 @@ class TagDetailView(APIView):
         old_tag = Tag.objects.get(tag_id=tag_id)
         old_tag.tag = data["tag"]
         old_tag.save()
+        tag_list_cache.invalidate_tag_list(request.user.id)
 
         response_serializer = ResTagIdSerializer({"tag_id": tag_id})
         return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -932,11 +1119,12 @@ class StoryView(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_summary="Get or generate stories",
+        operation_summary="Get stories",
         operation_description=(
-            "Get stories if ready, or trigger generation if not started. "
-            "When stories are ready, returns status='SUCCESS' with stories and automatically triggers new generation for the next request. "
-            "Returns status='PROCESSING' with empty stories if still generating."
+            "Pop up to `size` pre-generated stories from the user's story pool. "
+            "The pool is refilled in the background whenever it runs low, so this never waits for generation. "
+            "Returns status='SUCCESS' with stories, or status='PROCESSING' with empty stories "
+            "while the pool is being filled for the first time."
         ),
         request_body=None,
         responses={
@@ -968,12 +1156,8 @@ class StoryView(APIView):
     @log_request
     @handle_exceptions
     def get(self, request):
-        from celery.result import AsyncResult
-
         r = get_redis()
         user_id = request.user.id
-        story_key = str(user_id)
-        task_key = f"story_task:{user_id}"
 
         # Parse size parameter early
         try:
@@ -990,40 +1174,30 @@ class StoryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check if stories are ready in Redis
-        if r.exists(story_key):
-            story_data_json = r.get(story_key)
-            story_data = json.loads(story_data_json)
-            r.delete(story_key)
-
-            # Trigger new generation for next request
-            task = generate_stories_task.delay(user_id, size)
-            r.set(task_key, task.id, ex=3600)  # Store task ID for 1 hour
-
-            response_data = {"status": "SUCCESS", "stories": story_data}
-            serializer = ResStoryStateSerializer(response_data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        stories = story_pool.pop_stories(r, user_id, size)
 
-        # Check if a task is currently running
-        task_id = r.get(task_key)
-        if task_id:
-            task_id = task_id.decode("utf-8") if isinstance(task_id, bytes) else task_id
-            task_result = AsyncResult(task_id)
-
-            # If task is still pending or running, return PROCESSING status
-            if task_result.state in ["PENDING", "STARTED", "RETRY"]:
-                response_data = {"status": "PROCESSING", "stories": []}
-                serializer = ResStoryStateSerializer(response_data)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+        # Drop photos deleted or tagged since the stories were generated
+        if stories:
+            valid_ids = {
+                str(photo_id)
+                for photo_id in Photo.objects.filter(
+                    user=request.user,
+                    is_tagged=False,
+                    photo_id__in=[story["photo_id"] for story in stories],
+                ).values_list("photo_id", flat=True)
+            }
+            stories = [story for story in stories if story["photo_id"] in valid_ids]
 
-            # If task failed or is in unknown state, clean up and start new task
-            r.delete(task_key)
+        # Keep the pool above the low-water mark for the next request
+        refill_size = story_pool.acquire_refill(r, user_id)
+        if refill_size > 0:
+            generate_stories_task.delay(user_id, refill_size)
 
-        # No task running and no results - start new task
-        task = generate_stories_task.delay(user_id, size)
-        r.set(task_key, task.id, ex=3600)  # Store task ID for 1 hour
+        if stories or story_pool.is_exhausted(r, user_id):
+            response_data = {"status": "SUCCESS", "stories": stories}
+        else:
+            response_data = {"status": "PROCESSING", "stories": []}
 
-        response_data = {"status": "PROCESSING", "stories": []}
         serializer = ResStoryStateSerializer(response_data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
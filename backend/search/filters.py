@@ -0,0 +1,322 @@
+"""
+Time-range and geo filters for photo search.
+
+Filters come from query parameters (date_from, date_to, bbox, near) or from
+tokens in the search text:
+
+    date:2024                 the whole year
+    date:2024-06..2024-08     June to August (either side may be left open)
+    near:부산                 within NEAR_DEFAULT_RADIUS_KM of a place (search/places.py)
+    near:부산,20              within 20 km of it
+    near:35.1,129.0,5         within 5 km of coordinates
+
+so "beach last summer near Busan" is `beach date:2025-06..2025-08 near:부산`.
+
+The filters are pushed into the Qdrant query_filter next to the user_id
+condition, using the created_at (datetime), lat / lng (float) and location
+(geo) payload indexes, so the candidates are pruned at the index instead of
+in Python. Photos that match a tag directly come from MySQL and get the same
+conditions as a queryset filter.
+
+The fields have to be stored in the image payload
+(QDRANT_COLLECTION_SETTINGS["PAYLOAD_PROFILE"] "filters" or "full").
+"""
+
+import re
+from dataclasses import dataclass, fields, replace
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import ACos, Cos, Least, Radians, Sin
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from qdrant_client.http import models
+
+from gallery.qdrant_utils import image_payload_fields
+
+from .exceptions import SearchExecutionError
+from .places import resolve_place
+
+EARTH_RADIUS_KM = 6371.0
+
+# date:값 / near:값 (공백이 있는 지명은 따옴표로 묶음)
+FILTER_TOKEN_REGEX = re.compile(r'(?<!\S)(date|near):("[^"]+"\S*|\S+)')
+PERIOD_REGEX = re.compile(r"^(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?$")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Conditions on created_at and location; unset bounds are open"""
+
+    date_from: datetime | None = None  # inclusive
+    date_to: datetime | None = None  # exclusive
+    bbox: tuple | None = None  # (min_lat, min_lng, max_lat, max_lng)
+    near: tuple | None = None  # (lat, lng, radius_km)
+
+    def __bool__(self):
+        return any((self.date_from, self.date_to, self.bbox, self.near))
+
+    def merge(self, other: "SearchFilters") -> "SearchFilters":
+        """
+        Combine filters from parameters and search text.
+
+        Raises:
+            ValueError: the same filter is given twice
+        """
+        changes = {}
+        for item in fields(self):
+            value = getattr(other, item.name)
+            if value is None:
+                continue
+            if getattr(self, item.name) is not None:
+                raise ValueError(f"{item.name} is given twice")
+            changes[item.name] = value
+        return replace(self, **changes)
+
+    def payload_fields(self):
+        payload_fields = []
+        if self.date_from or self.date_to:
+            payload_fields.append("created_at")
+        if self.bbox:
+            payload_fields.extend(("lat", "lng"))
+        if self.near:
+            payload_fields.append("location")
+        return payload_fields
+
+    def qdrant_conditions(self) -> list:
+        """FieldConditions for the image collection payload"""
+        missing = [name for name in self.payload_fields() if name not in image_payload_fields()]
+        if missing:
+            raise SearchExecutionError(
+                f"Payload fields {', '.join(missing)} are not stored (PAYLOAD_PROFILE)"
+            )
+
+        conditions = []
+        if self.date_from or self.date_to:
+            conditions.append(
+                models.FieldCondition(
+                    key="created_at",
+                    range=models.DatetimeRange(gte=self.date_from, lt=self.date_to),
+                )
+            )
+        if self.bbox:
+            min_lat, min_lng, max_lat, max_lng = self.bbox
+            conditions.extend(
+                [
+                    models.FieldCondition(key="lat", range=models.Range(gte=min_lat, lte=max_lat)),
+                    models.FieldCondition(key="lng", range=models.Range(gte=min_lng, lte=max_lng)),
+                ]
+            )
+        if self.near:
+            lat, lng, radius_km = self.near
+            conditions.append(
+                models.FieldCondition(
+                    key="location",
+                    geo_radius=models.GeoRadius(
+                        center=models.GeoPoint(lat=lat, lon=lng),
+                        radius=radius_km * 1000,
+                    ),
+                )
+            )
+        return conditions
+
+    def filter_photos(self, queryset, prefix=""):
+        """
+        Same conditions on a Photo queryset (prefix "photo__" for Photo_Tag)
+        """
+        lookups = {}
+        if self.date_from:
+            lookups[f"{prefix}created_at__gte"] = self.date_from
+        if self.date_to:
+            lookups[f"{prefix}created_at__lt"] = self.date_to
+        if self.bbox:
+            min_lat, min_lng, max_lat, max_lng = self.bbox
+            lookups[f"{prefix}lat__range"] = (min_lat, max_lat)
+            lookups[f"{prefix}lng__range"] = (min_lng, max_lng)
+        if self.near:
+            # 구면 코사인 법칙으로 중심까지의 거리 (km)
+            lat, lng, radius_km = self.near
+            photo_lat = Radians(F(f"{prefix}lat"))
+            queryset = queryset.annotate(
+                near_distance_km=EARTH_RADIUS_KM
+                * ACos(
+                    Least(
+                        1.0,
+                        Sin(Radians(lat)) * Sin(photo_lat)
+                        + Cos(Radians(lat))
+                        * Cos(photo_lat)
+                        * Cos(Radians(F(f"{prefix}lng")) - Radians(lng)),
+                    )
+                )
+            )
+            lookups["near_distance_km__lte"] = radius_km
+        return queryset.filter(**lookups)
+
+
+def user_filter(user_id, filters: SearchFilters | None = None) -> models.Filter:
+    """Qdrant filter restricting a search to one user's photos (and the filters)"""
+    conditions = [
+        models.FieldCondition(
+            key="user_id",
+            match=models.MatchValue(value=user_id),
+        )
+    ]
+    if filters:
+        conditions.extend(filters.qdrant_conditions())
+    return models.Filter(must=conditions)
+
+
+def _parse_bound(value: str, name: str, end: bool) -> datetime:
+    # 날짜만 주어지면 하루 전체 (date_to는 다음 날 0시 미만)
+    day = parse_date(value)
+    if day is not None:
+        if end:
+            day += timedelta(days=1)
+        parsed = datetime.combine(day, time.min)
+    else:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"{name} must be an ISO 8601 date or datetime")
+        if end:
+            # datetime이면 해당 시각까지 포함
+            parsed += timedelta(microseconds=1)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_bbox(value: str) -> tuple:
+    try:
+        min_lat, min_lng, max_lat, max_lng = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng")
+
+    if not (-90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox latitudes must satisfy -90 <= min_lat <= max_lat <= 90")
+    if not (-180 <= min_lng <= max_lng <= 180):
+        raise ValueError("bbox longitudes must satisfy -180 <= min_lng <= max_lng <= 180")
+    return (min_lat, min_lng, max_lat, max_lng)
+
+
+def parse_near(value: str) -> tuple:
+    """
+    "lat,lng[,radius_km]" or "place[,radius_km]"
+
+    Returns:
+        (lat, lng, radius_km)
+    """
+    parts = [part.strip() for part in value.replace('"', "").split(",")]
+    radius_km = settings.HYBRID_SEARCH_SETTINGS.get("NEAR_DEFAULT_RADIUS_KM", 10)
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+        radius_parts = parts[2:]
+    except (ValueError, IndexError):
+        lat = lng = None
+        radius_parts = parts[1:]
+
+    if len(radius_parts) > 1 or not parts[0]:
+        raise ValueError("near must be lat,lng[,radius_km] or place[,radius_km]")
+    if radius_parts:
+        try:
+            radius_km = float(radius_parts[0])
+        except ValueError:
+            raise ValueError("near radius must be a number (km)")
+
+    max_radius_km = settings.HYBRID_SEARCH_SETTINGS.get("NEAR_MAX_RADIUS_KM", 1000)
+    if not (0 < radius_km <= max_radius_km):
+        raise ValueError(f"near radius must be between 0 and {max_radius_km} km")
+
+    if lat is None:
+        lat, lng = resolve_place(parts[0])
+    elif not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("near coordinates are out of range")
+    return (lat, lng, radius_km)
+
+
+def _parse_period(value: str) -> tuple:
+    # YYYY / YYYY-MM / YYYY-MM-DD → 그 기간의 (첫날, 다음 기간 첫날)
+    match = PERIOD_REGEX.match(value)
+    if match is None:
+        raise ValueError(f"date must be YYYY, YYYY-MM or YYYY-MM-DD: {value}")
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day is not None:
+            start = date(year, month, day)
+            return start, start + timedelta(days=1)
+        if month is not None:
+            start = date(year, month, 1)
+            return start, date(year + month // 12, month % 12 + 1, 1)
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+def _aware(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_date_token(value: str) -> tuple:
+    """
+    "A", "A..B", "A.." or "..B" with A / B as YYYY, YYYY-MM or YYYY-MM-DD
+
+    Returns:
+        (date_from, date_to)
+    """
+    start, sep, end = value.replace('"', "").partition("..")
+    if not sep:
+        period_start, period_end = _parse_period(start)
+        return _aware(period_start), _aware(period_end)
+    if not start and not end:
+        raise ValueError("date range needs a start or an end")
+    date_from = _aware(_parse_period(start)[0]) if start else None
+    date_to = _aware(_parse_period(end)[1]) if end else None
+    return date_from, date_to
+
+
+def _check_dates(filters: SearchFilters) -> SearchFilters:
+    if filters.date_from and filters.date_to and filters.date_from >= filters.date_to:
+        raise ValueError("date_from must be before date_to")
+    return filters
+
+
+def parse_search_filters(params) -> SearchFilters:
+    """
+    Read date_from / date_to / bbox / near query parameters.
+
+    Raises:
+        ValueError: malformed values (400 through handle_exceptions)
+    """
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    bbox = params.get("bbox")
+    near = params.get("near")
+
+    return _check_dates(
+        SearchFilters(
+            date_from=_parse_bound(date_from, "date_from", end=False) if date_from else None,
+            date_to=_parse_bound(date_to, "date_to", end=True) if date_to else None,
+            bbox=parse_bbox(bbox) if bbox else None,
+            near=parse_near(near) if near else None,
+        )
+    )
+
+
+def extract_query_filters(query: str) -> tuple:
+    """
+    Take date: / near: tokens out of the search text.
+
+    Returns:
+        (remaining search text, SearchFilters)
+    """
+    filters = SearchFilters()
+    for kind, value in FILTER_TOKEN_REGEX.findall(query):
+        if kind == "date":
+            date_from, date_to = parse_date_token(value)
+            token_filters = SearchFilters(date_from=date_from, date_to=date_to)
+        else:
+            token_filters = SearchFilters(near=parse_near(value))
+        filters = filters.merge(token_filters)
+
+    remaining = " ".join(FILTER_TOKEN_REGEX.sub(" ", query).split())
+    return remaining, _check_dates(filters)
@@ -0,0 +1,70 @@
+"""
+Place names of the near: search filter resolved to coordinates.
+
+Names are looked up with the Kakao Local API (address search, then keyword
+search for landmarks) and cached in Redis under ``place:{name}`` so a
+repeated "near:부산" costs no API call. Names Kakao doesn't know are cached
+too, as an empty value. Redis errors only cost the cache.
+"""
+
+import redis
+import requests
+from django.conf import settings
+
+from config.redis import get_redis
+
+from .exceptions import SearchExecutionError
+
+KAKAO_SEARCH_URLS = (
+    "https://dapi.kakao.com/v2/local/search/address.json",
+    "https://dapi.kakao.com/v2/local/search/keyword.json",
+)
+
+
+def cache_key(name: str) -> str:
+    return f"place:{name}"
+
+
+def _search_kakao(name: str):
+    headers = {"Authorization": f"KakaoAK {settings.KM_REST_API_KEY}"}
+    for url in KAKAO_SEARCH_URLS:
+        try:
+            resp = requests.get(url, params={"query": name, "size": 1}, headers=headers, timeout=5)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise SearchExecutionError(f"Place lookup failed for {name}: {e}") from e
+
+        documents = resp.json().get("documents")
+        if documents:
+            return float(documents[0]["y"]), float(documents[0]["x"])
+    return None
+
+
+def resolve_place(name: str):
+    """
+    Returns:
+        (lat, lng) of the place
+
+    Raises:
+        ValueError: unknown place (400 through handle_exceptions)
+    """
+    key = cache_key(name)
+    try:
+        cached = get_redis().get(key)
+    except redis.RedisError as e:
+        print(f"[WARN] Place cache read failed for {name}: {e}")
+        cached = None
+
+    if cached is None:
+        location = _search_kakao(name)
+        cached = f"{location[0]},{location[1]}" if location else ""
+        ttl = settings.HYBRID_SEARCH_SETTINGS.get("PLACE_CACHE_TTL", 60 * 60 * 24 * 7)
+        try:
+            get_redis().set(key, cached, ex=ttl)
+        except redis.RedisError as e:
+            print(f"[WARN] Place cache write failed for {name}: {e}")
+
+    if not cached:
+        raise ValueError(f"Unknown place: {name}")
+    lat, lng = cached.split(",")
+    return float(lat), float(lng)
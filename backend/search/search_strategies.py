@@ -4,10 +4,10 @@ from collections import defaultdict
 from gallery.models import Photo, Photo_Tag
 from search.embedding_service import create_query_embedding
 from gallery.qdrant_utils import get_qdrant_client, IMAGE_COLLECTION_NAME
-from qdrant_client.http import models
 import uuid
 from gallery.tasks import execute_hybrid_search
 from .exceptions import SearchExecutionError
+from .filters import SearchFilters, user_filter as build_user_filter
 from config import settings
 
 SEARCH_SETTINGS = settings.HYBRID_SEARCH_SETTINGS
@@ -28,25 +28,19 @@ class TagOnlySearchStrategy(SearchStrategy):
         tag_ids = query_params['tag_ids']
         offset = query_params.get('offset', 0)
         limit = query_params.get('limit', 50)
+        filters = query_params.get('filters') or SearchFilters()
 
         # 각 태그별 점수를 별도로 저장
         tag_scores_per_photo = defaultdict(dict)  # {photo_id: {tag_id: score}}
 
-        user_filter = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="user_id",
-                    match=models.MatchValue(value=user.id),
-                )
-            ]
-        )
+        user_filter = build_user_filter(user.id, filters)
 
         for tag_id in tag_ids:
             # 이 태그에 직접 속한 사진 ID 조회
             tag_photo_uuids = set(
-                Photo_Tag.objects.filter(user=user, tag_id=tag_id).values_list(
-                    "photo_id", flat=True
-                )
+                filters.filter_photos(
+                    Photo_Tag.objects.filter(user=user, tag_id=tag_id), prefix="photo__"
+                ).values_list("photo_id", flat=True)
             )
 
             tag_photo_ids_str = {str(pid) for pid in tag_photo_uuids}
@@ -137,14 +131,7 @@ class SemanticOnlySearchStrategy(SearchStrategy):
             query_vector = create_query_embedding(query_params['query_text'])
             client = get_qdrant_client()
 
-            user_filter = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="user_id",
-                        match=models.MatchValue(value=user.id),
-                    )
-                ]
-            )
+            user_filter = build_user_filter(user.id, query_params.get('filters'))
 
             search_result = client.search(
                 collection_name=IMAGE_COLLECTION_NAME,
@@ -205,7 +192,8 @@ class HybridSearchStrategy(SearchStrategy):
             tag_ids=query_params['tag_ids'],
             query_string=query_params['query_text'],
             offset=query_params['offset'],
-            limit=query_params['limit'] 
+            limit=query_params['limit'],
+            filters=query_params.get('filters'),
         )
 
 
@@ -0,0 +1,136 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import redis
+import requests
+from django.test import TestCase
+from django.utils import timezone
+
+from search.exceptions import SearchExecutionError
+from search.filters import SearchFilters, extract_query_filters, parse_near
+from search.places import resolve_place
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ExtractQueryFiltersTest(TestCase):
+    """검색어의 date: / near: 필터 파싱 테스트"""
+
+    def test_date_periods(self):
+        """Test year, month and day periods and open ranges"""
+        cases = {
+            "date:2024": (aware(2024, 1, 1), aware(2025, 1, 1)),
+            "date:2024-12": (aware(2024, 12, 1), aware(2025, 1, 1)),
+            "date:2024-06..2024-08": (aware(2024, 6, 1), aware(2024, 9, 1)),
+            "date:2024-06-15..": (aware(2024, 6, 15), None),
+            "date:..2024-02-29": (None, aware(2024, 3, 1)),
+        }
+        for token, (date_from, date_to) in cases.items():
+            _, filters = extract_query_filters(f"beach {token}")
+            self.assertEqual((filters.date_from, filters.date_to), (date_from, date_to), token)
+
+    def test_removes_tokens_from_text(self):
+        """Test that filter tokens are taken out of the semantic query"""
+        text, filters = extract_query_filters('{sunset} beach date:2024 near:"35.1, 129.0",5 party')
+
+        self.assertEqual(text, "{sunset} beach party")
+        self.assertEqual(filters.near, (35.1, 129.0, 5.0))
+
+    def test_near_default_radius(self):
+        """Test that near without a radius uses NEAR_DEFAULT_RADIUS_KM"""
+        with self.settings(HYBRID_SEARCH_SETTINGS={"NEAR_DEFAULT_RADIUS_KM": 3}):
+            self.assertEqual(parse_near("35.1,129.0"), (35.1, 129.0, 3))
+
+    def test_invalid_tokens(self):
+        """Test that malformed filters raise ValueError"""
+        for query in (
+            "date:summer",
+            "date:2024-13",
+            "date:..",
+            "date:2024-08..2024-06",
+            "date:2024 date:2025",
+            "near:35.1,129.0,0",
+            "near:35.1,129.0,5000",
+            "near:95,129.0",
+            "near:35.1,129.0,5,1",
+        ):
+            with self.assertRaises(ValueError, msg=query):
+                extract_query_filters(f"beach {query}")
+
+    def test_merge_rejects_duplicates(self):
+        """Test that a filter given as parameter and in the text is rejected"""
+        filters = SearchFilters(near=(35.1, 129.0, 5))
+
+        with self.assertRaises(ValueError):
+            filters.merge(SearchFilters(near=(37.5, 127.0, 5)))
+        self.assertEqual(
+            filters.merge(SearchFilters(date_from=aware(2024, 1, 1))).near, (35.1, 129.0, 5)
+        )
+
+
+class ResolvePlaceTest(TestCase):
+    """지명 → 좌표 변환 테스트"""
+
+    def setUp(self):
+        patcher = patch("search.places.get_redis")
+        self.mock_redis = patcher.start().return_value
+        self.mock_redis.get.return_value = None
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("search.places.requests.get")
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _response(self, documents):
+        response = MagicMock()
+        response.json.return_value = {"documents": documents}
+        return response
+
+    def test_address_search_and_cache(self):
+        """Test that the Kakao address search result is cached"""
+        self.mock_get.return_value = self._response([{"x": "129.075", "y": "35.179"}])
+
+        self.assertEqual(resolve_place("부산"), (35.179, 129.075))
+
+        self.assertEqual(self.mock_get.call_count, 1)
+        self.assertEqual(self.mock_get.call_args.kwargs["params"]["query"], "부산")
+        self.mock_redis.set.assert_called_once()
+        self.assertEqual(self.mock_redis.set.call_args.args, ("place:부산", "35.179,129.075"))
+
+    def test_cached_place(self):
+        """Test that a cached place needs no API call"""
+        self.mock_redis.get.return_value = "35.179,129.075"
+
+        self.assertEqual(resolve_place("부산"), (35.179, 129.075))
+        self.mock_get.assert_not_called()
+
+    def test_keyword_fallback_and_unknown_place(self):
+        """Test the keyword search fallback and that unknown places are rejected"""
+        self.mock_get.side_effect = [
+            self._response([]),
+            self._response([{"x": "129.16", "y": "35.16"}]),
+        ]
+        self.assertEqual(resolve_place("해운대해수욕장"), (35.16, 129.16))
+
+        self.mock_get.side_effect = [self._response([]), self._response([])]
+        with self.assertRaises(ValueError):
+            resolve_place("없는곳")
+        # 없는 지명도 캐시
+        self.assertEqual(self.mock_redis.set.call_args.args, ("place:없는곳", ""))
+
+    def test_api_failure(self):
+        """Test that a Kakao failure is a search error, not a bad request"""
+        self.mock_get.side_effect = requests.ConnectionError("down")
+
+        with self.assertRaises(SearchExecutionError):
+            resolve_place("부산")
+
+    def test_redis_failure(self):
+        """Test that Redis errors only skip the cache"""
+        self.mock_redis.get.side_effect = redis.ConnectionError("down")
+        self.mock_redis.set.side_effect = redis.ConnectionError("down")
+        self.mock_get.return_value = self._response([{"x": "129.075", "y": "35.179"}])
+
+        self.assertEqual(resolve_place("부산"), (35.179, 129.075))
@@ -293,3 +293,147 @@ class SemanticSearchViewTest(APITestCase):
         # Verify order is maintained
         self.assertEqual(str(response.data[0]["photo_id"]), str(self.photo2.photo_id))
         self.assertEqual(str(response.data[1]["photo_id"]), str(self.photo1.photo_id))
+
+    @patch("search.search_strategies.get_qdrant_client")
+    @patch("search.search_strategies.create_query_embedding")
+    def test_search_pushes_date_and_bbox_filters(self, mock_embedding, mock_get_client):
+        """Test that date_from / date_to / bbox go into the Qdrant query_filter"""
+        mock_embedding.return_value = [0.1] * 512
+        mock_get_client.return_value.search.return_value = []
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            response = self.client.get(
+                self.search_url,
+                {
+                    "query": "beach",
+                    "date_from": "2024-06-01",
+                    "date_to": "2024-08-31",
+                    "bbox": "34.9,128.7,35.4,129.4",
+                },
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        conditions = {
+            condition.key: condition
+            for condition in mock_get_client.return_value.search.call_args[1]["query_filter"].must
+        }
+        self.assertEqual(conditions["user_id"].match.value, self.user.id)
+        created_at = conditions["created_at"].range
+        self.assertEqual(created_at.gte.isoformat(), "2024-06-01T00:00:00+00:00")
+        # date_to는 그 날 하루 전체를 포함
+        self.assertEqual(created_at.lt.isoformat(), "2024-09-01T00:00:00+00:00")
+        self.assertEqual((conditions["lat"].range.gte, conditions["lat"].range.lte), (34.9, 35.4))
+        self.assertEqual((conditions["lng"].range.gte, conditions["lng"].range.lte), (128.7, 129.4))
+
+    @patch("search.search_strategies.get_qdrant_client")
+    def test_search_tag_only_filters_direct_photos(self, mock_get_client):
+        """Test that directly tagged photos outside the bbox are dropped in SQL"""
+        mock_get_client.return_value.recommend.return_value = []
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            response = self.client.get(
+                self.search_url,
+                {"query": "{sunset} {beach}", "bbox": "34.9,128.7,35.4,129.4"},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([photo["photo_path_id"] for photo in response.data], [1002])
+        query_filter = mock_get_client.return_value.recommend.call_args[1]["query_filter"]
+        self.assertEqual([condition.key for condition in query_filter.must], ["user_id", "lat", "lng"])
+
+    def test_search_invalid_filters(self):
+        """Test that malformed date / bbox parameters are rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+
+        for params in (
+            {"date_from": "last summer"},
+            {"date_from": "2024-09-01", "date_to": "2024-06-01"},
+            {"bbox": "35,129"},
+            {"bbox": "36,128,35,129"},
+        ):
+            response = self.client.get(self.search_url, {"query": "{sunset}", **params})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    @patch("search.search_strategies.get_qdrant_client")
+    @patch("search.search_strategies.create_query_embedding")
+    def test_search_filter_needs_payload_field(self, mock_embedding, mock_get_client):
+        """Test that filtering on a field outside the payload profile fails loudly"""
+        mock_embedding.return_value = [0.1] * 512
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "minimal"}):
+            response = self.client.get(
+                self.search_url, {"query": "beach", "date_from": "2024-06-01"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        mock_get_client.return_value.search.assert_not_called()
+
+    @patch("search.search_strategies.get_qdrant_client")
+    @patch("search.search_strategies.create_query_embedding")
+    def test_search_query_syntax_filters(self, mock_embedding, mock_get_client):
+        """Test that date: / near: in the query go into the Qdrant query_filter"""
+        mock_embedding.return_value = [0.1] * 512
+        mock_get_client.return_value.search.return_value = []
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            response = self.client.get(
+                self.search_url, {"query": "beach date:2024-06..2024-08 near:35.1,129.0,5"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_embedding.assert_called_once_with("beach")
+        conditions = {
+            condition.key: condition
+            for condition in mock_get_client.return_value.search.call_args[1]["query_filter"].must
+        }
+        self.assertEqual(conditions["created_at"].range.gte.isoformat(), "2024-06-01T00:00:00+00:00")
+        self.assertEqual(conditions["created_at"].range.lt.isoformat(), "2024-09-01T00:00:00+00:00")
+        geo_radius = conditions["location"].geo_radius
+        self.assertEqual((geo_radius.center.lat, geo_radius.center.lon), (35.1, 129.0))
+        self.assertEqual(geo_radius.radius, 5000)
+
+    @patch("search.search_strategies.get_qdrant_client")
+    def test_search_near_filters_direct_photos(self, mock_get_client):
+        """Test that directly tagged photos outside the radius are dropped in SQL"""
+        mock_get_client.return_value.recommend.return_value = []
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            # 부산 근처 (서울의 photo1은 약 320km 밖)
+            response = self.client.get(
+                self.search_url, {"query": "{sunset} {beach} near:35.2,129.1,30"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([photo["photo_path_id"] for photo in response.data], [1002])
+
+    @patch("search.filters.resolve_place")
+    @patch("search.search_strategies.get_qdrant_client")
+    @patch("search.search_strategies.create_query_embedding")
+    def test_search_near_place(self, mock_embedding, mock_get_client, mock_resolve_place):
+        """Test that near:<place> is resolved to coordinates"""
+        mock_embedding.return_value = [0.1] * 512
+        mock_get_client.return_value.search.return_value = []
+        mock_resolve_place.return_value = (35.179, 129.075)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        with self.settings(QDRANT_COLLECTION_SETTINGS={"PAYLOAD_PROFILE": "filters"}):
+            response = self.client.get(self.search_url, {"query": "beach", "near": "부산,20"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_resolve_place.assert_called_once_with("부산")
+        location = mock_get_client.return_value.search.call_args[1]["query_filter"].must[-1]
+        self.assertEqual(location.geo_radius.radius, 20000)
+
+    def test_search_filter_given_twice(self):
+        """Test that the same filter in the parameters and the query is rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        response = self.client.get(
+            self.search_url, {"query": "{sunset} near:35.1,129.0", "near": "37.5,127.0"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
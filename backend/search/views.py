@@ -11,6 +11,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.conf import settings
 
+from .filters import extract_query_filters, parse_search_filters
 from .search_strategies import SearchStrategyFactory
 
 TAG_REGEX = re.compile(r"\{([^}]+)\}")
@@ -24,7 +25,12 @@ class SemanticSearchView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Semantic Search",
-        operation_description="Search photos semantically using a query string.",
+        operation_description=(
+            "Search photos semantically using a query string. "
+            "{tag} selects a tag; date:2024-06..2024-08 and near:부산[,km] / "
+            "near:lat,lng[,km] in the query, or the date_from / date_to / bbox / near "
+            "parameters, narrow the search inside Qdrant."
+        ),
         manual_parameters=[
             openapi.Parameter(
                 "query",
@@ -33,6 +39,34 @@ class SemanticSearchView(APIView):
                 type=openapi.TYPE_STRING,
                 required=True,
             ),
+            openapi.Parameter(
+                "date_from",
+                openapi.IN_QUERY,
+                description="Only photos taken at or after this ISO 8601 date / datetime",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "date_to",
+                openapi.IN_QUERY,
+                description="Only photos taken until this ISO 8601 date (whole day) / datetime",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "bbox",
+                openapi.IN_QUERY,
+                description="Only photos inside the box: min_lat,min_lng,max_lat,max_lng",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "near",
+                openapi.IN_QUERY,
+                description="Only photos within a radius: lat,lng[,radius_km] or place[,radius_km]",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
             openapi.Parameter(
                 "offset",
                 openapi.IN_QUERY,
@@ -85,8 +119,11 @@ class SemanticSearchView(APIView):
                 else SEARCH_SETTINGS.get("SEARCH_SUBSEQUENT_PAGE_SIZE", 60)
             )
         limit = int(request.GET.get("limit", default_limit))
+        filters = parse_search_filters(request.GET)
 
-        # Parse tags and semantic query
+        # Parse date: / near: filters, tags and semantic query
+        query, query_filters = extract_query_filters(query)
+        filters = filters.merge(query_filters)
         tag_names = TAG_REGEX.findall(query)
         semantic_query = TAG_REGEX.sub("", query).strip()
 
@@ -109,7 +146,8 @@ class SemanticSearchView(APIView):
             'tag_ids': valid_tag_ids,
             'query_text': semantic_query,
             'offset': offset,
-            'limit': limit
+            'limit': limit,
+            'filters': filters,
         })
 
         serializer = PhotoResponseSerializer(results, many=True)